@@ -0,0 +1,148 @@
+"""Compares the sequential Dashboard queries with the single sp_GetDashboard call.
+
+The sequential path issues the four statements the Dashboard used to run one
+after another (rating stats, reviews, freelancer contracts, owner contracts);
+the batched path makes one callproc and reads the four result sets through
+stored_results(). A simulated network round-trip time is added to every
+statement sent to the server so the effect of a remote MySQL host shows up
+even when benchmarking against localhost:
+
+    python -m benchmarks.bench_dashboard --rtt-ms 0 1 5 20 50
+
+Runs against the database named by DB_NAME; pick students with --student-id,
+otherwise the students with the most contracts are used.
+"""
+import argparse
+import json
+import time
+
+import mysql.connector
+
+from benchmarks.common import print_table, time_call
+from db_config import load_db_config
+
+SEQUENTIAL_QUERIES = [
+    """
+    SELECT fn_GetStudentAverageRating(%(id)s) AS avg, fn_GetStudentReviewCount(%(id)s) AS count
+    """,
+    """
+    SELECT r.rating, r.review_text, p.title AS project_title
+    FROM Review r
+    JOIN Contract c ON r.contract_id = c.contract_id
+    JOIN Project p ON c.project_id = p.project_id
+    WHERE r.student_id = %(id)s
+    ORDER BY c.end_date DESC
+    """,
+    """
+    SELECT c.contract_id, p.title AS project_title, s.name AS project_owner_name, c.start_date, c.end_date
+    FROM Contract c
+    JOIN Project p ON c.project_id = p.project_id
+    JOIN Student s ON p.student_id = s.student_id
+    WHERE c.student_id = %(id)s AND p.status = 'In Progress'
+    """,
+    """
+    SELECT c.contract_id, p.title AS project_title, s.name AS freelancer_name, c.start_date, c.end_date
+    FROM Contract c
+    JOIN Project p ON c.project_id = p.project_id
+    JOIN Student s ON c.student_id = s.student_id
+    WHERE p.student_id = %(id)s AND p.status = 'In Progress'
+    """,
+]
+
+
+class DelayedCursor:
+    """Wraps a cursor and sleeps for one RTT on every statement sent to the server."""
+
+    def __init__(self, cursor, rtt):
+        self._cursor = cursor
+        self._rtt = rtt
+
+    def execute(self, *args, **kwargs):
+        time.sleep(self._rtt)
+        return self._cursor.execute(*args, **kwargs)
+
+    def callproc(self, *args, **kwargs):
+        time.sleep(self._rtt)
+        return self._cursor.callproc(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def sequential_dashboard(conn, student_id, rtt):
+    cursor = DelayedCursor(conn.cursor(dictionary=True), rtt)
+    results = []
+    for query in SEQUENTIAL_QUERIES:
+        cursor.execute(query, {'id': student_id})
+        results.append(cursor.fetchall())
+    cursor.close()
+    return sum(len(rows) for rows in results)
+
+
+def batched_dashboard(conn, student_id, rtt, review_limit):
+    cursor = DelayedCursor(conn.cursor(dictionary=True), rtt)
+    cursor.callproc('sp_GetDashboard', [student_id, review_limit])
+    rows = sum(len(result.fetchall()) for result in cursor.stored_results())
+    cursor.close()
+    return rows
+
+
+def busiest_students(conn, limit):
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT student_id FROM (
+            SELECT c.student_id FROM Contract c
+            UNION ALL
+            SELECT p.student_id FROM Contract c JOIN Project p ON c.project_id = p.project_id
+        ) AS involved
+        GROUP BY student_id ORDER BY COUNT(*) DESC LIMIT %s
+        """,
+        (limit,),
+    )
+    ids = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rtt-ms", type=float, nargs="+", default=[0, 1, 5, 20, 50])
+    parser.add_argument("--student-id", type=int, action="append")
+    parser.add_argument("--students", type=int, default=3, help="how many busy students to sample")
+    parser.add_argument("--review-limit", type=int, default=3, help="recent reviews fetched by sp_GetDashboard")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**load_db_config())
+    try:
+        student_ids = args.student_id or busiest_students(conn, args.students) or [1]
+        results = []
+        for rtt_ms in args.rtt_ms:
+            rtt = rtt_ms / 1000
+            for student_id in student_ids:
+                seq = time_call(lambda: sequential_dashboard(conn, student_id, rtt), repeat=args.repeat)
+                one = time_call(lambda: batched_dashboard(conn, student_id, rtt, args.review_limit), repeat=args.repeat)
+                results.append({
+                    'rtt_ms': rtt_ms,
+                    'student_id': student_id,
+                    'sequential_round_trips': len(SEQUENTIAL_QUERIES),
+                    'sequential_p50_ms': seq['p50_ms'],
+                    'sequential_p95_ms': seq['p95_ms'],
+                    'batched_round_trips': 1,
+                    'batched_p50_ms': one['p50_ms'],
+                    'batched_p95_ms': one['p95_ms'],
+                    'saved_p50_ms': seq['p50_ms'] - one['p50_ms'],
+                })
+    finally:
+        conn.close()
+
+    print_table(results, list(results[0].keys()) if results else [])
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Times every db_* data function at each seeded scale.
+
+For each --scales preset (see tools/seed_data.py) a fresh database is created
+and seeded, then each db_* function is timed through the repository method
+behind it. Reads are timed for a few personas: the busiest owner, the most
+reviewed freelancer and a typical student. Writes consume fresh inputs on
+every call. The Streamlit query cache is not involved, so the numbers are the
+database work a cache miss costs.
+
+    python -m benchmarks.bench_db_functions --scales small campus --json db_functions.json
+    python -m benchmarks.bench_db_functions --backend mysql --scales small
+    python -m benchmarks.bench_db_functions --json new.json --baseline db_functions.json
+
+The default backend is the embedded SQLite one (a temporary file per scale),
+so this runs without a server. With --backend mysql the scratch database
+--database is re-created from pesuconnect_schema.sql for every scale and
+dropped afterwards unless --keep is given. The JSON records the commit it ran
+on; --baseline adds each function's p50 change against an earlier run.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import tempfile
+import uuid
+
+import mysql.connector
+
+from benchmarks.common import print_table, time_call
+from db_config import load_db_config
+from instrumentation import row_count
+from repository import MySQLRepository, SQLiteRepository
+from tools.seed_data import SCALES, SEED_PASSWORD, apply_mysql_schema, seed
+
+
+def query_rows(repo, sql):
+    """Runs a setup query on either backend and returns plain tuples."""
+    cursor = repo.conn.cursor()
+    cursor.execute(sql)
+    rows = [tuple(row.values()) if isinstance(row, dict) else tuple(row) for row in cursor.fetchall()]
+    cursor.close()
+    return rows
+
+
+def find_personas(repo, rng):
+    """Picks the students and projects the cases run against."""
+    busiest_owner = query_rows(repo, "SELECT student_id FROM Project GROUP BY student_id ORDER BY COUNT(*) DESC LIMIT 1")
+    most_reviewed = query_rows(repo, "SELECT student_id FROM Student_Rating_Summary ORDER BY review_count DESC LIMIT 1")
+    popular_project = query_rows(repo, """
+        SELECT project_id FROM Application WHERE status = 'Pending'
+        GROUP BY project_id ORDER BY COUNT(*) DESC LIMIT 1
+    """)
+    n_students = query_rows(repo, "SELECT COUNT(*) FROM Student")[0][0]
+    return {
+        'busiest_owner': busiest_owner[0][0] if busiest_owner else 1,
+        'most_reviewed': most_reviewed[0][0] if most_reviewed else 1,
+        'typical': rng.randint(1, n_students),
+        'popular_project': popular_project[0][0] if popular_project else 1,
+    }
+
+
+def write_inputs(repo, personas, needed):
+    """Pre-computes enough fresh inputs for every write case to run `needed` times."""
+    student = personas['typical']
+    applicable = query_rows(repo, f"""
+        SELECT p.project_id FROM Project p
+        WHERE p.status = 'Open' AND p.student_id <> {student}
+          AND NOT EXISTS (SELECT 1 FROM Application a WHERE a.project_id = p.project_id AND a.student_id = {student})
+        ORDER BY p.project_id LIMIT {needed}
+    """)
+    # One pending application per distinct open project (accepting closes the project).
+    acceptable = query_rows(repo, f"""
+        SELECT MIN(a.application_id) FROM Application a JOIN Project p ON p.project_id = a.project_id
+        WHERE a.status = 'Pending' AND p.status = 'Open' AND a.project_id NOT IN ({
+            ", ".join(str(row[0]) for row in applicable) or "0"})
+        GROUP BY a.project_id ORDER BY a.project_id LIMIT {needed}
+    """)
+    completable = query_rows(repo, f"""
+        SELECT c.contract_id, p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id
+        WHERE c.status = 'In Progress' ORDER BY c.contract_id LIMIT {needed}
+    """)
+    skills = [name for (name,) in query_rows(repo, "SELECT skill_name FROM Skill ORDER BY skill_id LIMIT 5")]
+    return {
+        'apply': iter([row[0] for row in applicable]),
+        'accept': iter([row[0] for row in acceptable]),
+        'complete': iter(completable),
+        'skills': skills,
+    }
+
+
+def build_cases(personas, inputs):
+    """(db function, persona, callable taking the repository)."""
+    owner, reviewed, typical = personas['busiest_owner'], personas['most_reviewed'], personas['typical']
+    deadline = datetime.date.today() + datetime.timedelta(days=30)
+    levels = iter(["Beginner", "Advanced"] * 10_000)
+    cases = [
+        ('db_student_login', 'typical', lambda r: r.login(f"student{typical}@pesu.edu", SEED_PASSWORD)),
+        ('db_get_open_projects', 'all', lambda r: r.get_open_projects()),
+        ('db_search_projects_page', 'first page', lambda r: r.search_projects_page(page_size=20)),
+        ('db_search_projects_page', 'keyword', lambda r: r.search_projects_page(page_size=20, keyword="dashboard")),
+        ('db_search_projects_ranked', 'keyword', lambda r: r.search_projects_ranked("python dashboard", page_size=20)),
+        ('db_get_my_projects', 'busiest owner', lambda r: r.get_my_projects(owner)),
+        ('db_get_my_projects', 'typical', lambda r: r.get_my_projects(typical)),
+        ('db_get_pending_applications', 'popular project',
+         lambda r: r.get_pending_applications(personas['popular_project'])),
+        ('db_get_pending_applications_by_project', 'busiest owner',
+         lambda r: r.get_pending_applications_by_project([p['project_id'] for p in r.get_my_projects(owner)][:50])),
+        ('db_get_my_skills', 'typical', lambda r: r.get_my_skills(typical)),
+        ('db_get_skill_catalog', 'all', lambda r: r.get_skill_catalog()),
+        ('db_get_my_applied_project_ids', 'typical', lambda r: r.get_applied_project_ids(typical)),
+        ('db_get_recommended_projects', 'matrix rebuild', lambda r: r.get_project_skill_rows()),
+        ('db_get_my_contracts', 'most reviewed', lambda r: r.get_my_contracts(reviewed)),
+        ('db_get_my_contracts', 'busiest owner', lambda r: r.get_my_contracts(owner)),
+        ('db_get_my_reviews', 'most reviewed', lambda r: r.get_my_reviews(reviewed)),
+        ('db_get_my_reviews', 'typical', lambda r: r.get_my_reviews(typical)),
+        ('db_get_dashboard', 'most reviewed', lambda r: r.get_dashboard(reviewed)),
+        ('db_get_dashboard', 'typical', lambda r: r.get_dashboard(typical)),
+        ('db_get_entity_versions', 'typical', lambda r: r.get_entity_versions(typical)),
+        # Writes: every call gets a fresh input.
+        ('db_apply_for_project', 'typical', lambda r: r.apply_for_project(typical, next(inputs['apply']))),
+        ('db_create_project', 'typical',
+         lambda r: r.create_project(typical, "Benchmark project", "Created by bench_db_functions", deadline,
+                                    [(name, "Beginner") for name in inputs['skills'][:3]])),
+        ('db_save_skills', 'typical',
+         lambda r: r.save_skills(typical, [(name, next(levels)) for name in inputs['skills']])),
+        ('db_accept_application', 'open project', lambda r: r.accept_application(next(inputs['accept']))),
+        ('db_complete_contract_with_review', 'in-progress contract',
+         lambda r: _complete(r, next(inputs['complete']))),
+    ]
+    return cases
+
+
+def _complete(repo, contract):
+    contract_id, owner_id = contract
+    return repo.complete_contract_with_review(contract_id, owner_id, 5, "Benchmark review", 100, "UPI", uuid.uuid4().hex)
+
+
+def open_scratch(args, scale, workdir):
+    if args.backend == "sqlite":
+        return SQLiteRepository(os.path.join(workdir, f"{scale}.sqlite3"))
+    config = load_db_config()
+    config.pop('database', None)
+    conn = mysql.connector.connect(**config)
+    cursor = conn.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS {args.database}")
+    cursor.execute(f"CREATE DATABASE {args.database}")
+    cursor.execute(f"USE {args.database}")
+    cursor.close()
+    apply_mysql_schema(conn, args.schema)
+    return MySQLRepository(conn)
+
+
+def drop_scratch(args, repo):
+    if args.backend == "mysql" and not args.keep:
+        cursor = repo.conn.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS {args.database}")
+        cursor.close()
+    repo.conn.close()
+
+
+def run_metadata(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.datetime.now().isoformat(timespec="seconds"),
+        'backend': args.backend,
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+    }
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r['scale'], r['function'], r['persona']): r for r in json.load(f)['results']}
+    for row in results:
+        base = baseline.get((row['scale'], row['function'], row['persona']))
+        if base and base['p50_ms']:
+            row['vs_baseline'] = f"{(row['p50_ms'] / base['p50_ms'] - 1) * 100:+.0f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=SCALES, default=["small", "campus"])
+    parser.add_argument("--backend", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument("--database", default="pesuconnect_bench", help="scratch MySQL database to create")
+    parser.add_argument("--schema", default="pesuconnect_schema.sql")
+    parser.add_argument("--function", action="append", help="only time these db_* functions (repeatable)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--baseline", help="earlier --json output to compare p50 against")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch MySQL database")
+    args = parser.parse_args()
+
+    warmup = 2
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in args.scales:
+            repo = open_scratch(args, scale, workdir)
+            try:
+                print(f"Seeding {scale} ({args.backend})...")
+                seed(repo, SCALES[scale], seed=args.seed)
+                personas = find_personas(repo, random.Random(args.seed))
+                inputs = write_inputs(repo, personas, args.repeat + warmup)
+                for function, persona, call in build_cases(personas, inputs):
+                    if args.function and function not in args.function:
+                        continue
+                    try:
+                        timing = time_call(lambda: call(repo), repeat=args.repeat, warmup=warmup)
+                    except StopIteration:
+                        print(f"skipped {function} ({persona}): not enough seeded rows for {args.repeat} runs")
+                        continue
+                    results.append({
+                        'scale': scale,
+                        'function': function,
+                        'persona': persona,
+                        'p50_ms': timing['p50_ms'],
+                        'p95_ms': timing['p95_ms'],
+                        'mean_ms': timing['mean_ms'],
+                        'rows': row_count(timing['result']),
+                    })
+            finally:
+                drop_scratch(args, repo)
+
+    columns = ['scale', 'function', 'persona', 'p50_ms', 'p95_ms', 'rows']
+    if args.baseline:
+        compare(results, args.baseline)
+        columns.append('vs_baseline')
+    print_table(results, columns)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'meta': run_metadata(args), 'results': results}, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Compares plain-text and server-side prepared execution of the hot reads.
+
+Each repository method served by repository/prepared.py is timed twice on
+the same connection: once with the default MySQLRepository(conn), which
+sends the SQL text on every call, and once with prepared=True, which prepares
+each statement on first use and afterwards sends only its parameters. The
+session's Com_stmt_prepare / Com_stmt_execute / Com_stmt_reset counters are
+read around the prepared run to confirm every statement was prepared once and
+to show the COM_STMT_RESET mysql.connector sends before every execute: a
+prepared read costs two round trips to a plain one's, so run this against the
+production server (not localhost) before setting DB_PREPARED_STATEMENTS=1.
+Both paths must return the same rows; the prepared one is then checked again
+after conn.reconnect(), which must re-prepare transparently.
+
+    python -m benchmarks.bench_prepared --scales small campus
+    python -m benchmarks.bench_prepared --scales campus --repeat 200 --json prepared.json
+
+MySQL only (SQLite already caches compiled statements per connection). The
+scratch database --database is re-created from pesuconnect_schema.sql for
+every scale and dropped afterwards unless --keep is given.
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+
+from benchmarks.bench_db_functions import drop_scratch, find_personas, open_scratch, run_metadata
+from benchmarks.common import print_table, time_call
+from instrumentation import row_count
+from repository.prepared import prepared_statement_stats
+from tools.seed_data import SCALES, seed
+
+
+def build_cases(personas):
+    """(repository method, persona, callable taking the repository) for every prepared statement."""
+    owner, reviewed, typical = personas['busiest_owner'], personas['most_reviewed'], personas['typical']
+    return [
+        ('get_my_projects', 'busiest owner', lambda r: r.get_my_projects(owner)),
+        ('get_my_projects', 'typical', lambda r: r.get_my_projects(typical)),
+        ('get_applied_project_ids', 'typical', lambda r: r.get_applied_project_ids(typical)),
+        ('get_pending_applications', 'popular project', lambda r: r.get_pending_applications(personas['popular_project'])),
+        ('get_my_skills', 'typical', lambda r: r.get_my_skills(typical)),
+        ('get_skill_catalog', 'all', lambda r: r.get_skill_catalog()),
+        ('get_freelance_contracts', 'most reviewed', lambda r: r.get_freelance_contracts(reviewed)),
+        ('get_owner_contracts', 'busiest owner', lambda r: r.get_owner_contracts(owner)),
+        ('get_rating_stats', 'most reviewed', lambda r: r.get_rating_stats(reviewed)),
+        ('get_reviews_received', 'most reviewed', lambda r: r.get_reviews_received(reviewed)),
+        ('get_reviews_received', 'typical', lambda r: r.get_reviews_received(typical)),
+        ('get_entity_versions', 'typical', lambda r: r.get_entity_versions(typical)),
+    ]
+
+
+def statement_counters(conn):
+    cursor = conn.cursor()
+    cursor.execute(
+        "SHOW SESSION STATUS WHERE Variable_name IN ('Com_stmt_prepare', 'Com_stmt_execute', 'Com_stmt_reset')"
+    )
+    counters = {name: int(value) for name, value in cursor.fetchall()}
+    cursor.close()
+    return counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=SCALES, default=["small", "campus"])
+    parser.add_argument("--database", default="pesuconnect_bench", help="scratch MySQL database to create")
+    parser.add_argument("--schema", default="pesuconnect_schema.sql")
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch MySQL database")
+    args = parser.parse_args()
+    args.backend = "mysql"  # open_scratch / drop_scratch / run_metadata
+
+    warmup = 2
+    results = []
+    mismatches = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in args.scales:
+            repo = open_scratch(args, scale, workdir)
+            try:
+                print(f"Seeding {scale}...")
+                seed(repo, SCALES[scale], seed=args.seed)
+                cases = build_cases(find_personas(repo, random.Random(args.seed)))
+
+                timings = {}
+                for prepared in (False, True):
+                    repo.prepared = prepared
+                    before = statement_counters(repo.conn)
+                    for method, persona, call in cases:
+                        timings[method, persona, prepared] = time_call(lambda: call(repo), repeat=args.repeat, warmup=warmup)
+                    after = statement_counters(repo.conn)
+                    if prepared:
+                        delta = {name: after[name] - before[name] for name in after}
+                        print(f"{scale}: {delta['Com_stmt_prepare']} statement(s) prepared for "
+                              f"{delta['Com_stmt_execute']} execution(s), with {delta['Com_stmt_reset']} reset(s)")
+
+                for method, persona, call in cases:
+                    plain, prepared = timings[method, persona, False], timings[method, persona, True]
+                    if plain['result'] != prepared['result']:
+                        mismatches.append(f"{scale} {method} ({persona})")
+                    results.append({
+                        'scale': scale,
+                        'method': method,
+                        'persona': persona,
+                        'rows': row_count(plain['result']),
+                        'plain_p50_ms': plain['p50_ms'],
+                        'prepared_p50_ms': prepared['p50_ms'],
+                        'plain_p95_ms': plain['p95_ms'],
+                        'prepared_p95_ms': prepared['p95_ms'],
+                        'change': f"{(prepared['p50_ms'] / plain['p50_ms'] - 1) * 100:+.0f}%" if plain['p50_ms'] else "",
+                    })
+
+                # A reconnect leaves the statements behind on the old session.
+                repo.conn.reconnect()
+                repo.conn.database = args.database  # open_scratch selected it with USE
+                for method, persona, call in cases:
+                    if call(repo) != timings[method, persona, False]['result']:
+                        mismatches.append(f"{scale} {method} ({persona}) after reconnect")
+            finally:
+                drop_scratch(args, repo)
+
+    print_table(results, ['scale', 'method', 'persona', 'rows', 'plain_p50_ms', 'prepared_p50_ms',
+                          'plain_p95_ms', 'prepared_p95_ms', 'change'])
+    print("Registry:", ", ".join(f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+                                 for key, value in prepared_statement_stats().items()))
+    for mismatch in mismatches:
+        print(f"MISMATCH: {mismatch} returned different rows prepared and plain")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'meta': run_metadata(args), 'results': results, 'registry': prepared_statement_stats()},
+                      f, indent=2, default=str)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
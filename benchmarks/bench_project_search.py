@@ -0,0 +1,198 @@
+"""Benchmarks LIKE '%kw%' project search against the FULLTEXT index.
+
+Creates a scratch database, grows a Project table to each requested size and
+times the keyword predicate used by sp_SearchProjects (LIKE on title and
+description) against the one used by sp_SearchProjectsRanked
+(MATCH ... AGAINST on ft_project_title_description).
+
+    python -m benchmarks.bench_project_search --scales 10000 100000 1000000
+
+The scratch database is dropped afterwards unless --keep is given.
+"""
+import argparse
+import datetime
+import json
+import random
+
+import mysql.connector
+
+from benchmarks.common import print_table, time_call
+from db_config import load_db_config
+
+WORDS = (
+    "website app mobile data analysis python java design logo poster video "
+    "editing research survey report machine learning model dashboard database "
+    "backend frontend api scraper automation bot chatbot game unity android ios "
+    "portfolio resume tutoring calculus physics chemistry presentation slides "
+    "excel spreadsheet marketing social media content writing blog translation "
+    "kannada hindi photography event poster branding illustration animation "
+    "arduino robotics iot sensor circuit embedded firmware linux cloud aws "
+    "deployment docker testing selenium review proofreading thesis latex "
+    "statistics visualization tableau powerbi blockchain compiler cryptography"
+).split()
+
+KEYWORDS = ["website", "python dashboard", "scraper", "blockchain", "cryptography compiler"]
+
+DDL = [
+    """
+    CREATE TABLE Student (
+        student_id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(100) NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE Project (
+        project_id INT AUTO_INCREMENT PRIMARY KEY,
+        student_id INT,
+        title VARCHAR(100) NOT NULL,
+        description TEXT,
+        post_date DATE,
+        deadline DATE,
+        status VARCHAR(20) DEFAULT 'Open',
+        INDEX idx_project_status_deadline (status, deadline, project_id)
+    )
+    """,
+]
+
+LIKE_SQL = """
+    SELECT p.project_id, p.title, p.deadline, s.name AS owner_name
+    FROM Project p LEFT JOIN Student s ON p.student_id = s.student_id
+    WHERE (p.title LIKE %s OR p.description LIKE %s) AND p.status = 'Open'
+"""
+
+FULLTEXT_SQL = """
+    SELECT p.project_id, p.title, p.deadline, s.name AS owner_name,
+        MATCH(p.title, p.description) AGAINST (%s IN BOOLEAN MODE) AS relevance
+    FROM Project p LEFT JOIN Student s ON p.student_id = s.student_id
+    WHERE MATCH(p.title, p.description) AGAINST (%s IN BOOLEAN MODE) AND p.status = 'Open'
+    ORDER BY relevance DESC, p.project_id
+"""
+
+
+def random_text(rng, weights, n_words):
+    return " ".join(rng.choices(WORDS, weights=weights, k=n_words))
+
+
+def grow_projects(conn, rng, current, target, batch_size=5000):
+    """Inserts projects until the table holds `target` rows."""
+    weights = [1 / (rank + 1) for rank in range(len(WORDS))]  # Zipf-like word frequencies
+    today = datetime.date.today()
+    cursor = conn.cursor()
+    while current < target:
+        n = min(batch_size, target - current)
+        rows = [
+            (
+                rng.randint(1, 1000),
+                random_text(rng, weights, rng.randint(3, 8))[:100],
+                random_text(rng, weights, rng.randint(20, 80)),
+                today,
+                today + datetime.timedelta(days=rng.randint(1, 180)),
+                rng.choices(["Open", "In Progress", "Completed"], weights=[6, 2, 2])[0],
+            )
+            for _ in range(n)
+        ]
+        cursor.executemany(
+            "INSERT INTO Project (student_id, title, description, post_date, deadline, status) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            rows,
+        )
+        conn.commit()
+        current += n
+    cursor.close()
+    return current
+
+
+def rebuild_fulltext_index(conn):
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = 'Project' "
+        "AND index_name = 'ft_project_title_description'"
+    )
+    if cursor.fetchone()[0]:
+        cursor.execute("ALTER TABLE Project DROP INDEX ft_project_title_description")
+    cursor.execute("ALTER TABLE Project ADD FULLTEXT INDEX ft_project_title_description (title, description)")
+    cursor.execute("ANALYZE TABLE Project")
+    cursor.fetchall()
+    cursor.close()
+
+
+def run_query(conn, sql, params, limit=None):
+    cursor = conn.cursor()
+    cursor.execute(sql + (f" LIMIT {limit}" if limit else ""), params)
+    rows = cursor.fetchall()
+    cursor.close()
+    return len(rows)
+
+
+def fulltext_query(keyword):
+    return " ".join(f"{word}*" for word in keyword.split())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--database", default="pesuconnect_bench", help="scratch database to create")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database")
+    args = parser.parse_args()
+
+    config = load_db_config()
+    config.pop('database')
+    conn = mysql.connector.connect(**config)
+    cursor = conn.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS `{args.database}`")
+    cursor.execute(f"CREATE DATABASE `{args.database}`")
+    cursor.execute(f"USE `{args.database}`")
+    for statement in DDL:
+        cursor.execute(statement)
+    cursor.executemany("INSERT INTO Student (name) VALUES (%s)", [(f"Student {i}",) for i in range(1, 1001)])
+    conn.commit()
+    cursor.close()
+
+    rng = random.Random(args.seed)
+    results = []
+    size = 0
+    try:
+        for scale in sorted(args.scales):
+            print(f"Loading {scale:,} projects...", flush=True)
+            size = grow_projects(conn, rng, size, scale)
+            rebuild_fulltext_index(conn)
+
+            for keyword in KEYWORDS:
+                like = f"%{keyword}%"
+                ft = fulltext_query(keyword)
+                like_all = time_call(lambda: run_query(conn, LIKE_SQL, (like, like)), repeat=args.repeat)
+                like_page = time_call(lambda: run_query(conn, LIKE_SQL, (like, like), args.page_size), repeat=args.repeat)
+                ft_all = time_call(lambda: run_query(conn, FULLTEXT_SQL, (ft, ft)), repeat=args.repeat)
+                ft_page = time_call(lambda: run_query(conn, FULLTEXT_SQL, (ft, ft), args.page_size), repeat=args.repeat)
+                results.append({
+                    'projects': scale,
+                    'keyword': keyword,
+                    'like_matches': like_all['result'],
+                    'fulltext_matches': ft_all['result'],
+                    'like_all_p50_ms': like_all['p50_ms'],
+                    'like_page_p50_ms': like_page['p50_ms'],
+                    'fulltext_all_p50_ms': ft_all['p50_ms'],
+                    'fulltext_page_p50_ms': ft_page['p50_ms'],
+                    'speedup_page': like_page['p50_ms'] / ft_page['p50_ms'] if ft_page['p50_ms'] else None,
+                })
+    finally:
+        if not args.keep:
+            cursor = conn.cursor()
+            cursor.execute(f"DROP DATABASE IF EXISTS `{args.database}`")
+            cursor.close()
+        conn.close()
+
+    print()
+    print_table(results, list(results[0].keys()) if results else [])
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
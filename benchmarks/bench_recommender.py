@@ -0,0 +1,97 @@
+"""Measures the in-memory recommendation matrix used by "Recommended for You".
+
+Builds a ProjectSkillMatrix from synthetic Project_Skill rows (no database is
+needed) and times a full build, top-k scoring for random students, and the
+incremental add/remove done when a project is posted or accepted:
+
+    python -m benchmarks.bench_recommender --projects 10000 100000
+
+Skill popularity is skewed (a few skills appear in most projects), which is the
+realistic worst case for scoring since common skills touch many entries.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from benchmarks.common import print_table, time_call
+from recommender import PROFICIENCY_SCORES, ProjectSkillMatrix
+
+LEVELS = list(PROFICIENCY_SCORES)
+
+
+def synthetic_rows(rng, n_projects, n_skills, n_owners, skills_per_project):
+    """Returns (project_id, owner_id, skill_id, level) rows with Zipf-like skill popularity."""
+    popularity = 1.0 / np.arange(1, n_skills + 1)
+    popularity /= popularity.sum()
+    rows = []
+    owners = rng.integers(1, n_owners + 1, size=n_projects)
+    for project_id in range(1, n_projects + 1):
+        count = int(rng.integers(1, skills_per_project * 2))
+        skills = rng.choice(n_skills, size=min(count, n_skills), replace=False, p=popularity) + 1
+        for skill_id in skills:
+            rows.append((project_id, int(owners[project_id - 1]), int(skill_id), LEVELS[int(rng.integers(0, 3))]))
+    return rows
+
+
+def random_student(rng, n_skills, skills_per_student):
+    skills = rng.choice(n_skills, size=skills_per_student, replace=False) + 1
+    return {int(skill_id): LEVELS[int(rng.integers(0, 3))] for skill_id in skills}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--skills", type=int, default=500, help="distinct skills in the catalog")
+    parser.add_argument("--skills-per-project", type=int, default=4, help="average required skills per project")
+    parser.add_argument("--skills-per-student", type=int, default=8)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results = []
+    for n_projects in args.projects:
+        rows = synthetic_rows(rng, n_projects, args.skills, max(n_projects // 5, 1), args.skills_per_project)
+
+        start = time.perf_counter()
+        matrix = ProjectSkillMatrix(rows)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        students = [random_student(rng, args.skills, args.skills_per_student) for _ in range(args.repeat)]
+        turn = iter(range(10**9))
+        scoring = time_call(lambda: matrix.top_k(students[next(turn) % len(students)], k=args.k, exclude_owner=1),
+                            repeat=args.repeat)
+
+        # Post-then-accept churn: each round adds a project and removes an old one,
+        # so the timing includes merging the pending buffer and periodic compaction.
+        next_id = iter(range(n_projects + 1, n_projects + 10**9))
+        old_id = iter(range(1, n_projects + 1))
+
+        def churn():
+            matrix.add_project(next(next_id), 1, [(1, 'Beginner'), (2, 'Advanced')])
+            matrix.remove_project(next(old_id))
+            return matrix.top_k(students[0], k=args.k)
+
+        churned = time_call(churn, repeat=args.repeat)
+        results.append({
+            'projects': n_projects,
+            'entries': len(rows),
+            'build_ms': build_ms,
+            'top_k_p50_ms': scoring['p50_ms'],
+            'top_k_p95_ms': scoring['p95_ms'],
+            'add_remove_top_k_p50_ms': churned['p50_ms'],
+            'add_remove_top_k_p95_ms': churned['p95_ms'],
+        })
+
+    print_table(results, list(results[0].keys()) if results else [])
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import statistics
+import time
+
+# Shared helpers for the scripts in benchmarks/. They read the same DB_* settings
+# as frontend.py (from the environment or a .env file) but never import
+# Streamlit, so they can run from a plain shell:
+#
+#     python -m benchmarks.<script> --help
+
+
+def time_call(fn, repeat=20, warmup=2):
+    """Runs fn() repeatedly and returns latency statistics in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'p50_ms': statistics.median(samples),
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'mean_ms': statistics.fmean(samples),
+        'min_ms': samples[0],
+        'max_ms': samples[-1],
+        'runs': repeat,
+        'result': result,
+    }
+
+
+def print_table(rows, columns):
+    """Prints a list of dicts as a fixed-width text table."""
+    widths = {col: max([len(col)] + [len(_fmt(row.get(col))) for row in rows]) for col in columns}
+    print("  ".join(col.ljust(widths[col]) for col in columns))
+    print("  ".join("-" * widths[col] for col in columns))
+    for row in rows:
+        print("  ".join(_fmt(row.get(col)).ljust(widths[col]) for col in columns))
+
+
+def _fmt(value):
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return "" if value is None else str(value)
@@ -0,0 +1,480 @@
+"""Load test: many concurrent student sessions replaying the app's page flows.
+
+Sessions arrive at random (Poisson) at each of the --rates, in sessions per
+second, for --stage-seconds per stage, and each runs on a worker thread, as
+Streamlit runs each session's script on a thread of its own. Every step of a
+flow is one page run: it checks a connection out of a ConnectionPool built
+like the app's (--pool-size, --pool-timeout), reads the Entity_Version
+counters as every run does for its cache stamps, makes the repository calls
+that page makes and hands the connection back. Two flows are mixed
+(--owner-share):
+
+* freelancer: login (sp_StudentLogin) -> dashboard -> browse -> apply -> contracts
+* owner: login -> dashboard -> create (sometimes) -> manage -> accept -> contracts -> complete
+
+Steps are separated by --think-ms of simulated reading time. The Streamlit
+query cache is not involved, so every step costs what a cache miss does.
+
+    python -m benchmarks.load_test --seed-scale small --rates 2 5 10 20 40
+    python -m benchmarks.load_test --rates 10 --stage-seconds 120 --pool-size 10 --workers 200
+    python -m benchmarks.load_test --backend sqlite --seed-scale small --rates 5 10
+
+Capacity figures come from MySQL (the default --backend) only, ideally the
+production server or one sized like it. --backend sqlite is a smoke check
+that the flows, the pool and the report work end to end: SQLite serializes
+every write on one file lock, has no server threads to sample and no network
+between the app and the data, so its throughput and latencies say nothing
+about the deployed app. Its runs are marked smoke_check in --json output.
+
+Per stage it reports sessions and steps per second, how long sessions waited
+for a free worker (the script runner saturating), the pool's peak checkouts,
+waits and timeouts, and on MySQL the server's peak Threads_connected and
+Threads_running; per step, p50/p99 latency and the error rate. A rejected
+step broke a business rule under contention (e.g. the project closed between
+browse and apply); an error is anything else (pool timeout, deadlock, lost
+connection). Ramping stops after the first stage whose error rate exceeds
+--max-error-rate.
+
+The flows write (applications, projects, contracts, reviews, payments), so
+point them at a scratch database: --seed-scale creates and seeds one
+(--database on MySQL, a temporary file on SQLite) and drops it afterwards
+unless --keep is given. Without it, the DB_* database or --sqlite-path is
+used as it is and must hold tools/seed_data.py students.
+"""
+import argparse
+import datetime
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import errorcode
+
+from benchmarks.bench_db_functions import drop_scratch, open_scratch, query_rows, run_metadata
+from benchmarks.common import print_table
+from db_config import load_db_config
+from db_pool import ConnectionPool
+from instrumentation import InstrumentedRepository, Metrics, percentile
+from repository import MySQLRepository, RepositoryError, SQLiteRepository
+from tools.seed_data import SCALES, SEED_PASSWORD, seed
+
+STEPS = ['login', 'dashboard', 'browse', 'apply', 'create', 'manage', 'accept', 'contracts', 'complete']
+CREATE_SHARE = 0.3  # owner sessions that post a project, which keeps Open projects from running out
+REJECTED_MYSQL_ERRORS = {errorcode.ER_DUP_ENTRY}
+
+
+class SkipStep(Exception):
+    """A step with nothing to act on (e.g. no pending application to accept)."""
+
+
+# --- DATABASE ACCESS ---
+
+class Connections:
+    """Opens one repository per page run, like frontend.connect_to_db, and tracks how many are open at once."""
+
+    def __init__(self, backend, config=None, sqlite_path=None, pool_size=5, pool_timeout=10.0):
+        self.backend = backend
+        self.sqlite_path = sqlite_path
+        self.pool = ConnectionPool(config, size=pool_size, timeout=pool_timeout) if backend == "mysql" else None
+        self._lock = threading.Lock()
+        self.open = 0
+        self.peak = 0
+
+    @contextmanager
+    def repository(self, metrics):
+        if self.pool is not None:
+            with self.pool.connection() as conn:
+                with self._opened():
+                    yield InstrumentedRepository(MySQLRepository(conn), metrics)
+            return
+        repo = SQLiteRepository(self.sqlite_path)
+        try:
+            with self._opened():
+                yield InstrumentedRepository(repo, metrics)
+        finally:
+            repo.close()
+
+    @contextmanager
+    def _opened(self):
+        with self._lock:
+            self.open += 1
+            self.peak = max(self.peak, self.open)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.open -= 1
+
+    def reset_peak(self):
+        with self._lock:
+            self.peak = self.open
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close_all()
+
+
+def server_threads(conn):
+    """MySQL's Threads_connected and Threads_running."""
+    cursor = conn.cursor()
+    cursor.execute("SHOW GLOBAL STATUS WHERE Variable_name IN ('Threads_connected', 'Threads_running')")
+    threads = {name: int(value) for name, value in cursor.fetchall()}
+    cursor.close()
+    return threads
+
+
+class Monitor(threading.Thread):
+    """Samples the server's Threads_connected and Threads_running every `interval` seconds."""
+
+    def __init__(self, server_conn, interval):
+        super().__init__(daemon=True)
+        self.server_conn = server_conn
+        self.interval = interval
+        self.samples = []
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            try:
+                self.samples.append(server_threads(self.server_conn))
+            except mysql.connector.Error:
+                pass  # the server is struggling; the step errors will say so
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+    def peak(self, key):
+        return max((sample[key] for sample in self.samples), default=None)
+
+
+# --- SESSION FLOWS ---
+
+def outcome_of(err):
+    """'rejected' for a business-rule refusal, 'error' for anything else."""
+    if not isinstance(err, RepositoryError):
+        return 'error'  # e.g. the pool timed out
+    cause = err.__cause__
+    if isinstance(cause, mysql.connector.Error):
+        return 'rejected' if cause.sqlstate == '45000' or cause.errno in REJECTED_MYSQL_ERRORS else 'error'
+    if isinstance(cause, sqlite3.Error):
+        return 'rejected' if isinstance(cause, sqlite3.IntegrityError) else 'error'  # RAISE(ABORT) or a unique key
+    return 'rejected'  # raised by SQLiteRepository's emulated procedures
+
+
+class Session:
+    """One simulated student; each step is one page run on a connection of its own."""
+
+    def __init__(self, stage, student_id, rng):
+        self.stage = stage
+        self.student_id = student_id
+        self.rng = rng
+        self.projects = []
+        self.applications = []
+        self.contracts = []
+
+    def step(self, name, page):
+        stage = self.stage
+        start = time.perf_counter()
+        round_trips = 0
+        try:
+            with stage.connections.repository(stage.metrics) as repo:
+                repo.page = name
+                repo.get_entity_versions(self.student_id)
+                page(repo)
+                round_trips = repo.round_trips
+        except SkipStep:
+            return True
+        except Exception as err:  # noqa: BLE001 - every failure is a data point
+            stage.record(name, time.perf_counter() - start, round_trips, outcome_of(err), err)
+            return False
+        stage.record(name, time.perf_counter() - start, round_trips, 'ok')
+        return True
+
+    def think(self):
+        if self.stage.think:
+            time.sleep(self.rng.expovariate(1 / self.stage.think))
+
+    def run(self, steps):
+        for name, page in steps:
+            if not self.step(name, page):
+                return  # the user would be looking at an error
+            self.think()
+
+    # --- pages ---
+
+    def login(self, repo):
+        if repo.login(f"student{self.student_id}@pesu.edu", SEED_PASSWORD) is None:
+            raise RuntimeError(f"student{self.student_id} could not log in")
+
+    def dashboard(self, repo):
+        repo.get_dashboard(self.student_id)
+
+    def browse(self, repo):
+        projects, after = repo.search_projects_page(page_size=20)
+        if after is not None and self.rng.random() < 0.5:
+            projects, _ = repo.search_projects_page(after=after, page_size=20)
+        applied = repo.get_applied_project_ids(self.student_id)
+        self.projects = [project['project_id'] for project in projects
+                         if project['owner_id'] != self.student_id and project['project_id'] not in applied]
+
+    def apply(self, repo):
+        if not self.projects:
+            raise SkipStep
+        repo.apply_for_project(self.student_id, self.rng.choice(self.projects))
+
+    def create(self, repo):
+        if self.rng.random() >= CREATE_SHARE:
+            raise SkipStep
+        deadline = datetime.date.today() + datetime.timedelta(days=30)
+        repo.create_project(self.student_id, "Load test project", "Posted by benchmarks/load_test.py", deadline)
+
+    def manage(self, repo):
+        projects = repo.get_my_projects(self.student_id)
+        pending = [project['project_id'] for project in projects if project['pending_apps']]
+        applications = repo.get_pending_applications_by_project(pending)
+        self.applications = [app for apps in applications.values() for app in apps]
+
+    def accept(self, repo):
+        if not self.applications:
+            raise SkipStep
+        repo.accept_application(self.rng.choice(self.applications)['application_id'])
+
+    def contracts_page(self, repo):
+        _, self.contracts = repo.get_my_contracts(self.student_id)
+
+    def complete(self, repo):
+        if not self.contracts:
+            raise SkipStep
+        contract = self.rng.choice(self.contracts)
+        repo.complete_contract_with_review(contract['contract_id'], self.student_id, self.rng.randint(3, 5),
+                                           "Load test review", 500, "UPI", uuid.uuid4().hex)
+
+    def freelancer_flow(self):
+        return [('login', self.login), ('dashboard', self.dashboard), ('browse', self.browse),
+                ('apply', self.apply), ('contracts', self.contracts_page)]
+
+    def owner_flow(self):
+        return [('login', self.login), ('dashboard', self.dashboard), ('create', self.create),
+                ('manage', self.manage), ('accept', self.accept), ('contracts', self.contracts_page),
+                ('complete', self.complete)]
+
+
+# --- STAGES ---
+
+class Stage:
+    """One arrival rate: runs its sessions and collects their step outcomes."""
+
+    def __init__(self, rate, connections, args):
+        self.rate = rate
+        self.connections = connections
+        self.think = args.think_ms / 1000
+        self.metrics = Metrics(slow_query_ms=float('inf'), window=1_000_000)
+        self._lock = threading.Lock()
+        self.outcomes = Counter()  # (step, outcome) -> count
+        self.errors = {}  # step -> first few distinct messages
+        self.queue_delays = []
+
+    def record(self, step, seconds, round_trips, outcome, err=None):
+        self.metrics.record_page(step, seconds, round_trips)
+        with self._lock:
+            self.outcomes[step, outcome] += 1
+            if err is not None and outcome == 'error':
+                messages = self.errors.setdefault(step, [])
+                if len(messages) < 3 and str(err) not in messages:
+                    messages.append(str(err))
+
+    def session(self, flow, student_id, arrived, seed):
+        with self._lock:
+            self.queue_delays.append(time.perf_counter() - arrived)
+        session = Session(self, student_id, random.Random(seed))
+        session.run(getattr(session, flow)())
+
+    def run(self, args, students, owners, rng, server_conn):
+        monitor = Monitor(server_conn, args.sample_interval) if server_conn is not None else None
+        pool_before = self.connections.pool.stats() if self.connections.pool else None
+        self.connections.reset_peak()
+        if monitor:
+            monitor.start()
+        futures = []
+        started = time.perf_counter()
+        end = started + args.stage_seconds
+        next_arrival = started
+        with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="session") as executor:
+            while True:
+                next_arrival += rng.expovariate(self.rate)
+                if next_arrival >= end:
+                    break
+                time.sleep(max(0.0, next_arrival - time.perf_counter()))
+                if rng.random() < args.owner_share:
+                    flow, student_id = 'owner_flow', rng.choice(owners)
+                else:
+                    flow, student_id = 'freelancer_flow', rng.choice(students)
+                futures.append(executor.submit(self.session, flow, student_id, next_arrival, rng.random()))
+            arrivals_done = time.perf_counter()
+            wait(futures)
+        elapsed = time.perf_counter() - started
+        if monitor:
+            monitor.stop()
+        for future in futures:
+            if future.exception() is not None:  # a bug in the harness, not a step failure
+                raise future.exception()
+        return self.summary(args, len(futures), elapsed, elapsed - (arrivals_done - started), monitor, pool_before)
+
+    def summary(self, args, sessions, elapsed, drain, monitor, pool_before):
+        steps = sum(self.outcomes.values())
+        errors = sum(count for (_, outcome), count in self.outcomes.items() if outcome == 'error')
+        delays = sorted(self.queue_delays)
+        stage = {
+            'rate': self.rate,
+            'sessions': sessions,
+            'sessions_per_s': sessions / elapsed,
+            'steps_per_s': steps / elapsed,
+            'error_rate': errors / steps if steps else 0.0,
+            'queue_p50_ms': (percentile(delays, 50) or 0) * 1000,
+            'queue_p99_ms': (percentile(delays, 99) or 0) * 1000,
+            'drain_s': drain,
+            'peak_connections': self.connections.peak,
+        }
+        if pool_before is not None:
+            pool = self.connections.pool.stats()
+            stage.update({
+                'pool_waits': pool['waits'] - pool_before['waits'],
+                'pool_timeouts': pool['timeouts'] - pool_before['timeouts'],
+                'pool_created': pool['created'],
+                'server_connected': monitor.peak('Threads_connected'),
+                'server_running': monitor.peak('Threads_running'),
+            })
+        snapshot = self.metrics.snapshot()
+        pages = {page['page']: page for page in snapshot['pages']}
+        stage['steps'] = []
+        for step in STEPS:
+            if step not in pages:
+                continue
+            counts = {outcome: self.outcomes[step, outcome] for outcome in ('ok', 'rejected', 'error')}
+            total = sum(counts.values())
+            stage['steps'].append({
+                'rate': self.rate,
+                'step': step,
+                'count': total,
+                **counts,
+                'error_rate': counts['error'] / total if total else 0.0,
+                'p50_ms': pages[step]['p50'] * 1000,
+                'p99_ms': pages[step]['p99'] * 1000,
+                'max_ms': pages[step]['max'] * 1000,
+                'calls_p50': pages[step]['round_trips_p50'],
+            })
+        stage['queries'] = [
+            {'rate': self.rate, 'call': query['name'], 'count': query['count'], 'errors': query['errors'],
+             'p50_ms': query['p50'] * 1000, 'p99_ms': query['p99'] * 1000}
+            for query in snapshot['queries']
+        ]
+        stage['errors'] = self.errors
+        return stage
+
+
+# --- MAIN ---
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", nargs="+", type=float, default=[2, 5, 10, 20], help="session arrivals per second, one stage each")
+    parser.add_argument("--stage-seconds", type=float, default=30, help="how long sessions keep arriving per stage")
+    parser.add_argument("--workers", type=int, default=100, help="sessions that can run at once (script-runner threads)")
+    parser.add_argument("--pool-size", type=int, default=5, help="like DB_POOL_SIZE")
+    parser.add_argument("--pool-timeout", type=float, default=10, help="like DB_POOL_TIMEOUT")
+    parser.add_argument("--think-ms", type=float, default=250, help="mean pause between a session's steps")
+    parser.add_argument("--owner-share", type=float, default=0.3, help="share of sessions that follow the owner flow")
+    parser.add_argument("--max-error-rate", type=float, default=0.05, help="stop ramping after a stage above this")
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="seconds between samples of the MySQL server's threads")
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], default="mysql")
+    parser.add_argument("--sqlite-path", default="pesuconnect.sqlite3")
+    parser.add_argument("--seed-scale", choices=SCALES, help="create and seed a scratch database at this scale first")
+    parser.add_argument("--database", default="pesuconnect_load", help="scratch MySQL database for --seed-scale")
+    parser.add_argument("--schema", default="pesuconnect_schema.sql")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    args.repeat = None  # run_metadata
+    if args.backend == "sqlite":
+        print("SQLite run: a smoke check of the flows and the report, not a capacity measurement "
+              "(use --backend mysql for that).")
+
+    rng = random.Random(args.seed)
+    stages = []
+    with tempfile.TemporaryDirectory() as workdir:
+        scratch = None
+        if args.seed_scale:
+            scratch = open_scratch(args, args.seed_scale, workdir)
+            print(f"Seeding {args.seed_scale} ({args.backend})...")
+            seed(scratch, SCALES[args.seed_scale], seed=args.seed)
+            setup = scratch
+        elif args.backend == "sqlite":
+            setup = SQLiteRepository(args.sqlite_path)
+        else:
+            setup = MySQLRepository(mysql.connector.connect(**load_db_config()))
+        config = None
+        if args.backend == "mysql":
+            config = load_db_config()
+            if scratch is not None:
+                config['database'] = args.database
+        sqlite_path = args.sqlite_path
+        if args.backend == "sqlite" and scratch is not None:
+            sqlite_path = query_rows(scratch, "PRAGMA database_list")[0][2]  # the scratch file
+        connections = Connections(args.backend, config, sqlite_path, args.pool_size, args.pool_timeout)
+        try:
+            students = [row[0] for row in query_rows(setup, "SELECT student_id FROM Student")]
+            owners = [row[0] for row in query_rows(setup, "SELECT DISTINCT student_id FROM Project")] or students
+            if not students:
+                print("No students to log in as; seed the database (tools/seed_data.py) or pass --seed-scale.",
+                      file=sys.stderr)
+                return 1
+            server_conn = setup.conn if args.backend == "mysql" else None
+            for rate in args.rates:
+                print(f"Stage: {rate:g} sessions/s for {args.stage_seconds:g}s...")
+                stage = Stage(rate, connections, args).run(args, students, owners, rng, server_conn)
+                stages.append(stage)
+                if stage['error_rate'] > args.max_error_rate:
+                    print(f"Stopping: {stage['error_rate']:.1%} of steps failed at {rate:g} sessions/s.")
+                    break
+        finally:
+            connections.close()
+            if scratch is not None:
+                drop_scratch(args, scratch)
+            else:
+                setup.conn.close()
+
+    columns = ['rate', 'sessions', 'sessions_per_s', 'steps_per_s', 'error_rate', 'queue_p50_ms', 'queue_p99_ms',
+               'drain_s', 'peak_connections']
+    if args.backend == "mysql":
+        columns += ['pool_waits', 'pool_timeouts', 'server_connected', 'server_running']
+    print()
+    print_table(stages, columns)
+    print()
+    print_table([step for stage in stages for step in stage['steps']],
+                ['rate', 'step', 'count', 'ok', 'rejected', 'error', 'error_rate', 'p50_ms', 'p99_ms', 'max_ms', 'calls_p50'])
+    print()
+    print("Slowest repository calls per stage (p99):")
+    print_table([query for stage in stages for query in stage['queries'][:5]],
+                ['rate', 'call', 'count', 'errors', 'p50_ms', 'p99_ms'])
+    for stage in stages:
+        for step, messages in stage['errors'].items():
+            for message in messages:
+                print(f"{stage['rate']:g}/s {step}: {message}")
+    if args.json:
+        with open(args.json, "w") as f:
+            meta = dict(run_metadata(args), args=vars(args), smoke_check=args.backend == "sqlite")
+            json.dump({'meta': meta, 'stages': stages}, f, indent=2, default=str)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
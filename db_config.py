@@ -0,0 +1,37 @@
+import os
+
+from dotenv import load_dotenv
+
+# --- DATABASE CONFIGURATION FOR COMMAND-LINE SCRIPTS ---
+# frontend.py reads Streamlit secrets first; the scripts in tools/ and
+# benchmarks/ run outside Streamlit, so they only look at the environment
+# (or a .env file), using the same DB_* variable names.
+
+
+def load_db_config(database=None):
+    """Builds a mysql.connector config dict from the DB_* environment variables."""
+    load_dotenv()
+    return {
+        'host': os.environ.get('DB_HOST', '127.0.0.1'),
+        'port': int(os.environ.get('DB_PORT', 3306)),
+        'user': os.environ.get('DB_USER'),
+        'password': os.environ.get('DB_PASSWORD'),
+        'database': database or os.environ.get('DB_NAME'),
+        'ssl_disabled': True,
+    }
+
+
+def load_replica_config():
+    """The read replica's config from the DB_REPLICA_* variables, or None if
+    DB_REPLICA_HOST is unset. Unset fields default to the primary's."""
+    primary = load_db_config()
+    if not os.environ.get('DB_REPLICA_HOST'):
+        return None
+    return dict(
+        primary,
+        host=os.environ['DB_REPLICA_HOST'],
+        port=int(os.environ.get('DB_REPLICA_PORT', primary['port'])),
+        user=os.environ.get('DB_REPLICA_USER', primary['user']),
+        password=os.environ.get('DB_REPLICA_PASSWORD', primary['password']),
+        database=os.environ.get('DB_REPLICA_NAME', primary['database']),
+    )
@@ -0,0 +1,152 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import errors
+
+# --- CONNECTION POOL ---
+# A small, thread-safe pool shared by every Streamlit session in the process.
+# mysql.connector ships its own pooling module, but it has no checkout timeout,
+# no liveness check and no statistics, so we keep our own.
+
+
+class ConnectionPool:
+    """A fixed-size pool of MySQL connections built from a DB_CONFIG dict."""
+
+    def __init__(self, config, size=5, timeout=10.0, ping_interval=30.0):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        # consume_results lets a connection be reused even if a helper left
+        # rows unread on a cursor (e.g. a fetchone() on a multi-row result).
+        self._config = dict(config, consume_results=True)
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+
+        self._idle = queue.LifoQueue()  # (connection, returned_at)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._created = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+        self._timeouts = 0
+        self._reconnects = 0
+        self._discarded = 0
+
+    def _new_connection(self):
+        conn = mysql.connector.connect(**self._config)
+        with self._lock:
+            self._created += 1
+        return conn
+
+    def _make_usable(self, conn, returned_at):
+        """Pings connections that sat idle long enough to have gone stale."""
+        if time.monotonic() - returned_at < self.ping_interval:
+            return conn
+        try:
+            old_id = conn.connection_id
+            conn.ping(reconnect=True, attempts=1, delay=0)
+            if conn.connection_id != old_id:
+                with self._lock:
+                    self._reconnects += 1
+            return conn
+        except mysql.connector.Error:
+            self._discard(conn)
+            with self._lock:
+                self._reconnects += 1
+            return self._new_connection()
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except mysql.connector.Error:
+            pass
+        with self._lock:
+            self._discarded += 1
+
+    def get(self, timeout=None):
+        """Checks out a connection, waiting up to `timeout` seconds for a free slot."""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._waits += 1
+            if not self._slots.acquire(timeout=timeout):
+                with self._lock:
+                    self._timeouts += 1
+                raise errors.PoolError(
+                    f"Timed out after {timeout:.1f}s waiting for a database connection "
+                    f"({self.size} in use)."
+                )
+        waited = time.monotonic() - start
+
+        try:
+            try:
+                conn, returned_at = self._idle.get_nowait()
+                conn = self._make_usable(conn, returned_at)
+            except queue.Empty:
+                conn = self._new_connection()
+        except BaseException:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_time += waited
+            self._max_wait = max(self._max_wait, waited)
+        return conn
+
+    def put(self, conn):
+        """Returns a connection to the pool, rolling back anything left uncommitted."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put((conn, time.monotonic()))
+        except mysql.connector.Error:
+            self._discard(conn)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Context manager that always hands the connection back, even on st.rerun()."""
+        conn = self.get(timeout)
+        try:
+            yield conn
+        finally:
+            self.put(conn)
+
+    def stats(self):
+        """Returns a snapshot of pool usage counters."""
+        with self._lock:
+            return {
+                'size': self.size,
+                'in_use': self._in_use,
+                'idle': self._idle.qsize(),
+                'created': self._created,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'total_wait_time': self._wait_time,
+                'avg_wait_time': self._wait_time / self._checkouts if self._checkouts else 0.0,
+                'max_wait_time': self._max_wait,
+                'timeouts': self._timeouts,
+                'reconnects': self._reconnects,
+                'discarded': self._discarded,
+            }
+
+    def close_all(self):
+        """Closes every idle connection (e.g. when Streamlit clears the resource cache)."""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
@@ -2,8 +2,23 @@ import streamlit as st
 import mysql.connector
 import getpass
 import datetime
+import functools
+import io
 import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
 from dotenv import load_dotenv
+from db_pool import ConnectionPool
+from history_export import EXPORT_FORMATS, export_file_name, export_history
+from instrumentation import InstrumentedRepository, Metrics
+from query_cache import QueryCache
+from query_executor import QueryExecutor
+from recommender import RecommendationIndex
+from repository import EMPTY_PAYMENT_TOTALS, HISTORY_COLUMNS, PROFICIENCY_LEVELS, MySQLRepository, RepositoryError, RoutingRepository, SQLiteRepository
+from repository.base import validate_skills
+from repository.prepared import prepared_statement_stats
 
 # --- DATABASE CONFIGURATION ---
 load_dotenv()  # Load variables from .env file (for local development)
@@ -19,6 +34,36 @@ if 'DB_HOST' in st.secrets:
         'database': st.secrets.get('DB_NAME'),
         'ssl_disabled': True # <-- NEW: Let's try disabling SSL
     }
+    # Optional read replica; unset fields default to the primary's.
+    REPLICA_CONFIG = {
+        'host': st.secrets.get('DB_REPLICA_HOST'),
+        'port': st.secrets.get('DB_REPLICA_PORT', DB_CONFIG['port']),
+        'user': st.secrets.get('DB_REPLICA_USER', DB_CONFIG['user']),
+        'password': st.secrets.get('DB_REPLICA_PASSWORD', DB_CONFIG['password']),
+        'database': st.secrets.get('DB_REPLICA_NAME', DB_CONFIG['database']),
+        'ssl_disabled': True
+    }
+    READ_YOUR_WRITES_SECONDS = float(st.secrets.get('READ_YOUR_WRITES_SECONDS', 5))
+    PREPARED_STATEMENTS = str(st.secrets.get('DB_PREPARED_STATEMENTS', '0')).lower() not in ('0', 'false')
+    POOL_CONFIG = {
+        'size': int(st.secrets.get('DB_POOL_SIZE', 5)),
+        'timeout': float(st.secrets.get('DB_POOL_TIMEOUT', 10)),
+        'ping_interval': float(st.secrets.get('DB_POOL_PING_INTERVAL', 30)),
+    }
+    CACHE_CONFIG = {
+        'max_entries': int(st.secrets.get('QUERY_CACHE_SIZE', 1024)),
+        'ttl': float(st.secrets.get('QUERY_CACHE_TTL', 60)),
+    }
+    RECOMMENDER_REFRESH = float(st.secrets.get('RECOMMENDER_REFRESH', 300))
+    DB_BACKEND = st.secrets.get('DB_BACKEND', 'mysql')
+    SQLITE_PATH = st.secrets.get('SQLITE_PATH', 'pesuconnect.sqlite3')
+    SLOW_QUERY_MS = float(st.secrets.get('SLOW_QUERY_MS', 250))
+    ADMIN_EMAILS = {e.strip().lower() for e in st.secrets.get('ADMIN_EMAILS', '').split(',') if e.strip()}
+    METRICS_FILE = st.secrets.get('METRICS_FILE')
+    EXECUTOR_CONFIG = {
+        'max_workers': int(st.secrets.get('QUERY_WORKERS', 8)),
+        'timeout': float(st.secrets.get('QUERY_TIMEOUT', 10)),
+    }
 else:
     # Use .env file (for local development)
     DB_CONFIG = {
@@ -29,312 +74,707 @@ else:
         'database': os.environ.get('DB_NAME'),
         'ssl_disabled': True # <-- NEW: Let's try disabling SSL
     }
+    # Optional read replica; unset fields default to the primary's.
+    REPLICA_CONFIG = {
+        'host': os.environ.get('DB_REPLICA_HOST'),
+        'port': os.environ.get('DB_REPLICA_PORT', DB_CONFIG['port']),
+        'user': os.environ.get('DB_REPLICA_USER', DB_CONFIG['user']),
+        'password': os.environ.get('DB_REPLICA_PASSWORD', DB_CONFIG['password']),
+        'database': os.environ.get('DB_REPLICA_NAME', DB_CONFIG['database']),
+        'ssl_disabled': True
+    }
+    READ_YOUR_WRITES_SECONDS = float(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
+    PREPARED_STATEMENTS = os.environ.get('DB_PREPARED_STATEMENTS', '0').lower() not in ('0', 'false')
+    POOL_CONFIG = {
+        'size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        'ping_interval': float(os.environ.get('DB_POOL_PING_INTERVAL', 30)),
+    }
+    CACHE_CONFIG = {
+        'max_entries': int(os.environ.get('QUERY_CACHE_SIZE', 1024)),
+        'ttl': float(os.environ.get('QUERY_CACHE_TTL', 60)),
+    }
+    RECOMMENDER_REFRESH = float(os.environ.get('RECOMMENDER_REFRESH', 300))
+    DB_BACKEND = os.environ.get('DB_BACKEND', 'mysql')
+    SQLITE_PATH = os.environ.get('SQLITE_PATH', 'pesuconnect.sqlite3')
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 250))
+    ADMIN_EMAILS = {e.strip().lower() for e in os.environ.get('ADMIN_EMAILS', '').split(',') if e.strip()}
+    METRICS_FILE = os.environ.get('METRICS_FILE')
+    EXECUTOR_CONFIG = {
+        'max_workers': int(os.environ.get('QUERY_WORKERS', 8)),
+        'timeout': float(os.environ.get('QUERY_TIMEOUT', 10)),
+    }
+
+@st.cache_resource
+def get_db_pool():
+    """Creates the connection pool once per process; every session shares it."""
+    return ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+
+@st.cache_resource
+def get_replica_pool():
+    """Creates the read-replica pool once per process, or returns None if no DB_REPLICA_HOST is set."""
+    if DB_BACKEND == 'sqlite' or not REPLICA_CONFIG['host']:
+        return None
+    return ConnectionPool(REPLICA_CONFIG, **POOL_CONFIG)
+
+@st.cache_resource
+def get_query_cache():
+    """Creates the per-student query cache once per process; every session shares it."""
+    return QueryCache(**CACHE_CONFIG)
+
+@st.cache_resource
+def get_recommendation_index():
+    """Creates the project-skill matrix holder once per process; every session shares it."""
+    return RecommendationIndex(max_age=RECOMMENDER_REFRESH)
+
+@st.cache_resource
+def get_metrics():
+    """Creates the query/page metrics once per process; every session shares it."""
+    return Metrics(slow_query_ms=SLOW_QUERY_MS)
+
+@contextmanager
+def open_task_repository(pool, timeout):
+    """A repository of its own for one concurrent task (see run_concurrently).
 
+    Runs on a worker thread, so the pool is passed in rather than looked up
+    through st.cache_resource.
+    """
+    if pool is None:
+        repo = SQLiteRepository(SQLITE_PATH)
+        try:
+            yield repo
+        finally:
+            repo.close()
+        return
+    with pool.connection(timeout) as conn:
+        yield MySQLRepository(conn, PREPARED_STATEMENTS)
+
+@st.cache_resource
+def get_query_executor():
+    """Creates the thread pool for concurrent fetches once per process; every session shares it."""
+    pool = get_db_pool() if DB_BACKEND != 'sqlite' else None
+    return QueryExecutor(functools.partial(open_task_repository, pool), **EXECUTOR_CONFIG)
+
+REPLICA_RETRY_SECONDS = 30
+
+@contextmanager
 def connect_to_db():
-    """Establishes a connection to the database."""
+    """Yields the repository for one script run and always releases it.
+
+    With DB_BACKEND=mysql (the default) it wraps a connection checked out of
+    the pool; with DB_BACKEND=sqlite it opens the embedded database at
+    SQLITE_PATH. Either way the repository is wrapped so its calls are timed
+    (see instrumentation.py), and marked `released` once it has been handed
+    back. Yields None if no connection could be obtained.
+
+    With a replica configured, reads go to it (see repository/routing.py)
+    unless this session wrote in the last READ_YOUR_WRITES_SECONDS, so users
+    always see their own changes; a replica that can't be reached is left
+    alone for REPLICA_RETRY_SECONDS.
+    """
+    if DB_BACKEND == 'sqlite':
+        repo = InstrumentedRepository(SQLiteRepository(SQLITE_PATH), get_metrics())
+        try:
+            yield repo
+        finally:
+            repo.released = True
+            repo.close()
+        return
+
+    pool = get_db_pool()
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
+        conn = pool.get()
     except mysql.connector.Error as err:
         st.error(f"Error connecting to database: {err}")
         print(f"Error connecting to database: {err}") # Also print to console
-        return None
+        yield None
+        return
+    replica_pool = get_replica_pool()
+    router = None
+    if replica_pool is not None and time.monotonic() >= st.session_state.get('read_primary_until', 0):
+        router = RoutingRepository(MySQLRepository(conn, PREPARED_STATEMENTS),
+                                   functools.partial(open_task_repository, replica_pool, None))
+    repo = InstrumentedRepository(router or MySQLRepository(conn, PREPARED_STATEMENTS), get_metrics())
+    try:
+        yield repo
+    finally:
+        repo.released = True
+        if router is not None:
+            router.close()
+            if router.wrote:
+                st.session_state.read_primary_until = time.monotonic() + READ_YOUR_WRITES_SECONDS
+            elif router.replica_error is not None:
+                print(f"Replica unavailable, reading from the primary: {router.replica_error}")
+                st.session_state.read_primary_until = time.monotonic() + REPLICA_RETRY_SECONDS
+        pool.put(conn)
 
 # --- REFACTORED DATABASE LOGIC (NO UI) ---
-# These functions just get or send data to the DB.
+# These functions get or send data through the repository for this run (see
+# repository/) and report failures with st.error.
+#
+# Per-student reads go through the shared query cache under the keys below.
+# Every write helper invalidates exactly the keys whose results it changes;
+# version stamps (CACHE_DEPENDENCIES) catch the writes made elsewhere.
+
+CACHE_MY_PROJECTS = 'my_projects'
+CACHE_MY_SKILLS = 'my_skills'
+CACHE_MY_CONTRACTS = 'my_contracts'
+CACHE_MY_REVIEWS = 'my_reviews'
+CACHE_DASHBOARD = 'dashboard'
+CACHE_MY_APPLICATIONS = 'my_applications'
+CACHE_SKILL_CATALOG = 'skill_catalog'  # not per-student; cached under student_id None
+CACHE_PAYMENT_ANALYTICS = 'payment_analytics'
+
+# The Entity_Version counters each cached result depends on. Entries are stamped
+# with the owning student's counters for those entities when stored (the
+# platform-wide ones for the skill catalog) and only served while they are
+# unchanged, so writes from other app instances (or straight to the database)
+# show up on the next run rather than after the TTL, while other students'
+# writes leave the entry alone.
+CACHE_DEPENDENCIES = {
+    CACHE_MY_PROJECTS: ('projects', 'applications'),
+    CACHE_MY_SKILLS: ('skills',),
+    CACHE_MY_CONTRACTS: ('projects', 'contracts', 'reviews'),
+    CACHE_MY_REVIEWS: ('reviews',),
+    CACHE_DASHBOARD: ('projects', 'contracts', 'reviews'),
+    CACHE_MY_APPLICATIONS: ('applications',),
+    CACHE_SKILL_CATALOG: ('skills',),
+    # payments bump 'contracts'; the platform-wide rankings are bounded by the TTL
+    CACHE_PAYMENT_ANALYTICS: ('contracts', 'reviews'),
+}
+
+def db_get_entity_versions(repo, student_id=None):
+    """The Entity_Version counters, platform-wide and for `student_id`, read at
+    most once per run and student (every read includes the platform-wide ones).
 
-def db_student_login(conn, email, password):
+    Returns None if they can't be read (a database without migration 003);
+    entries are then unstamped and only the TTL bounds their staleness.
+    """
+    reads = getattr(repo, 'entity_versions', None)
+    if reads is None:
+        reads = repo.entity_versions = {}  # the repository is this run's, so this lasts one run
+    if student_id in reads:
+        return reads[student_id]
+    if student_id is None and reads:
+        return next(iter(reads.values()))
+    try:
+        versions = repo.get_entity_versions(student_id)
+    except RepositoryError:
+        versions = None
+    reads[student_id] = versions
+    return versions
+
+def version_stamp(repo, entities, student_id=None):
+    """The current counters of `entities` as a tuple (the student's own with
+    `student_id`, else platform-wide), or None if versions are unavailable."""
+    versions = db_get_entity_versions(repo, student_id)
+    if versions is None:
+        return None
+    return tuple(versions.get(entity if student_id is None else (entity, student_id)) for entity in entities)
+
+def cache_stamp(repo, cache_key):
+    name, student_id = cache_key
+    return version_stamp(repo, CACHE_DEPENDENCIES[name], student_id)
+
+def versioned_read(repo, name, args, entities, fetch):
+    """Re-serves this session's last `name` read while its arguments and the
+    counters of `entities` are unchanged, so paging back to a view costs only
+    the version check. Otherwise calls fetch() and remembers the result;
+    RepositoryErrors from fetch propagate.
+    """
+    stamp = version_stamp(repo, entities)
+    reads = st.session_state.setdefault('versioned_reads', {})
+    last = reads.get(name)
+    if stamp is not None and last is not None and last[:2] == (args, stamp):
+        return last[2]
+    value = fetch()
+    reads[name] = (args, stamp, value)
+    return value
+
+def run_concurrently(repo, tasks):
+    """Runs independent repository calls at the same time; returns {name: TaskResult}.
+
+    `tasks` maps a name to fn(repo). The first runs on this run's repository,
+    the others on worker threads with a connection each, so a task must only
+    call Repository methods (no st.* calls). A task that raises or runs past
+    QUERY_TIMEOUT gets an error in its result; the others are unaffected.
+    While the run reads from the replica, so do the worker threads.
+    """
+    metrics = get_metrics()
+    open_repo = None
+    if getattr(repo, 'reads_from_replica', False):
+        open_repo = functools.partial(open_task_repository, get_replica_pool())
+
+    def counted(fn):
+        def run(task_repo):
+            if task_repo is not repo:
+                task_repo = InstrumentedRepository(task_repo, metrics, parent=repo)
+            return fn(task_repo)
+        return run
+
+    return get_query_executor().gather({name: counted(fn) for name, fn in tasks.items()}, repo,
+                                       open_repo=open_repo)
+
+def db_read_concurrently(repo, reads):
+    """Serves several independent reads at once, from the query cache where possible.
+
+    `reads` maps a name to (cache_key, fetch, error_message, default); cache_key
+    may be None for uncached reads, fetch(repo) runs through run_concurrently.
+    Returns ({name: value}, ok): a read that failed is reported with st.error
+    and yields its default, and ok is False.
+    """
+    cache = get_query_cache()
+    values, tasks = {}, {}
+    for name, (cache_key, fetch, _, _) in reads.items():
+        cached = cache.get(cache_key, cache_stamp(repo, cache_key)) if cache_key is not None else None
+        if cached is not None:
+            values[name] = cached
+        else:
+            tasks[name] = fetch
+
+    ok = True
+    for name, result in run_concurrently(repo, tasks).items():
+        cache_key, _, error_message, default = reads[name]
+        if result.error is not None:
+            st.error(f"{error_message}: {result.error}")
+            values[name] = default
+            ok = False
+        else:
+            values[name] = result.value
+            if cache_key is not None:
+                cache.set(cache_key, result.value, cache_stamp(repo, cache_key))
+    return values, ok
+
+def db_student_login(repo, email, password):
     """Handles the student login process."""
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.callproc('sp_StudentLogin', [email, password])
-        user = None
-        for result in cursor.stored_results():
-            user = result.fetchone()
-        cursor.close()
-        return user
-    except mysql.connector.Error as err:
+        return repo.login(email, password)
+    except RepositoryError as err:
         st.error(f"Login error: {err}")
         return None
 
-def db_student_register(conn, name, email, password, phone, department, year):
+def db_student_register(repo, name, email, password, phone, department, year):
     """Handles the new student registration process."""
     try:
-        cursor = conn.cursor()
-        insert_query = """
-        INSERT INTO Student (name, email, password, phone_number, department, year_of_study)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(insert_query, (name, email, password, phone, department, year))
-        conn.commit()
-        cursor.close()
+        repo.register(name, email, password, phone, department, year)
         return True
-    except mysql.connector.Error as err:
+    except RepositoryError as err:
         st.error(f"Error registering: {err}")
-        conn.rollback()
         return False
 
-def db_get_open_projects(conn):
+def db_get_open_projects(repo):
     """Fetches all 'Open' projects."""
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.callproc('sp_SearchProjects', [None, 'Open'])
-        projects = []
-        for result in cursor.stored_results():
-            projects = result.fetchall()
-        cursor.close()
-        return projects
-    except mysql.connector.Error as err:
+        return repo.get_open_projects()
+    except RepositoryError as err:
         st.error(f"Error fetching projects: {err}")
         return []
 
-def db_apply_for_project(conn, user_id, project_id):
+def db_search_projects_page(repo, after=None, page_size=20, keyword=None, status='Open', deadline_before=None):
+    """Fetches one page of projects after a (deadline, project_id) cursor.
+
+    Returns (projects, next_cursor); next_cursor is None on the last page.
+    """
+    args = (after, page_size, keyword, status, deadline_before)
+    try:
+        return versioned_read(repo, 'search_projects_page', args, ('projects', 'reviews'),
+                              lambda: repo.search_projects_page(*args))
+    except RepositoryError as err:
+        st.error(f"Error fetching projects: {err}")
+        return [], None
+
+def db_search_projects_ranked(repo, keyword, offset=0, page_size=20, status='Open', deadline_before=None):
+    """Full-text searches project titles and descriptions, best matches first.
+
+    Returns (projects, next_offset); next_offset is None on the last page.
+    """
+    args = (keyword, offset, page_size, status, deadline_before)
+    try:
+        return versioned_read(repo, 'search_projects_ranked', args, ('projects', 'reviews'),
+                              lambda: repo.search_projects_ranked(*args))
+    except RepositoryError as err:
+        st.error(f"Error searching projects: {err}")
+        return [], None
+
+def db_apply_for_project(repo, user_id, project_id, owner_id):
     """Applies the logged-in user to a project."""
     try:
-        cursor = conn.cursor()
-        cursor.callproc('sp_CreateApplication', [user_id, project_id])
-        conn.commit()
+        repo.apply_for_project(user_id, project_id)
+        get_query_cache().invalidate((CACHE_MY_PROJECTS, owner_id), (CACHE_MY_APPLICATIONS, user_id))
         return True
-    except mysql.connector.Error as err:
+    except RepositoryError as err:
         st.error(f"Error applying for project: {err}")
-        conn.rollback()
         return False
 
-def db_create_project(conn, user_id, title, description, deadline):
-    """Creates a new project."""
+def db_apply_for_projects(repo, user_id, projects):
+    """Applies the logged-in user to several projects in one batch.
+
+    Returns one {'project_id', 'outcome', 'message'} dict per project, where
+    outcome is 'applied' or 'rejected' (with the reason in message).
+    """
     try:
-        cursor = conn.cursor()
-        cursor.callproc('sp_CreateProject', [user_id, title, description, deadline])
-        conn.commit()
-        cursor.close()
+        outcomes = repo.apply_for_projects(user_id, [proj['project_id'] for proj in projects])
+    except RepositoryError as err:
+        st.error(f"Error applying for projects: {err}")
+        return [{'project_id': proj['project_id'], 'outcome': 'rejected', 'message': str(err)} for proj in projects]
+    owners = {proj['project_id']: proj['owner_id'] for proj in projects}
+    get_query_cache().invalidate(
+        (CACHE_MY_APPLICATIONS, user_id),
+        *{(CACHE_MY_PROJECTS, owners[outcome['project_id']]) for outcome in outcomes if outcome['outcome'] == 'applied'},
+    )
+    return outcomes
+
+def db_create_project(repo, user_id, title, description, deadline, skills=()):
+    """Creates a new project.
+
+    `skills` are (skill_name, min_proficiency) pairs the project needs; they are
+    stored in Project_Skill in the same transaction and the project is added to
+    the recommendation matrix straight away.
+    """
+    try:
+        project_id, skill_rows = repo.create_project(user_id, title, description, deadline, skills)
+        get_query_cache().invalidate((CACHE_MY_PROJECTS, user_id), (CACHE_SKILL_CATALOG, None))
+        matrix = get_recommendation_index().current()
+        if matrix is not None:
+            matrix.add_project(project_id, user_id, skill_rows)
         return True
-    except mysql.connector.Error as err:
+    except RepositoryError as err:
         st.error(f"Error creating project: {err}")
-        conn.rollback()
         return False
 
-def db_get_my_projects(conn, user_id):
+def db_get_my_projects(repo, user_id):
     """Gets all projects owned by the user."""
+    cache = get_query_cache()
+    key = (CACHE_MY_PROJECTS, user_id)
+    projects = cache.get(key, cache_stamp(repo, key))
+    if projects is not None:
+        return projects
     try:
-        cursor = conn.cursor(dictionary=True)
-        query = """
-            SELECT 
-                p.project_id, p.title, p.status,
-                fn_GetProjectApplicationCount(p.project_id) AS pending_apps
-            FROM Project p WHERE p.student_id = %s
-        """
-        cursor.execute(query, (user_id,))
-        return cursor.fetchall()
-    except mysql.connector.Error as err:
+        projects = repo.get_my_projects(user_id)
+        cache.set(key, projects, cache_stamp(repo, key))
+        return projects
+    except RepositoryError as err:
         st.error(f"Error fetching your projects: {err}")
         return []
 
-def db_get_pending_applications(conn, project_id):
+def db_get_pending_applications(repo, project_id):
     """Gets all pending applications for a project."""
     try:
-        cursor = conn.cursor(dictionary=True)
-        query = """
-            SELECT a.application_id, a.application_date, s.name AS applicant_name
-            FROM Application a JOIN Student s ON a.student_id = s.student_id
-            WHERE a.project_id = %s AND a.status = 'Pending'
-        """
-        cursor.execute(query, (project_id,))
-        return cursor.fetchall()
-    except mysql.connector.Error as err:
+        return repo.get_pending_applications(project_id)
+    except RepositoryError as err:
         st.error(f"Error fetching applications: {err}")
         return []
 
-def db_accept_application(conn, app_id):
+def db_get_pending_applications_by_project(repo, project_ids):
+    """Gets the pending applications for several projects in one query.
+
+    Returns a dict of project_id -> list of applications.
+    """
     try:
-        cursor = conn.cursor()
-        cursor.callproc('sp_AcceptApplication', [app_id])
-        conn.commit()
+        return versioned_read(repo, 'pending_applications_by_project', tuple(project_ids), ('applications', 'reviews'),
+                              lambda: repo.get_pending_applications_by_project(project_ids))
+    except RepositoryError as err:
+        st.error(f"Error fetching applications: {err}")
+        return {project_id: [] for project_id in project_ids}
+
+def db_accept_application(repo, app_id, owner_id, applicant_id, project_id):
+    try:
+        repo.accept_application(app_id)
+        matrix = get_recommendation_index().current()
+        if matrix is not None:
+            matrix.remove_project(project_id)  # no longer Open
+        get_query_cache().invalidate(
+            (CACHE_MY_PROJECTS, owner_id),
+            (CACHE_MY_CONTRACTS, owner_id),
+            (CACHE_MY_CONTRACTS, applicant_id),
+            (CACHE_DASHBOARD, owner_id),
+            (CACHE_DASHBOARD, applicant_id),
+        )
         return True
-    except mysql.connector.Error as err:
+    except RepositoryError as err:
         st.error(f"Error accepting application: {err}")
-        conn.rollback()
         return False
 
-def db_reject_application(conn, app_id):
+def db_reject_application(repo, app_id, owner_id):
     try:
-        cursor = conn.cursor()
-        cursor.callproc('sp_RejectApplication', [app_id])
-        conn.commit()
+        repo.reject_application(app_id)
+        get_query_cache().invalidate((CACHE_MY_PROJECTS, owner_id))
         return True
-    except mysql.connector.Error as err:
+    except RepositoryError as err:
         st.error(f"Error rejecting application: {err}")
-        conn.rollback()
         return False
 
-def db_get_my_skills(conn, user_id):
+def db_get_my_skills(repo, user_id):
     """Fetches the user's current skills."""
+    cache = get_query_cache()
+    key = (CACHE_MY_SKILLS, user_id)
+    skills = cache.get(key, cache_stamp(repo, key))
+    if skills is not None:
+        return skills
     try:
-        cursor = conn.cursor(dictionary=True)
-        query = """
-            SELECT s.skill_id, s.skill_name, ss.proficiency_level 
-            FROM Student_Skill ss JOIN Skill s ON ss.skill_id = s.skill_id
-            WHERE ss.student_id = %s
-        """
-        cursor.execute(query, (user_id,))
-        return cursor.fetchall()
-    except mysql.connector.Error as err:
+        skills = repo.get_my_skills(user_id)
+        cache.set(key, skills, cache_stamp(repo, key))
+        return skills
+    except RepositoryError as err:
         st.error(f"Error fetching skills: {err}")
         return []
 
-def db_add_skill(conn, user_id, skill_name, proficiency):
-    """Adds a new skill to the user's profile."""
+def db_get_skill_catalog(repo):
+    """Fetches the names of every skill anyone has added, alphabetically."""
+    cache = get_query_cache()
+    key = (CACHE_SKILL_CATALOG, None)
+    catalog = cache.get(key, cache_stamp(repo, key))
+    if catalog is not None:
+        return catalog
     try:
-        cursor = conn.cursor(dictionary=True)
-        query_check_user = """
-            SELECT ss.student_id FROM Student_Skill ss
-            JOIN Skill s ON ss.skill_id = s.skill_id
-            WHERE ss.student_id = %s AND s.skill_name = %s
-        """
-        cursor.execute(query_check_user, (user_id, skill_name))
-        if cursor.fetchone():
-            st.warning(f"You have already added '{skill_name}' to your profile.")
-            return False
-
-        cursor.execute("SELECT skill_id FROM Skill WHERE skill_name = %s", (skill_name,))
-        skill = cursor.fetchone()
-        
-        skill_id = None
-        if skill:
-            skill_id = skill['skill_id']
-        else:
-            insert_skill_query = "INSERT INTO Skill (skill_name) VALUES (%s)"
-            cursor.execute(insert_skill_query, (skill_name,))
-            skill_id = cursor.lastrowid
-            if not skill_id:
-                 cursor.execute("SELECT skill_id FROM Skill WHERE skill_name = %s", (skill_name,))
-                 skill_id = cursor.fetchone()['skill_id']
-        
-        insert_student_skill_query = """
-            INSERT INTO Student_Skill (student_id, skill_id, proficiency_level)
-            VALUES (%s, %s, %s)
-        """
-        cursor.execute(insert_student_skill_query, (user_id, skill_id, proficiency))
-        conn.commit()
-        return True
-    except mysql.connector.Error as err:
-        st.error(f"Error adding skill: {err}")
-        conn.rollback()
-        return False
+        catalog = repo.get_skill_catalog()
+        cache.set(key, catalog, cache_stamp(repo, key))
+        return catalog
+    except RepositoryError as err:
+        st.error(f"Error fetching skills: {err}")
+        return []
 
-def db_update_skill(conn, user_id, skill_id, proficiency):
+def db_save_skills(repo, user_id, skills):
+    """Adds or updates many of the user's skills in one transaction.
+
+    `skills` is a list of (skill_name, proficiency) pairs. Returns one outcome
+    dict per distinct skill name: 'added', 'updated', 'unchanged' or 'invalid'.
+    """
     try:
-        cursor = conn.cursor()
-        query = "UPDATE Student_Skill SET proficiency_level = %s WHERE student_id = %s AND skill_id = %s"
-        cursor.execute(query, (proficiency, user_id, skill_id))
-        conn.commit()
-        return True
-    except mysql.connector.Error as err:
-        st.error(f"Error updating skill: {err}")
-        conn.rollback()
-        return False
+        outcomes = repo.save_skills(user_id, skills)
+        get_query_cache().invalidate((CACHE_MY_SKILLS, user_id), (CACHE_SKILL_CATALOG, None))
+        return outcomes
+    except RepositoryError as err:
+        st.error(f"Error saving skills: {err}")
+        outcomes = validate_skills(skills)
+        for outcome in outcomes.values():
+            if outcome['outcome'] is None:
+                outcome['outcome'] = 'invalid'
+                outcome['message'] = "Not saved; nothing in this batch was applied."
+        return list(outcomes.values())
 
-def db_remove_skill(conn, user_id, skill_id):
+def db_remove_skills(repo, user_id, skill_ids):
+    """Removes several of the user's skills with one DELETE."""
     try:
-        cursor = conn.cursor()
-        query = "DELETE FROM Student_Skill WHERE student_id = %s AND skill_id = %s"
-        cursor.execute(query, (user_id, skill_id))
-        conn.commit()
+        repo.remove_skills(user_id, skill_ids)
+        get_query_cache().invalidate((CACHE_MY_SKILLS, user_id))
         return True
-    except mysql.connector.Error as err:
-        st.error(f"Error removing skill: {err}")
-        conn.rollback()
+    except RepositoryError as err:
+        st.error(f"Error removing skills: {err}")
         return False
 
-def db_get_my_contracts(conn, user_id):
-    """Fetches all active contracts for the user."""
+def db_get_my_applied_project_ids(repo, user_id):
+    """Fetches the ids of every project the user has applied to."""
+    cache = get_query_cache()
+    key = (CACHE_MY_APPLICATIONS, user_id)
+    project_ids = cache.get(key, cache_stamp(repo, key))
+    if project_ids is not None:
+        return project_ids
     try:
-        cursor = conn.cursor(dictionary=True)
-        query_freelancer = """
-            SELECT c.contract_id, p.title AS project_title, s.name AS project_owner_name, c.start_date, c.end_date
-            FROM Contract c
-            JOIN Project p ON c.project_id = p.project_id
-            JOIN Student s ON p.student_id = s.student_id
-            WHERE c.student_id = %s AND p.status = 'In Progress'
-        """
-        cursor.execute(query_freelancer, (user_id,))
-        freelance_contracts = cursor.fetchall()
-        
-        query_owner = """
-            SELECT c.contract_id, p.title AS project_title, s.name AS freelancer_name, c.start_date, c.end_date
-            FROM Contract c
-            JOIN Project p ON c.project_id = p.project_id
-            JOIN Student s ON c.student_id = s.student_id
-            WHERE p.student_id = %s AND p.status = 'In Progress'
-        """
-        cursor.execute(query_owner, (user_id,))
-        owner_contracts = cursor.fetchall()
-        
-        return freelance_contracts, owner_contracts
-    except mysql.connector.Error as err:
-        st.error(f"Error fetching contracts: {err}")
-        return [], []
+        project_ids = repo.get_applied_project_ids(user_id)
+        cache.set(key, project_ids, cache_stamp(repo, key))
+        return project_ids
+    except RepositoryError as err:
+        st.error(f"Error fetching your applications: {err}")
+        return set()
+
+def db_get_recommended_projects(repo, user_id, limit=10):
+    """Ranks open projects by how well the user's skills cover their requirements.
 
-def db_complete_contract(conn, contract_id):
+    Scoring runs on the in-memory matrix; only the winning projects are read
+    from the database, in two queries. Projects the user owns or has already
+    applied to are left out. The user's skills, their applications and (when
+    stale) the matrix are loaded concurrently.
+    """
+    index = get_recommendation_index()  # st.cache_resource lookups must stay on this thread
+    reads, _ = db_read_concurrently(repo, {
+        'skills': ((CACHE_MY_SKILLS, user_id), lambda r: r.get_my_skills(user_id), "Error fetching skills", []),
+        'applied': ((CACHE_MY_APPLICATIONS, user_id), lambda r: r.get_applied_project_ids(user_id),
+                    "Error fetching your applications", set()),
+        'matrix': (None, lambda r: index.get(r.get_project_skill_rows),
+                   "Error fetching recommendations", None),
+    })
+    skills, applied, matrix = reads['skills'], reads['applied'], reads['matrix']
+    if not skills or matrix is None:
+        return []
     try:
-        cursor = conn.cursor()
-        cursor.callproc('sp_CompleteContract', [contract_id])
-        conn.commit()
-        return True
-    except mysql.connector.Error as err:
-        st.error(f"Error marking contract complete: {err}")
-        conn.rollback()
-        return False
+        ranked = matrix.top_k(
+            {skill['skill_id']: skill['proficiency_level'] for skill in skills},
+            k=limit, exclude_owner=user_id, exclude_projects=applied)
+        project_ids = tuple(match['project_id'] for match in ranked)
+        projects = versioned_read(repo, 'open_projects_by_ids', project_ids, ('projects', 'reviews'),
+                                  lambda: repo.get_open_projects_by_ids(list(project_ids)))
+
+        recommendations = []
+        for match in ranked:
+            proj = projects.get(match['project_id'])
+            if proj is None:
+                # Closed since the matrix was built; drop it so it isn't ranked again.
+                matrix.remove_project(match['project_id'])
+                continue
+            recommendations.append({**proj, **match})
+        return recommendations
+    except RepositoryError as err:
+        st.error(f"Error fetching recommendations: {err}")
+        return []
+
+def db_get_my_contracts(repo, user_id):
+    """Fetches all active contracts for the user.
 
-def db_create_review(conn, review_text, rating, contract_id, reviewer_id):
+    The freelancer and owner lists are independent queries and run concurrently.
+    """
+    cache = get_query_cache()
+    key = (CACHE_MY_CONTRACTS, user_id)
+    contracts = cache.get(key, cache_stamp(repo, key))
+    if contracts is not None:
+        return contracts
+    reads, ok = db_read_concurrently(repo, {
+        'freelance': (None, lambda r: r.get_freelance_contracts(user_id), "Error fetching contracts", []),
+        'owner': (None, lambda r: r.get_owner_contracts(user_id), "Error fetching contracts", []),
+    })
+    contracts = reads['freelance'], reads['owner']
+    if ok:
+        cache.set(key, contracts, cache_stamp(repo, key))
+    return contracts
+
+def db_complete_contract_with_review(repo, contract_id, owner_id, freelancer_id, rating, review_text,
+                                     amount, payment_method, completion_token):
+    """Completes a contract, reviews the freelancer and pays them in one transaction.
+
+    Safe to retry: repeating a call with the same completion_token does nothing
+    and returns the original result. Returns a dict with review_id, payment_id
+    and already_completed, or None on failure.
+    """
     try:
-        cursor = conn.cursor()
-        cursor.callproc('sp_CreateReview', [review_text, rating, contract_id, reviewer_id])
-        conn.commit()
-        return True
-    except mysql.connector.Error as err:
-        st.error(f"Error submitting review: {err}")
-        conn.rollback()
-        return False
+        result = repo.complete_contract_with_review(
+            contract_id, owner_id, rating, review_text, amount, payment_method, completion_token)
+        get_query_cache().invalidate(
+            (CACHE_MY_PROJECTS, owner_id),
+            (CACHE_MY_CONTRACTS, owner_id),
+            (CACHE_MY_CONTRACTS, freelancer_id),
+            (CACHE_MY_REVIEWS, freelancer_id),
+            (CACHE_DASHBOARD, owner_id),
+            (CACHE_DASHBOARD, freelancer_id),
+            (CACHE_PAYMENT_ANALYTICS, owner_id),
+            (CACHE_PAYMENT_ANALYTICS, freelancer_id),
+        )
+        return result
+    except RepositoryError as err:
+        st.error(f"Error completing contract: {err}")
+        return None
+
+def db_get_my_reviews(repo, user_id):
+    """Fetches all reviews for the logged-in user; the stats and the list load concurrently."""
+    cache = get_query_cache()
+    key = (CACHE_MY_REVIEWS, user_id)
+    cached = cache.get(key, cache_stamp(repo, key))
+    if cached is not None:
+        return cached
+    reads, ok = db_read_concurrently(repo, {
+        'stats': (None, lambda r: r.get_rating_stats(user_id), "Error fetching reviews", None),
+        'reviews': (None, lambda r: r.get_reviews_received(user_id), "Error fetching reviews", []),
+    })
+    if ok:
+        cache.set(key, (reads['stats'], reads['reviews']), cache_stamp(repo, key))
+    return reads['stats'], reads['reviews']
 
-def db_create_payment(conn, amount, payment_method, contract_id):
+def db_get_dashboard(repo, user_id, review_limit=3):
+    """Fetches the Dashboard's stats, contracts and recent reviews in one round trip."""
+    cache = get_query_cache()
+    key = (CACHE_DASHBOARD, user_id)
+    dashboard = cache.get(key, cache_stamp(repo, key))
+    if dashboard is not None:
+        return dashboard
     try:
-        cursor = conn.cursor()
-        pay_query = "INSERT INTO Payment (amount, payment_date, status, payment_method, contract_id) VALUES (%s, CURDATE(), 'Paid', %s, %s)"
-        cursor.execute(pay_query, (amount, payment_method, contract_id))
-        conn.commit()
-        return True
-    except mysql.connector.Error as err:
-        st.error(f"Error processing payment: {err}")
-        conn.rollback()
-        return False
+        dashboard = repo.get_dashboard(user_id, review_limit)
+        cache.set(key, dashboard, cache_stamp(repo, key))
+        return dashboard
+    except RepositoryError as err:
+        st.error(f"Error loading dashboard: {err}")
+        return {'stats': None, 'freelance_contracts': [], 'owner_contracts': [], 'recent_reviews': []}
 
-def db_get_my_reviews(conn, user_id):
-    """Fetches all reviews for the logged-in user."""
+def db_get_payment_analytics(repo, user_id):
+    """Fetches the Earnings & Spending page's figures, all read from the payment rollups."""
+    cache = get_query_cache()
+    key = (CACHE_PAYMENT_ANALYTICS, user_id)
+    analytics = cache.get(key, cache_stamp(repo, key))
+    if analytics is not None:
+        return analytics
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT fn_GetStudentAverageRating(%s) AS avg, fn_GetStudentReviewCount(%s) AS count", (user_id, user_id))
-        stats = cursor.fetchone()
-        
-        query = """
-            SELECT r.rating, r.review_text, p.title AS project_title
-            FROM Review r
-            JOIN Contract c ON r.contract_id = c.contract_id
-            JOIN Project p ON c.project_id = p.project_id
-            WHERE r.student_id = %s
-            ORDER BY c.end_date DESC
-        """
-        cursor.execute(query, (user_id,))
-        reviews = cursor.fetchall()
-        
-        return stats, reviews
-    except mysql.connector.Error as err:
-        st.error(f"Error fetching reviews: {err}")
-        return None, []
+        analytics = repo.get_payment_analytics(user_id, PAYMENT_ANALYTICS_MONTHS)
+        cache.set(key, analytics, cache_stamp(repo, key))
+        return analytics
+    except RepositoryError as err:
+        st.error(f"Error loading payment analytics: {err}")
+        return {'totals': dict(EMPTY_PAYMENT_TOTALS), 'monthly': [], 'departments': [], 'top_earners': [], 'top_rated': []}
 
 
 # --- STREAMLIT UI PAGES ---
 
-def show_login_page(conn):
+PROJECT_PAGE_SIZES = [10, 20, 50]
+PROJECT_TABLE_PAGE_SIZES = [100, 500, 1000]  # the table is virtualized, so rows cost no widgets
+PROJECT_LAYOUTS = ["Table", "Cards"]
+PROJECT_STATUSES = ["Open", "In Progress", "Completed", "Closed"]  # Closed: deadline passed (tools/maintenance.py)
+PAYMENT_ANALYTICS_MONTHS = 12
+
+def format_rating(avg, count):
+    """Short rating label for listings, e.g. '⭐ 4.50 (12)'."""
+    if not count:
+        return "no reviews yet"
+    return f"⭐ {avg:.2f} ({count})"
+
+@contextmanager
+def fragment_repository(repo, name):
+    """The repository a fragment (@st.fragment) renders with.
+
+    On a full run that is the run's own repository. When only the fragment
+    reruns, main() does not run and that repository has already been
+    released, so the fragment checks out its own for the rerun; its render
+    time and round trips are recorded as "<page> / <name>".
+    """
+    if not repo.released:
+        yield repo
+        return
+    start = time.perf_counter()
+    with connect_to_db() as fragment_repo:
+        if not fragment_repo:
+            st.stop()
+        fragment_repo.page = repo.page
+        try:
+            yield fragment_repo
+        finally:
+            record_run(fragment_repo, f"{repo.page} / {name}", time.perf_counter() - start)
+
+def fragment_view(repo, key, **fresh):
+    """The session-state copy of its data that a fragment renders from.
+
+    A full run replaces it with the freshly fetched `fresh` data, keeping any
+    pending notice; a fragment rerun keeps the copy its last write updated.
+    """
+    full_run = not repo.released
+    if full_run:
+        notice = st.session_state.get(key, {}).get('notice')
+        st.session_state[key] = dict(fresh, notice=notice) if notice else fresh
+    view = st.session_state[key]
+    view['full_run'] = full_run
+    return view
+
+def rerun_fragment(view):
+    """Reruns just the calling fragment after a write.
+
+    rerun_fragment(view) is only allowed during a fragment rerun, so a
+    fragment drawn by a full run (e.g. the first render under AppTest) reruns the app.
+    """
+    st.rerun(scope="app" if view['full_run'] else "fragment")
+
+def show_notice(view):
+    """Shows, once, the message a fragment left in its state before rerunning itself."""
+    notice = view.pop('notice', None)
+    if notice:
+        kind, message = notice
+        getattr(st, kind)(message)
+
+def show_login_page(repo):
     """Renders the Login and Sign Up pages."""
     
     login_tab, signup_tab = st.tabs(["Login", "Sign Up"])
@@ -350,7 +790,7 @@ def show_login_page(conn):
                 if not email or not password:
                     st.warning("Please fill in all fields.")
                 else:
-                    user = db_student_login(conn, email, password)
+                    user = db_student_login(repo, email, password)
                     if user:
                         st.session_state.logged_in = True
                         st.session_state.user = user
@@ -378,18 +818,52 @@ def show_login_page(conn):
                 elif password != confirm_password:
                     st.error("Passwords do not match.")
                 else:
-                    success = db_student_register(conn, name, email, password, phone, department, year)
+                    success = db_student_register(repo, name, email, password, phone, department, year)
                     if success:
                         st.success("Registration successful! Please go to the Login tab.")
                     else:
                         st.error("Registration failed. Email may already be in use.")
 
-def show_dashboard_page(conn):
+def history_download(pool, kind, fmt, student_id):
+    """The deferred data of an export download button: the student's history,
+    streamed from the database in chunks when the button is clicked.
+
+    Streamlit calls it on a server thread, so the pool is passed in.
+    """
+    def build():
+        sink = io.BytesIO()
+        try:
+            with open_task_repository(pool, None) as repo:
+                export_history(repo, kind, fmt, sink, student_id)
+        except RepositoryError as err:
+            print(f"Error exporting {kind}: {err}")
+            raise
+        return sink.getvalue()
+    return build
+
+def show_history_export(student_id):
+    """Download buttons for the student's payments, contracts and reviews; nothing is read until one is clicked."""
+    with st.expander("Export my history"):
+        fmt = st.radio("Format", list(EXPORT_FORMATS), horizontal=True, format_func=str.upper, key='export_format')
+        # An export only reads, so it can go to the replica unless this session just wrote.
+        pool = get_replica_pool()
+        if pool is None or time.monotonic() < st.session_state.get('read_primary_until', 0):
+            pool = get_db_pool() if DB_BACKEND != 'sqlite' else None
+        for col, kind in zip(st.columns(len(HISTORY_COLUMNS)), HISTORY_COLUMNS):
+            col.download_button(
+                kind.title(), history_download(pool, kind, fmt, student_id),
+                file_name=export_file_name(kind, fmt, student_id), mime=EXPORT_FORMATS[fmt]['mime'],
+                on_click="ignore", key=f"export_{kind}",
+            )
+
+def show_dashboard_page(repo):
     st.title(f"Welcome to your Dashboard, {st.session_state.user['name']}!")
     st.write("Use the sidebar to navigate the application.")
     
+    dashboard = db_get_dashboard(repo, st.session_state.user['student_id'])
+
     st.subheader("Your Stats at a Glance")
-    stats, reviews = db_get_my_reviews(conn, st.session_state.user['student_id'])
+    stats = dashboard['stats']
     
     if stats:
         col1, col2 = st.columns(2)
@@ -397,7 +871,7 @@ def show_dashboard_page(conn):
         col2.metric("Total Reviews", f"{stats['count']}")
     
     st.subheader("Your Active Projects")
-    freelance_contracts, owner_contracts = db_get_my_contracts(conn, st.session_state.user['student_id'])
+    freelance_contracts, owner_contracts = dashboard['freelance_contracts'], dashboard['owner_contracts']
     
     st.write("**As Freelancer (Working on):**")
     if not freelance_contracts:
@@ -413,38 +887,169 @@ def show_dashboard_page(conn):
         for contract in owner_contracts:
             st.write(f"- {contract['project_title']} (Freelancer: {contract['freelancer_name']})")
 
+    if dashboard['recent_reviews']:
+        st.subheader("Recent Reviews")
+        for review in dashboard['recent_reviews']:
+            st.write(f"- {'⭐' * review['rating']} on {review['project_title']}: {review['review_text']}")
+
+    show_history_export(st.session_state.user['student_id'])
+
+
+def show_project_card(repo, proj, details=None):
+    """Renders one project with an Apply button; `details` is an optional extra line."""
+    with st.container(border=True):
+        st.subheader(proj['title'])
+        col1, col2 = st.columns(2)
+        col1.write(f"**Owner:** {proj['owner_name']} · {format_rating(proj['owner_rating'], proj['owner_review_count'])}")
+        deadline = "No deadline" if proj['deadline'] is None else proj['deadline'].strftime('%Y-%m-%d')
+        col2.write(f"**Deadline:** {deadline}")
+        if details:
+            st.write(details)
+        st.write(f"**Description:** {proj['description']}")
+        
+        if proj['status'] == 'Open' and st.button("Apply", key=f"apply_{proj['project_id']}"):
+            success = db_apply_for_project(repo, st.session_state.user['student_id'], proj['project_id'], proj['owner_id'])
+            if success:
+                st.success(f"Successfully applied for '{proj['title']}'!")
+            else:
+                st.error("Application failed. You may have already applied or this is your own project.")
+
+def reset_project_pages():
+    """Sends the project browser back to the first page."""
+    st.session_state.project_page_cursors = [None]
+
+def show_project_table(repo, projects):
+    """Renders a page of projects as one selectable table with a single Apply action.
+
+    The browser only draws the visible rows and sorts columns itself (click a
+    header), so the page costs a fixed number of elements however many
+    projects it holds.
+    """
+    user_id = st.session_state.user['student_id']
+    applied = db_get_my_applied_project_ids(repo, user_id)
+    rows = [{
+        'project_id': proj['project_id'],
+        'title': proj['title'],
+        'owner': proj['owner_name'],
+        'rating': float(proj['owner_rating']) if proj['owner_review_count'] else None,
+        'reviews': proj['owner_review_count'] or 0,
+        'deadline': proj['deadline'],
+        'posted': proj['post_date'],
+        'status': proj['status'],
+        'applied': proj['project_id'] in applied,
+        'description': proj['description'],
+    } for proj in projects]
+
+    # Bumping the version gives the table a new key, which clears its selection.
+    version = st.session_state.setdefault('project_table_version', 0)
+    event = st.dataframe(
+        rows,
+        key=f"project_table_{version}",
+        on_select="rerun",
+        selection_mode="multi-row",
+        hide_index=True,
+        column_order=['title', 'owner', 'rating', 'reviews', 'deadline', 'posted', 'status', 'applied', 'description'],
+        column_config={
+            'title': st.column_config.TextColumn("Title", width="medium"),
+            'owner': st.column_config.TextColumn("Owner"),
+            'rating': st.column_config.NumberColumn("Rating", format="⭐ %.2f"),
+            'reviews': st.column_config.NumberColumn("Reviews"),
+            'deadline': st.column_config.DateColumn("Deadline", format="YYYY-MM-DD"),
+            'posted': st.column_config.DateColumn("Posted", format="YYYY-MM-DD"),
+            'status': st.column_config.TextColumn("Status"),
+            'applied': st.column_config.CheckboxColumn("Applied"),
+            'description': st.column_config.TextColumn("Description", width="large"),
+        },
+    )
+
+    selected = [projects[i] for i in event.selection.rows]
+    label = f"Apply to {len(selected)} selected" if selected else "Apply to selected"
+    if st.button(label, type="primary", disabled=not selected,
+                 help="Select rows with the checkboxes on the left. Your own, closed and already applied projects are rejected with a reason."):
+        titles = {proj['project_id']: proj['title'] for proj in selected}
+        outcomes = db_apply_for_projects(repo, user_id, selected)
+        st.session_state.project_table_notice = [dict(outcome, title=titles[outcome['project_id']]) for outcome in outcomes]
+        st.session_state.project_table_version = version + 1
+        st.rerun()
 
-def show_view_projects_page(conn):
+def show_view_projects_page(repo):
     st.title("Available Projects")
-    
-    projects = db_get_open_projects(conn)
-    
+
+    keyword = st.text_input("Search projects", placeholder="e.g. web scraper, data analysis", on_change=reset_project_pages)
+    col1, col2, col3, col4 = st.columns(4)
+    status = col1.selectbox("Status", PROJECT_STATUSES, on_change=reset_project_pages)
+    deadline_before = col2.date_input("Due on or before", value=None, on_change=reset_project_pages)
+    layout = col3.radio("Layout", PROJECT_LAYOUTS, key="project_layout", horizontal=True, on_change=reset_project_pages)
+    if layout == "Table":
+        page_size = col4.selectbox("Projects per page", PROJECT_TABLE_PAGE_SIZES, key="project_table_page_size", on_change=reset_project_pages)
+    else:
+        page_size = col4.selectbox("Projects per page", PROJECT_PAGE_SIZES, index=1, key="project_page_size", on_change=reset_project_pages)
+
+    if 'project_table_notice' in st.session_state:
+        outcomes = st.session_state.pop('project_table_notice')
+        applied_count = sum(outcome['outcome'] == 'applied' for outcome in outcomes)
+        rejected = [{'Project': outcome['title'], 'Reason': outcome['message'].removeprefix("Error: ")}
+                    for outcome in outcomes if outcome['outcome'] == 'rejected']
+        if applied_count:
+            st.success(f"Applied to {applied_count} project(s).")
+        if rejected:
+            st.warning(f"{len(rejected)} selected project(s) could not be applied to:")
+            st.dataframe(rejected, hide_index=True)
+
+    # Stack of cursors for the pages visited so far; the last one is the current page.
+    # Browsing pages on a (deadline, project_id) keyset; searching pages on a result offset.
+    if 'project_page_cursors' not in st.session_state:
+        reset_project_pages()
+    page_cursors = st.session_state.project_page_cursors
+
+    if keyword.strip():
+        projects, next_cursor = db_search_projects_ranked(
+            repo, keyword, offset=page_cursors[-1] or 0, page_size=page_size,
+            status=status, deadline_before=deadline_before)
+    else:
+        projects, next_cursor = db_search_projects_page(
+            repo, after=page_cursors[-1], page_size=page_size,
+            status=status, deadline_before=deadline_before)
+
+    if not projects and len(page_cursors) > 1:
+        # The projects on this page were taken or closed since we paged here.
+        reset_project_pages()
+        st.rerun()
+
     if not projects:
-        st.info("No open projects found.")
+        if keyword.strip() or status != 'Open' or deadline_before:
+            st.info("No matching projects found.")
+        else:
+            st.info("No open projects found.")
         return
 
-    for proj in projects:
-        with st.container(border=True):
-            st.subheader(proj['title'])
-            col1, col2 = st.columns(2)
-            col1.write(f"**Owner:** {proj['owner_name']}")
-            col2.write(f"**Deadline:** {proj['deadline'].strftime('%Y-%m-%d')}")
-            st.write(f"**Description:** {proj['description']}")
-            
-            if st.button("Apply", key=f"apply_{proj['project_id']}"):
-                success = db_apply_for_project(conn, st.session_state.user['student_id'], proj['project_id'])
-                if success:
-                    st.success(f"Successfully applied for '{proj['title']}'!")
-                else:
-                    st.error("Application failed. You may have already applied or this is your own project.")
+    if layout == "Table":
+        show_project_table(repo, projects)
+    else:
+        for proj in projects:
+            show_project_card(repo, proj)
+
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    if col_prev.button("Previous", disabled=len(page_cursors) == 1):
+        page_cursors.pop()
+        st.rerun()
+    col_page.caption(f"Page {len(page_cursors)}")
+    if col_next.button("Next", disabled=next_cursor is None):
+        page_cursors.append(next_cursor)
+        st.rerun()
 
-def show_create_project_page(conn):
+def show_create_project_page(repo):
     st.title("Create a New Project")
     
     with st.form("create_project_form"):
         title = st.text_input("Project Title")
         description = st.text_area("Project Description")
         deadline = st.date_input("Deadline", min_value=datetime.date.today() + datetime.timedelta(days=1))
+
+        st.write("**Required Skills** (used to recommend your project to matching students)")
+        catalog_skills = st.multiselect("Skills", db_get_skill_catalog(repo))
+        other_skills = st.text_input("Other skills", placeholder="Comma-separated, e.g. Figma, Rust")
+        min_level = st.selectbox("Minimum proficiency", PROFICIENCY_LEVELS)
         
         submitted = st.form_submit_button("Post Project")
         
@@ -452,86 +1057,211 @@ def show_create_project_page(conn):
             if not title or not description:
                 st.warning("Please fill in all fields.")
             else:
-                success = db_create_project(conn, st.session_state.user['student_id'], title, description, deadline)
+                skill_names = catalog_skills + [name.strip() for name in other_skills.split(",") if name.strip()]
+                success = db_create_project(repo, st.session_state.user['student_id'], title, description, deadline,
+                                            skills=[(name, min_level) for name in skill_names])
                 if success:
                     st.success("Your project has been posted!")
                 else:
                     st.error("Error creating project.")
 
-def show_manage_my_projects_page(conn):
+def show_recommended_projects_page(repo):
+    st.title("Recommended for You")
+    st.caption("Open projects ranked by how well your skills cover what they need.")
+
+    projects = db_get_recommended_projects(repo, st.session_state.user['student_id'])
+    if not projects:
+        st.info("No recommendations yet. Add skills on the Manage My Skills page to get matched with projects.")
+        return
+
+    for proj in projects:
+        details = (f"**Match:** {proj['score']:.0%} · {proj['matched_skills']} of {proj['required_skills']} skills"
+                   f" · {', '.join(proj['skills'])}")
+        show_project_card(repo, proj, details)
+
+def show_manage_my_projects_page(repo):
     st.title("Manage My Projects")
     
-    my_projects = db_get_my_projects(conn, st.session_state.user['student_id'])
+    my_projects = db_get_my_projects(repo, st.session_state.user['student_id'])
     
     if not my_projects:
         st.info("You have not created any projects yet.")
         return
-        
+
+    # Applicants are only fetched for projects whose list the user has opened,
+    # and all of those are fetched together in a single query.
+    open_project_ids = [
+        proj['project_id'] for proj in my_projects
+        if proj['pending_apps'] and st.session_state.get(f"show_apps_{proj['project_id']}")
+    ]
+    applications_by_project = db_get_pending_applications_by_project(repo, open_project_ids)
+
     for proj in my_projects:
-        with st.expander(f"**{proj['title']}** ({proj['status']}) - {proj['pending_apps']} Pending"):
+        show_project_applications(repo, proj, applications_by_project.get(proj['project_id']))
+
+@st.fragment
+def show_project_applications(repo, proj, applications):
+    """One project's expander with its pending applications.
+
+    Opening the list, Accept and Reject rerun only this fragment. A write is
+    applied to this project's copy in session state rather than re-reading
+    the page, and opening the list fetches just this project's applications.
+    `applications` is None when the full run did not fetch them.
+    """
+    view = fragment_view(repo, f"project_view_{proj['project_id']}", project=dict(proj), applications=applications)
+    proj = view['project']
+
+    with fragment_repository(repo, "applications") as repo:
+        with st.expander(f"**{proj['title']}** ({proj['status']}) - {proj['pending_apps']} Pending",
+                         expanded=view['applications'] is not None or 'notice' in view):
             st.write(f"**Project ID:** {proj['project_id']}")
-            
-            applications = db_get_pending_applications(conn, proj['project_id'])
-            if not applications:
+            show_notice(view)
+
+            if not proj['pending_apps']:
                 st.write("No pending applications for this project.")
+            elif not st.toggle("Show pending applications", key=f"show_apps_{proj['project_id']}"):
+                view['applications'] = None  # re-read when the list is opened again
             else:
-                st.write("**Pending Applications:**")
-                for app in applications:
-                    col1, col2, col3 = st.columns([2, 1, 1])
-                    col1.write(f"**Applicant:** {app['applicant_name']} (ID: {app['application_id']})")
-                    
-                    if col2.button("Accept", key=f"accept_{app['application_id']}"):
-                        if db_accept_application(conn, app['application_id']):
-                            st.success(f"Accepted {app['applicant_name']}! Contract created.")
-                            st.rerun()
-                        
-                    if col3.button("Reject", key=f"reject_{app['application_id']}"):
-                        if db_reject_application(conn, app['application_id']):
-                            st.warning(f"Rejected {app['applicant_name']}.")
-                            st.rerun()
-
-def show_manage_skills_page(conn):
+                if view['applications'] is None:
+                    view['applications'] = db_get_pending_applications(repo, proj['project_id'])
+                if not view['applications']:
+                    st.write("No pending applications for this project.")
+                else:
+                    st.write("**Pending Applications:**")
+                    for app in view['applications']:
+                        col1, col2, col3 = st.columns([2, 1, 1])
+                        col1.write(f"**Applicant:** {app['applicant_name']} (ID: {app['application_id']})")
+                        col1.caption(format_rating(app['applicant_rating'], app['applicant_review_count']))
+
+                        if col2.button("Accept", key=f"accept_{app['application_id']}"):
+                            if db_accept_application(repo, app['application_id'], st.session_state.user['student_id'],
+                                                     app['applicant_id'], app['project_id']):
+                                # sp_AcceptApplication also rejects the other applicants.
+                                proj['status'], proj['pending_apps'] = 'In Progress', 0
+                                view['applications'] = []
+                                view['notice'] = ('success', f"Accepted {app['applicant_name']}! Contract created.")
+                                rerun_fragment(view)
+
+                        if col3.button("Reject", key=f"reject_{app['application_id']}"):
+                            if db_reject_application(repo, app['application_id'], st.session_state.user['student_id']):
+                                proj['pending_apps'] -= 1
+                                view['applications'] = [other for other in view['applications']
+                                                        if other['application_id'] != app['application_id']]
+                                view['notice'] = ('warning', f"Rejected {app['applicant_name']}.")
+                                rerun_fragment(view)
+
+def parse_skill_lines(text, default_level):
+    """Parses pasted skills: one per line (or ';'-separated), optionally 'Skill: Level'."""
+    levels = {level.casefold(): level for level in PROFICIENCY_LEVELS}
+    skills = []
+    for entry in re.split(r"[\n;]", text):
+        name, sep, level = entry.partition(":")
+        if not sep:
+            name, sep, level = entry.partition(",")
+        name, level = name.strip(), level.strip()
+        if not name:
+            continue
+        # Unknown levels are passed through so db_save_skills reports them as invalid.
+        skills.append((name, levels.get(level.casefold(), level) if level else default_level))
+    return skills
+
+def show_manage_skills_page(repo):
     st.title("Manage My Skills")
-    
-    st.subheader("Your Current Skills")
-    my_skills = db_get_my_skills(conn, st.session_state.user['student_id'])
-    if not my_skills:
-        st.info("You have not added any skills yet.")
-    else:
-        for skill in my_skills:
-            col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
-            col1.write(f"**{skill['skill_name']}** (ID: {skill['skill_id']})")
-            col2.write(f"Level: {skill['proficiency_level']}")
-            
-            with col3.popover("Update"):
-                with st.form(f"update_skill_{skill['skill_id']}"):
-                    new_level = st.selectbox("New Proficiency", ["Beginner", "Intermediate", "Advanced"], index=["Beginner", "Intermediate", "Advanced"].index(skill['proficiency_level']), key=f"level_{skill['skill_id']}")
-                    if st.form_submit_button("Update"):
-                        if db_update_skill(conn, st.session_state.user['student_id'], skill['skill_id'], new_level):
-                            st.success("Skill updated!")
-                            st.rerun()
-            
-            if col4.button("Remove", key=f"remove_skill_{skill['skill_id']}"):
-                if db_remove_skill(conn, st.session_state.user['student_id'], skill['skill_id']):
-                    st.success("Skill removed!")
-                    st.rerun()
+    user_id = st.session_state.user['student_id']
 
-    st.subheader("Add a New Skill")
-    with st.form("add_skill_form"):
-        skill_name = st.text_input("Skill Name (e.g., Python)")
-        proficiency = st.selectbox("Proficiency", ["Beginner", "Intermediate", "Advanced"])
-        if st.form_submit_button("Add Skill"):
-            if not skill_name:
-                st.warning("Please enter a skill name.")
-            else:
-                if db_add_skill(conn, st.session_state.user['student_id'], skill_name, proficiency):
-                    st.success(f"'{skill_name}' added to your profile!")
-                    st.rerun()
+    # The skill list and the catalog for "Add Skills" are independent; load them together.
+    reads, _ = db_read_concurrently(repo, {
+        'my_skills': ((CACHE_MY_SKILLS, user_id), lambda r: r.get_my_skills(user_id), "Error fetching skills", []),
+        'catalog': ((CACHE_SKILL_CATALOG, None), lambda r: r.get_skill_catalog(), "Error fetching skills", []),
+    })
+    show_skill_editor(repo, user_id, reads['my_skills'], reads['catalog'])
+
+def apply_skill_outcomes(view, outcomes):
+    """Applies saved/removed skill outcomes to the page's copy of the user's skills and the catalog."""
+    skills = {skill['skill_id']: skill for skill in view['skills']}
+    catalog = {name.casefold(): name for name in view['catalog']}
+    for outcome in outcomes:
+        if outcome['outcome'] == 'removed':
+            skills.pop(outcome['skill_id'], None)
+        elif outcome['outcome'] in ('added', 'updated'):
+            skills[outcome['skill_id']] = {'skill_id': outcome['skill_id'], 'skill_name': outcome['skill_name'],
+                                           'proficiency_level': outcome['proficiency']}
+            catalog.setdefault(outcome['skill_name'].casefold(), outcome['skill_name'])
+    view['skills'] = list(skills.values())
+    view['catalog'] = sorted(catalog.values(), key=str.casefold)
+
+@st.fragment
+def show_skill_editor(repo, user_id, my_skills, catalog):
+    """The skill table and the Add Skills form.
+
+    Saving reruns only this fragment; the outcomes (which carry each skill's
+    id) are applied to a session-state copy of the list, so nothing is re-read.
+    """
+    view = fragment_view(repo, "skill_view", skills=list(my_skills), catalog=list(catalog))
+    my_skills = view['skills']
+
+    with fragment_repository(repo, "skills") as repo:
+        # Outcomes of the last save, shown once after the rerun that refreshed the list.
+        if 'skill_outcomes' in st.session_state:
+            outcomes = st.session_state.pop('skill_outcomes')
+            counts = {kind: sum(o['outcome'] == kind for o in outcomes) for kind in ('added', 'updated', 'removed', 'unchanged', 'invalid')}
+            st.success(", ".join(f"{count} {kind}" for kind, count in counts.items() if count) or "No changes.")
+            if counts['invalid'] or counts['updated']:
+                st.dataframe(outcomes, hide_index=True, use_container_width=True)
 
-def show_active_contracts_page(conn):
+        st.subheader("Your Current Skills")
+        if not my_skills:
+            st.info("You have not added any skills yet.")
+        else:
+            # One editable table and one submit instead of a form and a rerun per skill.
+            with st.form("edit_skills_form"):
+                edited = st.data_editor(
+                    [{'skill_id': skill['skill_id'], 'skill_name': skill['skill_name'],
+                      'proficiency_level': skill['proficiency_level'], 'remove': False} for skill in my_skills],
+                    column_config={
+                        'skill_id': st.column_config.NumberColumn("ID", disabled=True),
+                        'skill_name': st.column_config.TextColumn("Skill", disabled=True),
+                        'proficiency_level': st.column_config.SelectboxColumn("Level", options=PROFICIENCY_LEVELS, required=True),
+                        'remove': st.column_config.CheckboxColumn("Remove"),
+                    },
+                    hide_index=True,
+                    use_container_width=True,
+                )
+                if st.form_submit_button("Save Changes"):
+                    before = {skill['skill_id']: skill['proficiency_level'] for skill in my_skills}
+                    to_remove = [row['skill_id'] for row in edited if row['remove']]
+                    to_update = [(row['skill_name'], row['proficiency_level']) for row in edited
+                                 if not row['remove'] and row['proficiency_level'] != before[row['skill_id']]]
+                    outcomes = db_save_skills(repo, user_id, to_update) if to_update else []
+                    if db_remove_skills(repo, user_id, to_remove):
+                        outcomes += [{'skill_name': row['skill_name'], 'proficiency': row['proficiency_level'],
+                                      'outcome': 'removed', 'message': '', 'skill_id': row['skill_id']}
+                                     for row in edited if row['remove']]
+                    if outcomes:
+                        apply_skill_outcomes(view, outcomes)
+                        st.session_state.skill_outcomes = outcomes
+                        rerun_fragment(view)
+
+        st.subheader("Add Skills")
+        owned = {skill['skill_name'].casefold() for skill in my_skills}
+        with st.form("add_skills_form", clear_on_submit=True):
+            selected = st.multiselect("Pick from existing skills", [name for name in view['catalog'] if name.casefold() not in owned])
+            pasted = st.text_area("Or paste skills, one per line", placeholder="Python: Advanced\nSQL, Intermediate\nFigma")
+            default_level = st.selectbox("Proficiency (for skills without a level)", PROFICIENCY_LEVELS)
+            if st.form_submit_button("Add Skills"):
+                skills = [(name, default_level) for name in selected] + parse_skill_lines(pasted, default_level)
+                if not skills:
+                    st.warning("Please pick or paste at least one skill.")
+                else:
+                    outcomes = db_save_skills(repo, user_id, skills)
+                    apply_skill_outcomes(view, outcomes)
+                    st.session_state.skill_outcomes = outcomes
+                    rerun_fragment(view)
+
+def show_active_contracts_page(repo):
     st.title("Your Active Contracts")
     
-    freelance_contracts, owner_contracts = db_get_my_contracts(conn, st.session_state.user['student_id'])
+    freelance_contracts, owner_contracts = db_get_my_contracts(repo, st.session_state.user['student_id'])
 
     st.subheader("Contracts as Freelancer (Working on)")
     if not freelance_contracts:
@@ -543,7 +1273,20 @@ def show_active_contracts_page(conn):
                 st.write(f"**Owner:** {contract['project_owner_name']}")
                 st.write(f"**Dates:** {contract['start_date']} to {contract['end_date']}")
 
+    show_owner_contracts(repo, owner_contracts)
+
+@st.fragment
+def show_owner_contracts(repo, owner_contracts):
+    """Contracts the user hired for, with the completion form.
+
+    Opening the form and completing a contract rerun only this fragment; a
+    completed contract is dropped from a session-state copy of the list.
+    """
+    view = fragment_view(repo, "owner_contracts_view", contracts=list(owner_contracts))
+    owner_contracts = view['contracts']
+
     st.subheader("Contracts as Project Owner (Hired for)")
+    show_notice(view)
     if not owner_contracts:
         st.info("You have not hired for any active projects.")
     else:
@@ -556,8 +1299,10 @@ def show_active_contracts_page(conn):
                 st.write(f"**Dates:** {contract['start_date']} to {contract['end_date']}")
                 
                 if st.button("Complete Contract", key=f"complete_{contract['contract_id']}"):
-                    # Use session state to open the review/payment modal
+                    # Use session state to open the review/payment modal. The token
+                    # makes resubmitting the form (or retrying after an error) safe.
                     st.session_state.contract_to_complete = contract
+                    st.session_state.completion_token = uuid.uuid4().hex
     
     # --- Completion "Modal" ---
     if 'contract_to_complete' in st.session_state:
@@ -580,27 +1325,34 @@ def show_active_contracts_page(conn):
                 if not review_text or not amount:
                     st.warning("Please fill in all review and payment fields.")
                 else:
-                    # This is a 3-step transaction
-                    if db_complete_contract(conn, contract['contract_id']):
-                        if db_create_review(conn, review_text, rating, contract['contract_id'], st.session_state.user['student_id']):
-                            if db_create_payment(conn, amount, payment_method, contract['contract_id']):
-                                st.success("Contract completed, review submitted, and payment processed!")
-                                del st.session_state.contract_to_complete
-                                st.rerun()
-                            else:
-                                st.error("Payment failed. Please try again.")
+                    # Completion, review and payment commit together or not at all.
+                    with fragment_repository(repo, "contracts") as write_repo:
+                        result = db_complete_contract_with_review(
+                            write_repo, contract['contract_id'], st.session_state.user['student_id'],
+                            contract['freelancer_id'], rating, review_text, amount, payment_method,
+                            st.session_state.completion_token)
+                    if result:
+                        if result['already_completed']:
+                            view['notice'] = ('info', "This contract was already completed.")
                         else:
-                            st.error("Review failed. Please try again.")
+                            view['notice'] = ('success', "Contract completed, review submitted, and payment processed!")
+                        view['contracts'] = [other for other in owner_contracts
+                                             if other['contract_id'] != contract['contract_id']]
+                        del st.session_state.contract_to_complete
+                        del st.session_state.completion_token
+                        rerun_fragment(view)
                     else:
-                        st.error("Contract completion failed. Please try again.")
+                        st.error("Contract completion failed. Nothing was saved; please try again.")
 
-def show_my_reviews_page(conn):
+def show_my_reviews_page(repo):
     st.title("My Reviews")
     
-    stats, reviews = db_get_my_reviews(conn, st.session_state.user['student_id'])
+    stats, reviews = db_get_my_reviews(repo, st.session_state.user['student_id'])
     
-    if stats:
+    if stats and stats['count']:
         st.metric("Your Average Rating", f"{stats['avg']:.2f} / 5.00", f"{stats['count']} Total Reviews")
+        if stats['last_review_date']:
+            st.caption(f"Last reviewed on {stats['last_review_date'].strftime('%Y-%m-%d')}")
     else:
         st.info("You have 0 reviews.")
 
@@ -616,9 +1368,164 @@ def show_my_reviews_page(conn):
                 st.write(f"**Rating:** {'⭐' * review['rating']} ({review['rating']}/5)")
                 st.write(f"**Comment:** {review['review_text']}")
 
+def show_payment_analytics_page(repo):
+    st.title("Earnings & Spending")
+
+    analytics = db_get_payment_analytics(repo, st.session_state.user['student_id'])
+    totals = analytics['totals']
+
+    col1, col2 = st.columns(2)
+    col1.metric("Earned as a freelancer", f"₹{totals['earned']:,.2f}", f"{totals['earned_count']} payments", delta_color="off")
+    col2.metric("Spent as an owner", f"₹{totals['spent']:,.2f}", f"{totals['spent_count']} payments", delta_color="off")
+
+    st.subheader(f"By Month (last {PAYMENT_ANALYTICS_MONTHS})")
+    if not analytics['monthly']:
+        st.info("No payments in this period.")
+    else:
+        st.bar_chart(
+            {
+                'Month': [row['month'].strftime('%Y-%m') for row in analytics['monthly']],
+                'Earned': [float(row['earned']) for row in analytics['monthly']],
+                'Spent': [float(row['spent']) for row in analytics['monthly']],
+            },
+            x='Month', y=['Earned', 'Spent'], stack=False,
+        )
+
+    st.divider()
+    st.subheader("Platform")
+    by_department, by_earnings, by_rating = st.tabs(["By Department", "Top Freelancers by Earnings", "Top Freelancers by Rating"])
+    with by_department:
+        if not analytics['departments']:
+            st.info("No payments yet.")
+        else:
+            st.dataframe(
+                [
+                    {
+                        'Department': row['department'] or "(none)",
+                        'Earned': float(row['earned']),
+                        'Payments received': row['earned_count'],
+                        'Spent': float(row['spent']),
+                        'Payments made': row['spent_count'],
+                    }
+                    for row in analytics['departments']
+                ],
+                hide_index=True,
+            )
+    for tab, freelancers in ((by_earnings, analytics['top_earners']), (by_rating, analytics['top_rated'])):
+        with tab:
+            if not freelancers:
+                st.info("Not enough data yet.")
+                continue
+            st.dataframe(
+                [
+                    {
+                        'Freelancer': row['name'],
+                        'Department': row['department'] or "(none)",
+                        'Earned': float(row['earned']),
+                        'Payments': row['earned_count'],
+                        'Rating': format_rating(row['avg_rating'], row['review_count']),
+                    }
+                    for row in freelancers
+                ],
+                hide_index=True,
+            )
+
+
+def format_ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+def bucket_label(bound, unit):
+    if bound == float('inf'):
+        return "more"
+    return f"≤ {bound * 1000:g} ms" if unit == 'ms' else f"≤ {bound:g}"
+
+def metrics_gauges():
+    """Pool and query-cache counters exported next to the query metrics."""
+    gauges = {'query_cache': get_query_cache().stats()}
+    if DB_BACKEND == 'mysql':
+        gauges['pool'] = get_db_pool().stats()
+        gauges['prepared'] = prepared_statement_stats()
+    if get_replica_pool() is not None:
+        gauges['replica_pool'] = get_replica_pool().stats()
+    return gauges
+
+def show_performance_page(repo):
+    """Admin-only view of query latency, page render time and the slow-query log."""
+    metrics = get_metrics()
+    snapshot = metrics.snapshot()
+    st.title("Performance")
+    since = datetime.datetime.fromtimestamp(snapshot['since']).strftime('%Y-%m-%d %H:%M:%S')
+    st.caption(f"Since {since} · percentiles over the last {metrics.window} samples per query or page")
+
+    col1, col2 = st.columns(2)
+    col1.download_button("Export Prometheus metrics", metrics.to_prometheus(metrics_gauges()),
+                         file_name="pesuconnect.prom", mime="text/plain")
+    if col2.button("Reset metrics"):
+        metrics.reset()
+        st.rerun()
+
+    queries_tab, pages_tab, slow_tab, resources_tab = st.tabs(["Queries", "Pages", "Slow queries", "Pool & cache"])
+
+    with queries_tab:
+        if not snapshot['queries']:
+            st.info("No queries recorded yet.")
+        else:
+            st.dataframe([{
+                'query': q['name'], 'calls': q['count'], 'p50 ms': format_ms(q['p50']),
+                'p95 ms': format_ms(q['p95']), 'p99 ms': format_ms(q['p99']), 'max ms': format_ms(q['max']),
+                'rows/call': round(q['rows'] / q['count'], 1), 'errors': q['errors'],
+            } for q in snapshot['queries']], hide_index=True)
+            name = st.selectbox("Latency histogram", [q['name'] for q in snapshot['queries']])
+            st.bar_chart([{'latency': bucket_label(bound, 'ms'), 'calls': count}
+                          for bound, count in metrics.histogram('query', name)],
+                         x='latency', y='calls', sort=False)
+
+    with pages_tab:
+        if not snapshot['pages']:
+            st.info("No pages recorded yet.")
+        else:
+            st.dataframe([{
+                'page': p['page'], 'renders': p['count'], 'p50 ms': format_ms(p['p50']),
+                'p95 ms': format_ms(p['p95']), 'p99 ms': format_ms(p['p99']),
+                'round trips p50': p['round_trips_p50'], 'round trips max': p['round_trips_max'],
+            } for p in snapshot['pages']], hide_index=True)
+            page = st.selectbox("Render time histogram", [p['page'] for p in snapshot['pages']])
+            col1, col2 = st.columns(2)
+            col1.bar_chart([{'render time': bucket_label(bound, 'ms'), 'renders': count}
+                            for bound, count in metrics.histogram('page', page)],
+                           x='render time', y='renders', sort=False)
+            col2.bar_chart([{'round trips': bucket_label(bound, 'count'), 'renders': count}
+                            for bound, count in metrics.histogram('round_trips', page)],
+                           x='round trips', y='renders', sort=False)
+
+    with slow_tab:
+        st.write(f"{snapshot['slow_query_total']} calls at or above {snapshot['slow_query_ms']:g} ms "
+                 f"(set `SLOW_QUERY_MS` to change the threshold).")
+        if snapshot['slow_queries']:
+            st.dataframe([{
+                'at': datetime.datetime.fromtimestamp(entry['at']).strftime('%H:%M:%S'),
+                'query': entry['query'], 'ms': round(entry['ms'], 1), 'rows': entry['rows'],
+                'page': entry['page'], 'failed': entry['failed'],
+            } for entry in snapshot['slow_queries']], hide_index=True)
+
+    with resources_tab:
+        for prefix, stats in metrics_gauges().items():
+            st.subheader({'pool': "Connection pool", 'replica_pool': "Replica pool", 'prepared': "Prepared statements"}.get(prefix, "Query cache"))
+            st.dataframe([{'counter': key, 'value': value} for key, value in stats.items()], hide_index=True)
+
 
 # --- MAIN APPLICATION ---
 
+def record_run(repo, page, seconds):
+    """Records the page's render time and round trips, and refreshes METRICS_FILE if set."""
+    metrics = get_metrics()
+    metrics.record_page(page, seconds, repo.round_trips)
+    if METRICS_FILE:
+        try:
+            metrics.write_prometheus(METRICS_FILE, metrics_gauges(), min_interval=15)
+        except OSError as err:
+            print(f"Error writing {METRICS_FILE}: {err}")
+
 def main():
     st.set_page_config(page_title="PESUConnect", layout="centered")
 
@@ -628,53 +1535,71 @@ def main():
     if 'user' not in st.session_state:
         st.session_state.user = None
 
-    # Get DB connection
-    conn = connect_to_db()
-    if not conn:
-        st.error("Failed to connect to the database. Please check your .env file and database server.")
-        return
+    # Check out a pooled DB connection for this run; it goes back to the pool
+    # when the page has rendered (or when st.rerun() interrupts the run).
+    with connect_to_db() as repo:
+        if not repo:
+            st.error("Failed to connect to the database. Please check your .env file and database server.")
+            return
+
+        page = repo.page = "Login"
+        start = time.perf_counter()
+        try:
+            # --- MAIN ROUTING ---
+            if not st.session_state.logged_in:
+                st.title("Welcome to PESUConnect")
+                show_login_page(repo)
+            else:
+                # --- Logged-in View: Sidebar Navigation ---
+                st.sidebar.title(f"Welcome, {st.session_state.user['name']}!")
+                st.sidebar.caption(f"ID: {st.session_state.user['student_id']}")
+
+                page_options = [
+                    "Dashboard",
+                    "View Available Projects",
+                    "Recommended for You",
+                    "Create a New Project",
+                    "Manage My Projects",
+                    "Manage My Skills",
+                    "View Active Contracts",
+                    "View My Reviews",
+                    "Earnings & Spending"
+                ]
+                if st.session_state.user['email'].lower() in ADMIN_EMAILS:
+                    page_options.append("Performance")
+                page = st.sidebar.radio("Navigation", page_options)
+                repo.page = page
+
+                if st.sidebar.button("Logout"):
+                    st.session_state.logged_in = False
+                    st.session_state.user = None
+                    st.rerun()
+
+                # --- Page Content ---
+                if page == "Dashboard":
+                    show_dashboard_page(repo)
+                elif page == "View Available Projects":
+                    show_view_projects_page(repo)
+                elif page == "Recommended for You":
+                    show_recommended_projects_page(repo)
+                elif page == "Create a New Project":
+                    show_create_project_page(repo)
+                elif page == "Manage My Projects":
+                    show_manage_my_projects_page(repo)
+                elif page == "Manage My Skills":
+                    show_manage_skills_page(repo)
+                elif page == "View Active Contracts":
+                    show_active_contracts_page(repo)
+                elif page == "View My Reviews":
+                    show_my_reviews_page(repo)
+                elif page == "Earnings & Spending":
+                    show_payment_analytics_page(repo)
+                elif page == "Performance":
+                    show_performance_page(repo)
+        finally:
+            # Also runs when st.rerun() cuts the page short.
+            record_run(repo, page, time.perf_counter() - start)
 
-    # --- MAIN ROUTING ---
-    if not st.session_state.logged_in:
-        st.title("Welcome to PESUConnect")
-        show_login_page(conn)
-    else:
-        # --- Logged-in View: Sidebar Navigation ---
-        st.sidebar.title(f"Welcome, {st.session_state.user['name']}!")
-        st.sidebar.caption(f"ID: {st.session_state.user['student_id']}")
-        
-        page_options = [
-            "Dashboard", 
-            "View Available Projects", 
-            "Create a New Project", 
-            "Manage My Projects", 
-            "Manage My Skills",
-            "View Active Contracts",
-            "View My Reviews"
-        ]
-        page = st.sidebar.radio("Navigation", page_options)
-        
-        if st.sidebar.button("Logout"):
-            st.session_state.logged_in = False
-            st.session_state.user = None
-            st.rerun()
-
-        # --- Page Content ---
-        if page == "Dashboard":
-            show_dashboard_page(conn)
-        elif page == "View Available Projects":
-            show_view_projects_page(conn)
-        elif page == "Create a New Project":
-            show_create_project_page(conn)
-        elif page == "Manage My Projects":
-            show_manage_my_projects_page(conn)
-        elif page == "Manage My Skills":
-            show_manage_skills_page(conn)
-        elif page == "View Active Contracts":
-            show_active_contracts_page(conn)
-        elif page == "View My Reviews":
-            show_my_reviews_page(conn)
-            
 if __name__ == "__main__":
     main()
 
@@ -0,0 +1,101 @@
+import csv
+import io
+
+from repository import HISTORY_COLUMNS
+
+# --- HISTORY EXPORT ---
+# Turns Repository.iter_history() chunks into CSV or Parquet as they arrive:
+# each chunk is encoded and written to the sink before the next one is read,
+# so an export holds one chunk of rows (plus the encoder's buffer) whatever
+# its length. The sink is any binary file-like object: stdout for
+# tools/export_history.py, a BytesIO for the app's download buttons.
+#
+# Parquet needs pyarrow, which Streamlit already depends on; it is imported
+# only when a Parquet export is written.
+
+EXPORT_CHUNK_SIZE = 5000
+
+EXPORT_FORMATS = {
+    'csv': {'extension': 'csv', 'mime': 'text/csv'},
+    'parquet': {'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'},
+}
+
+# Arrow type names for the Parquet columns; anything not listed is a string.
+PARQUET_TYPES = {
+    'amount': 'decimal',
+    'payment_date': 'date',
+    'start_date': 'date',
+    'end_date': 'date',
+    'review_date': 'date',
+    'rating': 'int8',
+    'archived': 'int8',
+}
+
+
+def _parquet_type(pa, column):
+    kind = PARQUET_TYPES.get(column)
+    if kind == 'decimal':
+        return pa.decimal128(10, 2)
+    if kind == 'date':
+        return pa.date32()
+    if kind == 'int8':
+        return pa.int8()
+    if column.endswith('_id'):
+        return pa.int64()
+    return pa.string()
+
+
+def csv_chunks(columns, chunks):
+    """Yields the CSV encoding (UTF-8 bytes) of the header, then of each chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()  # a history with no rows is just the header
+
+
+def write_parquet(columns, chunks, sink):
+    """Writes one Parquet row group per chunk."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column, _parquet_type(pa, column)) for column in columns])
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in chunks:
+            arrays = [pa.array(values, field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+
+def export_history(repo, kind, fmt, sink, student_id=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Streams one history from `repo` into `sink` as `fmt`; returns the number of rows."""
+    total = 0
+    history = repo.iter_history(kind, student_id, chunk_size)
+
+    def counted():
+        nonlocal total
+        for rows in history:
+            total += len(rows)
+            yield rows
+
+    chunks = counted()
+    try:
+        if fmt == 'csv':
+            for data in csv_chunks(HISTORY_COLUMNS[kind], chunks):
+                sink.write(data)
+        elif fmt == 'parquet':
+            write_parquet(HISTORY_COLUMNS[kind], chunks, sink)
+        else:
+            raise ValueError(f"Unknown export format {fmt!r}.")
+    finally:
+        history.close()  # releases the cursor if the sink failed midway
+    return total
+
+
+def export_file_name(kind, fmt, student_id=None):
+    scope = f"student-{student_id}" if student_id is not None else "all"
+    return f"pesuconnect-{kind}-{scope}.{EXPORT_FORMATS[fmt]['extension']}"
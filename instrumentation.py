@@ -0,0 +1,277 @@
+import bisect
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+
+from repository.prepared import extra_round_trips
+
+# --- INSTRUMENTATION ---
+# Latency and row counters for every repository call, render time and
+# round trips for every page, and a slow-query log. One Metrics object is
+# shared by every session in the process (like the pool and the query cache);
+# each script run wraps its repository in an InstrumentedRepository, so only
+# calls that reach the database are counted and cache hits cost nothing.
+#
+# Percentiles are computed over a window of recent samples per name;
+# the bucket counts behind the Prometheus export are cumulative.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROUND_TRIP_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+
+
+def row_count(result):
+    """Rows in a repository result: the length of a list, or the total over the lists in a tuple/dict."""
+    if isinstance(result, (list, set)):
+        return len(result)
+    if isinstance(result, dict):
+        values = result.values()
+    elif isinstance(result, tuple):
+        values = result
+    else:
+        return None
+    lists = [value for value in values if isinstance(value, list)]
+    return sum(len(value) for value in lists) if lists else None
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list; None if it is empty."""
+    if not sorted_samples:
+        return None
+    rank = max(1, -(-len(sorted_samples) * pct // 100))  # ceil without floats
+    return sorted_samples[int(rank) - 1]
+
+
+class Histogram:
+    """Cumulative bucket counts plus a window of recent samples for percentiles."""
+
+    def __init__(self, buckets, window=1000):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.recent.append(value)
+
+    def summary(self):
+        samples = sorted(self.recent)
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'p50': percentile(samples, 50),
+            'p95': percentile(samples, 95),
+            'p99': percentile(samples, 99),
+            'max': samples[-1] if samples else None,
+        }
+
+
+class Metrics:
+    """Thread-safe query, page and slow-query metrics for the whole process."""
+
+    def __init__(self, slow_query_ms=250.0, slow_log_size=100, window=1000):
+        self.slow_query_ms = slow_query_ms
+        self.window = window
+        self._lock = threading.Lock()
+        self._queries = {}      # name -> Histogram of seconds
+        self._query_rows = {}   # name -> rows returned in total
+        self._query_errors = {}  # name -> calls that raised
+        self._pages = {}        # page -> Histogram of seconds
+        self._round_trips = {}  # page -> Histogram of database round trips per run
+        self._slow = deque(maxlen=slow_log_size)
+        self._slow_total = 0
+        self._started = time.time()
+        self._last_export = 0.0
+
+    def _histogram(self, table, name, buckets):
+        if name not in table:
+            table[name] = Histogram(buckets, self.window)
+        return table[name]
+
+    def record_query(self, name, seconds, rows=None, failed=False, page=None):
+        with self._lock:
+            self._histogram(self._queries, name, LATENCY_BUCKETS).observe(seconds)
+            self._query_rows[name] = self._query_rows.get(name, 0) + (rows or 0)
+            if failed:
+                self._query_errors[name] = self._query_errors.get(name, 0) + 1
+            if seconds * 1000 >= self.slow_query_ms:
+                self._slow_total += 1
+                self._slow.append({
+                    'at': time.time(),
+                    'query': name,
+                    'ms': seconds * 1000,
+                    'rows': rows,
+                    'page': page,
+                    'failed': failed,
+                })
+
+    def record_page(self, page, seconds, round_trips):
+        with self._lock:
+            self._histogram(self._pages, page, LATENCY_BUCKETS).observe(seconds)
+            self._histogram(self._round_trips, page, ROUND_TRIP_BUCKETS).observe(round_trips)
+
+    def reset(self):
+        with self._lock:
+            self._queries.clear()
+            self._query_rows.clear()
+            self._query_errors.clear()
+            self._pages.clear()
+            self._round_trips.clear()
+            self._slow.clear()
+            self._slow_total = 0
+            self._started = time.time()
+
+    def snapshot(self):
+        """Per-query and per-page summaries (seconds), slowest p95 first, plus the slow-query log."""
+        with self._lock:
+            queries = [
+                dict(name=name, rows=self._query_rows[name], errors=self._query_errors.get(name, 0),
+                     **hist.summary())
+                for name, hist in self._queries.items()
+            ]
+            pages = [
+                dict(page=page, **hist.summary(),
+                     round_trips_p50=percentile(sorted(self._round_trips[page].recent), 50),
+                     round_trips_max=max(self._round_trips[page].recent, default=None))
+                for page, hist in self._pages.items()
+            ]
+            return {
+                'since': self._started,
+                'queries': sorted(queries, key=lambda q: q['p95'] or 0, reverse=True),
+                'pages': sorted(pages, key=lambda p: p['p95'] or 0, reverse=True),
+                'slow_queries': list(reversed(self._slow)),
+                'slow_query_total': self._slow_total,
+                'slow_query_ms': self.slow_query_ms,
+            }
+
+    def histogram(self, kind, name):
+        """(upper bound, count) pairs for one query or page, non-cumulative."""
+        table = {'query': self._queries, 'page': self._pages, 'round_trips': self._round_trips}[kind]
+        with self._lock:
+            hist = table.get(name)
+            if hist is None:
+                return []
+            return list(zip(list(hist.buckets) + [float('inf')], hist.counts))
+
+    def to_prometheus(self, gauges=None):
+        """Renders every metric in the Prometheus text exposition format.
+
+        `gauges` maps a prefix to a stats() dict (e.g. the pool's); each numeric
+        value becomes a gauge named pesuconnect_<prefix>_<key>.
+        """
+        lines = []
+        with self._lock:
+            _prometheus_histogram(lines, "pesuconnect_query_duration_seconds",
+                                  "Repository call latency.", "query", self._queries)
+            lines += ["# HELP pesuconnect_query_rows_total Rows returned by repository calls.",
+                      "# TYPE pesuconnect_query_rows_total counter"]
+            lines += [f'pesuconnect_query_rows_total{{query="{_label(name)}"}} {rows}'
+                      for name, rows in sorted(self._query_rows.items())]
+            lines += ["# HELP pesuconnect_query_errors_total Repository calls that raised.",
+                      "# TYPE pesuconnect_query_errors_total counter"]
+            lines += [f'pesuconnect_query_errors_total{{query="{_label(name)}"}} {errors}'
+                      for name, errors in sorted(self._query_errors.items())]
+            lines += ["# HELP pesuconnect_slow_queries_total Repository calls slower than the slow-query threshold.",
+                      "# TYPE pesuconnect_slow_queries_total counter",
+                      f"pesuconnect_slow_queries_total {self._slow_total}"]
+            _prometheus_histogram(lines, "pesuconnect_page_render_seconds",
+                                  "Time to render a page, including its queries.", "page", self._pages)
+            _prometheus_histogram(lines, "pesuconnect_page_round_trips",
+                                  "Database round trips made while rendering a page.", "page", self._round_trips)
+        for prefix, stats in (gauges or {}).items():
+            for key, value in stats.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines += [f"# TYPE pesuconnect_{prefix}_{key} gauge", f"pesuconnect_{prefix}_{key} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path, gauges=None, min_interval=0.0):
+        """Atomically writes to_prometheus() to `path` (for node_exporter's textfile collector).
+
+        Skipped if the file was written less than `min_interval` seconds ago.
+        Returns True if the file was written.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._last_export and now - self._last_export < min_interval:
+                return False
+            self._last_export = now
+        text = self.to_prometheus(gauges)
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".metrics-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return True
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _prometheus_histogram(lines, metric, help_text, label, histograms):
+    lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+    for name, hist in sorted(histograms.items()):
+        name = _label(name)
+        cumulative = 0
+        for bound, count in zip(list(hist.buckets) + ["+Inf"], hist.counts):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{{label}="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_sum{{{label}="{name}"}} {hist.total}')
+        lines.append(f'{metric}_count{{{label}="{name}"}} {hist.count}')
+
+
+class InstrumentedRepository:
+    """Wraps a Repository for one script run, timing every public method call.
+
+    Counts the run's database round trips (one per call, plus the resets and
+    prepares of prepared statements, see repository/prepared.py) and tags
+    slow-query log entries with the page being rendered. A repository
+    opened for a concurrent task (see query_executor.py) is wrapped with the
+    run's wrapper as `parent`, so its calls count towards the same run.
+    """
+
+    def __init__(self, repo, metrics, parent=None):
+        self._repo = repo
+        self._metrics = metrics
+        self._parent = parent
+        self._lock = threading.Lock()
+        self.round_trips = 0
+        self.page = parent.page if parent is not None else None
+        self.released = False  # set by whoever hands the connection underneath back
+
+    def _count_round_trip(self, count=1):
+        with self._lock:
+            self.round_trips += count
+        if self._parent is not None:
+            self._parent._count_round_trip(count)
+
+    def __getattr__(self, name):
+        attr = getattr(self._repo, name)
+        if name.startswith("_") or not callable(attr) or name == "close":
+            return attr
+
+        def timed(*args, **kwargs):
+            self._count_round_trip()
+            extra = extra_round_trips()
+            start = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+            except Exception:
+                self._metrics.record_query(name, time.perf_counter() - start, failed=True, page=self.page)
+                raise
+            finally:
+                if extra_round_trips() > extra:
+                    self._count_round_trip(extra_round_trips() - extra)
+            self._metrics.record_query(name, time.perf_counter() - start, row_count(result), page=self.page)
+            return result
+
+        return timed
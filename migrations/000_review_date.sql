@@ -0,0 +1,55 @@
+-- Migration 000: Review.review_date.
+--
+-- The rating summary added review_date to Review, and sp_CreateReview,
+-- sp_CompleteContractWithReview, the trg_Review_Summary_* triggers,
+-- sp_GetDashboard and sp_RebuildRatingSummary all read or write it. On a
+-- database created before it, every review write (and so every contract
+-- completion) fails with "Unknown column 'review_date'". Numbered 000 so it
+-- runs before every migration that refers to the column.
+--
+-- Existing reviews were written when their contract was completed, so they
+-- are dated with the contract's end_date, live or archived. Then
+-- Student_Rating_Summary is rebuilt to pick up last_review_date; create it and
+-- sp_RebuildRatingSummary from pesuconnect_schema.sql first.
+--
+-- Safe to re-run.
+
+USE pesuConnect;
+
+DROP PROCEDURE IF EXISTS tmp_AddReviewDate;
+
+DELIMITER //
+
+CREATE PROCEDURE tmp_AddReviewDate()
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = 'Review' AND column_name = 'review_date'
+    ) THEN
+        ALTER TABLE Review ADD COLUMN review_date DATE;
+    END IF;
+
+    UPDATE Review r
+    JOIN Contract c ON c.contract_id = r.contract_id
+    SET r.review_date = c.end_date
+    WHERE r.review_date IS NULL;
+
+    -- Contract_Archive is created by migration 004, which may not have run yet.
+    IF EXISTS (
+        SELECT 1 FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name = 'Contract_Archive'
+    ) THEN
+        UPDATE Review r
+        JOIN Contract_Archive ca ON ca.contract_id = r.contract_id
+        SET r.review_date = ca.end_date
+        WHERE r.review_date IS NULL;
+    END IF;
+END //
+
+DELIMITER ;
+
+CALL tmp_AddReviewDate();
+
+DROP PROCEDURE tmp_AddReviewDate;
+
+CALL sp_RebuildRatingSummary();
@@ -0,0 +1,71 @@
+-- Migration 001: composite index plan for the hot predicates.
+--
+-- pesuconnect_schema.sql already creates these indexes for new databases; run
+-- this against an existing pesuConnect database to bring it up to date. It is
+-- safe to re-run: indexes that already exist are skipped.
+-- Check the resulting plans with: python -m tools.explain_audit
+--
+-- InnoDB silently drops the single-column index it auto-created for a foreign
+-- key once a composite index with the same leading column exists, so these
+-- replace (rather than add to) the FK indexes on Project.student_id,
+-- Application.student_id/project_id, Contract.student_id and Review.student_id.
+
+USE pesuConnect;
+
+DROP PROCEDURE IF EXISTS tmp_AddIndexIfMissing;
+
+DELIMITER //
+
+CREATE PROCEDURE tmp_AddIndexIfMissing(
+    IN in_table VARCHAR(64),
+    IN in_index VARCHAR(64),
+    IN in_ddl TEXT
+)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = in_table AND index_name = in_index
+    ) THEN
+        SET @ddl = in_ddl;
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END //
+
+DELIMITER ;
+
+-- Browse projects by deadline (sp_SearchProjectsPage).
+CALL tmp_AddIndexIfMissing('Project', 'idx_project_status_deadline',
+    'ALTER TABLE Project ADD INDEX idx_project_status_deadline (status, deadline, project_id)');
+
+-- Keyword search (sp_SearchProjectsRanked).
+CALL tmp_AddIndexIfMissing('Project', 'ft_project_title_description',
+    'ALTER TABLE Project ADD FULLTEXT INDEX ft_project_title_description (title, description)');
+
+-- db_get_my_projects (WHERE student_id = ?) and the owner half of
+-- db_get_my_contracts (WHERE p.student_id = ? AND p.status = 'In Progress').
+CALL tmp_AddIndexIfMissing('Project', 'idx_project_owner_status',
+    'ALTER TABLE Project ADD INDEX idx_project_owner_status (student_id, status)');
+
+-- Pending application counts and lists (db_get_my_projects,
+-- db_get_pending_applications*, the bulk reject in sp_AcceptApplication).
+CALL tmp_AddIndexIfMissing('Application', 'idx_application_project_status',
+    'ALTER TABLE Application ADD INDEX idx_application_project_status (project_id, status)');
+
+-- trg_Prevent_Duplicate_Application's COUNT(*) by (student_id, project_id).
+CALL tmp_AddIndexIfMissing('Application', 'idx_application_student_project',
+    'ALTER TABLE Application ADD INDEX idx_application_student_project (student_id, project_id)');
+
+-- Freelancer half of db_get_my_contracts (WHERE c.student_id = ?), covering
+-- the join column to Project.
+CALL tmp_AddIndexIfMissing('Contract', 'idx_contract_student_project',
+    'ALTER TABLE Contract ADD INDEX idx_contract_student_project (student_id, project_id)');
+
+-- db_get_my_reviews (WHERE r.student_id = ?), covering the join column to Contract.
+CALL tmp_AddIndexIfMissing('Review', 'idx_review_student_contract',
+    'ALTER TABLE Review ADD INDEX idx_review_student_contract (student_id, contract_id)');
+
+DROP PROCEDURE tmp_AddIndexIfMissing;
+
+ANALYZE TABLE Project, Application, Contract, Review;
@@ -0,0 +1,79 @@
+-- Migration 002: one application per student per project, enforced by a
+-- unique key instead of a trigger.
+--
+-- trg_Prevent_Duplicate_Application counted matching rows on every insert and
+-- still let two concurrent inserts through; uq_application_student_project
+-- rejects the second one atomically and replaces idx_application_student_project
+-- (same columns). The own-project and closed-project triggers are merged into
+-- trg_Validate_Application, which reads the Project row once.
+--
+-- Duplicates that slipped in are removed first: the Accepted application is
+-- kept, otherwise the earliest one. Safe to re-run.
+
+USE pesuConnect;
+
+DELETE a FROM Application a
+JOIN Application keep
+  ON keep.student_id = a.student_id AND keep.project_id = a.project_id
+ AND (keep.status = 'Accepted') >= (a.status = 'Accepted')
+ AND ((keep.status = 'Accepted') > (a.status = 'Accepted') OR keep.application_id < a.application_id);
+
+DROP PROCEDURE IF EXISTS tmp_AlterIfIndexMissing;
+
+DELIMITER //
+
+CREATE PROCEDURE tmp_AlterIfIndexMissing(
+    IN in_table VARCHAR(64),
+    IN in_index VARCHAR(64),
+    IN in_present BOOLEAN,
+    IN in_ddl TEXT
+)
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = in_table AND index_name = in_index
+    ) = in_present THEN
+        SET @ddl = in_ddl;
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END //
+
+DELIMITER ;
+
+-- Add the unique key before dropping the old index, so the foreign key on
+-- student_id always has an index to use.
+CALL tmp_AlterIfIndexMissing('Application', 'uq_application_student_project', FALSE,
+    'ALTER TABLE Application ADD UNIQUE KEY uq_application_student_project (student_id, project_id)');
+CALL tmp_AlterIfIndexMissing('Application', 'idx_application_student_project', TRUE,
+    'ALTER TABLE Application DROP INDEX idx_application_student_project');
+
+DROP PROCEDURE tmp_AlterIfIndexMissing;
+
+DROP TRIGGER IF EXISTS trg_Prevent_Self_Application;
+DROP TRIGGER IF EXISTS trg_Check_Project_Status_On_Apply;
+DROP TRIGGER IF EXISTS trg_Prevent_Duplicate_Application;
+DROP TRIGGER IF EXISTS trg_Validate_Application;
+
+DELIMITER //
+
+CREATE TRIGGER trg_Validate_Application
+BEFORE INSERT ON Application
+FOR EACH ROW
+BEGIN
+    DECLARE v_project_owner_id INT;
+    DECLARE v_project_status VARCHAR(20);
+    SELECT student_id, status INTO v_project_owner_id, v_project_status
+    FROM Project WHERE project_id = NEW.project_id;
+    IF v_project_owner_id = NEW.student_id THEN
+        SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Error: A student cannot apply to their own project.';
+    END IF;
+    IF v_project_status != 'Open' THEN
+        SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Error: This project is no longer open for applications.';
+    END IF;
+END //
+
+DELIMITER ;
@@ -0,0 +1,217 @@
+-- Migration 003: Entity_Version change tracking.
+--
+-- Adds the Entity_Version counters and the trg_Version_* triggers that bump
+-- them, so the app can check one small table instead of re-running a page's
+-- queries when nothing has changed. Safe to re-run.
+
+USE pesuConnect;
+
+-- One counter per kind of data the app caches, bumped by the trg_Version_*
+-- triggers in the same transaction as every write. A reader that remembers the
+-- counters it saw can tell from this one small table whether anything it
+-- cached has changed (Repository.get_entity_versions).
+-- Payments count as contract changes and Skill, Student_Skill and Project_Skill
+-- as skill changes.
+CREATE TABLE IF NOT EXISTS Entity_Version (
+    entity VARCHAR(32) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT IGNORE INTO Entity_Version (entity) VALUES ('projects'), ('applications'), ('contracts'), ('reviews'), ('skills');
+
+DROP TRIGGER IF EXISTS trg_Version_Project_INSERT;
+DROP TRIGGER IF EXISTS trg_Version_Project_UPDATE;
+DROP TRIGGER IF EXISTS trg_Version_Project_DELETE;
+DROP TRIGGER IF EXISTS trg_Version_Application_INSERT;
+DROP TRIGGER IF EXISTS trg_Version_Application_UPDATE;
+DROP TRIGGER IF EXISTS trg_Version_Application_DELETE;
+DROP TRIGGER IF EXISTS trg_Version_Contract_INSERT;
+DROP TRIGGER IF EXISTS trg_Version_Contract_UPDATE;
+DROP TRIGGER IF EXISTS trg_Version_Contract_DELETE;
+DROP TRIGGER IF EXISTS trg_Version_Payment_INSERT;
+DROP TRIGGER IF EXISTS trg_Version_Payment_UPDATE;
+DROP TRIGGER IF EXISTS trg_Version_Payment_DELETE;
+DROP TRIGGER IF EXISTS trg_Version_Review_INSERT;
+DROP TRIGGER IF EXISTS trg_Version_Review_UPDATE;
+DROP TRIGGER IF EXISTS trg_Version_Review_DELETE;
+DROP TRIGGER IF EXISTS trg_Version_Skill_INSERT;
+DROP TRIGGER IF EXISTS trg_Version_Skill_UPDATE;
+DROP TRIGGER IF EXISTS trg_Version_Skill_DELETE;
+DROP TRIGGER IF EXISTS trg_Version_Student_Skill_INSERT;
+DROP TRIGGER IF EXISTS trg_Version_Student_Skill_UPDATE;
+DROP TRIGGER IF EXISTS trg_Version_Student_Skill_DELETE;
+DROP TRIGGER IF EXISTS trg_Version_Project_Skill_INSERT;
+DROP TRIGGER IF EXISTS trg_Version_Project_Skill_UPDATE;
+DROP TRIGGER IF EXISTS trg_Version_Project_Skill_DELETE;
+
+DELIMITER //
+
+CREATE TRIGGER trg_Version_Project_INSERT
+AFTER INSERT ON Project
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'projects';
+END //
+
+CREATE TRIGGER trg_Version_Project_UPDATE
+AFTER UPDATE ON Project
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'projects';
+END //
+
+CREATE TRIGGER trg_Version_Project_DELETE
+AFTER DELETE ON Project
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'projects';
+END //
+
+CREATE TRIGGER trg_Version_Application_INSERT
+AFTER INSERT ON Application
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'applications';
+END //
+
+CREATE TRIGGER trg_Version_Application_UPDATE
+AFTER UPDATE ON Application
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'applications';
+END //
+
+CREATE TRIGGER trg_Version_Application_DELETE
+AFTER DELETE ON Application
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'applications';
+END //
+
+CREATE TRIGGER trg_Version_Contract_INSERT
+AFTER INSERT ON Contract
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'contracts';
+END //
+
+CREATE TRIGGER trg_Version_Contract_UPDATE
+AFTER UPDATE ON Contract
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'contracts';
+END //
+
+CREATE TRIGGER trg_Version_Contract_DELETE
+AFTER DELETE ON Contract
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'contracts';
+END //
+
+CREATE TRIGGER trg_Version_Payment_INSERT
+AFTER INSERT ON Payment
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'contracts';
+END //
+
+CREATE TRIGGER trg_Version_Payment_UPDATE
+AFTER UPDATE ON Payment
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'contracts';
+END //
+
+CREATE TRIGGER trg_Version_Payment_DELETE
+AFTER DELETE ON Payment
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'contracts';
+END //
+
+CREATE TRIGGER trg_Version_Review_INSERT
+AFTER INSERT ON Review
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'reviews';
+END //
+
+CREATE TRIGGER trg_Version_Review_UPDATE
+AFTER UPDATE ON Review
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'reviews';
+END //
+
+CREATE TRIGGER trg_Version_Review_DELETE
+AFTER DELETE ON Review
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'reviews';
+END //
+
+CREATE TRIGGER trg_Version_Skill_INSERT
+AFTER INSERT ON Skill
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'skills';
+END //
+
+CREATE TRIGGER trg_Version_Skill_UPDATE
+AFTER UPDATE ON Skill
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'skills';
+END //
+
+CREATE TRIGGER trg_Version_Skill_DELETE
+AFTER DELETE ON Skill
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'skills';
+END //
+
+CREATE TRIGGER trg_Version_Student_Skill_INSERT
+AFTER INSERT ON Student_Skill
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'skills';
+END //
+
+CREATE TRIGGER trg_Version_Student_Skill_UPDATE
+AFTER UPDATE ON Student_Skill
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'skills';
+END //
+
+CREATE TRIGGER trg_Version_Student_Skill_DELETE
+AFTER DELETE ON Student_Skill
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'skills';
+END //
+
+CREATE TRIGGER trg_Version_Project_Skill_INSERT
+AFTER INSERT ON Project_Skill
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'skills';
+END //
+
+CREATE TRIGGER trg_Version_Project_Skill_UPDATE
+AFTER UPDATE ON Project_Skill
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'skills';
+END //
+
+CREATE TRIGGER trg_Version_Project_Skill_DELETE
+AFTER DELETE ON Project_Skill
+FOR EACH ROW
+BEGIN
+    UPDATE Entity_Version SET version = version + 1 WHERE entity = 'skills';
+END //
+
+DELIMITER ;
@@ -0,0 +1,280 @@
+-- Migration 004: deadline sweeper and archive tables.
+--
+-- * trg_Validate_Project_Deadline_UPDATE now checks only a changed deadline;
+--   it used to reject every update of a project past its deadline, which made
+--   expired projects impossible to close.
+-- * sp_CloseExpiredProjects closes Open projects past their deadline and
+--   rejects their pending applications, in bounded batches.
+-- * sp_ArchiveFinishedWork moves finished projects with their applications,
+--   contracts and payments into the *_Archive tables after a retention window.
+-- * Review.contract_id loses its foreign key (it may now refer to
+--   Contract_Archive), and sp_GetDashboard reads reviews through both.
+-- * ev_Close_Expired_Projects and ev_Archive_Finished_Work schedule the two
+--   procedures when event_scheduler is ON.
+--
+-- Safe to re-run.
+
+USE pesuConnect;
+
+-- Finished work, moved out of the hot tables by sp_ArchiveFinishedWork once
+-- it is past the retention window, so Project, Application, Contract, Payment
+-- and their indexes only hold live and recent rows. Same columns as the live
+-- tables plus archived_at, and no foreign keys: the history outlives edits to
+-- the live tables. Review rows stay put; their contract_id may refer to
+-- Contract_Archive, and the review queries join both.
+CREATE TABLE IF NOT EXISTS Project_Archive (
+    project_id INT PRIMARY KEY,
+    student_id INT,
+    title VARCHAR(100) NOT NULL,
+    description TEXT,
+    post_date DATE,
+    deadline DATE,
+    status VARCHAR(20),
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_project_archive_owner (student_id)
+);
+
+CREATE TABLE IF NOT EXISTS Application_Archive (
+    application_id INT PRIMARY KEY,
+    application_date DATE,
+    status VARCHAR(20),
+    student_id INT,
+    project_id INT,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_application_archive_project (project_id)
+);
+
+CREATE TABLE IF NOT EXISTS Contract_Archive (
+    contract_id INT PRIMARY KEY,
+    start_date DATE,
+    end_date DATE,
+    status VARCHAR(20),
+    student_id INT,
+    project_id INT,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_contract_archive_student (student_id)
+);
+
+CREATE TABLE IF NOT EXISTS Payment_Archive (
+    payment_id INT PRIMARY KEY,
+    amount DECIMAL(10, 2) NOT NULL,
+    payment_date DATE,
+    status VARCHAR(20),
+    payment_method VARCHAR(50),
+    contract_id INT,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_payment_archive_contract (contract_id)
+);
+
+-- Drop Review's foreign key on contract_id under whatever name it was created with.
+DROP PROCEDURE IF EXISTS tmp_DropReviewContractForeignKey;
+
+DELIMITER //
+
+CREATE PROCEDURE tmp_DropReviewContractForeignKey()
+BEGIN
+    DECLARE v_constraint VARCHAR(64);
+    SELECT constraint_name INTO v_constraint
+    FROM information_schema.key_column_usage
+    WHERE table_schema = DATABASE() AND table_name = 'Review' AND column_name = 'contract_id'
+      AND referenced_table_name = 'Contract'
+    LIMIT 1;
+    IF v_constraint IS NOT NULL THEN
+        SET @ddl = CONCAT('ALTER TABLE Review DROP FOREIGN KEY ', v_constraint);
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END //
+
+DELIMITER ;
+
+CALL tmp_DropReviewContractForeignKey();
+DROP PROCEDURE tmp_DropReviewContractForeignKey;
+
+DROP TRIGGER IF EXISTS trg_Validate_Project_Deadline_UPDATE;
+DROP PROCEDURE IF EXISTS sp_CloseExpiredProjects;
+DROP PROCEDURE IF EXISTS sp_ArchiveFinishedWork;
+DROP PROCEDURE IF EXISTS sp_GetDashboard;
+DROP EVENT IF EXISTS ev_Close_Expired_Projects;
+DROP EVENT IF EXISTS ev_Archive_Finished_Work;
+
+DELIMITER //
+
+CREATE TRIGGER trg_Validate_Project_Deadline_UPDATE
+BEFORE UPDATE ON Project
+FOR EACH ROW
+BEGIN
+    -- Only a changed deadline is checked, so expired projects can still change status.
+    IF NOT (NEW.deadline <=> OLD.deadline) AND NEW.deadline <= CURDATE() THEN
+        SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Error: Project deadline must be in the future.';
+    END IF;
+END //
+
+-- Purpose: Closes up to in_batch_size Open projects whose deadline has passed
+-- and rejects their pending applications, in one transaction. Returns one row
+-- (projects_closed, applications_rejected); call again until projects_closed is 0.
+CREATE PROCEDURE sp_CloseExpiredProjects(IN in_batch_size INT)
+BEGIN
+    DECLARE v_projects_closed INT DEFAULT 0;
+    DECLARE v_applications_rejected INT DEFAULT 0;
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        DROP TEMPORARY TABLE IF EXISTS tmp_Expired_Project;
+        RESIGNAL;
+    END;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_Expired_Project;
+    CREATE TEMPORARY TABLE tmp_Expired_Project (project_id INT PRIMARY KEY);
+
+    START TRANSACTION;
+
+    -- Seeks idx_project_status_deadline; the oldest deadlines go first.
+    INSERT INTO tmp_Expired_Project (project_id)
+    SELECT project_id FROM Project
+    WHERE status = 'Open' AND deadline < CURDATE()
+    ORDER BY deadline, project_id
+    LIMIT in_batch_size;
+
+    UPDATE Project p
+    JOIN tmp_Expired_Project t ON t.project_id = p.project_id
+    SET p.status = 'Closed'
+    WHERE p.status = 'Open';
+    SET v_projects_closed = ROW_COUNT();
+
+    UPDATE Application a
+    JOIN Project p ON p.project_id = a.project_id
+    JOIN tmp_Expired_Project t ON t.project_id = a.project_id
+    SET a.status = 'Rejected'
+    WHERE a.status = 'Pending' AND p.status = 'Closed';
+    SET v_applications_rejected = ROW_COUNT();
+
+    COMMIT;
+    DROP TEMPORARY TABLE tmp_Expired_Project;
+
+    SELECT v_projects_closed AS projects_closed, v_applications_rejected AS applications_rejected;
+END //
+
+-- Purpose: Moves up to in_batch_size Completed or Closed projects that finished
+-- more than in_retention_days ago (last contract end date, else the deadline)
+-- into the archive tables, with their applications, contracts and payments, in
+-- one transaction. Returns one row of counts; call again until projects is 0.
+CREATE PROCEDURE sp_ArchiveFinishedWork(IN in_retention_days INT, IN in_batch_size INT)
+BEGIN
+    DECLARE v_projects INT DEFAULT 0;
+    DECLARE v_applications INT DEFAULT 0;
+    DECLARE v_contracts INT DEFAULT 0;
+    DECLARE v_payments INT DEFAULT 0;
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        DROP TEMPORARY TABLE IF EXISTS tmp_Archive_Project;
+        DROP TEMPORARY TABLE IF EXISTS tmp_Archive_Contract;
+        RESIGNAL;
+    END;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_Archive_Project;
+    CREATE TEMPORARY TABLE tmp_Archive_Project (project_id INT PRIMARY KEY);
+    DROP TEMPORARY TABLE IF EXISTS tmp_Archive_Contract;
+    CREATE TEMPORARY TABLE tmp_Archive_Contract (contract_id INT PRIMARY KEY);
+
+    START TRANSACTION;
+
+    INSERT INTO tmp_Archive_Project (project_id)
+    SELECT p.project_id FROM Project p
+    WHERE p.status IN ('Completed', 'Closed')
+      AND COALESCE((SELECT MAX(c.end_date) FROM Contract c WHERE c.project_id = p.project_id), p.deadline)
+          < CURDATE() - INTERVAL in_retention_days DAY
+    ORDER BY p.project_id
+    LIMIT in_batch_size;
+
+    INSERT INTO tmp_Archive_Contract (contract_id)
+    SELECT c.contract_id FROM Contract c
+    JOIN tmp_Archive_Project t ON t.project_id = c.project_id;
+
+    -- Children first: payments, contracts (Contract_Completion cascades), applications, projects.
+    INSERT INTO Payment_Archive (payment_id, amount, payment_date, status, payment_method, contract_id)
+    SELECT py.payment_id, py.amount, py.payment_date, py.status, py.payment_method, py.contract_id
+    FROM Payment py JOIN tmp_Archive_Contract t ON t.contract_id = py.contract_id;
+    DELETE py FROM Payment py JOIN tmp_Archive_Contract t ON t.contract_id = py.contract_id;
+    SET v_payments = ROW_COUNT();
+
+    INSERT INTO Contract_Archive (contract_id, start_date, end_date, status, student_id, project_id)
+    SELECT c.contract_id, c.start_date, c.end_date, c.status, c.student_id, c.project_id
+    FROM Contract c JOIN tmp_Archive_Contract t ON t.contract_id = c.contract_id;
+    DELETE c FROM Contract c JOIN tmp_Archive_Contract t ON t.contract_id = c.contract_id;
+    SET v_contracts = ROW_COUNT();
+
+    INSERT INTO Application_Archive (application_id, application_date, status, student_id, project_id)
+    SELECT a.application_id, a.application_date, a.status, a.student_id, a.project_id
+    FROM Application a JOIN tmp_Archive_Project t ON t.project_id = a.project_id;
+    DELETE a FROM Application a JOIN tmp_Archive_Project t ON t.project_id = a.project_id;
+    SET v_applications = ROW_COUNT();
+
+    INSERT INTO Project_Archive (project_id, student_id, title, description, post_date, deadline, status)
+    SELECT p.project_id, p.student_id, p.title, p.description, p.post_date, p.deadline, p.status
+    FROM Project p JOIN tmp_Archive_Project t ON t.project_id = p.project_id;
+    DELETE p FROM Project p JOIN tmp_Archive_Project t ON t.project_id = p.project_id;
+    SET v_projects = ROW_COUNT();
+
+    COMMIT;
+    DROP TEMPORARY TABLE tmp_Archive_Project;
+    DROP TEMPORARY TABLE tmp_Archive_Contract;
+
+    SELECT v_projects AS projects, v_applications AS applications, v_contracts AS contracts, v_payments AS payments;
+END //
+
+-- Purpose: Returns everything the Dashboard shows in one round trip, as four
+-- result sets: rating stats, contracts as freelancer, contracts as owner, and
+-- the most recent reviews.
+CREATE PROCEDURE sp_GetDashboard(
+    IN in_student_id INT,
+    IN in_review_limit INT
+)
+BEGIN
+    SELECT 
+        COALESCE(rs.avg_rating, 0.00) AS avg,
+        COALESCE(rs.review_count, 0) AS count,
+        rs.last_review_date
+    FROM Student s
+    LEFT JOIN Student_Rating_Summary rs ON rs.student_id = s.student_id
+    WHERE s.student_id = in_student_id;
+
+    SELECT c.contract_id, p.title AS project_title, s.name AS project_owner_name, c.start_date, c.end_date
+    FROM Contract c
+    JOIN Project p ON c.project_id = p.project_id
+    JOIN Student s ON p.student_id = s.student_id
+    WHERE c.student_id = in_student_id AND p.status = 'In Progress';
+
+    SELECT c.contract_id, p.title AS project_title, c.student_id AS freelancer_id, s.name AS freelancer_name, c.start_date, c.end_date
+    FROM Contract c
+    JOIN Project p ON c.project_id = p.project_id
+    JOIN Student s ON c.student_id = s.student_id
+    WHERE p.student_id = in_student_id AND p.status = 'In Progress';
+
+    -- Reviews of archived contracts come from the archive tables.
+    SELECT r.rating, r.review_text, r.review_date, COALESCE(p.title, pa.title) AS project_title
+    FROM Review r
+    LEFT JOIN Contract c ON r.contract_id = c.contract_id
+    LEFT JOIN Project p ON c.project_id = p.project_id
+    LEFT JOIN Contract_Archive ca ON r.contract_id = ca.contract_id
+    LEFT JOIN Project_Archive pa ON ca.project_id = pa.project_id
+    WHERE r.student_id = in_student_id AND COALESCE(p.title, pa.title) IS NOT NULL
+    ORDER BY COALESCE(c.end_date, ca.end_date) DESC
+    LIMIT in_review_limit;
+END //
+
+-- Scheduled maintenance. Events only run with event_scheduler=ON; otherwise
+-- run python -m tools.maintenance from cron (it is also the only scheduler for
+-- the SQLite backend). Each run handles one bounded batch.
+CREATE EVENT ev_Close_Expired_Projects
+ON SCHEDULE EVERY 15 MINUTE
+DO CALL sp_CloseExpiredProjects(500) //
+
+CREATE EVENT ev_Archive_Finished_Work
+ON SCHEDULE EVERY 1 HOUR
+DO CALL sp_ArchiveFinishedWork(180, 500) //
+
+DELIMITER ;
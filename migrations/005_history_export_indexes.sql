@@ -0,0 +1,44 @@
+-- Migration 005: indexes for the per-student history export.
+--
+-- iter_history reads a student's history as owner by joining from their
+-- projects to the contracts on them, and reads the reviews they wrote by
+-- joining from those contracts to Review. Neither join had an index to use:
+--
+-- * Contract_Archive was only indexed by freelancer (student_id);
+-- * Review lost its contract_id foreign key (and with it, on fresh installs,
+--   the index MySQL creates for one) in migration 004.
+--
+-- Safe to re-run.
+
+USE pesuConnect;
+
+DROP PROCEDURE IF EXISTS tmp_AlterIfIndexMissing;
+
+DELIMITER //
+
+CREATE PROCEDURE tmp_AlterIfIndexMissing(
+    IN in_table VARCHAR(64),
+    IN in_index VARCHAR(64),
+    IN in_present BOOLEAN,
+    IN in_ddl TEXT
+)
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = in_table AND index_name = in_index
+    ) = in_present THEN
+        SET @ddl = in_ddl;
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END //
+
+DELIMITER ;
+
+CALL tmp_AlterIfIndexMissing('Contract_Archive', 'idx_contract_archive_project', FALSE,
+    'ALTER TABLE Contract_Archive ADD INDEX idx_contract_archive_project (project_id)');
+CALL tmp_AlterIfIndexMissing('Review', 'idx_review_contract', FALSE,
+    'ALTER TABLE Review ADD INDEX idx_review_contract (contract_id)');
+
+DROP PROCEDURE tmp_AlterIfIndexMissing;
@@ -0,0 +1,295 @@
+-- Migration 006: payment rollups for the Earnings & Spending page.
+--
+-- * Student_Payment_Summary, Student_Payment_Month and Department_Payment_Summary
+--   hold earned/spent totals per student, per student and month, and per
+--   department; trg_Payment_Rollups_INSERT keeps them current.
+-- * sp_RebuildPaymentRollups / sp_VerifyPaymentRollups recompute and check
+--   them (see tools/payment_rollups.py); this migration ends with a rebuild,
+--   which fills them from the existing payments.
+-- * sp_GetPaymentAnalytics reads the page in one round trip, and
+--   idx_rating_summary_top serves its top-rated list.
+--
+-- Safe to re-run.
+
+USE pesuConnect;
+
+-- Payment rollups; see pesuconnect_schema.sql.
+CREATE TABLE IF NOT EXISTS Student_Payment_Summary (
+    student_id INT PRIMARY KEY,
+    earned DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    earned_count INT NOT NULL DEFAULT 0,
+    spent DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    spent_count INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (student_id) REFERENCES Student(student_id) ON DELETE CASCADE,
+    -- Serves the top-earners list: ORDER BY earned DESC LIMIT n
+    INDEX idx_payment_summary_earned (earned)
+);
+
+CREATE TABLE IF NOT EXISTS Student_Payment_Month (
+    student_id INT,
+    month DATE, -- the first day of the month of payment_date
+    earned DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    earned_count INT NOT NULL DEFAULT 0,
+    spent DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    spent_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (student_id, month),
+    FOREIGN KEY (student_id) REFERENCES Student(student_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS Department_Payment_Summary (
+    department VARCHAR(50) PRIMARY KEY, -- '' for students without one
+    earned DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    earned_count INT NOT NULL DEFAULT 0,
+    spent DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    spent_count INT NOT NULL DEFAULT 0
+);
+
+DROP PROCEDURE IF EXISTS tmp_AlterIfIndexMissing;
+
+DELIMITER //
+
+CREATE PROCEDURE tmp_AlterIfIndexMissing(
+    IN in_table VARCHAR(64),
+    IN in_index VARCHAR(64),
+    IN in_present BOOLEAN,
+    IN in_ddl TEXT
+)
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = in_table AND index_name = in_index
+    ) = in_present THEN
+        SET @ddl = in_ddl;
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END //
+
+DELIMITER ;
+
+CALL tmp_AlterIfIndexMissing('Student_Rating_Summary', 'idx_rating_summary_top', FALSE,
+    'ALTER TABLE Student_Rating_Summary ADD INDEX idx_rating_summary_top (avg_rating, review_count)');
+
+DROP PROCEDURE tmp_AlterIfIndexMissing;
+
+DROP TRIGGER IF EXISTS trg_Payment_Rollups_INSERT;
+DROP PROCEDURE IF EXISTS sp_FillPaymentFacts;
+DROP PROCEDURE IF EXISTS sp_RebuildPaymentRollups;
+DROP PROCEDURE IF EXISTS sp_VerifyPaymentRollups;
+DROP PROCEDURE IF EXISTS sp_GetPaymentAnalytics;
+
+DELIMITER //
+
+-- Payments are only ever inserted (archiving moves them, and must not
+-- subtract from the rollups), so one trigger keeps the rollups current.
+CREATE TRIGGER trg_Payment_Rollups_INSERT
+AFTER INSERT ON Payment
+FOR EACH ROW
+BEGIN
+    DECLARE v_freelancer_id INT;
+    DECLARE v_owner_id INT;
+    DECLARE v_freelancer_department VARCHAR(50);
+    DECLARE v_owner_department VARCHAR(50);
+    DECLARE v_month DATE;
+
+    SELECT c.student_id, p.student_id, COALESCE(fs.department, ''), COALESCE(os.department, '')
+    INTO v_freelancer_id, v_owner_id, v_freelancer_department, v_owner_department
+    FROM Contract c
+    JOIN Project p ON p.project_id = c.project_id
+    JOIN Student fs ON fs.student_id = c.student_id
+    JOIN Student os ON os.student_id = p.student_id
+    WHERE c.contract_id = NEW.contract_id;
+
+    IF v_freelancer_id IS NOT NULL THEN
+        INSERT INTO Student_Payment_Summary (student_id, earned, earned_count)
+        VALUES (v_freelancer_id, NEW.amount, 1)
+        ON DUPLICATE KEY UPDATE earned = earned + NEW.amount, earned_count = earned_count + 1;
+        INSERT INTO Student_Payment_Summary (student_id, spent, spent_count)
+        VALUES (v_owner_id, NEW.amount, 1)
+        ON DUPLICATE KEY UPDATE spent = spent + NEW.amount, spent_count = spent_count + 1;
+
+        INSERT INTO Department_Payment_Summary (department, earned, earned_count)
+        VALUES (v_freelancer_department, NEW.amount, 1)
+        ON DUPLICATE KEY UPDATE earned = earned + NEW.amount, earned_count = earned_count + 1;
+        INSERT INTO Department_Payment_Summary (department, spent, spent_count)
+        VALUES (v_owner_department, NEW.amount, 1)
+        ON DUPLICATE KEY UPDATE spent = spent + NEW.amount, spent_count = spent_count + 1;
+
+        IF NEW.payment_date IS NOT NULL THEN
+            SET v_month = DATE_FORMAT(NEW.payment_date, '%Y-%m-01');
+            INSERT INTO Student_Payment_Month (student_id, month, earned, earned_count)
+            VALUES (v_freelancer_id, v_month, NEW.amount, 1)
+            ON DUPLICATE KEY UPDATE earned = earned + NEW.amount, earned_count = earned_count + 1;
+            INSERT INTO Student_Payment_Month (student_id, month, spent, spent_count)
+            VALUES (v_owner_id, v_month, NEW.amount, 1)
+            ON DUPLICATE KEY UPDATE spent = spent + NEW.amount, spent_count = spent_count + 1;
+        END IF;
+    END IF;
+END //
+
+-- Purpose: Fills tmp_Payment_Fact with one row per student per payment: an
+-- earned row for the freelancer and a spent row for the owner, live and
+-- archived, with the student's department and the payment's month. The
+-- input of sp_RebuildPaymentRollups and sp_VerifyPaymentRollups.
+CREATE PROCEDURE sp_FillPaymentFacts()
+BEGIN
+    DROP TEMPORARY TABLE IF EXISTS tmp_Payment_Fact;
+    CREATE TEMPORARY TABLE tmp_Payment_Fact (
+        student_id INT,
+        department VARCHAR(50),
+        month DATE,
+        earned DECIMAL(14, 2),
+        earned_count INT,
+        spent DECIMAL(14, 2),
+        spent_count INT
+    );
+
+    INSERT INTO tmp_Payment_Fact (student_id, department, month, earned, earned_count, spent, spent_count)
+    SELECT c.student_id, COALESCE(s.department, ''), DATE_FORMAT(py.payment_date, '%Y-%m-01'), py.amount, 1, 0, 0
+    FROM Payment py
+    JOIN Contract c ON c.contract_id = py.contract_id
+    JOIN Project p ON p.project_id = c.project_id
+    JOIN Student s ON s.student_id = c.student_id
+    UNION ALL
+    SELECT p.student_id, COALESCE(s.department, ''), DATE_FORMAT(py.payment_date, '%Y-%m-01'), 0, 0, py.amount, 1
+    FROM Payment py
+    JOIN Contract c ON c.contract_id = py.contract_id
+    JOIN Project p ON p.project_id = c.project_id
+    JOIN Student s ON s.student_id = p.student_id
+    UNION ALL
+    SELECT c.student_id, COALESCE(s.department, ''), DATE_FORMAT(py.payment_date, '%Y-%m-01'), py.amount, 1, 0, 0
+    FROM Payment_Archive py
+    JOIN Contract_Archive c ON c.contract_id = py.contract_id
+    JOIN Project_Archive p ON p.project_id = c.project_id
+    JOIN Student s ON s.student_id = c.student_id
+    UNION ALL
+    SELECT p.student_id, COALESCE(s.department, ''), DATE_FORMAT(py.payment_date, '%Y-%m-01'), 0, 0, py.amount, 1
+    FROM Payment_Archive py
+    JOIN Contract_Archive c ON c.contract_id = py.contract_id
+    JOIN Project_Archive p ON p.project_id = c.project_id
+    JOIN Student s ON s.student_id = p.student_id;
+END //
+
+-- Purpose: Recomputes the three payment rollups from Payment and Payment_Archive.
+CREATE PROCEDURE sp_RebuildPaymentRollups()
+BEGIN
+    START TRANSACTION;
+
+    CALL sp_FillPaymentFacts();
+
+    DELETE FROM Student_Payment_Summary;
+    DELETE FROM Student_Payment_Month;
+    DELETE FROM Department_Payment_Summary;
+
+    INSERT INTO Student_Payment_Summary (student_id, earned, earned_count, spent, spent_count)
+    SELECT student_id, SUM(earned), SUM(earned_count), SUM(spent), SUM(spent_count)
+    FROM tmp_Payment_Fact
+    GROUP BY student_id;
+
+    INSERT INTO Student_Payment_Month (student_id, month, earned, earned_count, spent, spent_count)
+    SELECT student_id, month, SUM(earned), SUM(earned_count), SUM(spent), SUM(spent_count)
+    FROM tmp_Payment_Fact
+    WHERE month IS NOT NULL
+    GROUP BY student_id, month;
+
+    INSERT INTO Department_Payment_Summary (department, earned, earned_count, spent, spent_count)
+    SELECT department, SUM(earned), SUM(earned_count), SUM(spent), SUM(spent_count)
+    FROM tmp_Payment_Fact
+    GROUP BY department;
+
+    COMMIT;
+
+    DROP TEMPORARY TABLE tmp_Payment_Fact;
+END //
+
+-- Purpose: Lists payment rollup rows that disagree with the payments, as
+-- three result sets (students, student months, departments). Each row holds
+-- actual minus rollup for every total; empty results mean the rollups are
+-- consistent. (A temporary table can only be opened once per statement, so
+-- the three checks can't be one UNION.)
+CREATE PROCEDURE sp_VerifyPaymentRollups()
+BEGIN
+    CALL sp_FillPaymentFacts();
+
+    SELECT 'student' AS rollup, student_id AS rollup_key, NULL AS month,
+        SUM(earned) AS earned, SUM(earned_count) AS earned_count, SUM(spent) AS spent, SUM(spent_count) AS spent_count
+    FROM (
+        SELECT student_id, earned, earned_count, spent, spent_count FROM tmp_Payment_Fact
+        UNION ALL
+        SELECT student_id, -earned, -earned_count, -spent, -spent_count FROM Student_Payment_Summary
+    ) AS diff
+    GROUP BY student_id
+    HAVING SUM(earned) <> 0 OR SUM(earned_count) <> 0 OR SUM(spent) <> 0 OR SUM(spent_count) <> 0;
+
+    SELECT 'month' AS rollup, student_id AS rollup_key, month,
+        SUM(earned) AS earned, SUM(earned_count) AS earned_count, SUM(spent) AS spent, SUM(spent_count) AS spent_count
+    FROM (
+        SELECT student_id, month, earned, earned_count, spent, spent_count FROM tmp_Payment_Fact
+        WHERE month IS NOT NULL
+        UNION ALL
+        SELECT student_id, month, -earned, -earned_count, -spent, -spent_count FROM Student_Payment_Month
+    ) AS diff
+    GROUP BY student_id, month
+    HAVING SUM(earned) <> 0 OR SUM(earned_count) <> 0 OR SUM(spent) <> 0 OR SUM(spent_count) <> 0;
+
+    SELECT 'department' AS rollup, department AS rollup_key, NULL AS month,
+        SUM(earned) AS earned, SUM(earned_count) AS earned_count, SUM(spent) AS spent, SUM(spent_count) AS spent_count
+    FROM (
+        SELECT department, earned, earned_count, spent, spent_count FROM tmp_Payment_Fact
+        UNION ALL
+        SELECT department, -earned, -earned_count, -spent, -spent_count FROM Department_Payment_Summary
+    ) AS diff
+    GROUP BY department
+    HAVING SUM(earned) <> 0 OR SUM(earned_count) <> 0 OR SUM(spent) <> 0 OR SUM(spent_count) <> 0;
+
+    DROP TEMPORARY TABLE tmp_Payment_Fact;
+END //
+
+-- Purpose: Everything the Earnings & Spending page shows, as five result sets
+-- read from the payment rollups: the student's totals, their last in_months
+-- months, the department totals, and the top in_top_limit freelancers by
+-- earnings and by rating (with at least in_min_reviews reviews).
+CREATE PROCEDURE sp_GetPaymentAnalytics(
+    IN in_student_id INT,
+    IN in_months INT,
+    IN in_top_limit INT,
+    IN in_min_reviews INT
+)
+BEGIN
+    SELECT earned, earned_count, spent, spent_count
+    FROM Student_Payment_Summary
+    WHERE student_id = in_student_id;
+
+    SELECT month, earned, earned_count, spent, spent_count
+    FROM Student_Payment_Month
+    WHERE student_id = in_student_id
+      AND month >= DATE_FORMAT(CURDATE() - INTERVAL (in_months - 1) MONTH, '%Y-%m-01')
+    ORDER BY month;
+
+    SELECT department, earned, earned_count, spent, spent_count
+    FROM Department_Payment_Summary
+    ORDER BY department;
+
+    SELECT s.student_id, s.name, s.department, ps.earned, ps.earned_count,
+        COALESCE(rs.avg_rating, 0.00) AS avg_rating, COALESCE(rs.review_count, 0) AS review_count
+    FROM Student_Payment_Summary ps
+    JOIN Student s ON s.student_id = ps.student_id
+    LEFT JOIN Student_Rating_Summary rs ON rs.student_id = ps.student_id
+    WHERE ps.earned_count > 0
+    ORDER BY ps.earned DESC
+    LIMIT in_top_limit;
+
+    SELECT s.student_id, s.name, s.department, COALESCE(ps.earned, 0.00) AS earned,
+        COALESCE(ps.earned_count, 0) AS earned_count, rs.avg_rating, rs.review_count
+    FROM Student_Rating_Summary rs
+    JOIN Student s ON s.student_id = rs.student_id
+    LEFT JOIN Student_Payment_Summary ps ON ps.student_id = rs.student_id
+    WHERE rs.review_count >= in_min_reviews
+    ORDER BY rs.avg_rating DESC, rs.review_count DESC
+    LIMIT in_top_limit;
+END //
+
+DELIMITER ;
+
+CALL sp_RebuildPaymentRollups();
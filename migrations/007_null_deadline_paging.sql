@@ -0,0 +1,91 @@
+-- Migration 007: page through projects that have no deadline.
+--
+-- Project.deadline is nullable and MySQL sorts NULLs first, so a page ending on
+-- a project without a deadline handed sp_SearchProjectsPage a (NULL, id)
+-- cursor, which it read as "first page": the next page repeated forever, and
+-- the (deadline, project_id) > cursor predicate never reached NULL rows anyway.
+-- sp_SearchProjectsPage now orders and compares on
+-- COALESCE(deadline, DATE '9999-12-31'), so undated projects come last, and
+-- idx_project_status_due indexes that expression (MySQL 8.0.13+).
+-- idx_project_status_deadline stays for sp_CloseExpiredProjects.
+--
+-- Safe to re-run.
+
+USE pesuConnect;
+
+DROP PROCEDURE IF EXISTS tmp_AddIndexIfMissing;
+
+DELIMITER //
+
+CREATE PROCEDURE tmp_AddIndexIfMissing(
+    IN in_table VARCHAR(64),
+    IN in_index VARCHAR(64),
+    IN in_ddl TEXT
+)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = in_table AND index_name = in_index
+    ) THEN
+        SET @ddl = in_ddl;
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END //
+
+DELIMITER ;
+
+CALL tmp_AddIndexIfMissing('Project', 'idx_project_status_due',
+    'ALTER TABLE Project ADD INDEX idx_project_status_due (status, (COALESCE(deadline, DATE ''9999-12-31'')), project_id)');
+
+DROP PROCEDURE tmp_AddIndexIfMissing;
+
+DROP PROCEDURE IF EXISTS sp_SearchProjectsPage;
+
+DELIMITER //
+
+-- Purpose: Returns one page of projects ordered by (deadline, project_id), with
+-- projects that have no deadline last (as if it were 9999-12-31).
+-- Pass the deadline and project_id of the last row already shown as the cursor,
+-- 9999-12-31 for a row without one (NULLs for the first page). Cost depends on
+-- the page size, not on how many projects match, because the cursor seeks
+-- straight into idx_project_status_due.
+CREATE PROCEDURE sp_SearchProjectsPage(
+    IN in_keyword VARCHAR(100),
+    IN in_status VARCHAR(20),
+    IN in_deadline_before DATE,
+    IN in_after_deadline DATE,
+    IN in_after_project_id INT,
+    IN in_page_size INT
+)
+BEGIN
+    DECLARE v_keyword VARCHAR(102);
+    SET v_keyword = CONCAT('%', in_keyword, '%');
+
+    SELECT 
+        p.project_id, 
+        p.title, 
+        p.description, 
+        p.deadline, 
+        p.post_date,
+        p.status,
+        p.student_id AS owner_id,
+        s.name AS owner_name,
+        rs.avg_rating AS owner_rating,
+        rs.review_count AS owner_review_count
+    FROM Project p
+    LEFT JOIN Student s ON p.student_id = s.student_id
+    LEFT JOIN Student_Rating_Summary rs ON rs.student_id = p.student_id
+    WHERE 
+        (in_keyword IS NULL OR p.title LIKE v_keyword OR p.description LIKE v_keyword)
+        AND (in_status IS NULL OR p.status = in_status)
+        AND (in_deadline_before IS NULL OR p.deadline <= in_deadline_before)
+        AND (in_after_deadline IS NULL
+             OR COALESCE(p.deadline, DATE '9999-12-31') > in_after_deadline
+             OR (COALESCE(p.deadline, DATE '9999-12-31') = in_after_deadline AND p.project_id > in_after_project_id))
+    ORDER BY COALESCE(p.deadline, DATE '9999-12-31'), p.project_id
+    LIMIT in_page_size;
+END //
+
+DELIMITER ;
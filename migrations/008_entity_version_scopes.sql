@@ -0,0 +1,410 @@
+-- Migration 008: per-student Entity_Version counters.
+--
+-- Migration 003 kept one counter per entity, so any student's write bumped the
+-- counter every cached entry depended on: one write anywhere invalidated every
+-- student's cache, and every writer queued on the same row lock until commit
+-- (the sweeper, the archive job and batch applies included).
+--
+-- Entity_Version is now keyed by (scope, entity). scope > 0 is a student_id,
+-- bumped only by writes that change what that student sees; scopes 0 to -15
+-- are shards of the platform-wide counter, picked by row id, whose sum is the
+-- old per-entity counter. The existing rows become shard 0, so the
+-- platform-wide counters carry on from their current values.
+--
+-- Safe to re-run.
+
+USE pesuConnect;
+
+DROP PROCEDURE IF EXISTS tmp_AddVersionScope;
+
+DELIMITER //
+
+CREATE PROCEDURE tmp_AddVersionScope()
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = 'Entity_Version' AND column_name = 'scope'
+    ) THEN
+        ALTER TABLE Entity_Version
+            ADD COLUMN scope INT NOT NULL DEFAULT 0 FIRST,
+            DROP PRIMARY KEY,
+            ADD PRIMARY KEY (scope, entity);
+    END IF;
+END //
+
+DELIMITER ;
+
+CALL tmp_AddVersionScope();
+
+DROP PROCEDURE tmp_AddVersionScope;
+
+DROP TRIGGER IF EXISTS trg_Version_Project_INSERT;
+DROP TRIGGER IF EXISTS trg_Version_Project_UPDATE;
+DROP TRIGGER IF EXISTS trg_Version_Project_DELETE;
+DROP TRIGGER IF EXISTS trg_Version_Application_INSERT;
+DROP TRIGGER IF EXISTS trg_Version_Application_UPDATE;
+DROP TRIGGER IF EXISTS trg_Version_Application_DELETE;
+DROP TRIGGER IF EXISTS trg_Version_Contract_INSERT;
+DROP TRIGGER IF EXISTS trg_Version_Contract_UPDATE;
+DROP TRIGGER IF EXISTS trg_Version_Contract_DELETE;
+DROP TRIGGER IF EXISTS trg_Version_Payment_INSERT;
+DROP TRIGGER IF EXISTS trg_Version_Payment_UPDATE;
+DROP TRIGGER IF EXISTS trg_Version_Payment_DELETE;
+DROP TRIGGER IF EXISTS trg_Version_Review_INSERT;
+DROP TRIGGER IF EXISTS trg_Version_Review_UPDATE;
+DROP TRIGGER IF EXISTS trg_Version_Review_DELETE;
+DROP TRIGGER IF EXISTS trg_Version_Skill_INSERT;
+DROP TRIGGER IF EXISTS trg_Version_Skill_UPDATE;
+DROP TRIGGER IF EXISTS trg_Version_Skill_DELETE;
+DROP TRIGGER IF EXISTS trg_Version_Student_Skill_INSERT;
+DROP TRIGGER IF EXISTS trg_Version_Student_Skill_UPDATE;
+DROP TRIGGER IF EXISTS trg_Version_Student_Skill_DELETE;
+DROP TRIGGER IF EXISTS trg_Version_Project_Skill_INSERT;
+DROP TRIGGER IF EXISTS trg_Version_Project_Skill_UPDATE;
+DROP TRIGGER IF EXISTS trg_Version_Project_Skill_DELETE;
+
+DELIMITER //
+
+CREATE TRIGGER trg_Version_Project_INSERT
+AFTER INSERT ON Project
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'projects', 1 FROM (
+        SELECT -(NEW.project_id % 16) AS scope
+        UNION SELECT NEW.student_id
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Project_UPDATE
+AFTER UPDATE ON Project
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'projects', 1 FROM (
+        SELECT -(NEW.project_id % 16) AS scope
+        UNION SELECT NEW.student_id
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Project_DELETE
+AFTER DELETE ON Project
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'projects', 1 FROM (
+        SELECT -(OLD.project_id % 16) AS scope
+        UNION SELECT OLD.student_id
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Application_INSERT
+AFTER INSERT ON Application
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'applications', 1 FROM (
+        SELECT -(NEW.application_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = NEW.project_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Application_UPDATE
+AFTER UPDATE ON Application
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'applications', 1 FROM (
+        SELECT -(NEW.application_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = NEW.project_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Application_DELETE
+AFTER DELETE ON Application
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'applications', 1 FROM (
+        SELECT -(OLD.application_id % 16) AS scope
+        UNION SELECT OLD.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = OLD.project_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Contract_INSERT
+AFTER INSERT ON Contract
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(NEW.contract_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = NEW.project_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Contract_UPDATE
+AFTER UPDATE ON Contract
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(NEW.contract_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = NEW.project_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Contract_DELETE
+AFTER DELETE ON Contract
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(OLD.contract_id % 16) AS scope
+        UNION SELECT OLD.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = OLD.project_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Payment_INSERT
+AFTER INSERT ON Payment
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(NEW.payment_id % 16) AS scope
+        UNION SELECT (SELECT student_id FROM Contract WHERE contract_id = NEW.contract_id)
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = NEW.contract_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Payment_UPDATE
+AFTER UPDATE ON Payment
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(NEW.payment_id % 16) AS scope
+        UNION SELECT (SELECT student_id FROM Contract WHERE contract_id = NEW.contract_id)
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = NEW.contract_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Payment_DELETE
+AFTER DELETE ON Payment
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(OLD.payment_id % 16) AS scope
+        UNION SELECT (SELECT student_id FROM Contract WHERE contract_id = OLD.contract_id)
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = OLD.contract_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Review_INSERT
+AFTER INSERT ON Review
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'reviews', 1 FROM (
+        SELECT -(NEW.review_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = NEW.contract_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Review_UPDATE
+AFTER UPDATE ON Review
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'reviews', 1 FROM (
+        SELECT -(NEW.review_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = NEW.contract_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Review_DELETE
+AFTER DELETE ON Review
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'reviews', 1 FROM (
+        SELECT -(OLD.review_id % 16) AS scope
+        UNION SELECT OLD.student_id
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = OLD.contract_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Skill_INSERT
+AFTER INSERT ON Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.skill_id % 16) AS scope
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Skill_UPDATE
+AFTER UPDATE ON Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.skill_id % 16) AS scope
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Skill_DELETE
+AFTER DELETE ON Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(OLD.skill_id % 16) AS scope
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Student_Skill_INSERT
+AFTER INSERT ON Student_Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.student_id % 16) AS scope
+        UNION SELECT NEW.student_id
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Student_Skill_UPDATE
+AFTER UPDATE ON Student_Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.student_id % 16) AS scope
+        UNION SELECT NEW.student_id
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Student_Skill_DELETE
+AFTER DELETE ON Student_Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(OLD.student_id % 16) AS scope
+        UNION SELECT OLD.student_id
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Project_Skill_INSERT
+AFTER INSERT ON Project_Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.project_id % 16) AS scope
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Project_Skill_UPDATE
+AFTER UPDATE ON Project_Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.project_id % 16) AS scope
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Project_Skill_DELETE
+AFTER DELETE ON Project_Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(OLD.project_id % 16) AS scope
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+DELIMITER ;
@@ -20,7 +20,16 @@ CREATE TABLE Project (
     post_date DATE,
     deadline DATE,
     status VARCHAR(20) DEFAULT 'Open',
-    FOREIGN KEY (student_id) REFERENCES Student(student_id) ON DELETE SET NULL
+    FOREIGN KEY (student_id) REFERENCES Student(student_id) ON DELETE SET NULL,
+    -- Serves sp_CloseExpiredProjects: WHERE status = 'Open' AND deadline < CURDATE() ORDER BY deadline, project_id
+    INDEX idx_project_status_deadline (status, deadline, project_id),
+    -- Serves keyset pagination in sp_SearchProjectsPage, where a project without
+    -- a deadline sorts after every dated one: ORDER BY <this expression>, project_id
+    INDEX idx_project_status_due (status, (COALESCE(deadline, DATE '9999-12-31')), project_id),
+    -- Serves keyword search in sp_SearchProjectsRanked (replaces LIKE '%kw%' scans)
+    FULLTEXT INDEX ft_project_title_description (title, description),
+    -- Serves "my projects" and owner-side contract lookups: WHERE student_id = ? [AND status = 'In Progress']
+    INDEX idx_project_owner_status (student_id, status)
 );
 
 CREATE TABLE Application (
@@ -30,7 +39,11 @@ CREATE TABLE Application (
     student_id INT,
     project_id INT,
     FOREIGN KEY (student_id) REFERENCES Student(student_id) ON DELETE CASCADE,
-    FOREIGN KEY (project_id) REFERENCES Project(project_id) ON DELETE CASCADE
+    FOREIGN KEY (project_id) REFERENCES Project(project_id) ON DELETE CASCADE,
+    -- Serves pending counts/lists: WHERE project_id = ? AND status = 'Pending'
+    INDEX idx_application_project_status (project_id, status),
+    -- One application per student per project; also serves WHERE student_id = ? [AND project_id = ?]
+    UNIQUE KEY uq_application_student_project (student_id, project_id)
 );
 
 CREATE TABLE Contract (
@@ -41,7 +54,9 @@ CREATE TABLE Contract (
     student_id INT,
     project_id INT,
     FOREIGN KEY (student_id) REFERENCES Student(student_id) ON DELETE CASCADE,
-    FOREIGN KEY (project_id) REFERENCES Project(project_id) ON DELETE CASCADE
+    FOREIGN KEY (project_id) REFERENCES Project(project_id) ON DELETE CASCADE,
+    -- Serves freelancer-side contract lookups: WHERE c.student_id = ? joined to Project
+    INDEX idx_contract_student_project (student_id, project_id)
 );
 
 CREATE TABLE Payment (
@@ -60,8 +75,77 @@ CREATE TABLE Review (
     rating INT CHECK (rating >= 1 AND rating <= 5),
     student_id INT, -- The student being reviewed
     contract_id INT,
+    review_date DATE,
     FOREIGN KEY (student_id) REFERENCES Student(student_id) ON DELETE CASCADE,
-    FOREIGN KEY (contract_id) REFERENCES Contract(contract_id) ON DELETE SET NULL
+    -- No foreign key on contract_id: it may refer to Contract or Contract_Archive.
+    -- Serves a student's review list: WHERE student_id = ? joined through contract_id
+    INDEX idx_review_student_contract (student_id, contract_id),
+    -- Serves reviews written by a project owner: joined from their contracts
+    INDEX idx_review_contract (contract_id)
+);
+
+-- Per-student rating totals, kept current by the trg_Review_Summary_* triggers
+-- so that showing a rating is a primary-key lookup instead of an AVG/COUNT scan.
+-- Rebuild or check it with sp_RebuildRatingSummary / sp_VerifyRatingSummary.
+CREATE TABLE Student_Rating_Summary (
+    student_id INT PRIMARY KEY,
+    review_count INT NOT NULL DEFAULT 0, -- all reviews, like COUNT(*)
+    rating_count INT NOT NULL DEFAULT 0, -- reviews with a rating, like COUNT(rating)
+    rating_sum INT NOT NULL DEFAULT 0,
+    avg_rating DECIMAL(3, 2) AS (IF(rating_count = 0, 0.00, rating_sum / rating_count)) STORED,
+    last_review_date DATE,
+    FOREIGN KEY (student_id) REFERENCES Student(student_id) ON DELETE CASCADE,
+    -- Serves the top-rated list: ORDER BY avg_rating DESC, review_count DESC LIMIT n
+    INDEX idx_rating_summary_top (avg_rating, review_count)
+);
+
+-- Payment rollups, kept current by trg_Payment_Rollups_INSERT so that the
+-- Earnings & Spending page reads a few rows by key instead of aggregating
+-- Payment through Contract and Project. A payment counts as earned for the
+-- contract's freelancer and as spent for the project's owner, and towards
+-- the department of each. Archiving leaves the rollups alone: they cover the
+-- whole history. Rebuild or check them with sp_RebuildPaymentRollups /
+-- sp_VerifyPaymentRollups.
+CREATE TABLE Student_Payment_Summary (
+    student_id INT PRIMARY KEY,
+    earned DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    earned_count INT NOT NULL DEFAULT 0,
+    spent DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    spent_count INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (student_id) REFERENCES Student(student_id) ON DELETE CASCADE,
+    -- Serves the top-earners list: ORDER BY earned DESC LIMIT n
+    INDEX idx_payment_summary_earned (earned)
+);
+
+CREATE TABLE Student_Payment_Month (
+    student_id INT,
+    month DATE, -- the first day of the month of payment_date
+    earned DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    earned_count INT NOT NULL DEFAULT 0,
+    spent DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    spent_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (student_id, month),
+    FOREIGN KEY (student_id) REFERENCES Student(student_id) ON DELETE CASCADE
+);
+
+CREATE TABLE Department_Payment_Summary (
+    department VARCHAR(50) PRIMARY KEY, -- '' for students without one
+    earned DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    earned_count INT NOT NULL DEFAULT 0,
+    spent DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    spent_count INT NOT NULL DEFAULT 0
+);
+
+-- One row per contract completed through sp_CompleteContractWithReview, keyed by
+-- the client-supplied token so that a retried or double-submitted completion is
+-- recognised instead of writing a second review and payment.
+CREATE TABLE Contract_Completion (
+    completion_token VARCHAR(64) PRIMARY KEY,
+    contract_id INT NOT NULL UNIQUE,
+    review_id INT,
+    payment_id INT,
+    completed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (contract_id) REFERENCES Contract(contract_id) ON DELETE CASCADE
 );
 
 CREATE TABLE Skill (
@@ -79,6 +163,90 @@ CREATE TABLE Student_Skill (
     FOREIGN KEY (skill_id) REFERENCES Skill(skill_id) ON DELETE CASCADE
 );
 
+-- Skills a project needs and the minimum proficiency wanted; feeds the
+-- "Recommended for You" matching in recommender.py.
+CREATE TABLE Project_Skill (
+    project_id INT,
+    skill_id INT,
+    min_proficiency ENUM('Beginner', 'Intermediate', 'Advanced') DEFAULT 'Beginner',
+    PRIMARY KEY (project_id, skill_id),
+    FOREIGN KEY (project_id) REFERENCES Project(project_id) ON DELETE CASCADE,
+    FOREIGN KEY (skill_id) REFERENCES Skill(skill_id) ON DELETE CASCADE
+);
+
+-- Finished work, moved out of the hot tables by sp_ArchiveFinishedWork once
+-- it is past the retention window, so Project, Application, Contract, Payment
+-- and their indexes only hold live and recent rows. Same columns as the live
+-- tables plus archived_at, and no foreign keys: the history outlives edits to
+-- the live tables. Review rows stay put; their contract_id may refer to
+-- Contract_Archive, and the review queries join both.
+CREATE TABLE Project_Archive (
+    project_id INT PRIMARY KEY,
+    student_id INT,
+    title VARCHAR(100) NOT NULL,
+    description TEXT,
+    post_date DATE,
+    deadline DATE,
+    status VARCHAR(20),
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_project_archive_owner (student_id)
+);
+
+CREATE TABLE Application_Archive (
+    application_id INT PRIMARY KEY,
+    application_date DATE,
+    status VARCHAR(20),
+    student_id INT,
+    project_id INT,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_application_archive_project (project_id)
+);
+
+CREATE TABLE Contract_Archive (
+    contract_id INT PRIMARY KEY,
+    start_date DATE,
+    end_date DATE,
+    status VARCHAR(20),
+    student_id INT,
+    project_id INT,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_contract_archive_student (student_id),
+    INDEX idx_contract_archive_project (project_id)
+);
+
+CREATE TABLE Payment_Archive (
+    payment_id INT PRIMARY KEY,
+    amount DECIMAL(10, 2) NOT NULL,
+    payment_date DATE,
+    status VARCHAR(20),
+    payment_method VARCHAR(50),
+    contract_id INT,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_payment_archive_contract (contract_id)
+);
+
+-- Change counters for the kinds of data the app caches, bumped by the
+-- trg_Version_* triggers in the same transaction as every write. A reader that
+-- remembers the counters it saw can tell from this small table whether anything
+-- it cached has changed (Repository.get_entity_versions).
+-- * scope > 0 is a student_id: writes that change what that student sees
+--   (their projects and the applications to them, their applications,
+--   contracts on either side, payments on those, reviews they received or
+--   wrote, their skills). Other students' writes leave it alone.
+-- * scope 0 to -15 are shards of the platform-wide counter, which is their
+--   sum; a write bumps the shard of its row id modulo 16, so concurrent
+--   writers rarely wait on the same row.
+-- Payments count as contract changes and Skill, Student_Skill and Project_Skill
+-- as skill changes.
+CREATE TABLE Entity_Version (
+    scope INT NOT NULL DEFAULT 0,
+    entity VARCHAR(32) NOT NULL,
+    version BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (scope, entity)
+);
+
+INSERT INTO Entity_Version (entity) VALUES ('projects'), ('applications'), ('contracts'), ('reviews'), ('skills');
+
 DELIMITER //
 
 CREATE TRIGGER trg_Validate_PESU_Email
@@ -123,49 +291,33 @@ CREATE TRIGGER trg_Validate_Project_Deadline_UPDATE
 BEFORE UPDATE ON Project
 FOR EACH ROW
 BEGIN
-    IF NEW.deadline <= CURDATE() THEN
+    -- Only a changed deadline is checked, so expired projects can still change status.
+    IF NOT (NEW.deadline <=> OLD.deadline) AND NEW.deadline <= CURDATE() THEN
         SIGNAL SQLSTATE '45000'
         SET MESSAGE_TEXT = 'Error: Project deadline must be in the future.';
     END IF;
 END //
 
-CREATE TRIGGER trg_Prevent_Self_Application
+-- Own-project and closed-project checks from one Project lookup; duplicates
+-- are rejected by uq_application_student_project (ER_DUP_ENTRY).
+CREATE TRIGGER trg_Validate_Application
 BEFORE INSERT ON Application
 FOR EACH ROW
 BEGIN
     DECLARE v_project_owner_id INT;
-    SELECT student_id INTO v_project_owner_id FROM Project WHERE project_id = NEW.project_id;
+    DECLARE v_project_status VARCHAR(20);
+    SELECT student_id, status INTO v_project_owner_id, v_project_status
+    FROM Project WHERE project_id = NEW.project_id;
     IF v_project_owner_id = NEW.student_id THEN
         SIGNAL SQLSTATE '45000'
         SET MESSAGE_TEXT = 'Error: A student cannot apply to their own project.';
     END IF;
-END //
-
-CREATE TRIGGER trg_Check_Project_Status_On_Apply
-BEFORE INSERT ON Application
-FOR EACH ROW
-BEGIN
-    DECLARE v_project_status VARCHAR(20);
-    SELECT status INTO v_project_status FROM Project WHERE project_id = NEW.project_id;
     IF v_project_status != 'Open' THEN
         SIGNAL SQLSTATE '45000'
         SET MESSAGE_TEXT = 'Error: This project is no longer open for applications.';
     END IF;
 END //
 
-CREATE TRIGGER trg_Prevent_Duplicate_Application
-BEFORE INSERT ON Application
-FOR EACH ROW
-BEGIN
-    DECLARE v_application_count INT;
-    SELECT COUNT(*) INTO v_application_count FROM Application
-    WHERE student_id = NEW.student_id AND project_id = NEW.project_id;
-    IF v_application_count > 0 THEN
-        SIGNAL SQLSTATE '45000'
-        SET MESSAGE_TEXT = 'Error: You have already applied to this project.';
-    END IF;
-END //
-
 CREATE TRIGGER trg_Validate_Skill_Proficiency_INSERT
 BEFORE INSERT ON Student_Skill
 FOR EACH ROW
@@ -196,6 +348,446 @@ BEGIN
     END IF;
 END //
 
+CREATE TRIGGER trg_Review_Summary_INSERT
+AFTER INSERT ON Review
+FOR EACH ROW
+BEGIN
+    INSERT INTO Student_Rating_Summary (student_id, review_count, rating_count, rating_sum, last_review_date)
+    VALUES (NEW.student_id, 1, IF(NEW.rating IS NULL, 0, 1), COALESCE(NEW.rating, 0), NEW.review_date)
+    ON DUPLICATE KEY UPDATE
+        review_count = review_count + 1,
+        rating_count = rating_count + IF(NEW.rating IS NULL, 0, 1),
+        rating_sum = rating_sum + COALESCE(NEW.rating, 0),
+        last_review_date = IF(last_review_date IS NULL OR NEW.review_date > last_review_date,
+                              NEW.review_date, last_review_date);
+END //
+
+CREATE TRIGGER trg_Review_Summary_UPDATE
+AFTER UPDATE ON Review
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.student_id <=> OLD.student_id AND NEW.rating <=> OLD.rating
+            AND NEW.review_date <=> OLD.review_date) THEN
+        UPDATE Student_Rating_Summary
+        SET review_count = review_count - 1,
+            rating_count = rating_count - IF(OLD.rating IS NULL, 0, 1),
+            rating_sum = rating_sum - COALESCE(OLD.rating, 0),
+            last_review_date = (SELECT MAX(review_date) FROM Review WHERE student_id = OLD.student_id)
+        WHERE student_id = OLD.student_id;
+
+        INSERT INTO Student_Rating_Summary (student_id, review_count, rating_count, rating_sum, last_review_date)
+        VALUES (NEW.student_id, 1, IF(NEW.rating IS NULL, 0, 1), COALESCE(NEW.rating, 0), NEW.review_date)
+        ON DUPLICATE KEY UPDATE
+            review_count = review_count + 1,
+            rating_count = rating_count + IF(NEW.rating IS NULL, 0, 1),
+            rating_sum = rating_sum + COALESCE(NEW.rating, 0),
+            last_review_date = (SELECT MAX(review_date) FROM Review WHERE student_id = NEW.student_id);
+    END IF;
+END //
+
+CREATE TRIGGER trg_Review_Summary_DELETE
+AFTER DELETE ON Review
+FOR EACH ROW
+BEGIN
+    UPDATE Student_Rating_Summary
+    SET review_count = review_count - 1,
+        rating_count = rating_count - IF(OLD.rating IS NULL, 0, 1),
+        rating_sum = rating_sum - COALESCE(OLD.rating, 0),
+        last_review_date = (SELECT MAX(review_date) FROM Review WHERE student_id = OLD.student_id)
+    WHERE student_id = OLD.student_id;
+END //
+
+-- Payments are only ever inserted (archiving moves them, and must not
+-- subtract from the rollups), so one trigger keeps the rollups current.
+CREATE TRIGGER trg_Payment_Rollups_INSERT
+AFTER INSERT ON Payment
+FOR EACH ROW
+BEGIN
+    DECLARE v_freelancer_id INT;
+    DECLARE v_owner_id INT;
+    DECLARE v_freelancer_department VARCHAR(50);
+    DECLARE v_owner_department VARCHAR(50);
+    DECLARE v_month DATE;
+
+    SELECT c.student_id, p.student_id, COALESCE(fs.department, ''), COALESCE(os.department, '')
+    INTO v_freelancer_id, v_owner_id, v_freelancer_department, v_owner_department
+    FROM Contract c
+    JOIN Project p ON p.project_id = c.project_id
+    JOIN Student fs ON fs.student_id = c.student_id
+    JOIN Student os ON os.student_id = p.student_id
+    WHERE c.contract_id = NEW.contract_id;
+
+    IF v_freelancer_id IS NOT NULL THEN
+        INSERT INTO Student_Payment_Summary (student_id, earned, earned_count)
+        VALUES (v_freelancer_id, NEW.amount, 1)
+        ON DUPLICATE KEY UPDATE earned = earned + NEW.amount, earned_count = earned_count + 1;
+        INSERT INTO Student_Payment_Summary (student_id, spent, spent_count)
+        VALUES (v_owner_id, NEW.amount, 1)
+        ON DUPLICATE KEY UPDATE spent = spent + NEW.amount, spent_count = spent_count + 1;
+
+        INSERT INTO Department_Payment_Summary (department, earned, earned_count)
+        VALUES (v_freelancer_department, NEW.amount, 1)
+        ON DUPLICATE KEY UPDATE earned = earned + NEW.amount, earned_count = earned_count + 1;
+        INSERT INTO Department_Payment_Summary (department, spent, spent_count)
+        VALUES (v_owner_department, NEW.amount, 1)
+        ON DUPLICATE KEY UPDATE spent = spent + NEW.amount, spent_count = spent_count + 1;
+
+        IF NEW.payment_date IS NOT NULL THEN
+            SET v_month = DATE_FORMAT(NEW.payment_date, '%Y-%m-01');
+            INSERT INTO Student_Payment_Month (student_id, month, earned, earned_count)
+            VALUES (v_freelancer_id, v_month, NEW.amount, 1)
+            ON DUPLICATE KEY UPDATE earned = earned + NEW.amount, earned_count = earned_count + 1;
+            INSERT INTO Student_Payment_Month (student_id, month, spent, spent_count)
+            VALUES (v_owner_id, v_month, NEW.amount, 1)
+            ON DUPLICATE KEY UPDATE spent = spent + NEW.amount, spent_count = spent_count + 1;
+        END IF;
+    END IF;
+END //
+
+-- Change tracking: every write to a cached table bumps the Entity_Version rows
+-- of the students it affects and one platform-wide shard.
+CREATE TRIGGER trg_Version_Project_INSERT
+AFTER INSERT ON Project
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'projects', 1 FROM (
+        SELECT -(NEW.project_id % 16) AS scope
+        UNION SELECT NEW.student_id
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Project_UPDATE
+AFTER UPDATE ON Project
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'projects', 1 FROM (
+        SELECT -(NEW.project_id % 16) AS scope
+        UNION SELECT NEW.student_id
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Project_DELETE
+AFTER DELETE ON Project
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'projects', 1 FROM (
+        SELECT -(OLD.project_id % 16) AS scope
+        UNION SELECT OLD.student_id
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Application_INSERT
+AFTER INSERT ON Application
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'applications', 1 FROM (
+        SELECT -(NEW.application_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = NEW.project_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Application_UPDATE
+AFTER UPDATE ON Application
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'applications', 1 FROM (
+        SELECT -(NEW.application_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = NEW.project_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Application_DELETE
+AFTER DELETE ON Application
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'applications', 1 FROM (
+        SELECT -(OLD.application_id % 16) AS scope
+        UNION SELECT OLD.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = OLD.project_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Contract_INSERT
+AFTER INSERT ON Contract
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(NEW.contract_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = NEW.project_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Contract_UPDATE
+AFTER UPDATE ON Contract
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(NEW.contract_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = NEW.project_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Contract_DELETE
+AFTER DELETE ON Contract
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(OLD.contract_id % 16) AS scope
+        UNION SELECT OLD.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = OLD.project_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Payment_INSERT
+AFTER INSERT ON Payment
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(NEW.payment_id % 16) AS scope
+        UNION SELECT (SELECT student_id FROM Contract WHERE contract_id = NEW.contract_id)
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = NEW.contract_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Payment_UPDATE
+AFTER UPDATE ON Payment
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(NEW.payment_id % 16) AS scope
+        UNION SELECT (SELECT student_id FROM Contract WHERE contract_id = NEW.contract_id)
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = NEW.contract_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Payment_DELETE
+AFTER DELETE ON Payment
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(OLD.payment_id % 16) AS scope
+        UNION SELECT (SELECT student_id FROM Contract WHERE contract_id = OLD.contract_id)
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = OLD.contract_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Review_INSERT
+AFTER INSERT ON Review
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'reviews', 1 FROM (
+        SELECT -(NEW.review_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = NEW.contract_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Review_UPDATE
+AFTER UPDATE ON Review
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'reviews', 1 FROM (
+        SELECT -(NEW.review_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = NEW.contract_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Review_DELETE
+AFTER DELETE ON Review
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'reviews', 1 FROM (
+        SELECT -(OLD.review_id % 16) AS scope
+        UNION SELECT OLD.student_id
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = OLD.contract_id)
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Skill_INSERT
+AFTER INSERT ON Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.skill_id % 16) AS scope
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Skill_UPDATE
+AFTER UPDATE ON Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.skill_id % 16) AS scope
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Skill_DELETE
+AFTER DELETE ON Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(OLD.skill_id % 16) AS scope
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Student_Skill_INSERT
+AFTER INSERT ON Student_Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.student_id % 16) AS scope
+        UNION SELECT NEW.student_id
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Student_Skill_UPDATE
+AFTER UPDATE ON Student_Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.student_id % 16) AS scope
+        UNION SELECT NEW.student_id
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Student_Skill_DELETE
+AFTER DELETE ON Student_Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(OLD.student_id % 16) AS scope
+        UNION SELECT OLD.student_id
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Project_Skill_INSERT
+AFTER INSERT ON Project_Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.project_id % 16) AS scope
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Project_Skill_UPDATE
+AFTER UPDATE ON Project_Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.project_id % 16) AS scope
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
+CREATE TRIGGER trg_Version_Project_Skill_DELETE
+AFTER DELETE ON Project_Skill
+FOR EACH ROW
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(OLD.project_id % 16) AS scope
+    ) affected
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON DUPLICATE KEY UPDATE version = version + 1;
+END //
+
 -- Purpose: Securely logs in a student.
 CREATE PROCEDURE sp_StudentLogin(
     IN in_email VARCHAR(100),
@@ -255,6 +847,83 @@ BEGIN
         AND (in_status IS NULL OR p.status = in_status);
 END //
 
+-- Purpose: Returns one page of projects ordered by (deadline, project_id), with
+-- projects that have no deadline last (as if it were 9999-12-31).
+-- Pass the deadline and project_id of the last row already shown as the cursor,
+-- 9999-12-31 for a row without one (NULLs for the first page). Cost depends on
+-- the page size, not on how many projects match, because the cursor seeks
+-- straight into idx_project_status_due.
+CREATE PROCEDURE sp_SearchProjectsPage(
+    IN in_keyword VARCHAR(100),
+    IN in_status VARCHAR(20),
+    IN in_deadline_before DATE,
+    IN in_after_deadline DATE,
+    IN in_after_project_id INT,
+    IN in_page_size INT
+)
+BEGIN
+    DECLARE v_keyword VARCHAR(102);
+    SET v_keyword = CONCAT('%', in_keyword, '%');
+
+    SELECT 
+        p.project_id, 
+        p.title, 
+        p.description, 
+        p.deadline, 
+        p.post_date,
+        p.status,
+        p.student_id AS owner_id,
+        s.name AS owner_name,
+        rs.avg_rating AS owner_rating,
+        rs.review_count AS owner_review_count
+    FROM Project p
+    LEFT JOIN Student s ON p.student_id = s.student_id
+    LEFT JOIN Student_Rating_Summary rs ON rs.student_id = p.student_id
+    WHERE 
+        (in_keyword IS NULL OR p.title LIKE v_keyword OR p.description LIKE v_keyword)
+        AND (in_status IS NULL OR p.status = in_status)
+        AND (in_deadline_before IS NULL OR p.deadline <= in_deadline_before)
+        AND (in_after_deadline IS NULL
+             OR COALESCE(p.deadline, DATE '9999-12-31') > in_after_deadline
+             OR (COALESCE(p.deadline, DATE '9999-12-31') = in_after_deadline AND p.project_id > in_after_project_id))
+    ORDER BY COALESCE(p.deadline, DATE '9999-12-31'), p.project_id
+    LIMIT in_page_size;
+END //
+
+-- Purpose: Full-text project search ranked by relevance.
+-- in_query is a boolean-mode query string (the frontend turns "web scraper"
+-- into 'web* scraper*'); it is matched through ft_project_title_description.
+CREATE PROCEDURE sp_SearchProjectsRanked(
+    IN in_query VARCHAR(200),
+    IN in_status VARCHAR(20),
+    IN in_deadline_before DATE,
+    IN in_offset INT,
+    IN in_limit INT
+)
+BEGIN
+    SELECT 
+        p.project_id, 
+        p.title, 
+        p.description, 
+        p.deadline, 
+        p.post_date,
+        p.status,
+        p.student_id AS owner_id,
+        s.name AS owner_name,
+        rs.avg_rating AS owner_rating,
+        rs.review_count AS owner_review_count,
+        MATCH(p.title, p.description) AGAINST (in_query IN BOOLEAN MODE) AS relevance
+    FROM Project p
+    LEFT JOIN Student s ON p.student_id = s.student_id
+    LEFT JOIN Student_Rating_Summary rs ON rs.student_id = p.student_id
+    WHERE 
+        MATCH(p.title, p.description) AGAINST (in_query IN BOOLEAN MODE)
+        AND (in_status IS NULL OR p.status = in_status)
+        AND (in_deadline_before IS NULL OR p.deadline <= in_deadline_before)
+    ORDER BY relevance DESC, p.project_id
+    LIMIT in_offset, in_limit;
+END //
+
 -- Purpose: Allows a student to apply for a project.
 CREATE PROCEDURE sp_CreateApplication(
     IN in_student_id INT,
@@ -362,21 +1031,486 @@ BEGIN
     -- Ensure the person writing the review is the project owner
     IF v_project_owner_id = in_reviewer_student_id THEN
         -- Insert the review for the FREELANCER
-        INSERT INTO Review (review_text, rating, contract_id, student_id)
-        VALUES (in_review_text, in_rating, in_contract_id, v_freelancer_student_id);
+        INSERT INTO Review (review_text, rating, contract_id, student_id, review_date)
+        VALUES (in_review_text, in_rating, in_contract_id, v_freelancer_student_id, CURDATE());
     ELSE
         SIGNAL SQLSTATE '45000'
         SET MESSAGE_TEXT = 'Error: Only the project owner can leave a review.';
     END IF;
 END //
 
+-- Purpose: Completes a contract, reviews the freelancer and records the payment
+-- in a single transaction. Idempotent per in_completion_token: calling again with
+-- the same token returns the original review and payment ids without writing.
+CREATE PROCEDURE sp_CompleteContractWithReview(
+    IN in_contract_id INT,
+    IN in_reviewer_student_id INT,
+    IN in_rating INT,
+    IN in_review_text TEXT,
+    IN in_amount DECIMAL(10, 2),
+    IN in_payment_method VARCHAR(50),
+    IN in_completion_token VARCHAR(64)
+)
+BEGIN
+    DECLARE v_project_id INT;
+    DECLARE v_freelancer_student_id INT;
+    DECLARE v_project_owner_id INT;
+    DECLARE v_contract_status VARCHAR(20);
+    DECLARE v_token_contract_id INT;
+    DECLARE v_review_id INT;
+    DECLARE v_payment_id INT;
+    DECLARE v_already_completed BOOLEAN DEFAULT FALSE;
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    START TRANSACTION;
+
+    -- Lock the contract first so concurrent submits for it run one at a time.
+    SELECT c.project_id, c.student_id, c.status, p.student_id
+    INTO v_project_id, v_freelancer_student_id, v_contract_status, v_project_owner_id
+    FROM Contract c
+    JOIN Project p ON c.project_id = p.project_id
+    WHERE c.contract_id = in_contract_id
+    FOR UPDATE;
+
+    -- Locking read, so a completion committed while we waited is visible.
+    SELECT contract_id, review_id, payment_id
+    INTO v_token_contract_id, v_review_id, v_payment_id
+    FROM Contract_Completion
+    WHERE completion_token = in_completion_token
+    FOR UPDATE;
+
+    IF v_token_contract_id IS NOT NULL THEN
+        IF v_token_contract_id != in_contract_id THEN
+            SIGNAL SQLSTATE '45000'
+            SET MESSAGE_TEXT = 'Error: This completion token was already used for another contract.';
+        END IF;
+        SET v_already_completed = TRUE;
+    ELSEIF v_project_id IS NULL THEN
+        SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Error: Contract not found.';
+    ELSEIF v_project_owner_id != in_reviewer_student_id THEN
+        SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Error: Only the project owner can complete this contract.';
+    ELSEIF v_contract_status != 'In Progress' THEN
+        SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Error: This contract has already been completed.';
+    ELSE
+        UPDATE Contract
+        SET status = 'Completed', end_date = CURDATE()
+        WHERE contract_id = in_contract_id;
+
+        UPDATE Project
+        SET status = 'Completed'
+        WHERE project_id = v_project_id;
+
+        INSERT INTO Review (review_text, rating, contract_id, student_id, review_date)
+        VALUES (in_review_text, in_rating, in_contract_id, v_freelancer_student_id, CURDATE());
+        SET v_review_id = LAST_INSERT_ID();
+
+        INSERT INTO Payment (amount, payment_date, status, payment_method, contract_id)
+        VALUES (in_amount, CURDATE(), 'Paid', in_payment_method, in_contract_id);
+        SET v_payment_id = LAST_INSERT_ID();
+
+        INSERT INTO Contract_Completion (completion_token, contract_id, review_id, payment_id)
+        VALUES (in_completion_token, in_contract_id, v_review_id, v_payment_id);
+    END IF;
+
+    COMMIT;
+
+    SELECT 
+        in_contract_id AS contract_id,
+        v_review_id AS review_id,
+        v_payment_id AS payment_id,
+        v_already_completed AS already_completed;
+END //
+
+-- Purpose: Returns everything the Dashboard shows in one round trip, as four
+-- result sets: rating stats, contracts as freelancer, contracts as owner, and
+-- the most recent reviews.
+CREATE PROCEDURE sp_GetDashboard(
+    IN in_student_id INT,
+    IN in_review_limit INT
+)
+BEGIN
+    SELECT 
+        COALESCE(rs.avg_rating, 0.00) AS avg,
+        COALESCE(rs.review_count, 0) AS count,
+        rs.last_review_date
+    FROM Student s
+    LEFT JOIN Student_Rating_Summary rs ON rs.student_id = s.student_id
+    WHERE s.student_id = in_student_id;
+
+    SELECT c.contract_id, p.title AS project_title, s.name AS project_owner_name, c.start_date, c.end_date
+    FROM Contract c
+    JOIN Project p ON c.project_id = p.project_id
+    JOIN Student s ON p.student_id = s.student_id
+    WHERE c.student_id = in_student_id AND p.status = 'In Progress';
+
+    SELECT c.contract_id, p.title AS project_title, c.student_id AS freelancer_id, s.name AS freelancer_name, c.start_date, c.end_date
+    FROM Contract c
+    JOIN Project p ON c.project_id = p.project_id
+    JOIN Student s ON c.student_id = s.student_id
+    WHERE p.student_id = in_student_id AND p.status = 'In Progress';
+
+    -- Reviews of archived contracts come from the archive tables.
+    SELECT r.rating, r.review_text, r.review_date, COALESCE(p.title, pa.title) AS project_title
+    FROM Review r
+    LEFT JOIN Contract c ON r.contract_id = c.contract_id
+    LEFT JOIN Project p ON c.project_id = p.project_id
+    LEFT JOIN Contract_Archive ca ON r.contract_id = ca.contract_id
+    LEFT JOIN Project_Archive pa ON ca.project_id = pa.project_id
+    WHERE r.student_id = in_student_id AND COALESCE(p.title, pa.title) IS NOT NULL
+    ORDER BY COALESCE(c.end_date, ca.end_date) DESC
+    LIMIT in_review_limit;
+END //
+
+-- Purpose: Everything the Earnings & Spending page shows, as five result sets
+-- read from the payment rollups: the student's totals, their last in_months
+-- months, the department totals, and the top in_top_limit freelancers by
+-- earnings and by rating (with at least in_min_reviews reviews).
+CREATE PROCEDURE sp_GetPaymentAnalytics(
+    IN in_student_id INT,
+    IN in_months INT,
+    IN in_top_limit INT,
+    IN in_min_reviews INT
+)
+BEGIN
+    SELECT earned, earned_count, spent, spent_count
+    FROM Student_Payment_Summary
+    WHERE student_id = in_student_id;
+
+    SELECT month, earned, earned_count, spent, spent_count
+    FROM Student_Payment_Month
+    WHERE student_id = in_student_id
+      AND month >= DATE_FORMAT(CURDATE() - INTERVAL (in_months - 1) MONTH, '%Y-%m-01')
+    ORDER BY month;
+
+    SELECT department, earned, earned_count, spent, spent_count
+    FROM Department_Payment_Summary
+    ORDER BY department;
+
+    SELECT s.student_id, s.name, s.department, ps.earned, ps.earned_count,
+        COALESCE(rs.avg_rating, 0.00) AS avg_rating, COALESCE(rs.review_count, 0) AS review_count
+    FROM Student_Payment_Summary ps
+    JOIN Student s ON s.student_id = ps.student_id
+    LEFT JOIN Student_Rating_Summary rs ON rs.student_id = ps.student_id
+    WHERE ps.earned_count > 0
+    ORDER BY ps.earned DESC
+    LIMIT in_top_limit;
+
+    SELECT s.student_id, s.name, s.department, COALESCE(ps.earned, 0.00) AS earned,
+        COALESCE(ps.earned_count, 0) AS earned_count, rs.avg_rating, rs.review_count
+    FROM Student_Rating_Summary rs
+    JOIN Student s ON s.student_id = rs.student_id
+    LEFT JOIN Student_Payment_Summary ps ON ps.student_id = rs.student_id
+    WHERE rs.review_count >= in_min_reviews
+    ORDER BY rs.avg_rating DESC, rs.review_count DESC
+    LIMIT in_top_limit;
+END //
+
+-- Purpose: Closes up to in_batch_size Open projects whose deadline has passed
+-- and rejects their pending applications, in one transaction. Returns one row
+-- (projects_closed, applications_rejected); call again until projects_closed is 0.
+CREATE PROCEDURE sp_CloseExpiredProjects(IN in_batch_size INT)
+BEGIN
+    DECLARE v_projects_closed INT DEFAULT 0;
+    DECLARE v_applications_rejected INT DEFAULT 0;
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        DROP TEMPORARY TABLE IF EXISTS tmp_Expired_Project;
+        RESIGNAL;
+    END;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_Expired_Project;
+    CREATE TEMPORARY TABLE tmp_Expired_Project (project_id INT PRIMARY KEY);
+
+    START TRANSACTION;
+
+    -- Seeks idx_project_status_deadline; the oldest deadlines go first.
+    INSERT INTO tmp_Expired_Project (project_id)
+    SELECT project_id FROM Project
+    WHERE status = 'Open' AND deadline < CURDATE()
+    ORDER BY deadline, project_id
+    LIMIT in_batch_size;
+
+    UPDATE Project p
+    JOIN tmp_Expired_Project t ON t.project_id = p.project_id
+    SET p.status = 'Closed'
+    WHERE p.status = 'Open';
+    SET v_projects_closed = ROW_COUNT();
+
+    UPDATE Application a
+    JOIN Project p ON p.project_id = a.project_id
+    JOIN tmp_Expired_Project t ON t.project_id = a.project_id
+    SET a.status = 'Rejected'
+    WHERE a.status = 'Pending' AND p.status = 'Closed';
+    SET v_applications_rejected = ROW_COUNT();
+
+    COMMIT;
+    DROP TEMPORARY TABLE tmp_Expired_Project;
+
+    SELECT v_projects_closed AS projects_closed, v_applications_rejected AS applications_rejected;
+END //
+
+-- Purpose: Moves up to in_batch_size Completed or Closed projects that finished
+-- more than in_retention_days ago (last contract end date, else the deadline)
+-- into the archive tables, with their applications, contracts and payments, in
+-- one transaction. Returns one row of counts; call again until projects is 0.
+CREATE PROCEDURE sp_ArchiveFinishedWork(IN in_retention_days INT, IN in_batch_size INT)
+BEGIN
+    DECLARE v_projects INT DEFAULT 0;
+    DECLARE v_applications INT DEFAULT 0;
+    DECLARE v_contracts INT DEFAULT 0;
+    DECLARE v_payments INT DEFAULT 0;
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        DROP TEMPORARY TABLE IF EXISTS tmp_Archive_Project;
+        DROP TEMPORARY TABLE IF EXISTS tmp_Archive_Contract;
+        RESIGNAL;
+    END;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_Archive_Project;
+    CREATE TEMPORARY TABLE tmp_Archive_Project (project_id INT PRIMARY KEY);
+    DROP TEMPORARY TABLE IF EXISTS tmp_Archive_Contract;
+    CREATE TEMPORARY TABLE tmp_Archive_Contract (contract_id INT PRIMARY KEY);
+
+    START TRANSACTION;
+
+    INSERT INTO tmp_Archive_Project (project_id)
+    SELECT p.project_id FROM Project p
+    WHERE p.status IN ('Completed', 'Closed')
+      AND COALESCE((SELECT MAX(c.end_date) FROM Contract c WHERE c.project_id = p.project_id), p.deadline)
+          < CURDATE() - INTERVAL in_retention_days DAY
+    ORDER BY p.project_id
+    LIMIT in_batch_size;
+
+    INSERT INTO tmp_Archive_Contract (contract_id)
+    SELECT c.contract_id FROM Contract c
+    JOIN tmp_Archive_Project t ON t.project_id = c.project_id;
+
+    -- Children first: payments, contracts (Contract_Completion cascades), applications, projects.
+    INSERT INTO Payment_Archive (payment_id, amount, payment_date, status, payment_method, contract_id)
+    SELECT py.payment_id, py.amount, py.payment_date, py.status, py.payment_method, py.contract_id
+    FROM Payment py JOIN tmp_Archive_Contract t ON t.contract_id = py.contract_id;
+    DELETE py FROM Payment py JOIN tmp_Archive_Contract t ON t.contract_id = py.contract_id;
+    SET v_payments = ROW_COUNT();
+
+    INSERT INTO Contract_Archive (contract_id, start_date, end_date, status, student_id, project_id)
+    SELECT c.contract_id, c.start_date, c.end_date, c.status, c.student_id, c.project_id
+    FROM Contract c JOIN tmp_Archive_Contract t ON t.contract_id = c.contract_id;
+    DELETE c FROM Contract c JOIN tmp_Archive_Contract t ON t.contract_id = c.contract_id;
+    SET v_contracts = ROW_COUNT();
+
+    INSERT INTO Application_Archive (application_id, application_date, status, student_id, project_id)
+    SELECT a.application_id, a.application_date, a.status, a.student_id, a.project_id
+    FROM Application a JOIN tmp_Archive_Project t ON t.project_id = a.project_id;
+    DELETE a FROM Application a JOIN tmp_Archive_Project t ON t.project_id = a.project_id;
+    SET v_applications = ROW_COUNT();
+
+    INSERT INTO Project_Archive (project_id, student_id, title, description, post_date, deadline, status)
+    SELECT p.project_id, p.student_id, p.title, p.description, p.post_date, p.deadline, p.status
+    FROM Project p JOIN tmp_Archive_Project t ON t.project_id = p.project_id;
+    DELETE p FROM Project p JOIN tmp_Archive_Project t ON t.project_id = p.project_id;
+    SET v_projects = ROW_COUNT();
+
+    COMMIT;
+    DROP TEMPORARY TABLE tmp_Archive_Project;
+    DROP TEMPORARY TABLE tmp_Archive_Contract;
+
+    SELECT v_projects AS projects, v_applications AS applications, v_contracts AS contracts, v_payments AS payments;
+END //
+
+-- Scheduled maintenance. Events only run with event_scheduler=ON; otherwise
+-- run python -m tools.maintenance from cron (it is also the only scheduler for
+-- the SQLite backend). Each run handles one bounded batch.
+CREATE EVENT ev_Close_Expired_Projects
+ON SCHEDULE EVERY 15 MINUTE
+DO CALL sp_CloseExpiredProjects(500) //
+
+CREATE EVENT ev_Archive_Finished_Work
+ON SCHEDULE EVERY 1 HOUR
+DO CALL sp_ArchiveFinishedWork(180, 500) //
+
+-- Purpose: Recomputes Student_Rating_Summary from the Review table.
+CREATE PROCEDURE sp_RebuildRatingSummary()
+BEGIN
+    START TRANSACTION;
+
+    DELETE FROM Student_Rating_Summary;
+
+    INSERT INTO Student_Rating_Summary (student_id, review_count, rating_count, rating_sum, last_review_date)
+    SELECT student_id, COUNT(*), COUNT(rating), COALESCE(SUM(rating), 0), MAX(review_date)
+    FROM Review
+    WHERE student_id IS NOT NULL
+    GROUP BY student_id;
+
+    COMMIT;
+END //
+
+-- Purpose: Lists students whose Student_Rating_Summary row disagrees with Review.
+-- An empty result means the summary is consistent.
+CREATE PROCEDURE sp_VerifyRatingSummary()
+BEGIN
+    SELECT 
+        COALESCE(actual.student_id, summary.student_id) AS student_id,
+        summary.review_count AS summary_review_count,
+        actual.review_count AS actual_review_count,
+        summary.rating_sum AS summary_rating_sum,
+        actual.rating_sum AS actual_rating_sum,
+        summary.last_review_date AS summary_last_review_date,
+        actual.last_review_date AS actual_last_review_date
+    FROM (
+        SELECT student_id, COUNT(*) AS review_count, COUNT(rating) AS rating_count,
+            COALESCE(SUM(rating), 0) AS rating_sum, MAX(review_date) AS last_review_date
+        FROM Review
+        WHERE student_id IS NOT NULL
+        GROUP BY student_id
+    ) AS actual
+    LEFT JOIN Student_Rating_Summary summary ON summary.student_id = actual.student_id
+    WHERE NOT (summary.review_count <=> actual.review_count
+               AND summary.rating_count <=> actual.rating_count
+               AND summary.rating_sum <=> actual.rating_sum
+               AND summary.last_review_date <=> actual.last_review_date)
+    UNION ALL
+    SELECT summary.student_id, summary.review_count, 0, summary.rating_sum, 0,
+        summary.last_review_date, NULL
+    FROM Student_Rating_Summary summary
+    WHERE summary.review_count <> 0
+      AND NOT EXISTS (SELECT 1 FROM Review r WHERE r.student_id = summary.student_id);
+END //
+
+-- Purpose: Fills tmp_Payment_Fact with one row per student per payment: an
+-- earned row for the freelancer and a spent row for the owner, live and
+-- archived, with the student's department and the payment's month. The
+-- input of sp_RebuildPaymentRollups and sp_VerifyPaymentRollups.
+CREATE PROCEDURE sp_FillPaymentFacts()
+BEGIN
+    DROP TEMPORARY TABLE IF EXISTS tmp_Payment_Fact;
+    CREATE TEMPORARY TABLE tmp_Payment_Fact (
+        student_id INT,
+        department VARCHAR(50),
+        month DATE,
+        earned DECIMAL(14, 2),
+        earned_count INT,
+        spent DECIMAL(14, 2),
+        spent_count INT
+    );
+
+    INSERT INTO tmp_Payment_Fact (student_id, department, month, earned, earned_count, spent, spent_count)
+    SELECT c.student_id, COALESCE(s.department, ''), DATE_FORMAT(py.payment_date, '%Y-%m-01'), py.amount, 1, 0, 0
+    FROM Payment py
+    JOIN Contract c ON c.contract_id = py.contract_id
+    JOIN Project p ON p.project_id = c.project_id
+    JOIN Student s ON s.student_id = c.student_id
+    UNION ALL
+    SELECT p.student_id, COALESCE(s.department, ''), DATE_FORMAT(py.payment_date, '%Y-%m-01'), 0, 0, py.amount, 1
+    FROM Payment py
+    JOIN Contract c ON c.contract_id = py.contract_id
+    JOIN Project p ON p.project_id = c.project_id
+    JOIN Student s ON s.student_id = p.student_id
+    UNION ALL
+    SELECT c.student_id, COALESCE(s.department, ''), DATE_FORMAT(py.payment_date, '%Y-%m-01'), py.amount, 1, 0, 0
+    FROM Payment_Archive py
+    JOIN Contract_Archive c ON c.contract_id = py.contract_id
+    JOIN Project_Archive p ON p.project_id = c.project_id
+    JOIN Student s ON s.student_id = c.student_id
+    UNION ALL
+    SELECT p.student_id, COALESCE(s.department, ''), DATE_FORMAT(py.payment_date, '%Y-%m-01'), 0, 0, py.amount, 1
+    FROM Payment_Archive py
+    JOIN Contract_Archive c ON c.contract_id = py.contract_id
+    JOIN Project_Archive p ON p.project_id = c.project_id
+    JOIN Student s ON s.student_id = p.student_id;
+END //
+
+-- Purpose: Recomputes the three payment rollups from Payment and Payment_Archive.
+CREATE PROCEDURE sp_RebuildPaymentRollups()
+BEGIN
+    START TRANSACTION;
+
+    CALL sp_FillPaymentFacts();
+
+    DELETE FROM Student_Payment_Summary;
+    DELETE FROM Student_Payment_Month;
+    DELETE FROM Department_Payment_Summary;
+
+    INSERT INTO Student_Payment_Summary (student_id, earned, earned_count, spent, spent_count)
+    SELECT student_id, SUM(earned), SUM(earned_count), SUM(spent), SUM(spent_count)
+    FROM tmp_Payment_Fact
+    GROUP BY student_id;
+
+    INSERT INTO Student_Payment_Month (student_id, month, earned, earned_count, spent, spent_count)
+    SELECT student_id, month, SUM(earned), SUM(earned_count), SUM(spent), SUM(spent_count)
+    FROM tmp_Payment_Fact
+    WHERE month IS NOT NULL
+    GROUP BY student_id, month;
+
+    INSERT INTO Department_Payment_Summary (department, earned, earned_count, spent, spent_count)
+    SELECT department, SUM(earned), SUM(earned_count), SUM(spent), SUM(spent_count)
+    FROM tmp_Payment_Fact
+    GROUP BY department;
+
+    COMMIT;
+
+    DROP TEMPORARY TABLE tmp_Payment_Fact;
+END //
+
+-- Purpose: Lists payment rollup rows that disagree with the payments, as
+-- three result sets (students, student months, departments). Each row holds
+-- actual minus rollup for every total; empty results mean the rollups are
+-- consistent. (A temporary table can only be opened once per statement, so
+-- the three checks can't be one UNION.)
+CREATE PROCEDURE sp_VerifyPaymentRollups()
+BEGIN
+    CALL sp_FillPaymentFacts();
+
+    SELECT 'student' AS rollup, student_id AS rollup_key, NULL AS month,
+        SUM(earned) AS earned, SUM(earned_count) AS earned_count, SUM(spent) AS spent, SUM(spent_count) AS spent_count
+    FROM (
+        SELECT student_id, earned, earned_count, spent, spent_count FROM tmp_Payment_Fact
+        UNION ALL
+        SELECT student_id, -earned, -earned_count, -spent, -spent_count FROM Student_Payment_Summary
+    ) AS diff
+    GROUP BY student_id
+    HAVING SUM(earned) <> 0 OR SUM(earned_count) <> 0 OR SUM(spent) <> 0 OR SUM(spent_count) <> 0;
+
+    SELECT 'month' AS rollup, student_id AS rollup_key, month,
+        SUM(earned) AS earned, SUM(earned_count) AS earned_count, SUM(spent) AS spent, SUM(spent_count) AS spent_count
+    FROM (
+        SELECT student_id, month, earned, earned_count, spent, spent_count FROM tmp_Payment_Fact
+        WHERE month IS NOT NULL
+        UNION ALL
+        SELECT student_id, month, -earned, -earned_count, -spent, -spent_count FROM Student_Payment_Month
+    ) AS diff
+    GROUP BY student_id, month
+    HAVING SUM(earned) <> 0 OR SUM(earned_count) <> 0 OR SUM(spent) <> 0 OR SUM(spent_count) <> 0;
+
+    SELECT 'department' AS rollup, department AS rollup_key, NULL AS month,
+        SUM(earned) AS earned, SUM(earned_count) AS earned_count, SUM(spent) AS spent, SUM(spent_count) AS spent_count
+    FROM (
+        SELECT department, earned, earned_count, spent, spent_count FROM tmp_Payment_Fact
+        UNION ALL
+        SELECT department, -earned, -earned_count, -spent, -spent_count FROM Department_Payment_Summary
+    ) AS diff
+    GROUP BY department
+    HAVING SUM(earned) <> 0 OR SUM(earned_count) <> 0 OR SUM(spent) <> 0 OR SUM(spent_count) <> 0;
+
+    DROP TEMPORARY TABLE tmp_Payment_Fact;
+END //
+
 CREATE FUNCTION fn_GetStudentAverageRating(in_student_id INT)
 RETURNS DECIMAL(3, 2)
 DETERMINISTIC
 READS SQL DATA
 BEGIN
     DECLARE v_avg_rating DECIMAL(3, 2);
-    SELECT AVG(rating) INTO v_avg_rating FROM Review WHERE student_id = in_student_id;
+    SELECT avg_rating INTO v_avg_rating FROM Student_Rating_Summary WHERE student_id = in_student_id;
     IF v_avg_rating IS NULL THEN
         SET v_avg_rating = 0.00;
     END IF;
@@ -389,7 +1523,10 @@ DETERMINISTIC
 READS SQL DATA
 BEGIN
     DECLARE v_review_count INT;
-    SELECT COUNT(*) INTO v_review_count FROM Review WHERE student_id = in_student_id;
+    SELECT review_count INTO v_review_count FROM Student_Rating_Summary WHERE student_id = in_student_id;
+    IF v_review_count IS NULL THEN
+        SET v_review_count = 0;
+    END IF;
     RETURN v_review_count;
 END //
 
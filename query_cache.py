@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+
+# --- QUERY CACHE ---
+# A read-through cache for per-student query results, shared by every session
+# in the process. Entries are keyed by (query name, student_id), expire after a
+# TTL, and the least recently used entry is evicted once the cache is full.
+# Write helpers invalidate the exact keys they affect. An entry can also carry
+# a version stamp (the Entity_Version counters it was read under): a lookup
+# with a different stamp is a miss, so changes made outside this app are
+# picked up as soon as the counters move and the TTL is only a backstop.
+
+
+class QueryCache:
+    """Thread-safe LRU cache with a per-entry time-to-live."""
+
+    def __init__(self, max_entries=1024, ttl=60.0):
+        if max_entries < 1:
+            raise ValueError("Cache must hold at least one entry.")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, stamp, value)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._stale = 0
+
+    def get(self, key, stamp=None):
+        """Returns the cached value, or None on a miss. None itself is never cached.
+
+        With a `stamp`, an entry stored under a different stamp is dropped as stale.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, entry_stamp, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            if stamp is not None and entry_stamp != stamp:
+                del self._entries[key]
+                self._stale += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key, value, stamp=None):
+        if value is None:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, stamp, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, *keys):
+        """Drops the given keys; keys that aren't cached are ignored."""
+        with self._lock:
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Returns a snapshot of cache counters."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'invalidations': self._invalidations,
+                'stale': self._stale,
+            }
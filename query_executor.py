@@ -0,0 +1,68 @@
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# --- CONCURRENT QUERY EXECUTOR ---
+# Runs a page's independent fetches at the same time so it waits for the
+# slowest one instead of their sum. A connection can only run one query at a
+# time, so every task gets its own repository from `open_repo` (a pooled
+# connection for MySQL) and hands it back when done. The first task runs in
+# the calling thread on the caller's repository, which keeps the connections a
+# page holds at the number of tasks rather than one more.
+#
+# Tasks are isolated: an exception or a timeout is reported in that task's
+# result and the others are unaffected.
+
+TaskResult = namedtuple('TaskResult', 'value error seconds')
+
+
+class QueryExecutor:
+    """A thread pool shared by every session in the process."""
+
+    def __init__(self, open_repo, max_workers=8, timeout=10.0):
+        """`open_repo(timeout)` returns a context manager yielding a repository for one task."""
+        self._open_repo = open_repo
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query")
+
+    def _run(self, fn, repo=None, timeout=None, open_repo=None):
+        start = time.perf_counter()
+        try:
+            if repo is not None:
+                value = fn(repo)
+            else:
+                with (open_repo or self._open_repo)(timeout) as task_repo:
+                    value = fn(task_repo)
+        except Exception as err:
+            return TaskResult(None, err, time.perf_counter() - start)
+        return TaskResult(value, None, time.perf_counter() - start)
+
+    def gather(self, tasks, repo=None, timeout=None, open_repo=None):
+        """Runs `tasks` ({name: fn(repo)}) concurrently and returns {name: TaskResult}.
+
+        With `repo`, the first task runs on it in the calling thread (and so is
+        not subject to the timeout). Tasks still running `timeout` seconds after
+        the call get a TimeoutError result; they finish in the background and
+        release their connection then. `open_repo` replaces the executor's
+        own for this call's tasks (e.g. to read from a replica).
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        names = list(tasks)
+        inline = names.pop(0) if repo is not None and names else None
+        futures = {name: self._pool.submit(self._run, tasks[name], None, timeout, open_repo) for name in names}
+
+        results = {}
+        if inline is not None:
+            results[inline] = self._run(tasks[inline], repo)
+        wait(futures.values(), timeout=max(0.0, deadline - time.monotonic()))
+        for name, future in futures.items():
+            if future.done():
+                results[name] = future.result()
+            else:
+                future.cancel()  # only stops tasks still queued for a worker
+                results[name] = TaskResult(None, TimeoutError(f"Timed out after {timeout:g}s"), timeout)
+        return {name: results[name] for name in tasks}
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
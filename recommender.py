@@ -0,0 +1,192 @@
+import threading
+import time
+
+import numpy as np
+
+# --- SKILL-BASED PROJECT RECOMMENDATIONS ---
+# Open projects and the skills they require are held in memory as a sparse
+# project x skill matrix (one entry per Project_Skill row, CSR-style arrays).
+# Scoring a student is a handful of vectorised NumPy passes over those entries,
+# so it never issues per-project queries and stays in the low milliseconds for
+# 100k open projects.
+
+PROFICIENCY_SCORES = {'Beginner': 1.0, 'Intermediate': 2.0, 'Advanced': 3.0}
+
+
+class ProjectSkillMatrix:
+    """Requirement matrix for open projects, updated incrementally.
+
+    Rows are projects, columns are skill ids and values are the minimum
+    proficiency required (1-3). New projects are buffered and merged into the
+    arrays on the next query; removed projects are masked out and compacted
+    away once they make up a quarter of the rows.
+    """
+
+    def __init__(self, rows=()):
+        """`rows` are (project_id, owner_id, skill_id, min_proficiency) tuples."""
+        self._lock = threading.Lock()
+        self.built_at = time.monotonic()
+        self._reset()
+        projects = {}
+        for project_id, owner_id, skill_id, level in rows:
+            projects.setdefault(project_id, (owner_id, []))[1].append((skill_id, level))
+        for project_id, (owner_id, skills) in projects.items():
+            self._pending.append((project_id, owner_id, skills))
+        self._merge_pending()
+
+    def _reset(self):
+        self._project_ids = np.empty(0, dtype=np.int64)
+        self._owner_ids = np.empty(0, dtype=np.int64)
+        self._alive = np.empty(0, dtype=bool)
+        self._required_counts = np.empty(0, dtype=np.float32)
+        self._entry_rows = np.empty(0, dtype=np.int32)
+        self._entry_skills = np.empty(0, dtype=np.int32)
+        self._entry_levels = np.empty(0, dtype=np.float32)
+        self._row_of = {}
+        self._pending = []
+
+    def __len__(self):
+        with self._lock:
+            return int(self._alive.sum()) + len(self._pending)
+
+    # --- incremental maintenance ---
+
+    def add_project(self, project_id, owner_id, skills):
+        """Adds (or replaces) a project; `skills` are (skill_id, min_proficiency) pairs."""
+        if not skills:
+            return
+        with self._lock:
+            self._remove_locked(project_id)
+            self._pending.append((project_id, owner_id, list(skills)))
+
+    def remove_project(self, project_id):
+        """Drops a project, e.g. once it is no longer Open."""
+        with self._lock:
+            self._remove_locked(project_id)
+
+    def _remove_locked(self, project_id):
+        row = self._row_of.pop(project_id, None)
+        if row is not None:
+            self._alive[row] = False
+        self._pending = [p for p in self._pending if p[0] != project_id]
+
+    def _merge_pending(self):
+        if self._pending:
+            first_row = len(self._project_ids)
+            new_ids, new_owners, new_counts = [], [], []
+            rows, skills, levels = [], [], []
+            for offset, (project_id, owner_id, project_skills) in enumerate(self._pending):
+                new_ids.append(project_id)
+                new_owners.append(owner_id if owner_id is not None else -1)
+                new_counts.append(len(project_skills))
+                self._row_of[project_id] = first_row + offset
+                for skill_id, level in project_skills:
+                    rows.append(first_row + offset)
+                    skills.append(skill_id)
+                    levels.append(PROFICIENCY_SCORES.get(level, level) if isinstance(level, str) else level)
+            self._project_ids = np.concatenate([self._project_ids, np.asarray(new_ids, dtype=np.int64)])
+            self._owner_ids = np.concatenate([self._owner_ids, np.asarray(new_owners, dtype=np.int64)])
+            self._alive = np.concatenate([self._alive, np.ones(len(new_ids), dtype=bool)])
+            self._required_counts = np.concatenate([self._required_counts, np.asarray(new_counts, dtype=np.float32)])
+            self._entry_rows = np.concatenate([self._entry_rows, np.asarray(rows, dtype=np.int32)])
+            self._entry_skills = np.concatenate([self._entry_skills, np.asarray(skills, dtype=np.int32)])
+            self._entry_levels = np.concatenate([self._entry_levels, np.asarray(levels, dtype=np.float32)])
+            self._pending = []
+
+        dead = len(self._alive) - int(self._alive.sum())
+        if dead and dead * 4 >= len(self._alive):
+            self._compact()
+
+    def _compact(self):
+        keep_rows = np.flatnonzero(self._alive)
+        new_row = np.full(len(self._alive), -1, dtype=np.int32)
+        new_row[keep_rows] = np.arange(len(keep_rows), dtype=np.int32)
+        keep_entries = self._alive[self._entry_rows]
+
+        self._project_ids = self._project_ids[keep_rows]
+        self._owner_ids = self._owner_ids[keep_rows]
+        self._required_counts = self._required_counts[keep_rows]
+        self._alive = np.ones(len(keep_rows), dtype=bool)
+        self._entry_rows = new_row[self._entry_rows[keep_entries]]
+        self._entry_skills = self._entry_skills[keep_entries]
+        self._entry_levels = self._entry_levels[keep_entries]
+        self._row_of = {int(pid): row for row, pid in enumerate(self._project_ids)}
+
+    # --- scoring ---
+
+    def top_k(self, user_skills, k=10, exclude_owner=None, exclude_projects=()):
+        """Ranks open projects against a student's skills.
+
+        `user_skills` maps skill_id -> proficiency (name or 1-3). A project's
+        score is the mean, over its required skills, of min(have / required, 1),
+        so meeting every requirement scores 1.0 and partial proficiency earns
+        partial credit. Returns up to k dicts with project_id, score,
+        matched_skills and required_skills, best first; projects that share no
+        skill with the student are left out.
+        """
+        with self._lock:
+            self._merge_pending()
+            n_rows = len(self._project_ids)
+            if not n_rows or not user_skills or k <= 0:
+                return []
+
+            n_skills = max(int(self._entry_skills.max(initial=0)), max(user_skills)) + 1
+            user_vector = np.zeros(n_skills, dtype=np.float32)
+            for skill_id, level in user_skills.items():
+                user_vector[skill_id] = PROFICIENCY_SCORES.get(level, 0.0) if isinstance(level, str) else level
+
+            have = user_vector[self._entry_skills]
+            credit = np.minimum(have / self._entry_levels, 1.0)
+            scores = np.bincount(self._entry_rows, weights=credit, minlength=n_rows)
+            matched = np.bincount(self._entry_rows, weights=have > 0, minlength=n_rows)
+            scores /= np.maximum(self._required_counts, 1.0)
+
+            eligible = self._alive & (matched > 0)
+            if exclude_owner is not None:
+                eligible &= self._owner_ids != exclude_owner
+            if len(exclude_projects):
+                eligible &= ~np.isin(self._project_ids, np.asarray(list(exclude_projects), dtype=np.int64))
+            scores = np.where(eligible, scores, -1.0)
+
+            k = min(k, int(eligible.sum()))
+            if k == 0:
+                return []
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.lexsort((-matched[best], -scores[best]))]
+            return [
+                {
+                    'project_id': int(self._project_ids[row]),
+                    'score': float(scores[row]),
+                    'matched_skills': int(matched[row]),
+                    'required_skills': int(self._required_counts[row]),
+                }
+                for row in best
+            ]
+
+
+class RecommendationIndex:
+    """Holds the shared ProjectSkillMatrix and rebuilds it once it is too old.
+
+    Write paths update the current matrix in place (add_project/remove_project);
+    the periodic rebuild picks up anything changed outside this process.
+    """
+
+    def __init__(self, max_age=600.0):
+        self.max_age = max_age
+        self._matrix = None
+        self._lock = threading.Lock()
+
+    def get(self, load_rows):
+        """Returns the matrix, calling load_rows() to rebuild it if missing or stale."""
+        with self._lock:
+            if self._matrix is None or time.monotonic() - self._matrix.built_at > self.max_age:
+                self._matrix = ProjectSkillMatrix(load_rows())
+            return self._matrix
+
+    def current(self):
+        """Returns the matrix if one has been built, without loading anything."""
+        return self._matrix
+
+    def invalidate(self):
+        with self._lock:
+            self._matrix = None
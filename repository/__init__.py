@@ -0,0 +1,16 @@
+from repository.base import EMPTY_PAYMENT_TOTALS, HISTORY_COLUMNS, PROFICIENCY_LEVELS, Repository, RepositoryError
+from repository.mysql_repo import MySQLRepository
+from repository.routing import READ_ONLY_METHODS, RoutingRepository
+from repository.sqlite_repo import SQLiteRepository
+
+__all__ = [
+    'EMPTY_PAYMENT_TOTALS',
+    'HISTORY_COLUMNS',
+    'PROFICIENCY_LEVELS',
+    'Repository',
+    'RepositoryError',
+    'MySQLRepository',
+    'READ_ONLY_METHODS',
+    'RoutingRepository',
+    'SQLiteRepository',
+]
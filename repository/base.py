@@ -0,0 +1,402 @@
+import abc
+import datetime
+
+# --- BACKEND-AGNOSTIC DATA ACCESS ---
+# Repository is the API the app (and the benchmarks) use to read and write
+# pesuConnect data. Each backend implements every method with the same
+# arguments and the same row shapes (dicts keyed by column alias), and reports
+# any failure, including a trigger rejecting a write, as a RepositoryError
+# carrying the backend's message. Nothing in this package imports Streamlit.
+
+PROFICIENCY_LEVELS = ["Beginner", "Intermediate", "Advanced"]
+
+
+# The columns of each history iter_history() streams, in row order.
+HISTORY_COLUMNS = {
+    'payments': ('payment_id', 'contract_id', 'project_id', 'project_title', 'freelancer_id', 'owner_id',
+                 'amount', 'payment_date', 'status', 'payment_method', 'archived'),
+    'contracts': ('contract_id', 'project_id', 'project_title', 'freelancer_id', 'owner_id',
+                  'start_date', 'end_date', 'status', 'archived'),
+    'reviews': ('review_id', 'contract_id', 'project_title', 'reviewee_id', 'reviewer_id',
+                'rating', 'review_text', 'review_date'),
+}
+
+
+class RepositoryError(Exception):
+    """A query or write failed; the message is the backend's (e.g. a trigger's 'Error: ...')."""
+
+
+def validate_skills(skills):
+    """Checks (skill_name, proficiency) pairs before they are saved.
+
+    Returns a dict of casefolded name -> outcome dict. Valid entries have
+    outcome None (to be decided by the backend); invalid ones are 'invalid'
+    with a message. A name listed twice keeps its last level.
+    """
+    outcomes = {}
+    for skill_name, proficiency in skills:
+        skill_name = (skill_name or "").strip()
+        if not skill_name:
+            continue
+        outcome = {'skill_name': skill_name, 'proficiency': proficiency, 'outcome': 'invalid', 'message': ''}
+        if len(skill_name) > 100:
+            outcome['message'] = "Skill names can be at most 100 characters."
+        elif proficiency not in PROFICIENCY_LEVELS:
+            outcome['message'] = f"Proficiency must be one of {', '.join(PROFICIENCY_LEVELS)}."
+        else:
+            outcome['outcome'] = None  # decided by the backend
+        outcomes[skill_name.casefold()] = outcome
+    return outcomes
+
+
+def resolve_skill_outcome(outcome, row):
+    """Fills in a validated outcome (and its skill_id) from the matching Skill row joined
+    to the student's current level. Returns True if the Student_Skill row must be written."""
+    if row is None:
+        # The column collation matched it to a differently spelled skill (e.g. accents).
+        outcome['outcome'] = 'invalid'
+        outcome['message'] = "Matches an existing skill spelled differently; pick it from the list."
+        return False
+    outcome['skill_name'] = row['skill_name']
+    outcome['skill_id'] = row['skill_id']
+    if row['proficiency_level'] is None:
+        outcome['outcome'] = 'added'
+    elif row['proficiency_level'] != outcome['proficiency']:
+        outcome['outcome'] = 'updated'
+        outcome['message'] = f"Was {row['proficiency_level']}."
+    else:
+        outcome['outcome'] = 'unchanged'
+        return False
+    return True
+
+
+def required_skills(skills):
+    """Normalises a project's (skill_name, min_proficiency) pairs, dropping invalid ones.
+
+    Returns a dict of casefolded name -> (skill_name, level).
+    """
+    required = {}
+    for skill_name, level in skills:
+        skill_name = (skill_name or "").strip()
+        if skill_name and len(skill_name) <= 100 and level in PROFICIENCY_LEVELS:
+            required[skill_name.casefold()] = (skill_name, level)
+    return required
+
+
+# Where a project without a deadline sorts in keyset pagination: after every
+# dated one (sp_SearchProjectsPage orders by COALESCE(deadline, '9999-12-31')).
+NO_DEADLINE = datetime.date(9999, 12, 31)
+
+
+def next_page_cursor(projects, page_size):
+    """Trims a page fetched with one extra row; returns (projects, (deadline, project_id) or None)."""
+    if len(projects) > page_size:
+        projects = projects[:page_size]
+        last = projects[-1]
+        return projects, (last['deadline'] or NO_DEADLINE, last['project_id'])
+    return projects, None
+
+
+def next_page_offset(projects, offset, page_size):
+    """Trims a page fetched with one extra row; returns (projects, next offset or None)."""
+    if len(projects) > page_size:
+        return projects[:page_size], offset + page_size
+    return projects, None
+
+
+def entity_versions(rows, student_id):
+    """Builds get_entity_versions()'s dict from (entity, own, version) rows,
+    `own` being whether the row sums the student's counters or the
+    platform-wide shards. Counters without a row yet are 0."""
+    versions = {}
+    for row in rows:
+        key = (row['entity'], student_id) if row['own'] else row['entity']
+        versions[key] = int(row['version'])
+    if student_id is not None:
+        for entity in [key for key in versions if isinstance(key, str)]:
+            versions.setdefault((entity, student_id), 0)
+    return versions
+
+
+# The messages trg_Validate_Application raises, plus the one both backends
+# report for a uq_application_student_project violation.
+OWN_PROJECT_MESSAGE = "Error: A student cannot apply to their own project."
+PROJECT_CLOSED_MESSAGE = "Error: This project is no longer open for applications."
+DUPLICATE_APPLICATION_MESSAGE = "Error: You have already applied to this project."
+
+
+def check_applications(user_id, project_ids, rows):
+    """Decides a batch of applications from one read of the projects involved.
+
+    `rows` has project_id, owner_id, status and applied (whether the user has
+    already applied) for each project that exists. Returns one outcome dict per
+    distinct project id, in order: 'rejected' ones carry the trigger's message,
+    the rest have outcome None and are to be inserted.
+    """
+    found = {row['project_id']: row for row in rows}
+    outcomes = []
+    for project_id in dict.fromkeys(project_ids):
+        outcome = {'project_id': project_id, 'outcome': 'rejected', 'message': ''}
+        row = found.get(project_id)
+        if row is None:
+            outcome['message'] = "Error: This project does not exist."
+        elif row['owner_id'] == user_id:
+            outcome['message'] = OWN_PROJECT_MESSAGE
+        elif row['status'] != 'Open':
+            outcome['message'] = PROJECT_CLOSED_MESSAGE
+        elif row['applied']:
+            outcome['message'] = DUPLICATE_APPLICATION_MESSAGE
+        else:
+            outcome['outcome'] = None
+        outcomes.append(outcome)
+    return outcomes
+
+
+EMPTY_RATING_STATS = {'avg': 0, 'count': 0, 'last_review_date': None}
+EMPTY_PAYMENT_TOTALS = {'earned': 0, 'earned_count': 0, 'spent': 0, 'spent_count': 0}
+
+
+class Repository(abc.ABC):
+    """Every read and write the app performs, independent of the database engine.
+
+    Write methods commit before returning and roll back before raising.
+    """
+
+    # --- students ---
+
+    @abc.abstractmethod
+    def login(self, email, password):
+        """Returns the student's profile dict, or None if the credentials don't match."""
+
+    @abc.abstractmethod
+    def register(self, name, email, password, phone, department, year):
+        """Creates a student; the password is stored hashed."""
+
+    # --- projects ---
+
+    @abc.abstractmethod
+    def get_open_projects(self):
+        """Returns every 'Open' project (unpaginated)."""
+
+    @abc.abstractmethod
+    def search_projects_page(self, after=None, page_size=20, keyword=None, status='Open', deadline_before=None):
+        """Returns (projects, next_cursor) for one page after a (deadline, project_id) cursor."""
+
+    @abc.abstractmethod
+    def search_projects_ranked(self, keyword, offset=0, page_size=20, status='Open', deadline_before=None):
+        """Full-text search, best match first. Returns (projects, next_offset)."""
+
+    @abc.abstractmethod
+    def create_project(self, user_id, title, description, deadline, skills=()):
+        """Creates a project and its Project_Skill rows in one transaction.
+
+        Returns (project_id, [(skill_id, min_proficiency), ...]).
+        """
+
+    @abc.abstractmethod
+    def get_my_projects(self, user_id):
+        """Returns the user's projects with their pending application counts,
+        archived ones included."""
+
+    @abc.abstractmethod
+    def get_open_projects_by_ids(self, project_ids):
+        """Returns {project_id: project} for those still Open, each with a 'skills' list."""
+
+    @abc.abstractmethod
+    def get_project_skill_rows(self):
+        """Returns (project_id, owner_id, skill_id, min_proficiency) for every open project."""
+
+    # --- applications ---
+
+    @abc.abstractmethod
+    def apply_for_project(self, user_id, project_id):
+        """Applies the user to a project."""
+
+    @abc.abstractmethod
+    def apply_for_projects(self, user_id, project_ids):
+        """Applies the user to several projects with one INSERT.
+
+        Returns one dict per distinct project id with outcome 'applied' or
+        'rejected' and, for rejections, the reason in 'message'.
+        """
+
+    @abc.abstractmethod
+    def get_applied_project_ids(self, user_id):
+        """Returns the set of project ids the user has applied to."""
+
+    @abc.abstractmethod
+    def get_pending_applications(self, project_id):
+        """Returns the pending applications for one project."""
+
+    @abc.abstractmethod
+    def get_pending_applications_by_project(self, project_ids):
+        """Returns {project_id: [applications]} for several projects in one query."""
+
+    @abc.abstractmethod
+    def accept_application(self, application_id):
+        """Accepts an application: creates the contract and rejects the other applicants."""
+
+    @abc.abstractmethod
+    def reject_application(self, application_id):
+        """Rejects one pending application."""
+
+    # --- skills ---
+
+    @abc.abstractmethod
+    def get_my_skills(self, user_id):
+        """Returns the user's skills with their proficiency."""
+
+    @abc.abstractmethod
+    def get_skill_catalog(self):
+        """Returns every skill name, alphabetically."""
+
+    @abc.abstractmethod
+    def add_skill(self, user_id, skill_name, proficiency):
+        """Adds one skill; returns False if the user already has it."""
+
+    @abc.abstractmethod
+    def update_skill(self, user_id, skill_id, proficiency):
+        """Changes the proficiency of one of the user's skills."""
+
+    @abc.abstractmethod
+    def remove_skill(self, user_id, skill_id):
+        """Removes one of the user's skills."""
+
+    @abc.abstractmethod
+    def save_skills(self, user_id, skills):
+        """Adds or updates many skills in one transaction; returns one outcome dict per name."""
+
+    @abc.abstractmethod
+    def remove_skills(self, user_id, skill_ids):
+        """Removes several of the user's skills."""
+
+    # --- contracts, reviews and payments ---
+
+    @abc.abstractmethod
+    def get_freelance_contracts(self, user_id):
+        """Returns the user's In Progress contracts as freelancer."""
+
+    @abc.abstractmethod
+    def get_owner_contracts(self, user_id):
+        """Returns the In Progress contracts on the user's own projects."""
+
+    def get_my_contracts(self, user_id):
+        """Returns (contracts as freelancer, contracts as owner), both In Progress.
+
+        Two independent queries; the app runs them concurrently on separate
+        connections instead (see query_executor.py).
+        """
+        return self.get_freelance_contracts(user_id), self.get_owner_contracts(user_id)
+
+    @abc.abstractmethod
+    def complete_contract(self, contract_id):
+        """Marks a contract and its project Completed."""
+
+    @abc.abstractmethod
+    def create_review(self, review_text, rating, contract_id, reviewer_id):
+        """Reviews the freelancer on a contract; only the project owner may."""
+
+    @abc.abstractmethod
+    def create_payment(self, amount, payment_method, contract_id):
+        """Records a paid payment for a contract."""
+
+    @abc.abstractmethod
+    def complete_contract_with_review(self, contract_id, owner_id, rating, review_text,
+                                      amount, payment_method, completion_token):
+        """Completes, reviews and pays in one idempotent transaction.
+
+        Returns a dict with contract_id, review_id, payment_id and already_completed.
+        """
+
+    @abc.abstractmethod
+    def get_rating_stats(self, user_id):
+        """Returns the user's avg, count and last_review_date (zeros if never reviewed)."""
+
+    @abc.abstractmethod
+    def get_reviews_received(self, user_id):
+        """Returns the reviews the user received, newest contract first."""
+
+    def get_my_reviews(self, user_id):
+        """Returns (rating stats, reviews received); two independent queries like get_my_contracts."""
+        return self.get_rating_stats(user_id), self.get_reviews_received(user_id)
+
+    @abc.abstractmethod
+    def get_dashboard(self, user_id, review_limit=3):
+        """Returns a dict with stats, freelance_contracts, owner_contracts and recent_reviews."""
+
+    # --- payment analytics ---
+
+    @abc.abstractmethod
+    def get_payment_analytics(self, user_id, months=12, top_limit=10, min_reviews=3):
+        """Returns a dict read from the payment rollups, never from Payment itself:
+
+        * totals: the user's earned, earned_count, spent and spent_count;
+        * monthly: the same per month (month is its first day) for the
+          months with payments among the last `months`, oldest first;
+        * departments: the totals per department (department '' for none);
+        * top_earners / top_rated: the top `top_limit` freelancers by amount
+          earned, and by avg_rating among those with at least `min_reviews`
+          reviews, each with student_id, name, department, earned,
+          earned_count, avg_rating and review_count.
+        """
+
+    # --- maintenance ---
+
+    @abc.abstractmethod
+    def close_expired_projects(self, batch_size=500):
+        """Closes up to `batch_size` Open projects whose deadline has passed and
+        rejects their pending applications, in one transaction.
+
+        Returns {'projects_closed', 'applications_rejected'}; call again until
+        projects_closed is 0.
+        """
+
+    @abc.abstractmethod
+    def archive_finished_work(self, retention_days=180, batch_size=500):
+        """Moves up to `batch_size` Completed or Closed projects that finished more
+        than `retention_days` ago, with their applications, contracts and payments,
+        into the archive tables, in one transaction.
+
+        Returns {'projects', 'applications', 'contracts', 'payments'} moved; call
+        again until projects is 0.
+        """
+
+    @abc.abstractmethod
+    def rebuild_payment_rollups(self):
+        """Recomputes Student_Payment_Summary, Student_Payment_Month and
+        Department_Payment_Summary from the live and archived payments, in one
+        transaction."""
+
+    @abc.abstractmethod
+    def verify_payment_rollups(self):
+        """Returns the rollup rows that disagree with the payments, as dicts of
+        rollup ('student', 'month' or 'department'), rollup_key, month and the
+        actual minus stored earned, earned_count, spent and spent_count. An
+        empty list means the rollups are consistent."""
+
+    # --- history export ---
+
+    @abc.abstractmethod
+    def iter_history(self, kind, student_id=None, chunk_size=1000):
+        """Streams every row of one history (see HISTORY_COLUMNS), live and archived.
+
+        Yields lists of at most `chunk_size` tuples in HISTORY_COLUMNS[kind]
+        order, as the backend reads them, so memory stays at one chunk however
+        long the history is. With `student_id`, only rows the student took
+        part in (as freelancer or owner; for reviews, received or written).
+        The repository can't run other queries until the generator is
+        exhausted or closed.
+        """
+
+    # --- change tracking ---
+
+    @abc.abstractmethod
+    def get_entity_versions(self, student_id=None):
+        """Returns the Entity_Version counters (projects, applications, contracts,
+        reviews, skills): {entity: version} platform-wide, plus
+        {(entity, student_id): version} for `student_id`. A platform-wide version
+        changes whenever that data does; a student's only when what that student
+        sees does."""
+
+    def close(self):
+        """Releases anything the repository opened itself."""
@@ -0,0 +1,707 @@
+import functools
+import re
+
+import mysql.connector
+from mysql.connector import errorcode
+
+from repository.base import (
+    DUPLICATE_APPLICATION_MESSAGE,
+    EMPTY_PAYMENT_TOTALS,
+    EMPTY_RATING_STATS,
+    HISTORY_COLUMNS,
+    Repository,
+    RepositoryError,
+    check_applications,
+    entity_versions,
+    next_page_cursor,
+    next_page_offset,
+    required_skills,
+    resolve_skill_outcome,
+    validate_skills,
+)
+from repository.prepared import STATEMENTS, statements_for
+
+# --- MYSQL BACKEND ---
+# Wraps one mysql.connector connection (the app passes a pooled one). Business
+# rules live in pesuconnect_schema.sql: the procedures are called with callproc
+# and the triggers fire on their own, so a rejected write surfaces here as a
+# mysql.connector.Error and is re-raised as a RepositoryError.
+#
+# With prepared=True the hot reads run as server-side prepared statements
+# (see prepared.py); by default they are sent as plain text.
+
+
+def build_fulltext_query(keyword):
+    """Turns free text into a boolean-mode query that prefix-matches each word."""
+    words = re.findall(r"\w+", keyword or "")
+    return " ".join(f"{word}*" for word in words)
+
+
+def _error_message(err):
+    """The message to surface for a failed statement; unique-key violations that
+    stand in for a trigger get that trigger's wording."""
+    if err.errno == errorcode.ER_DUP_ENTRY and "uq_application_student_project" in (err.msg or ""):
+        return DUPLICATE_APPLICATION_MESSAGE
+    return str(err)
+
+
+def _translate_errors(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except mysql.connector.Error as err:
+            try:
+                if self.conn.in_transaction:
+                    self.conn.rollback()
+            except mysql.connector.Error:
+                pass  # the connection itself is gone; the pool will replace it
+            raise RepositoryError(_error_message(err)) from err
+    return wrapper
+
+
+def _translate_stream_errors(method):
+    """_translate_errors for generator methods, whose queries run while they are iterated."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            yield from method(self, *args, **kwargs)
+        except mysql.connector.Error as err:
+            raise RepositoryError(_error_message(err)) from err
+    return wrapper
+
+
+class MySQLRepository(Repository):
+    """Repository over a mysql.connector connection it does not own."""
+
+    def __init__(self, conn, prepared=False):
+        self.conn = conn
+        self.prepared = prepared
+
+    def _fetch_statement(self, name, *params):
+        """Rows (dicts) of the named statement in prepared.STATEMENTS."""
+        if self.prepared:
+            return statements_for(self.conn).fetchall(self.conn, name, params)
+        cursor = self.conn.cursor(dictionary=True)
+        cursor.execute(STATEMENTS[name], params)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+    # --- students ---
+
+    @_translate_errors
+    def login(self, email, password):
+        cursor = self.conn.cursor(dictionary=True)
+        cursor.callproc('sp_StudentLogin', [email, password])
+        user = None
+        for result in cursor.stored_results():
+            user = result.fetchone()
+        cursor.close()
+        return user
+
+    @_translate_errors
+    def register(self, name, email, password, phone, department, year):
+        cursor = self.conn.cursor()
+        insert_query = """
+        INSERT INTO Student (name, email, password, phone_number, department, year_of_study)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        """
+        cursor.execute(insert_query, (name, email, password, phone, department, year))
+        self.conn.commit()
+        cursor.close()
+
+    # --- projects ---
+
+    @_translate_errors
+    def get_open_projects(self):
+        cursor = self.conn.cursor(dictionary=True)
+        cursor.callproc('sp_SearchProjects', [None, 'Open'])
+        projects = []
+        for result in cursor.stored_results():
+            projects = result.fetchall()
+        cursor.close()
+        return projects
+
+    @_translate_errors
+    def search_projects_page(self, after=None, page_size=20, keyword=None, status='Open', deadline_before=None):
+        cursor = self.conn.cursor(dictionary=True)
+        after_deadline, after_project_id = after if after else (None, None)
+        # Ask for one extra row so we know whether there is a next page.
+        cursor.callproc('sp_SearchProjectsPage', [keyword, status, deadline_before, after_deadline, after_project_id, page_size + 1])
+        projects = []
+        for result in cursor.stored_results():
+            projects = result.fetchall()
+        cursor.close()
+        return next_page_cursor(projects, page_size)
+
+    @_translate_errors
+    def search_projects_ranked(self, keyword, offset=0, page_size=20, status='Open', deadline_before=None):
+        query = build_fulltext_query(keyword)
+        if not query:
+            return [], None
+        cursor = self.conn.cursor(dictionary=True)
+        cursor.callproc('sp_SearchProjectsRanked', [query, status, deadline_before, offset, page_size + 1])
+        projects = []
+        for result in cursor.stored_results():
+            projects = result.fetchall()
+        cursor.close()
+        return next_page_offset(projects, offset, page_size)
+
+    @_translate_errors
+    def create_project(self, user_id, title, description, deadline, skills=()):
+        cursor = self.conn.cursor()
+        cursor.callproc('sp_CreateProject', [user_id, title, description, deadline])
+        project_id = next(cursor.stored_results()).fetchone()[0]
+
+        required = required_skills(skills)
+        skill_rows = []
+        if required:
+            names = [name for name, _ in required.values()]
+            cursor.executemany(
+                "INSERT INTO Skill (skill_name) VALUES (%s) ON DUPLICATE KEY UPDATE skill_name = skill_name",
+                [(name,) for name in names],
+            )
+            placeholders = ", ".join(["%s"] * len(names))
+            cursor.execute(f"SELECT skill_id, skill_name FROM Skill WHERE skill_name IN ({placeholders})", tuple(names))
+            for skill_id, skill_name in cursor.fetchall():
+                if skill_name.casefold() in required:
+                    skill_rows.append((skill_id, required[skill_name.casefold()][1]))
+            cursor.executemany(
+                "INSERT INTO Project_Skill (project_id, skill_id, min_proficiency) VALUES (%s, %s, %s)",
+                [(project_id, skill_id, level) for skill_id, level in skill_rows],
+            )
+        self.conn.commit()
+        cursor.close()
+        return project_id, skill_rows
+
+    @_translate_errors
+    def get_my_projects(self, user_id):
+        # One grouped join instead of calling fn_GetProjectApplicationCount per row;
+        # archived projects follow, with nothing pending.
+        return self._fetch_statement('my_projects', user_id, user_id)
+
+    @_translate_errors
+    def get_open_projects_by_ids(self, project_ids):
+        if not project_ids:
+            return {}
+        placeholders = ", ".join(["%s"] * len(project_ids))
+        cursor = self.conn.cursor(dictionary=True)
+        query = f"""
+            SELECT p.project_id, p.title, p.description, p.deadline, p.status,
+                p.student_id AS owner_id, s.name AS owner_name,
+                rs.avg_rating AS owner_rating, rs.review_count AS owner_review_count
+            FROM Project p
+            JOIN Student s ON p.student_id = s.student_id
+            LEFT JOIN Student_Rating_Summary rs ON rs.student_id = p.student_id
+            WHERE p.project_id IN ({placeholders}) AND p.status = 'Open'
+        """
+        cursor.execute(query, tuple(project_ids))
+        projects = {proj['project_id']: {**proj, 'skills': []} for proj in cursor.fetchall()}
+
+        query = f"""
+            SELECT ps.project_id, s.skill_name, ps.min_proficiency
+            FROM Project_Skill ps JOIN Skill s ON ps.skill_id = s.skill_id
+            WHERE ps.project_id IN ({placeholders})
+            ORDER BY ps.project_id, s.skill_name
+        """
+        cursor.execute(query, tuple(project_ids))
+        for row in cursor.fetchall():
+            if row['project_id'] in projects:
+                projects[row['project_id']]['skills'].append(f"{row['skill_name']} ({row['min_proficiency']})")
+        cursor.close()
+        return projects
+
+    @_translate_errors
+    def get_project_skill_rows(self):
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT p.project_id, p.student_id AS owner_id, ps.skill_id, ps.min_proficiency
+            FROM Project p
+            JOIN Project_Skill ps ON ps.project_id = p.project_id
+            WHERE p.status = 'Open'
+        """)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+    # --- applications ---
+
+    @_translate_errors
+    def apply_for_project(self, user_id, project_id):
+        cursor = self.conn.cursor()
+        cursor.callproc('sp_CreateApplication', [user_id, project_id])
+        self.conn.commit()
+        cursor.close()
+
+    @_translate_errors
+    def apply_for_projects(self, user_id, project_ids):
+        project_ids = list(dict.fromkeys(project_ids))
+        if not project_ids:
+            return []
+        cursor = self.conn.cursor(dictionary=True)
+
+        # 1. Decide every project from one read (served by the primary key and
+        #    uq_application_student_project).
+        placeholders = ", ".join(["%s"] * len(project_ids))
+        query = f"""
+            SELECT p.project_id, p.student_id AS owner_id, p.status, a.application_id IS NOT NULL AS applied
+            FROM Project p
+            LEFT JOIN Application a ON a.project_id = p.project_id AND a.student_id = %s
+            WHERE p.project_id IN ({placeholders})
+        """
+        cursor.execute(query, (user_id, *project_ids))
+        outcomes = check_applications(user_id, project_ids, cursor.fetchall())
+        pending = [outcome for outcome in outcomes if outcome['outcome'] is None]
+
+        # 2. Insert the rest with one multi-row INSERT (executemany batches it).
+        insert = "INSERT INTO Application (application_date, student_id, project_id) VALUES (CURDATE(), %s, %s)"
+        try:
+            if pending:
+                cursor.executemany(insert, [(user_id, outcome['project_id']) for outcome in pending])
+            self.conn.commit()
+            for outcome in pending:
+                outcome['outcome'] = 'applied'
+        except mysql.connector.Error:
+            # A project closed (or another tab applied) since the read, and the
+            # batch is all-or-nothing: retry one row at a time for exact reasons.
+            self.conn.rollback()
+            for outcome in pending:
+                try:
+                    cursor.execute(insert, (user_id, outcome['project_id']))
+                    self.conn.commit()
+                    outcome['outcome'] = 'applied'
+                except mysql.connector.Error as err:
+                    self.conn.rollback()
+                    outcome['outcome'] = 'rejected'
+                    outcome['message'] = err.msg if err.sqlstate == '45000' else _error_message(err)
+        cursor.close()
+        return outcomes
+
+    @_translate_errors
+    def get_applied_project_ids(self, user_id):
+        return {row['project_id'] for row in self._fetch_statement('applied_project_ids', user_id)}
+
+    @_translate_errors
+    def get_pending_applications(self, project_id):
+        return self._fetch_statement('pending_applications', project_id)
+
+    @_translate_errors
+    def get_pending_applications_by_project(self, project_ids):
+        applications = {project_id: [] for project_id in project_ids}
+        if not project_ids:
+            return applications
+        cursor = self.conn.cursor(dictionary=True)
+        placeholders = ", ".join(["%s"] * len(project_ids))
+        query = f"""
+            SELECT a.project_id, a.application_id, a.application_date, a.student_id AS applicant_id, s.name AS applicant_name,
+                rs.avg_rating AS applicant_rating, rs.review_count AS applicant_review_count
+            FROM Application a
+            JOIN Student s ON a.student_id = s.student_id
+            LEFT JOIN Student_Rating_Summary rs ON rs.student_id = a.student_id
+            WHERE a.project_id IN ({placeholders}) AND a.status = 'Pending'
+            ORDER BY a.project_id, a.application_date, a.application_id
+        """
+        cursor.execute(query, tuple(project_ids))
+        for app in cursor.fetchall():
+            applications[app['project_id']].append(app)
+        cursor.close()
+        return applications
+
+    @_translate_errors
+    def accept_application(self, application_id):
+        cursor = self.conn.cursor()
+        cursor.callproc('sp_AcceptApplication', [application_id])
+        self.conn.commit()
+        cursor.close()
+
+    @_translate_errors
+    def reject_application(self, application_id):
+        cursor = self.conn.cursor()
+        cursor.callproc('sp_RejectApplication', [application_id])
+        self.conn.commit()
+        cursor.close()
+
+    # --- skills ---
+
+    @_translate_errors
+    def get_my_skills(self, user_id):
+        return self._fetch_statement('my_skills', user_id)
+
+    @_translate_errors
+    def get_skill_catalog(self):
+        return [row['skill_name'] for row in self._fetch_statement('skill_catalog')]
+
+    @_translate_errors
+    def add_skill(self, user_id, skill_name, proficiency):
+        cursor = self.conn.cursor(dictionary=True)
+        query_check_user = """
+            SELECT ss.student_id FROM Student_Skill ss
+            JOIN Skill s ON ss.skill_id = s.skill_id
+            WHERE ss.student_id = %s AND s.skill_name = %s
+        """
+        cursor.execute(query_check_user, (user_id, skill_name))
+        if cursor.fetchone():
+            cursor.close()
+            return False
+
+        cursor.execute("SELECT skill_id FROM Skill WHERE skill_name = %s", (skill_name,))
+        skill = cursor.fetchone()
+
+        skill_id = None
+        if skill:
+            skill_id = skill['skill_id']
+        else:
+            insert_skill_query = "INSERT INTO Skill (skill_name) VALUES (%s)"
+            cursor.execute(insert_skill_query, (skill_name,))
+            skill_id = cursor.lastrowid
+            if not skill_id:
+                cursor.execute("SELECT skill_id FROM Skill WHERE skill_name = %s", (skill_name,))
+                skill_id = cursor.fetchone()['skill_id']
+
+        insert_student_skill_query = """
+            INSERT INTO Student_Skill (student_id, skill_id, proficiency_level)
+            VALUES (%s, %s, %s)
+        """
+        cursor.execute(insert_student_skill_query, (user_id, skill_id, proficiency))
+        self.conn.commit()
+        cursor.close()
+        return True
+
+    @_translate_errors
+    def update_skill(self, user_id, skill_id, proficiency):
+        cursor = self.conn.cursor()
+        query = "UPDATE Student_Skill SET proficiency_level = %s WHERE student_id = %s AND skill_id = %s"
+        cursor.execute(query, (proficiency, user_id, skill_id))
+        self.conn.commit()
+        cursor.close()
+
+    @_translate_errors
+    def remove_skill(self, user_id, skill_id):
+        cursor = self.conn.cursor()
+        query = "DELETE FROM Student_Skill WHERE student_id = %s AND skill_id = %s"
+        cursor.execute(query, (user_id, skill_id))
+        self.conn.commit()
+        cursor.close()
+
+    @_translate_errors
+    def save_skills(self, user_id, skills):
+        """Missing Skill rows are created and Student_Skill rows upserted with
+        batched statements, so the cost is four round trips however many skills
+        are submitted."""
+        outcomes = validate_skills(skills)
+        valid = {key: o for key, o in outcomes.items() if o['outcome'] is None}
+        if not valid:
+            return list(outcomes.values())
+
+        cursor = self.conn.cursor(dictionary=True)
+        names = [o['skill_name'] for o in valid.values()]
+
+        # 1. Create any Skill rows that don't exist yet (one multi-row INSERT).
+        cursor.executemany(
+            "INSERT INTO Skill (skill_name) VALUES (%s) ON DUPLICATE KEY UPDATE skill_name = skill_name",
+            [(name,) for name in names],
+        )
+
+        # 2. Resolve ids and the user's current levels in one query.
+        placeholders = ", ".join(["%s"] * len(names))
+        query = f"""
+            SELECT s.skill_id, s.skill_name, ss.proficiency_level
+            FROM Skill s
+            LEFT JOIN Student_Skill ss ON ss.skill_id = s.skill_id AND ss.student_id = %s
+            WHERE s.skill_name IN ({placeholders})
+        """
+        cursor.execute(query, (user_id, *names))
+        existing = {row['skill_name'].casefold(): row for row in cursor.fetchall()}
+
+        # 3. Upsert only the rows that actually change (one multi-row INSERT).
+        rows = []
+        for key, outcome in valid.items():
+            if resolve_skill_outcome(outcome, existing.get(key)):
+                rows.append((user_id, existing[key]['skill_id'], outcome['proficiency']))
+        if rows:
+            cursor.executemany(
+                """
+                INSERT INTO Student_Skill (student_id, skill_id, proficiency_level)
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE proficiency_level = VALUES(proficiency_level)
+                """,
+                rows,
+            )
+        self.conn.commit()
+        cursor.close()
+        return list(outcomes.values())
+
+    @_translate_errors
+    def remove_skills(self, user_id, skill_ids):
+        if not skill_ids:
+            return
+        cursor = self.conn.cursor()
+        placeholders = ", ".join(["%s"] * len(skill_ids))
+        query = f"DELETE FROM Student_Skill WHERE student_id = %s AND skill_id IN ({placeholders})"
+        cursor.execute(query, (user_id, *skill_ids))
+        self.conn.commit()
+        cursor.close()
+
+    # --- contracts, reviews and payments ---
+
+    @_translate_errors
+    def get_freelance_contracts(self, user_id):
+        return self._fetch_statement('freelance_contracts', user_id)
+
+    @_translate_errors
+    def get_owner_contracts(self, user_id):
+        return self._fetch_statement('owner_contracts', user_id)
+
+    @_translate_errors
+    def complete_contract(self, contract_id):
+        cursor = self.conn.cursor()
+        cursor.callproc('sp_CompleteContract', [contract_id])
+        self.conn.commit()
+        cursor.close()
+
+    @_translate_errors
+    def create_review(self, review_text, rating, contract_id, reviewer_id):
+        cursor = self.conn.cursor()
+        cursor.callproc('sp_CreateReview', [review_text, rating, contract_id, reviewer_id])
+        self.conn.commit()
+        cursor.close()
+
+    @_translate_errors
+    def create_payment(self, amount, payment_method, contract_id):
+        cursor = self.conn.cursor()
+        pay_query = "INSERT INTO Payment (amount, payment_date, status, payment_method, contract_id) VALUES (%s, CURDATE(), 'Paid', %s, %s)"
+        cursor.execute(pay_query, (amount, payment_method, contract_id))
+        self.conn.commit()
+        cursor.close()
+
+    @_translate_errors
+    def complete_contract_with_review(self, contract_id, owner_id, rating, review_text,
+                                      amount, payment_method, completion_token):
+        cursor = self.conn.cursor(dictionary=True)
+        cursor.callproc('sp_CompleteContractWithReview', [
+            contract_id, owner_id, rating, review_text, amount, payment_method, completion_token
+        ])
+        result = None
+        for stored in cursor.stored_results():
+            result = stored.fetchone()
+        cursor.close()
+        return result
+
+    @_translate_errors
+    def get_rating_stats(self, user_id):
+        rows = self._fetch_statement('rating_stats', user_id)
+        return rows[0] if rows else dict(EMPTY_RATING_STATS)
+
+    @_translate_errors
+    def get_reviews_received(self, user_id):
+        return self._fetch_statement('reviews_received', user_id)
+
+    @_translate_errors
+    def get_dashboard(self, user_id, review_limit=3):
+        cursor = self.conn.cursor(dictionary=True)
+        cursor.callproc('sp_GetDashboard', [user_id, review_limit])
+        stats, freelance_contracts, owner_contracts, recent_reviews = (
+            result.fetchall() for result in cursor.stored_results()
+        )
+        cursor.close()
+        return {
+            'stats': stats[0] if stats else dict(EMPTY_RATING_STATS),
+            'freelance_contracts': freelance_contracts,
+            'owner_contracts': owner_contracts,
+            'recent_reviews': recent_reviews,
+        }
+
+    # --- payment analytics ---
+
+    @_translate_errors
+    def get_payment_analytics(self, user_id, months=12, top_limit=10, min_reviews=3):
+        cursor = self.conn.cursor(dictionary=True)
+        cursor.callproc('sp_GetPaymentAnalytics', [user_id, months, top_limit, min_reviews])
+        totals, monthly, departments, top_earners, top_rated = (
+            result.fetchall() for result in cursor.stored_results()
+        )
+        cursor.close()
+        return {
+            'totals': totals[0] if totals else dict(EMPTY_PAYMENT_TOTALS),
+            'monthly': monthly,
+            'departments': departments,
+            'top_earners': top_earners,
+            'top_rated': top_rated,
+        }
+
+    # --- maintenance ---
+
+    def _call_for_row(self, procedure, args):
+        cursor = self.conn.cursor(dictionary=True)
+        cursor.callproc(procedure, args)
+        row = next(cursor.stored_results()).fetchone()
+        cursor.close()
+        return row
+
+    @_translate_errors
+    def close_expired_projects(self, batch_size=500):
+        return self._call_for_row('sp_CloseExpiredProjects', [batch_size])
+
+    @_translate_errors
+    def archive_finished_work(self, retention_days=180, batch_size=500):
+        return self._call_for_row('sp_ArchiveFinishedWork', [retention_days, batch_size])
+
+    @_translate_errors
+    def rebuild_payment_rollups(self):
+        cursor = self.conn.cursor()
+        cursor.callproc('sp_RebuildPaymentRollups')
+        cursor.close()
+
+    @_translate_errors
+    def verify_payment_rollups(self):
+        cursor = self.conn.cursor(dictionary=True)
+        cursor.callproc('sp_VerifyPaymentRollups')
+        drift = [row for result in cursor.stored_results() for row in result.fetchall()]
+        cursor.close()
+        return drift
+
+    # --- history export ---
+
+    @_translate_stream_errors
+    def iter_history(self, kind, student_id=None, chunk_size=1000):
+        if kind not in HISTORY_COLUMNS:
+            raise ValueError(f"Unknown history {kind!r}.")
+        # Unbuffered: rows are read off the socket as fetchmany() asks for
+        # them, and UNION ALL without ORDER BY lets the server send the first
+        # ones straight away. Per-student histories are one indexed branch
+        # per role and per live/archive table rather than an OR across joins.
+        cursor = self.conn.cursor(buffered=False)
+        try:
+            if kind == 'payments' and student_id is None:
+                cursor.execute("""
+                    SELECT py.payment_id, py.contract_id, c.project_id, p.title, c.student_id, p.student_id,
+                        py.amount, py.payment_date, py.status, py.payment_method, 0
+                    FROM Payment py
+                    LEFT JOIN Contract c ON c.contract_id = py.contract_id
+                    LEFT JOIN Project p ON p.project_id = c.project_id
+                    UNION ALL
+                    SELECT py.payment_id, py.contract_id, c.project_id, p.title, c.student_id, p.student_id,
+                        py.amount, py.payment_date, py.status, py.payment_method, 1
+                    FROM Payment_Archive py
+                    LEFT JOIN Contract_Archive c ON c.contract_id = py.contract_id
+                    LEFT JOIN Project_Archive p ON p.project_id = c.project_id
+                """)
+            elif kind == 'payments':
+                cursor.execute("""
+                    SELECT py.payment_id, py.contract_id, c.project_id, p.title, c.student_id, p.student_id,
+                        py.amount, py.payment_date, py.status, py.payment_method, 0
+                    FROM Contract c
+                    JOIN Project p ON p.project_id = c.project_id
+                    JOIN Payment py ON py.contract_id = c.contract_id
+                    WHERE c.student_id = %s
+                    UNION ALL
+                    SELECT py.payment_id, py.contract_id, c.project_id, p.title, c.student_id, p.student_id,
+                        py.amount, py.payment_date, py.status, py.payment_method, 0
+                    FROM Project p
+                    JOIN Contract c ON c.project_id = p.project_id
+                    JOIN Payment py ON py.contract_id = c.contract_id
+                    WHERE p.student_id = %s
+                    UNION ALL
+                    SELECT py.payment_id, py.contract_id, c.project_id, p.title, c.student_id, p.student_id,
+                        py.amount, py.payment_date, py.status, py.payment_method, 1
+                    FROM Contract_Archive c
+                    JOIN Project_Archive p ON p.project_id = c.project_id
+                    JOIN Payment_Archive py ON py.contract_id = c.contract_id
+                    WHERE c.student_id = %s
+                    UNION ALL
+                    SELECT py.payment_id, py.contract_id, c.project_id, p.title, c.student_id, p.student_id,
+                        py.amount, py.payment_date, py.status, py.payment_method, 1
+                    FROM Project_Archive p
+                    JOIN Contract_Archive c ON c.project_id = p.project_id
+                    JOIN Payment_Archive py ON py.contract_id = c.contract_id
+                    WHERE p.student_id = %s
+                """, (student_id,) * 4)
+            elif kind == 'contracts' and student_id is None:
+                cursor.execute("""
+                    SELECT c.contract_id, c.project_id, p.title, c.student_id, p.student_id,
+                        c.start_date, c.end_date, c.status, 0
+                    FROM Contract c
+                    LEFT JOIN Project p ON p.project_id = c.project_id
+                    UNION ALL
+                    SELECT c.contract_id, c.project_id, p.title, c.student_id, p.student_id,
+                        c.start_date, c.end_date, c.status, 1
+                    FROM Contract_Archive c
+                    LEFT JOIN Project_Archive p ON p.project_id = c.project_id
+                """)
+            elif kind == 'contracts':
+                cursor.execute("""
+                    SELECT c.contract_id, c.project_id, p.title, c.student_id, p.student_id,
+                        c.start_date, c.end_date, c.status, 0
+                    FROM Contract c
+                    JOIN Project p ON p.project_id = c.project_id
+                    WHERE c.student_id = %s
+                    UNION ALL
+                    SELECT c.contract_id, c.project_id, p.title, c.student_id, p.student_id,
+                        c.start_date, c.end_date, c.status, 0
+                    FROM Project p
+                    JOIN Contract c ON c.project_id = p.project_id
+                    WHERE p.student_id = %s
+                    UNION ALL
+                    SELECT c.contract_id, c.project_id, p.title, c.student_id, p.student_id,
+                        c.start_date, c.end_date, c.status, 1
+                    FROM Contract_Archive c
+                    JOIN Project_Archive p ON p.project_id = c.project_id
+                    WHERE c.student_id = %s
+                    UNION ALL
+                    SELECT c.contract_id, c.project_id, p.title, c.student_id, p.student_id,
+                        c.start_date, c.end_date, c.status, 1
+                    FROM Project_Archive p
+                    JOIN Contract_Archive c ON c.project_id = p.project_id
+                    WHERE p.student_id = %s
+                """, (student_id,) * 4)
+            elif student_id is None:
+                cursor.execute("""
+                    SELECT r.review_id, r.contract_id, COALESCE(p.title, pa.title), r.student_id,
+                        COALESCE(p.student_id, pa.student_id), r.rating, r.review_text, r.review_date
+                    FROM Review r
+                    LEFT JOIN Contract c ON r.contract_id = c.contract_id
+                    LEFT JOIN Project p ON c.project_id = p.project_id
+                    LEFT JOIN Contract_Archive ca ON r.contract_id = ca.contract_id
+                    LEFT JOIN Project_Archive pa ON ca.project_id = pa.project_id
+                """)
+            else:
+                cursor.execute("""
+                    SELECT r.review_id, r.contract_id, COALESCE(p.title, pa.title), r.student_id,
+                        COALESCE(p.student_id, pa.student_id), r.rating, r.review_text, r.review_date
+                    FROM Review r
+                    LEFT JOIN Contract c ON r.contract_id = c.contract_id
+                    LEFT JOIN Project p ON c.project_id = p.project_id
+                    LEFT JOIN Contract_Archive ca ON r.contract_id = ca.contract_id
+                    LEFT JOIN Project_Archive pa ON ca.project_id = pa.project_id
+                    WHERE r.student_id = %s
+                    UNION ALL
+                    SELECT r.review_id, r.contract_id, p.title, r.student_id, p.student_id,
+                        r.rating, r.review_text, r.review_date
+                    FROM Project p
+                    JOIN Contract c ON c.project_id = p.project_id
+                    JOIN Review r ON r.contract_id = c.contract_id
+                    WHERE p.student_id = %s
+                    UNION ALL
+                    SELECT r.review_id, r.contract_id, p.title, r.student_id, p.student_id,
+                        r.rating, r.review_text, r.review_date
+                    FROM Project_Archive p
+                    JOIN Contract_Archive c ON c.project_id = p.project_id
+                    JOIN Review r ON r.contract_id = c.contract_id
+                    WHERE p.student_id = %s
+                """, (student_id,) * 3)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            if self.conn.unread_result:
+                self.conn.consume_results()  # the consumer stopped early
+            cursor.close()
+
+    # --- change tracking ---
+
+    @_translate_errors
+    def get_entity_versions(self, student_id=None):
+        return entity_versions(self._fetch_statement('entity_versions', student_id), student_id)
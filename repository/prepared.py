@@ -0,0 +1,188 @@
+import threading
+import weakref
+
+import mysql.connector
+from mysql.connector import errorcode
+
+# --- PREPARED STATEMENTS ---
+# The SQL of the hot read paths, by name. MySQLRepository runs these through
+# server-side prepared cursors kept per pooled connection, so each statement
+# is parsed and planned once per connection and every later call only sends
+# its parameters (binary protocol; dates and decimals come back typed).
+#
+# mysql.connector keeps a prepared cursor's statement only while it is handed
+# the very same str object, so these constants must be passed as they are:
+# never a copy, a concatenation or an f-string.
+#
+# mysql.connector (8.0.33, pure and C extension) sends COM_STMT_RESET before
+# every execute of a prepared cursor, so a prepared read costs two round trips
+# to the server where a plain one costs one: a win only where parsing and
+# planning outweigh the network, which is why MySQLRepository leaves this off
+# unless asked (DB_PREPARED_STATEMENTS). extra_round_trips() lets the
+# instrumentation count the resets and prepares.
+#
+# Only fixed text belongs here. IN (...) lists whose length varies, CALLs
+# (several result sets) and one-off or maintenance statements stay on plain
+# cursors. Each connection holds at most len(STATEMENTS) statements, far below
+# MySQL's max_prepared_stmt_count.
+
+STATEMENTS = {
+    'my_projects': """
+        SELECT
+            p.project_id, p.title, p.status,
+            COUNT(a.application_id) AS pending_apps
+        FROM Project p
+        LEFT JOIN Application a ON a.project_id = p.project_id AND a.status = 'Pending'
+        WHERE p.student_id = %s
+        GROUP BY p.project_id, p.title, p.status
+        UNION ALL
+        SELECT project_id, title, status, 0 FROM Project_Archive WHERE student_id = %s
+    """,
+    'applied_project_ids': "SELECT project_id FROM Application WHERE student_id = %s",
+    'pending_applications': """
+        SELECT a.project_id, a.application_id, a.application_date, a.student_id AS applicant_id, s.name AS applicant_name,
+            rs.avg_rating AS applicant_rating, rs.review_count AS applicant_review_count
+        FROM Application a
+        JOIN Student s ON a.student_id = s.student_id
+        LEFT JOIN Student_Rating_Summary rs ON rs.student_id = a.student_id
+        WHERE a.project_id = %s AND a.status = 'Pending'
+    """,
+    'my_skills': """
+        SELECT s.skill_id, s.skill_name, ss.proficiency_level
+        FROM Student_Skill ss JOIN Skill s ON ss.skill_id = s.skill_id
+        WHERE ss.student_id = %s
+    """,
+    'skill_catalog': "SELECT skill_name FROM Skill ORDER BY skill_name",
+    'freelance_contracts': """
+        SELECT c.contract_id, p.title AS project_title, s.name AS project_owner_name, c.start_date, c.end_date
+        FROM Contract c
+        JOIN Project p ON c.project_id = p.project_id
+        JOIN Student s ON p.student_id = s.student_id
+        WHERE c.student_id = %s AND p.status = 'In Progress'
+    """,
+    'owner_contracts': """
+        SELECT c.contract_id, p.title AS project_title, c.student_id AS freelancer_id, s.name AS freelancer_name, c.start_date, c.end_date
+        FROM Contract c
+        JOIN Project p ON c.project_id = p.project_id
+        JOIN Student s ON c.student_id = s.student_id
+        WHERE p.student_id = %s AND p.status = 'In Progress'
+    """,
+    # Primary-key lookup on the trigger-maintained summary instead of AVG/COUNT over Review.
+    'rating_stats': """
+        SELECT avg_rating AS avg, review_count AS count, last_review_date
+        FROM Student_Rating_Summary WHERE student_id = %s
+    """,
+    'reviews_received': """
+        SELECT r.rating, r.review_text, COALESCE(p.title, pa.title) AS project_title
+        FROM Review r
+        LEFT JOIN Contract c ON r.contract_id = c.contract_id
+        LEFT JOIN Project p ON c.project_id = p.project_id
+        LEFT JOIN Contract_Archive ca ON r.contract_id = ca.contract_id
+        LEFT JOIN Project_Archive pa ON ca.project_id = pa.project_id
+        WHERE r.student_id = %s AND COALESCE(p.title, pa.title) IS NOT NULL
+        ORDER BY COALESCE(c.end_date, ca.end_date) DESC
+    """,
+    # Two seeks on the (scope, entity) key: the platform-wide shards and one student's rows.
+    'entity_versions': """
+        SELECT entity, scope > 0 AS own, SUM(version) AS version
+        FROM Entity_Version
+        WHERE scope <= 0 OR scope = %s
+        GROUP BY entity, own
+    """,
+}
+
+# The server dropped the statement (e.g. after COM_RESET_CONNECTION) or asks
+# for it to be prepared again (a table it reads was altered).
+REPREPARE_ERRORS = {errorcode.ER_UNKNOWN_STMT_HANDLER, errorcode.ER_NEED_REPREPARE}
+
+
+class PreparedStatements:
+    """The prepared cursors of one connection, one per name in STATEMENTS.
+
+    A statement is prepared the first time it runs on the connection. A
+    reconnect (the pool's ping, or mysql.connector's own) gives the
+    connection a new connection_id and leaves every statement behind on the
+    old session, so a changed id drops them all and they are prepared again
+    on first use.
+    """
+
+    def __init__(self):
+        self._connection_id = None
+        self._cursors = {}
+
+    def fetchall(self, conn, name, params=()):
+        """Runs STATEMENTS[name] with `params` and returns its rows as dicts."""
+        if conn.connection_id != self._connection_id:
+            if self._cursors:
+                _count('reconnects')
+            self._cursors = {}  # their statements died with the old session
+            self._connection_id = conn.connection_id
+        try:
+            return self._execute(conn, name, params)
+        except mysql.connector.Error as err:
+            if err.errno not in REPREPARE_ERRORS:
+                raise
+            self._cursors.pop(name, None)
+            _count('reprepares')
+            return self._execute(conn, name, params)
+
+    def _execute(self, conn, name, params):
+        cursor = self._cursors.get(name)
+        if cursor is None:
+            cursor = conn.cursor(prepared=True, dictionary=True)
+            self._cursors[name] = cursor
+            _count('prepares')
+            _count_extra_round_trip()
+        _count_extra_round_trip()  # the COM_STMT_RESET before the execute
+        try:
+            cursor.execute(STATEMENTS[name], params)
+            rows = cursor.fetchall()  # prepared cursors are unbuffered
+        except mysql.connector.Error:
+            self._cursors.pop(name, None)  # prepare it afresh next time
+            raise
+        _count('executions')
+        return rows
+
+
+_registries = weakref.WeakKeyDictionary()  # connection -> PreparedStatements; cursors only hold weak proxies
+_lock = threading.Lock()
+_stats = {'prepares': 0, 'executions': 0, 'reprepares': 0, 'reconnects': 0}
+_local = threading.local()
+
+
+def _count(counter):
+    with _lock:
+        _stats[counter] += 1
+
+
+def _count_extra_round_trip():
+    _local.extra_round_trips = extra_round_trips() + 1
+
+
+def extra_round_trips():
+    """Round trips this thread's prepared executions have made beyond one each
+    (each COM_STMT_RESET and COM_STMT_PREPARE), as a running total."""
+    return getattr(_local, 'extra_round_trips', 0)
+
+
+def statements_for(conn):
+    """The PreparedStatements of `conn`, created on first use."""
+    with _lock:
+        registry = _registries.get(conn)
+        if registry is None:
+            registry = _registries[conn] = PreparedStatements()
+        return registry
+
+
+def prepared_statement_stats():
+    """Process-wide counters: statements prepared, executions, re-prepares after
+    a server-side loss, reconnects that discarded a connection's statements,
+    and the round trips each execution cost on average."""
+    with _lock:
+        stats = dict(_stats, connections=len(_registries))
+    stats['reuse_ratio'] = 1 - stats['prepares'] / stats['executions'] if stats['executions'] else 0.0
+    # a reset and an execute each, plus the prepares
+    stats['round_trips_per_execution'] = (
+        (2 * stats['executions'] + stats['prepares']) / stats['executions'] if stats['executions'] else 0.0
+    )
+    return stats
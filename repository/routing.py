@@ -0,0 +1,89 @@
+# --- READ/WRITE ROUTING ---
+# Sends read-only Repository calls to a replica and everything else to the
+# primary. The replica is checked out on the first read that needs it, so a
+# run that only writes never touches it, and if it can't be reached the reads
+# fall back to the primary. Once a call has written, every later call in the
+# same run goes to the primary too: a page re-reading what it just wrote must
+# see it even while the replica is behind. Keeping the user on the primary
+# for the runs after that is the caller's job (see connect_to_db).
+
+READ_ONLY_METHODS = frozenset({
+    'login',
+    'get_open_projects',
+    'search_projects_page',
+    'search_projects_ranked',
+    'get_my_projects',
+    'get_open_projects_by_ids',
+    'get_project_skill_rows',
+    'get_applied_project_ids',
+    'get_pending_applications',
+    'get_pending_applications_by_project',
+    'get_my_skills',
+    'get_skill_catalog',
+    'get_freelance_contracts',
+    'get_owner_contracts',
+    'get_my_contracts',
+    'get_rating_stats',
+    'get_reviews_received',
+    'get_my_reviews',
+    'get_dashboard',
+    'get_payment_analytics',
+    'get_entity_versions',
+    'iter_history',
+})
+
+
+class RoutingRepository:
+    """A Repository that splits one run's calls between a primary and a replica.
+
+    `primary` is a Repository; `open_replica()` returns a context manager
+    yielding one (e.g. a connection checked out of the replica pool). Any
+    method not in READ_ONLY_METHODS counts as a write, so a new Repository
+    method is sent to the primary until it is listed there.
+    """
+
+    def __init__(self, primary, open_replica):
+        self._primary = primary
+        self._open_replica = open_replica
+        self._replica = None
+        self._replica_cm = None
+        self.replica_error = None  # why reads fell back to the primary, if they did
+        self.wrote = False
+
+    @property
+    def reads_from_replica(self):
+        """Whether the next read goes to the replica."""
+        return self.replica_error is None and not self.wrote
+
+    def _replica_repo(self):
+        if self._replica is None:
+            cm = self._open_replica()
+            try:
+                self._replica = cm.__enter__()
+            except Exception as err:
+                self.replica_error = err
+                return None
+            self._replica_cm = cm
+        return self._replica
+
+    def __getattr__(self, name):
+        if name in READ_ONLY_METHODS:
+            replica = self._replica_repo() if self.reads_from_replica else None
+            return getattr(replica if replica is not None else self._primary, name)
+        attr = getattr(self._primary, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def write(*args, **kwargs):
+            # Set even if the call raises: a failed write may still have
+            # changed rows (e.g. a batch that fell back to row-by-row).
+            self.wrote = True
+            return attr(*args, **kwargs)
+
+        return write
+
+    def close(self):
+        """Hands the replica back; the primary belongs to the caller."""
+        if self._replica_cm is not None:
+            cm, self._replica_cm, self._replica = self._replica_cm, None, None
+            cm.__exit__(None, None, None)
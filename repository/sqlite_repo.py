@@ -0,0 +1,1133 @@
+import datetime
+import functools
+import hashlib
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from decimal import Decimal
+
+from repository.base import (
+    DUPLICATE_APPLICATION_MESSAGE,
+    EMPTY_PAYMENT_TOTALS,
+    EMPTY_RATING_STATS,
+    HISTORY_COLUMNS,
+    Repository,
+    RepositoryError,
+    check_applications,
+    entity_versions,
+    next_page_cursor,
+    next_page_offset,
+    required_skills,
+    resolve_skill_outcome,
+    validate_skills,
+)
+
+# --- EMBEDDED SQLITE BACKEND ---
+# Runs the whole workflow without a server: sqlite_schema.sql mirrors the MySQL
+# tables, indexes and triggers, and the stored procedures are emulated below,
+# each in its own transaction. Rows come back in the same shapes as the MySQL
+# backend (dicts, datetime.date for DATE columns, Decimal for DECIMAL ones).
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "sqlite_schema.sql")
+CENTS = Decimal("0.01")
+
+# Converters are looked up by declared column type, or by "AS name [TYPE]"
+# aliases for computed columns (PARSE_COLNAMES). Every DECIMAL in the schema
+# has two decimal places, which SQLite's NUMERIC affinity drops (1200.00 is
+# stored as the integer 1200): they are restored, as MySQL returns them.
+sqlite3.register_adapter(datetime.date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter("DATE", lambda value: datetime.date.fromisoformat(value.decode()))
+sqlite3.register_converter("DATETIME", lambda value: datetime.datetime.fromisoformat(value.decode()))
+sqlite3.register_converter("DECIMAL", lambda value: Decimal(value.decode()).quantize(CENTS))
+
+
+def build_fts_query(keyword):
+    """Turns free text into an FTS5 query that prefix-matches any of the words,
+    like the MySQL backend's boolean-mode query."""
+    words = re.findall(r"\w+", keyword or "")
+    return " OR ".join(f'"{word}"*' for word in words)
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+def _sha1(value):
+    return None if value is None else hashlib.sha1(str(value).encode()).hexdigest()
+
+
+def _curdate():
+    return datetime.date.today().isoformat()
+
+
+# Existing database files predate uq_application_student_project; bring them
+# up to date on open (the SQLite counterpart of migrations/002).
+APPLICATION_UPGRADE = """
+    DELETE FROM Application WHERE application_id NOT IN (
+        SELECT application_id FROM (
+            SELECT application_id, ROW_NUMBER() OVER (
+                PARTITION BY student_id, project_id
+                ORDER BY status = 'Accepted' DESC, application_id
+            ) AS position
+            FROM Application
+        ) WHERE position = 1
+    );
+    DROP INDEX IF EXISTS idx_application_student_project;
+    CREATE UNIQUE INDEX uq_application_student_project ON Application (student_id, project_id);
+    DROP TRIGGER IF EXISTS trg_Prevent_Self_Application;
+    DROP TRIGGER IF EXISTS trg_Check_Project_Status_On_Apply;
+    DROP TRIGGER IF EXISTS trg_Prevent_Duplicate_Application;
+"""
+
+
+def schema_statements(pattern):
+    """The statements of sqlite_schema.sql that match the regex `pattern`, in order."""
+    statements, current = [], ""
+    with open(SCHEMA_PATH) as f:
+        for line in f:
+            current += line
+            if sqlite3.complete_statement(current):
+                statements.append(current.strip())
+                current = ""
+    return [statement for statement in statements if re.search(pattern, statement)]
+
+
+def _placeholders(values):
+    return ", ".join("?" * len(values))
+
+
+def _error_message(err):
+    """The message to surface for a failed statement; unique-index violations that
+    stand in for a trigger get that trigger's wording."""
+    if isinstance(err, sqlite3.IntegrityError) and "Application.student_id, Application.project_id" in str(err):
+        return DUPLICATE_APPLICATION_MESSAGE
+    return str(err)
+
+
+def _translate_errors(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except sqlite3.Error as err:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            raise RepositoryError(_error_message(err)) from err
+    return wrapper
+
+
+def _translate_stream_errors(method):
+    """_translate_errors for generator methods, whose queries run while they are iterated."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            yield from method(self, *args, **kwargs)
+        except sqlite3.Error as err:
+            raise RepositoryError(_error_message(err)) from err
+    return wrapper
+
+
+# iter_history's queries: (select list, FROM clause) per branch, joined with
+# UNION ALL. Per-student branches filter on the student in one role each.
+_PAYMENT_COLUMNS = """py.payment_id, py.contract_id, c.project_id, p.title, c.student_id, p.student_id,
+    py.amount, py.payment_date, py.status, py.payment_method"""
+_CONTRACT_COLUMNS = """c.contract_id, c.project_id, p.title, c.student_id, p.student_id,
+    c.start_date, c.end_date, c.status"""
+_REVIEW_COLUMNS = """r.review_id, r.contract_id, p.title, r.student_id, p.student_id,
+    r.rating, r.review_text, r.review_date"""
+_REVIEW_ANY_CONTRACT = """
+    SELECT r.review_id, r.contract_id, COALESCE(p.title, pa.title), r.student_id,
+        COALESCE(p.student_id, pa.student_id), r.rating, r.review_text, r.review_date
+    FROM Review r
+    LEFT JOIN Contract c ON r.contract_id = c.contract_id
+    LEFT JOIN Project p ON c.project_id = p.project_id
+    LEFT JOIN Contract_Archive ca ON r.contract_id = ca.contract_id
+    LEFT JOIN Project_Archive pa ON ca.project_id = pa.project_id
+"""
+_HISTORY_QUERIES = {
+    ('payments', False): f"""
+        SELECT {_PAYMENT_COLUMNS}, 0 FROM Payment py
+        LEFT JOIN Contract c ON c.contract_id = py.contract_id LEFT JOIN Project p ON p.project_id = c.project_id
+        UNION ALL
+        SELECT {_PAYMENT_COLUMNS}, 1 FROM Payment_Archive py
+        LEFT JOIN Contract_Archive c ON c.contract_id = py.contract_id
+        LEFT JOIN Project_Archive p ON p.project_id = c.project_id
+    """,
+    ('payments', True): f"""
+        SELECT {_PAYMENT_COLUMNS}, 0 FROM Contract c
+        JOIN Project p ON p.project_id = c.project_id JOIN Payment py ON py.contract_id = c.contract_id
+        WHERE c.student_id = :student_id
+        UNION ALL
+        SELECT {_PAYMENT_COLUMNS}, 0 FROM Project p
+        JOIN Contract c ON c.project_id = p.project_id JOIN Payment py ON py.contract_id = c.contract_id
+        WHERE p.student_id = :student_id
+        UNION ALL
+        SELECT {_PAYMENT_COLUMNS}, 1 FROM Contract_Archive c
+        JOIN Project_Archive p ON p.project_id = c.project_id JOIN Payment_Archive py ON py.contract_id = c.contract_id
+        WHERE c.student_id = :student_id
+        UNION ALL
+        SELECT {_PAYMENT_COLUMNS}, 1 FROM Project_Archive p
+        JOIN Contract_Archive c ON c.project_id = p.project_id JOIN Payment_Archive py ON py.contract_id = c.contract_id
+        WHERE p.student_id = :student_id
+    """,
+    ('contracts', False): f"""
+        SELECT {_CONTRACT_COLUMNS}, 0 FROM Contract c LEFT JOIN Project p ON p.project_id = c.project_id
+        UNION ALL
+        SELECT {_CONTRACT_COLUMNS}, 1 FROM Contract_Archive c LEFT JOIN Project_Archive p ON p.project_id = c.project_id
+    """,
+    ('contracts', True): f"""
+        SELECT {_CONTRACT_COLUMNS}, 0 FROM Contract c JOIN Project p ON p.project_id = c.project_id
+        WHERE c.student_id = :student_id
+        UNION ALL
+        SELECT {_CONTRACT_COLUMNS}, 0 FROM Project p JOIN Contract c ON c.project_id = p.project_id
+        WHERE p.student_id = :student_id
+        UNION ALL
+        SELECT {_CONTRACT_COLUMNS}, 1 FROM Contract_Archive c JOIN Project_Archive p ON p.project_id = c.project_id
+        WHERE c.student_id = :student_id
+        UNION ALL
+        SELECT {_CONTRACT_COLUMNS}, 1 FROM Project_Archive p JOIN Contract_Archive c ON c.project_id = p.project_id
+        WHERE p.student_id = :student_id
+    """,
+    ('reviews', False): _REVIEW_ANY_CONTRACT,
+    ('reviews', True): f"""
+        {_REVIEW_ANY_CONTRACT} WHERE r.student_id = :student_id
+        UNION ALL
+        SELECT {_REVIEW_COLUMNS} FROM Project p
+        JOIN Contract c ON c.project_id = p.project_id JOIN Review r ON r.contract_id = c.contract_id
+        WHERE p.student_id = :student_id
+        UNION ALL
+        SELECT {_REVIEW_COLUMNS} FROM Project_Archive p
+        JOIN Contract_Archive c ON c.project_id = p.project_id JOIN Review r ON r.contract_id = c.contract_id
+        WHERE p.student_id = :student_id
+    """,
+}
+
+
+# sp_FillPaymentFacts: one earned row for the freelancer and one spent row for
+# the owner of every payment, live and archived.
+_PAYMENT_FACT_BRANCH = """
+    SELECT {student}.student_id, COALESCE(s.department, ''), strftime('%Y-%m-01', py.payment_date), {amounts}
+    FROM Payment{suffix} py
+    JOIN Contract{suffix} c ON c.contract_id = py.contract_id
+    JOIN Project{suffix} p ON p.project_id = c.project_id
+    JOIN Student s ON s.student_id = {student}.student_id
+"""
+_PAYMENT_FACTS = (
+    "INSERT INTO tmp_Payment_Fact (student_id, department, month, earned, earned_count, spent, spent_count)"
+    + "UNION ALL".join(
+        _PAYMENT_FACT_BRANCH.format(student=student, amounts=amounts, suffix=suffix)
+        for suffix in ("", "_Archive")
+        for student, amounts in (("c", "py.amount, 1, 0, 0"), ("p", "0, 0, py.amount, 1"))
+    )
+)
+
+# sp_VerifyPaymentRollups: actual minus stored totals per rollup key.
+_ROLLUP_DRIFT = """
+    SELECT '{rollup}' AS rollup, {key} AS rollup_key, {month} AS "month [DATE]",
+        ROUND(SUM(earned), 2) AS "earned [DECIMAL]", SUM(earned_count) AS earned_count,
+        ROUND(SUM(spent), 2) AS "spent [DECIMAL]", SUM(spent_count) AS spent_count
+    FROM (
+        SELECT {columns}, earned, earned_count, spent, spent_count FROM tmp_Payment_Fact {where}
+        UNION ALL
+        SELECT {columns}, -earned, -earned_count, -spent, -spent_count FROM {table}
+    )
+    GROUP BY {columns}
+    HAVING ROUND(SUM(earned), 2) <> 0 OR SUM(earned_count) <> 0 OR ROUND(SUM(spent), 2) <> 0 OR SUM(spent_count) <> 0
+"""
+_PAYMENT_ROLLUPS = (
+    # (rollup, table, key columns, key, month, facts filter)
+    ('student', 'Student_Payment_Summary', 'student_id', 'student_id', 'NULL', ''),
+    ('month', 'Student_Payment_Month', 'student_id, month', 'student_id', 'month', 'WHERE month IS NOT NULL'),
+    ('department', 'Department_Payment_Summary', 'department', 'department', 'NULL', ''),
+)
+
+
+class SQLiteRepository(Repository):
+    """Repository over an embedded SQLite database, created on first use.
+
+    `path` is a file name, ":memory:" (private to this repository) or a
+    "file:" URI. Pass check_same_thread=False to share it between threads.
+    """
+
+    def __init__(self, path=":memory:", check_same_thread=True, timeout=10.0):
+        self.conn = sqlite3.connect(
+            path,
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            isolation_level=None,  # transactions are opened explicitly in _transaction()
+            check_same_thread=check_same_thread,
+            timeout=timeout,
+            uri=path.startswith("file:"),
+        )
+        self.conn.row_factory = _dict_row
+        self.conn.create_function("CURDATE", 0, _curdate)
+        self.conn.create_function("SHA1", 1, _sha1, deterministic=True)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Student'"
+        ).fetchone()
+        if not exists:
+            with open(SCHEMA_PATH) as f:
+                self.conn.executescript(f.read())
+        else:
+            self._upgrade()
+
+    def _upgrade(self):
+        """Brings a database file created by an earlier version up to date."""
+        if not self._fetch_one(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'uq_application_student_project'"
+        ):
+            self._upgrade_applications()
+        version_columns = {row['name'] for row in self._fetch_all("PRAGMA table_info(Entity_Version)")}
+        if 'scope' not in version_columns:
+            # migrations/003, or migrations/008's per-student counters in place of 003's
+            with open(SCHEMA_PATH) as f:
+                schema = f.read()
+            section = schema[schema.index("-- --- ENTITY VERSIONS ---"):]
+            drops = "".join(
+                f"DROP TRIGGER {row['name']};"
+                for row in self._fetch_all("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_Version_%'")
+            )
+            if version_columns:
+                drops += "DROP TABLE Entity_Version;"
+            self._execute_script(f"BEGIN IMMEDIATE; {drops} {section} COMMIT;")
+        self._upgrade_archive()
+        # migrations/005 and 007, plus the foreign-key indexes MySQL has implicitly
+        for index in ('idx_review_contract', 'idx_contract_archive_project', 'idx_contract_project',
+                      'idx_payment_contract', 'idx_project_status_due'):
+            if not self._fetch_one("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (index,)):
+                self._execute_script(schema_statements(rf"CREATE INDEX {index}\b")[0])
+        if not self._fetch_one("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Student_Payment_Summary'"):
+            # migrations/006, once the archive tables it reads exist
+            with open(SCHEMA_PATH) as f:
+                schema = f.read()
+            section = schema[schema.index("-- --- PAYMENT ROLLUPS ---"):schema.index("-- --- ENTITY VERSIONS ---")]
+            self._execute_script(f"BEGIN IMMEDIATE; {section} COMMIT;")
+            self.rebuild_payment_rollups()
+
+    def _upgrade_applications(self):
+        trigger = schema_statements(r"CREATE TRIGGER trg_Validate_Application\b")[0]
+        self._execute_script(f"BEGIN IMMEDIATE; {APPLICATION_UPGRADE} {trigger} COMMIT;")
+
+    def _upgrade_archive(self):
+        """The SQLite counterpart of migrations/004."""
+        if not self._fetch_one("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Project_Archive'"):
+            tables = "\n".join(schema_statements(r"_Archive \("))
+            self._execute_script(f"BEGIN IMMEDIATE; {tables} COMMIT;")
+        trigger = self._fetch_one(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_Validate_Project_Deadline_UPDATE'"
+        )
+        if trigger and "OLD.deadline" not in trigger['sql']:
+            new_trigger = schema_statements(r"CREATE TRIGGER trg_Validate_Project_Deadline_UPDATE\b")[0]
+            self._execute_script(
+                f"BEGIN IMMEDIATE; DROP TRIGGER trg_Validate_Project_Deadline_UPDATE; {new_trigger} COMMIT;"
+            )
+        if any(row['table'] == 'Contract' for row in self._fetch_all("PRAGMA foreign_key_list(Review)")):
+            # SQLite can't drop a foreign key: rebuild Review without it, then
+            # put back its index and triggers.
+            table = schema_statements(r"CREATE TABLE Review \(")[0].replace("CREATE TABLE Review (", "CREATE TABLE Review_New (")
+            dependents = "\n".join(schema_statements(r"CREATE (INDEX|TRIGGER) \w+\s.*\bON Review\b"))
+            self.conn.execute("PRAGMA foreign_keys = OFF")  # only takes effect outside a transaction
+            try:
+                self._execute_script(f"""
+                    BEGIN IMMEDIATE;
+                    {table}
+                    INSERT INTO Review_New SELECT * FROM Review;
+                    DROP TABLE Review;
+                    ALTER TABLE Review_New RENAME TO Review;
+                    {dependents}
+                    COMMIT;
+                """)
+            finally:
+                self.conn.execute("PRAGMA foreign_keys = ON")
+
+    def _execute_script(self, script):
+        try:
+            self.conn.executescript(script)
+        except sqlite3.Error:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            raise
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE takes the write lock up front, standing in for the
+        procedures' START TRANSACTION ... FOR UPDATE."""
+        cursor = self.conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield cursor
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        else:
+            cursor.execute("COMMIT")
+        finally:
+            cursor.close()
+
+    def _fetch_all(self, query, params=()):
+        return self.conn.execute(query, params).fetchall()
+
+    def _fetch_one(self, query, params=()):
+        return self.conn.execute(query, params).fetchone()
+
+    # --- students ---
+
+    @_translate_errors
+    def login(self, email, password):
+        return self._fetch_one(
+            """
+            SELECT student_id, name, email, phone_number, department, year_of_study
+            FROM Student
+            WHERE email = ? AND password = SHA1(?)
+            """,
+            (email, password),
+        )
+
+    @_translate_errors
+    def register(self, name, email, password, phone, department, year):
+        with self._transaction() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO Student (name, email, password, phone_number, department, year_of_study)
+                VALUES (?, ?, SHA1(?), ?, ?, ?)
+                """,
+                (name, email, password, phone, department, year),
+            )
+
+    # --- projects ---
+
+    _PROJECT_COLUMNS = """
+        p.project_id, p.title, p.description, p.deadline, p.post_date, p.status,
+        p.student_id AS owner_id, s.name AS owner_name,
+        rs.avg_rating AS owner_rating, rs.review_count AS owner_review_count
+    """
+
+    @_translate_errors
+    def get_open_projects(self):
+        return self._fetch_all(
+            """
+            SELECT p.project_id, p.title, p.description, p.deadline, p.status, s.name AS owner_name
+            FROM Project p
+            LEFT JOIN Student s ON p.student_id = s.student_id
+            WHERE p.status = 'Open'
+            """
+        )
+
+    @_translate_errors
+    def search_projects_page(self, after=None, page_size=20, keyword=None, status='Open', deadline_before=None):
+        after_deadline, after_project_id = after if after else (None, None)
+        projects = self._fetch_all(
+            f"""
+            SELECT {self._PROJECT_COLUMNS}
+            FROM Project p
+            LEFT JOIN Student s ON p.student_id = s.student_id
+            LEFT JOIN Student_Rating_Summary rs ON rs.student_id = p.student_id
+            WHERE (:keyword IS NULL OR p.title LIKE '%' || :keyword || '%' OR p.description LIKE '%' || :keyword || '%')
+                AND (:status IS NULL OR p.status = :status)
+                AND (:deadline_before IS NULL OR p.deadline <= :deadline_before)
+                AND (:after_deadline IS NULL
+                     OR COALESCE(p.deadline, '9999-12-31') > :after_deadline
+                     OR (COALESCE(p.deadline, '9999-12-31') = :after_deadline AND p.project_id > :after_project_id))
+            ORDER BY COALESCE(p.deadline, '9999-12-31'), p.project_id
+            LIMIT :limit
+            """,
+            {
+                'keyword': keyword, 'status': status, 'deadline_before': deadline_before,
+                'after_deadline': after_deadline, 'after_project_id': after_project_id,
+                'limit': page_size + 1,
+            },
+        )
+        return next_page_cursor(projects, page_size)
+
+    @_translate_errors
+    def search_projects_ranked(self, keyword, offset=0, page_size=20, status='Open', deadline_before=None):
+        query = build_fts_query(keyword)
+        if not query:
+            return [], None
+        projects = self._fetch_all(
+            f"""
+            SELECT {self._PROJECT_COLUMNS}, -bm25(Project_FTS) AS relevance
+            FROM Project_FTS
+            JOIN Project p ON p.project_id = Project_FTS.rowid
+            LEFT JOIN Student s ON p.student_id = s.student_id
+            LEFT JOIN Student_Rating_Summary rs ON rs.student_id = p.student_id
+            WHERE Project_FTS MATCH :query
+                AND (:status IS NULL OR p.status = :status)
+                AND (:deadline_before IS NULL OR p.deadline <= :deadline_before)
+            ORDER BY relevance DESC, p.project_id
+            LIMIT :limit OFFSET :offset
+            """,
+            {
+                'query': query, 'status': status, 'deadline_before': deadline_before,
+                'limit': page_size + 1, 'offset': offset,
+            },
+        )
+        return next_page_offset(projects, offset, page_size)
+
+    @_translate_errors
+    def create_project(self, user_id, title, description, deadline, skills=()):
+        required = required_skills(skills)
+        skill_rows = []
+        with self._transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO Project (student_id, title, description, deadline, status) VALUES (?, ?, ?, ?, 'Open')",
+                (user_id, title, description, deadline),
+            )
+            project_id = cursor.lastrowid
+            if required:
+                names = [name for name, _ in required.values()]
+                cursor.executemany(
+                    "INSERT INTO Skill (skill_name) VALUES (?) ON CONFLICT (skill_name) DO NOTHING",
+                    [(name,) for name in names],
+                )
+                placeholders = ", ".join(["?"] * len(names))
+                cursor.execute(f"SELECT skill_id, skill_name FROM Skill WHERE skill_name IN ({placeholders})", names)
+                for row in cursor.fetchall():
+                    if row['skill_name'].casefold() in required:
+                        skill_rows.append((row['skill_id'], required[row['skill_name'].casefold()][1]))
+                cursor.executemany(
+                    "INSERT INTO Project_Skill (project_id, skill_id, min_proficiency) VALUES (?, ?, ?)",
+                    [(project_id, skill_id, level) for skill_id, level in skill_rows],
+                )
+        return project_id, skill_rows
+
+    @_translate_errors
+    def get_my_projects(self, user_id):
+        return self._fetch_all(
+            """
+            SELECT p.project_id, p.title, p.status, COUNT(a.application_id) AS pending_apps
+            FROM Project p
+            LEFT JOIN Application a ON a.project_id = p.project_id AND a.status = 'Pending'
+            WHERE p.student_id = ?
+            GROUP BY p.project_id, p.title, p.status
+            UNION ALL
+            SELECT project_id, title, status, 0 FROM Project_Archive WHERE student_id = ?
+            """,
+            (user_id, user_id),
+        )
+
+    @_translate_errors
+    def get_open_projects_by_ids(self, project_ids):
+        if not project_ids:
+            return {}
+        placeholders = ", ".join(["?"] * len(project_ids))
+        rows = self._fetch_all(
+            f"""
+            SELECT p.project_id, p.title, p.description, p.deadline, p.status,
+                p.student_id AS owner_id, s.name AS owner_name,
+                rs.avg_rating AS owner_rating, rs.review_count AS owner_review_count
+            FROM Project p
+            JOIN Student s ON p.student_id = s.student_id
+            LEFT JOIN Student_Rating_Summary rs ON rs.student_id = p.student_id
+            WHERE p.project_id IN ({placeholders}) AND p.status = 'Open'
+            """,
+            tuple(project_ids),
+        )
+        projects = {proj['project_id']: {**proj, 'skills': []} for proj in rows}
+        for row in self._fetch_all(
+            f"""
+            SELECT ps.project_id, s.skill_name, ps.min_proficiency
+            FROM Project_Skill ps JOIN Skill s ON ps.skill_id = s.skill_id
+            WHERE ps.project_id IN ({placeholders})
+            ORDER BY ps.project_id, s.skill_name
+            """,
+            tuple(project_ids),
+        ):
+            if row['project_id'] in projects:
+                projects[row['project_id']]['skills'].append(f"{row['skill_name']} ({row['min_proficiency']})")
+        return projects
+
+    @_translate_errors
+    def get_project_skill_rows(self):
+        rows = self._fetch_all(
+            """
+            SELECT p.project_id, p.student_id AS owner_id, ps.skill_id, ps.min_proficiency
+            FROM Project p
+            JOIN Project_Skill ps ON ps.project_id = p.project_id
+            WHERE p.status = 'Open'
+            """
+        )
+        return [(r['project_id'], r['owner_id'], r['skill_id'], r['min_proficiency']) for r in rows]
+
+    # --- applications ---
+
+    @_translate_errors
+    def apply_for_project(self, user_id, project_id):
+        with self._transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO Application (application_date, student_id, project_id) VALUES (CURDATE(), ?, ?)",
+                (user_id, project_id),
+            )
+
+    @_translate_errors
+    def apply_for_projects(self, user_id, project_ids):
+        project_ids = list(dict.fromkeys(project_ids))
+        if not project_ids:
+            return []
+        insert = "INSERT INTO Application (application_date, student_id, project_id) VALUES (CURDATE(), ?, ?)"
+        placeholders = ", ".join("?" * len(project_ids))
+        with self._transaction() as cursor:
+            # BEGIN IMMEDIATE holds the write lock from the read to the insert, so
+            # nothing can change between deciding and writing.
+            rows = cursor.execute(
+                f"""
+                SELECT p.project_id, p.student_id AS owner_id, p.status, a.application_id IS NOT NULL AS applied
+                FROM Project p
+                LEFT JOIN Application a ON a.project_id = p.project_id AND a.student_id = ?
+                WHERE p.project_id IN ({placeholders})
+                """,
+                (user_id, *project_ids),
+            ).fetchall()
+            outcomes = check_applications(user_id, project_ids, rows)
+            pending = [outcome for outcome in outcomes if outcome['outcome'] is None]
+            cursor.executemany(insert, [(user_id, outcome['project_id']) for outcome in pending])
+        for outcome in pending:
+            outcome['outcome'] = 'applied'
+        return outcomes
+
+    @_translate_errors
+    def get_applied_project_ids(self, user_id):
+        rows = self._fetch_all("SELECT project_id FROM Application WHERE student_id = ?", (user_id,))
+        return {row['project_id'] for row in rows}
+
+    _APPLICATION_QUERY = """
+        SELECT a.project_id, a.application_id, a.application_date, a.student_id AS applicant_id, s.name AS applicant_name,
+            rs.avg_rating AS applicant_rating, rs.review_count AS applicant_review_count
+        FROM Application a
+        JOIN Student s ON a.student_id = s.student_id
+        LEFT JOIN Student_Rating_Summary rs ON rs.student_id = a.student_id
+    """
+
+    @_translate_errors
+    def get_pending_applications(self, project_id):
+        return self._fetch_all(
+            self._APPLICATION_QUERY + " WHERE a.project_id = ? AND a.status = 'Pending'",
+            (project_id,),
+        )
+
+    @_translate_errors
+    def get_pending_applications_by_project(self, project_ids):
+        applications = {project_id: [] for project_id in project_ids}
+        if not project_ids:
+            return applications
+        placeholders = ", ".join(["?"] * len(project_ids))
+        for app in self._fetch_all(
+            self._APPLICATION_QUERY + f"""
+            WHERE a.project_id IN ({placeholders}) AND a.status = 'Pending'
+            ORDER BY a.project_id, a.application_date, a.application_id
+            """,
+            tuple(project_ids),
+        ):
+            applications[app['project_id']].append(app)
+        return applications
+
+    @_translate_errors
+    def accept_application(self, application_id):
+        # sp_AcceptApplication
+        with self._transaction() as cursor:
+            cursor.execute(
+                """
+                SELECT a.student_id, a.project_id, p.deadline
+                FROM Application a LEFT JOIN Project p ON p.project_id = a.project_id
+                WHERE a.application_id = ? AND a.status = 'Pending'
+                """,
+                (application_id,),
+            )
+            app = cursor.fetchone()
+            if app is None or app['student_id'] is None:
+                return
+            cursor.execute("UPDATE Application SET status = 'Accepted' WHERE application_id = ?", (application_id,))
+            cursor.execute(
+                "INSERT INTO Contract (start_date, end_date, student_id, project_id) VALUES (CURDATE(), ?, ?, ?)",
+                (app['deadline'], app['student_id'], app['project_id']),
+            )
+            cursor.execute("UPDATE Project SET status = 'In Progress' WHERE project_id = ?", (app['project_id'],))
+            cursor.execute(
+                "UPDATE Application SET status = 'Rejected' WHERE project_id = ? AND status = 'Pending'",
+                (app['project_id'],),
+            )
+
+    @_translate_errors
+    def reject_application(self, application_id):
+        with self._transaction() as cursor:
+            cursor.execute(
+                "UPDATE Application SET status = 'Rejected' WHERE application_id = ? AND status = 'Pending'",
+                (application_id,),
+            )
+
+    # --- skills ---
+
+    @_translate_errors
+    def get_my_skills(self, user_id):
+        return self._fetch_all(
+            """
+            SELECT s.skill_id, s.skill_name, ss.proficiency_level
+            FROM Student_Skill ss JOIN Skill s ON ss.skill_id = s.skill_id
+            WHERE ss.student_id = ?
+            """,
+            (user_id,),
+        )
+
+    @_translate_errors
+    def get_skill_catalog(self):
+        return [row['skill_name'] for row in self._fetch_all("SELECT skill_name FROM Skill ORDER BY skill_name")]
+
+    @_translate_errors
+    def add_skill(self, user_id, skill_name, proficiency):
+        with self._transaction() as cursor:
+            cursor.execute(
+                """
+                SELECT 1 FROM Student_Skill ss JOIN Skill s ON ss.skill_id = s.skill_id
+                WHERE ss.student_id = ? AND s.skill_name = ?
+                """,
+                (user_id, skill_name),
+            )
+            if cursor.fetchone():
+                return False
+            cursor.execute("INSERT INTO Skill (skill_name) VALUES (?) ON CONFLICT (skill_name) DO NOTHING", (skill_name,))
+            cursor.execute("SELECT skill_id FROM Skill WHERE skill_name = ?", (skill_name,))
+            skill_id = cursor.fetchone()['skill_id']
+            cursor.execute(
+                "INSERT INTO Student_Skill (student_id, skill_id, proficiency_level) VALUES (?, ?, ?)",
+                (user_id, skill_id, proficiency),
+            )
+        return True
+
+    @_translate_errors
+    def update_skill(self, user_id, skill_id, proficiency):
+        with self._transaction() as cursor:
+            cursor.execute(
+                "UPDATE Student_Skill SET proficiency_level = ? WHERE student_id = ? AND skill_id = ?",
+                (proficiency, user_id, skill_id),
+            )
+
+    @_translate_errors
+    def remove_skill(self, user_id, skill_id):
+        with self._transaction() as cursor:
+            cursor.execute("DELETE FROM Student_Skill WHERE student_id = ? AND skill_id = ?", (user_id, skill_id))
+
+    @_translate_errors
+    def save_skills(self, user_id, skills):
+        outcomes = validate_skills(skills)
+        valid = {key: o for key, o in outcomes.items() if o['outcome'] is None}
+        if not valid:
+            return list(outcomes.values())
+
+        names = [o['skill_name'] for o in valid.values()]
+        with self._transaction() as cursor:
+            cursor.executemany(
+                "INSERT INTO Skill (skill_name) VALUES (?) ON CONFLICT (skill_name) DO NOTHING",
+                [(name,) for name in names],
+            )
+            placeholders = ", ".join(["?"] * len(names))
+            cursor.execute(
+                f"""
+                SELECT s.skill_id, s.skill_name, ss.proficiency_level
+                FROM Skill s
+                LEFT JOIN Student_Skill ss ON ss.skill_id = s.skill_id AND ss.student_id = ?
+                WHERE s.skill_name IN ({placeholders})
+                """,
+                (user_id, *names),
+            )
+            existing = {row['skill_name'].casefold(): row for row in cursor.fetchall()}
+
+            rows = []
+            for key, outcome in valid.items():
+                if resolve_skill_outcome(outcome, existing.get(key)):
+                    rows.append((user_id, existing[key]['skill_id'], outcome['proficiency']))
+            cursor.executemany(
+                """
+                INSERT INTO Student_Skill (student_id, skill_id, proficiency_level) VALUES (?, ?, ?)
+                ON CONFLICT (student_id, skill_id) DO UPDATE SET proficiency_level = excluded.proficiency_level
+                """,
+                rows,
+            )
+        return list(outcomes.values())
+
+    @_translate_errors
+    def remove_skills(self, user_id, skill_ids):
+        if not skill_ids:
+            return
+        placeholders = ", ".join(["?"] * len(skill_ids))
+        with self._transaction() as cursor:
+            cursor.execute(
+                f"DELETE FROM Student_Skill WHERE student_id = ? AND skill_id IN ({placeholders})",
+                (user_id, *skill_ids),
+            )
+
+    # --- contracts, reviews and payments ---
+
+    _FREELANCE_CONTRACTS_QUERY = """
+        SELECT c.contract_id, p.title AS project_title, s.name AS project_owner_name, c.start_date, c.end_date
+        FROM Contract c
+        JOIN Project p ON c.project_id = p.project_id
+        JOIN Student s ON p.student_id = s.student_id
+        WHERE c.student_id = ? AND p.status = 'In Progress'
+    """
+    _OWNER_CONTRACTS_QUERY = """
+        SELECT c.contract_id, p.title AS project_title, c.student_id AS freelancer_id, s.name AS freelancer_name, c.start_date, c.end_date
+        FROM Contract c
+        JOIN Project p ON c.project_id = p.project_id
+        JOIN Student s ON c.student_id = s.student_id
+        WHERE p.student_id = ? AND p.status = 'In Progress'
+    """
+
+    @_translate_errors
+    def get_freelance_contracts(self, user_id):
+        return self._fetch_all(self._FREELANCE_CONTRACTS_QUERY, (user_id,))
+
+    @_translate_errors
+    def get_owner_contracts(self, user_id):
+        return self._fetch_all(self._OWNER_CONTRACTS_QUERY, (user_id,))
+
+    @_translate_errors
+    def complete_contract(self, contract_id):
+        # sp_CompleteContract
+        with self._transaction() as cursor:
+            cursor.execute("SELECT project_id FROM Contract WHERE contract_id = ?", (contract_id,))
+            contract = cursor.fetchone()
+            if contract is None or contract['project_id'] is None:
+                return
+            cursor.execute(
+                "UPDATE Contract SET status = 'Completed', end_date = CURDATE() WHERE contract_id = ?",
+                (contract_id,),
+            )
+            cursor.execute("UPDATE Project SET status = 'Completed' WHERE project_id = ?", (contract['project_id'],))
+
+    @_translate_errors
+    def create_review(self, review_text, rating, contract_id, reviewer_id):
+        # sp_CreateReview
+        with self._transaction() as cursor:
+            cursor.execute(
+                """
+                SELECT c.student_id AS freelancer_id, p.student_id AS owner_id
+                FROM Contract c JOIN Project p ON c.project_id = p.project_id
+                WHERE c.contract_id = ?
+                """,
+                (contract_id,),
+            )
+            contract = cursor.fetchone()
+            if contract is None or contract['owner_id'] != reviewer_id:
+                raise RepositoryError("Error: Only the project owner can leave a review.")
+            cursor.execute(
+                "INSERT INTO Review (review_text, rating, contract_id, student_id, review_date) VALUES (?, ?, ?, ?, CURDATE())",
+                (review_text, rating, contract_id, contract['freelancer_id']),
+            )
+
+    @_translate_errors
+    def create_payment(self, amount, payment_method, contract_id):
+        with self._transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO Payment (amount, payment_date, status, payment_method, contract_id) VALUES (?, CURDATE(), 'Paid', ?, ?)",
+                (amount, payment_method, contract_id),
+            )
+
+    @_translate_errors
+    def complete_contract_with_review(self, contract_id, owner_id, rating, review_text,
+                                      amount, payment_method, completion_token):
+        # sp_CompleteContractWithReview; BEGIN IMMEDIATE serialises concurrent submits.
+        with self._transaction() as cursor:
+            cursor.execute(
+                """
+                SELECT c.project_id, c.student_id AS freelancer_id, c.status, p.student_id AS owner_id
+                FROM Contract c JOIN Project p ON c.project_id = p.project_id
+                WHERE c.contract_id = ?
+                """,
+                (contract_id,),
+            )
+            contract = cursor.fetchone()
+            cursor.execute(
+                "SELECT contract_id, review_id, payment_id FROM Contract_Completion WHERE completion_token = ?",
+                (completion_token,),
+            )
+            completion = cursor.fetchone()
+
+            if completion is not None:
+                if completion['contract_id'] != contract_id:
+                    raise RepositoryError("Error: This completion token was already used for another contract.")
+                return {'contract_id': contract_id, 'review_id': completion['review_id'],
+                        'payment_id': completion['payment_id'], 'already_completed': True}
+            if contract is None:
+                raise RepositoryError("Error: Contract not found.")
+            if contract['owner_id'] != owner_id:
+                raise RepositoryError("Error: Only the project owner can complete this contract.")
+            if contract['status'] != 'In Progress':
+                raise RepositoryError("Error: This contract has already been completed.")
+
+            cursor.execute(
+                "UPDATE Contract SET status = 'Completed', end_date = CURDATE() WHERE contract_id = ?",
+                (contract_id,),
+            )
+            cursor.execute("UPDATE Project SET status = 'Completed' WHERE project_id = ?", (contract['project_id'],))
+            cursor.execute(
+                "INSERT INTO Review (review_text, rating, contract_id, student_id, review_date) VALUES (?, ?, ?, ?, CURDATE())",
+                (review_text, rating, contract_id, contract['freelancer_id']),
+            )
+            review_id = cursor.lastrowid
+            cursor.execute(
+                "INSERT INTO Payment (amount, payment_date, status, payment_method, contract_id) VALUES (?, CURDATE(), 'Paid', ?, ?)",
+                (amount, payment_method, contract_id),
+            )
+            payment_id = cursor.lastrowid
+            cursor.execute(
+                "INSERT INTO Contract_Completion (completion_token, contract_id, review_id, payment_id) VALUES (?, ?, ?, ?)",
+                (completion_token, contract_id, review_id, payment_id),
+            )
+        return {'contract_id': contract_id, 'review_id': review_id, 'payment_id': payment_id, 'already_completed': False}
+
+    # Reviews of archived contracts come from the archive tables.
+    _REVIEWS_QUERY = """
+        SELECT r.rating, r.review_text, r.review_date, COALESCE(p.title, pa.title) AS project_title
+        FROM Review r
+        LEFT JOIN Contract c ON r.contract_id = c.contract_id
+        LEFT JOIN Project p ON c.project_id = p.project_id
+        LEFT JOIN Contract_Archive ca ON r.contract_id = ca.contract_id
+        LEFT JOIN Project_Archive pa ON ca.project_id = pa.project_id
+        WHERE r.student_id = ? AND COALESCE(p.title, pa.title) IS NOT NULL
+        ORDER BY COALESCE(c.end_date, ca.end_date) DESC
+    """
+
+    @_translate_errors
+    def get_rating_stats(self, user_id):
+        stats = self._fetch_one(
+            """
+            SELECT avg_rating AS avg, review_count AS count, last_review_date
+            FROM Student_Rating_Summary WHERE student_id = ?
+            """,
+            (user_id,),
+        )
+        return stats or dict(EMPTY_RATING_STATS)
+
+    @_translate_errors
+    def get_reviews_received(self, user_id):
+        return self._fetch_all(self._REVIEWS_QUERY, (user_id,))
+
+    @_translate_errors
+    def get_dashboard(self, user_id, review_limit=3):
+        # sp_GetDashboard's four result sets as four local queries.
+        stats = self._fetch_one(
+            """
+            SELECT COALESCE(rs.avg_rating, 0.00) AS "avg [DECIMAL]", COALESCE(rs.review_count, 0) AS count,
+                rs.last_review_date
+            FROM Student s
+            LEFT JOIN Student_Rating_Summary rs ON rs.student_id = s.student_id
+            WHERE s.student_id = ?
+            """,
+            (user_id,),
+        )
+        return {
+            'stats': stats or dict(EMPTY_RATING_STATS),
+            'freelance_contracts': self._fetch_all(self._FREELANCE_CONTRACTS_QUERY, (user_id,)),
+            'owner_contracts': self._fetch_all(self._OWNER_CONTRACTS_QUERY, (user_id,)),
+            'recent_reviews': self._fetch_all(self._REVIEWS_QUERY + " LIMIT ?", (user_id, review_limit)),
+        }
+
+    # --- payment analytics ---
+
+    @_translate_errors
+    def get_payment_analytics(self, user_id, months=12, top_limit=10, min_reviews=3):
+        # sp_GetPaymentAnalytics's five result sets as five local queries.
+        totals = self._fetch_one(
+            "SELECT earned, earned_count, spent, spent_count FROM Student_Payment_Summary WHERE student_id = ?",
+            (user_id,),
+        )
+        monthly = self._fetch_all(
+            """
+            SELECT month, earned, earned_count, spent, spent_count
+            FROM Student_Payment_Month
+            WHERE student_id = ? AND month >= date(CURDATE(), 'start of month', ?)
+            ORDER BY month
+            """,
+            (user_id, f"-{months - 1} months"),
+        )
+        departments = self._fetch_all(
+            "SELECT department, earned, earned_count, spent, spent_count FROM Department_Payment_Summary ORDER BY department"
+        )
+        top_earners = self._fetch_all(
+            """
+            SELECT s.student_id, s.name, s.department, ps.earned, ps.earned_count,
+                COALESCE(rs.avg_rating, 0.00) AS "avg_rating [DECIMAL]", COALESCE(rs.review_count, 0) AS review_count
+            FROM Student_Payment_Summary ps
+            JOIN Student s ON s.student_id = ps.student_id
+            LEFT JOIN Student_Rating_Summary rs ON rs.student_id = ps.student_id
+            WHERE ps.earned_count > 0
+            ORDER BY ps.earned DESC
+            LIMIT ?
+            """,
+            (top_limit,),
+        )
+        top_rated = self._fetch_all(
+            """
+            SELECT s.student_id, s.name, s.department, COALESCE(ps.earned, 0.00) AS "earned [DECIMAL]",
+                COALESCE(ps.earned_count, 0) AS earned_count, rs.avg_rating, rs.review_count
+            FROM Student_Rating_Summary rs
+            JOIN Student s ON s.student_id = rs.student_id
+            LEFT JOIN Student_Payment_Summary ps ON ps.student_id = rs.student_id
+            WHERE rs.review_count >= ?
+            ORDER BY rs.avg_rating DESC, rs.review_count DESC
+            LIMIT ?
+            """,
+            (min_reviews, top_limit),
+        )
+        return {
+            'totals': totals or dict(EMPTY_PAYMENT_TOTALS),
+            'monthly': monthly,
+            'departments': departments,
+            'top_earners': top_earners,
+            'top_rated': top_rated,
+        }
+
+    # --- maintenance ---
+
+    @_translate_errors
+    def close_expired_projects(self, batch_size=500):
+        # sp_CloseExpiredProjects
+        with self._transaction() as cursor:
+            project_ids = [row['project_id'] for row in cursor.execute(
+                """
+                SELECT project_id FROM Project
+                WHERE status = 'Open' AND deadline < CURDATE()
+                ORDER BY deadline, project_id LIMIT ?
+                """,
+                (batch_size,),
+            )]
+            closed = cursor.execute(
+                f"UPDATE Project SET status = 'Closed' WHERE status = 'Open' AND project_id IN ({_placeholders(project_ids)})",
+                project_ids,
+            ).rowcount
+            rejected = cursor.execute(
+                f"""
+                UPDATE Application SET status = 'Rejected'
+                WHERE status = 'Pending' AND project_id IN ({_placeholders(project_ids)})
+                """,
+                project_ids,
+            ).rowcount
+        return {'projects_closed': closed, 'applications_rejected': rejected}
+
+    @_translate_errors
+    def archive_finished_work(self, retention_days=180, batch_size=500):
+        # sp_ArchiveFinishedWork
+        cutoff = datetime.date.today() - datetime.timedelta(days=retention_days)
+        with self._transaction() as cursor:
+            project_ids = [row['project_id'] for row in cursor.execute(
+                """
+                SELECT p.project_id FROM Project p
+                WHERE p.status IN ('Completed', 'Closed')
+                  AND COALESCE((SELECT MAX(c.end_date) FROM Contract c WHERE c.project_id = p.project_id), p.deadline) < ?
+                ORDER BY p.project_id LIMIT ?
+                """,
+                (cutoff, batch_size),
+            )]
+            projects = _placeholders(project_ids)
+            contract_ids = [row['contract_id'] for row in cursor.execute(
+                f"SELECT contract_id FROM Contract WHERE project_id IN ({projects})", project_ids
+            )]
+            contracts = _placeholders(contract_ids)
+
+            # Children first: payments, contracts (Contract_Completion cascades), applications, projects.
+            moved = {}
+            for key, table, columns, where, ids in (
+                ('payments', 'Payment', "payment_id, amount, payment_date, status, payment_method, contract_id",
+                 f"contract_id IN ({contracts})", contract_ids),
+                ('contracts', 'Contract', "contract_id, start_date, end_date, status, student_id, project_id",
+                 f"contract_id IN ({contracts})", contract_ids),
+                ('applications', 'Application', "application_id, application_date, status, student_id, project_id",
+                 f"project_id IN ({projects})", project_ids),
+                ('projects', 'Project', "project_id, student_id, title, description, post_date, deadline, status",
+                 f"project_id IN ({projects})", project_ids),
+            ):
+                cursor.execute(f"INSERT INTO {table}_Archive ({columns}) SELECT {columns} FROM {table} WHERE {where}", ids)
+                moved[key] = cursor.execute(f"DELETE FROM {table} WHERE {where}", ids).rowcount
+        return {key: moved[key] for key in ('projects', 'applications', 'contracts', 'payments')}
+
+    def _fill_payment_facts(self, cursor):
+        # sp_FillPaymentFacts
+        cursor.execute("DROP TABLE IF EXISTS temp.tmp_Payment_Fact")
+        cursor.execute(
+            """
+            CREATE TEMP TABLE tmp_Payment_Fact (
+                student_id INT, department VARCHAR(50), month DATE,
+                earned DECIMAL(14, 2), earned_count INT, spent DECIMAL(14, 2), spent_count INT
+            )
+            """
+        )
+        cursor.execute(_PAYMENT_FACTS)
+
+    @_translate_errors
+    def rebuild_payment_rollups(self):
+        # sp_RebuildPaymentRollups
+        with self._transaction() as cursor:
+            self._fill_payment_facts(cursor)
+            for _, table, columns, _, _, where in _PAYMENT_ROLLUPS:
+                cursor.execute(f"DELETE FROM {table}")
+                cursor.execute(
+                    f"""
+                    INSERT INTO {table} ({columns}, earned, earned_count, spent, spent_count)
+                    SELECT {columns}, ROUND(SUM(earned), 2), SUM(earned_count), ROUND(SUM(spent), 2), SUM(spent_count)
+                    FROM tmp_Payment_Fact {where}
+                    GROUP BY {columns}
+                    """
+                )
+            cursor.execute("DROP TABLE temp.tmp_Payment_Fact")
+
+    @_translate_errors
+    def verify_payment_rollups(self):
+        # sp_VerifyPaymentRollups
+        cursor = self.conn.cursor()
+        try:
+            self._fill_payment_facts(cursor)
+            return [
+                row
+                for rollup, table, columns, key, month, where in _PAYMENT_ROLLUPS
+                for row in cursor.execute(_ROLLUP_DRIFT.format(
+                    rollup=rollup, table=table, columns=columns, key=key, month=month, where=where,
+                )).fetchall()
+            ]
+        finally:
+            if self.conn.in_transaction:
+                self.conn.rollback()  # the implicit one the INSERT into tmp_Payment_Fact opened
+            cursor.execute("DROP TABLE IF EXISTS temp.tmp_Payment_Fact")
+            cursor.close()
+
+    # --- history export ---
+
+    @_translate_stream_errors
+    def iter_history(self, kind, student_id=None, chunk_size=1000):
+        if kind not in HISTORY_COLUMNS:
+            raise ValueError(f"Unknown history {kind!r}.")
+        # SQLite steps through the result as fetchmany() asks for rows, so
+        # nothing beyond the current chunk is held in memory.
+        cursor = self.conn.cursor()
+        cursor.row_factory = None  # plain tuples, in HISTORY_COLUMNS order
+        try:
+            cursor.execute(_HISTORY_QUERIES[kind, student_id is not None], {'student_id': student_id})
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            cursor.close()
+
+    # --- change tracking ---
+
+    @_translate_errors
+    def get_entity_versions(self, student_id=None):
+        rows = self._fetch_all(
+            """
+            SELECT entity, scope > 0 AS own, SUM(version) AS version
+            FROM Entity_Version
+            WHERE scope <= 0 OR scope = ?
+            GROUP BY entity, own
+            """,
+            (student_id,),
+        )
+        return entity_versions(rows, student_id)
@@ -0,0 +1,709 @@
+-- SQLite translation of pesuconnect_schema.sql for SQLiteRepository.
+--
+-- Tables, indexes and triggers mirror the MySQL schema; differences:
+--   * SIGNAL SQLSTATE '45000' becomes RAISE(ABORT, <same message>);
+--   * BEFORE triggers cannot assign NEW.*, so Student passwords are hashed by
+--     SHA1() in the INSERT itself and Project.post_date is set AFTER INSERT;
+--   * the FULLTEXT index is an FTS5 table (Project_FTS) kept in sync by triggers;
+--   * stored procedures are Python methods of SQLiteRepository.
+-- CURDATE() and SHA1() are registered as SQL functions on every connection.
+
+PRAGMA foreign_keys = ON;
+
+CREATE TABLE Student (
+    student_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(100) NOT NULL UNIQUE COLLATE NOCASE,
+    password VARCHAR(50) NOT NULL,
+    phone_number VARCHAR(15),
+    department VARCHAR(50),
+    year_of_study INT
+);
+
+CREATE TABLE Project (
+    project_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INT REFERENCES Student(student_id) ON DELETE SET NULL,
+    title VARCHAR(100) NOT NULL,
+    description TEXT,
+    post_date DATE,
+    deadline DATE,
+    status VARCHAR(20) DEFAULT 'Open'
+);
+CREATE INDEX idx_project_status_deadline ON Project (status, deadline, project_id);
+CREATE INDEX idx_project_status_due ON Project (status, COALESCE(deadline, '9999-12-31'), project_id);
+CREATE INDEX idx_project_owner_status ON Project (student_id, status);
+
+CREATE VIRTUAL TABLE Project_FTS USING fts5(
+    title, description, content='Project', content_rowid='project_id'
+);
+
+CREATE TABLE Application (
+    application_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    application_date DATE,
+    status VARCHAR(20) DEFAULT 'Pending',
+    student_id INT REFERENCES Student(student_id) ON DELETE CASCADE,
+    project_id INT REFERENCES Project(project_id) ON DELETE CASCADE
+);
+CREATE INDEX idx_application_project_status ON Application (project_id, status);
+-- One application per student per project, enforced by the index itself.
+CREATE UNIQUE INDEX uq_application_student_project ON Application (student_id, project_id);
+
+CREATE TABLE Contract (
+    contract_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    start_date DATE,
+    end_date DATE,
+    status VARCHAR(20) DEFAULT 'In Progress',
+    student_id INT REFERENCES Student(student_id) ON DELETE CASCADE,
+    project_id INT REFERENCES Project(project_id) ON DELETE CASCADE
+);
+CREATE INDEX idx_contract_student_project ON Contract (student_id, project_id);
+-- MySQL indexes foreign key columns by itself; SQLite needs these spelled out.
+CREATE INDEX idx_contract_project ON Contract (project_id);
+
+CREATE TABLE Payment (
+    payment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    amount DECIMAL(10, 2) NOT NULL,
+    payment_date DATE,
+    status VARCHAR(20) DEFAULT 'Pending',
+    payment_method VARCHAR(50),
+    contract_id INT REFERENCES Contract(contract_id) ON DELETE SET NULL
+);
+CREATE INDEX idx_payment_contract ON Payment (contract_id);
+
+CREATE TABLE Review (
+    review_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    review_text TEXT,
+    rating INT CHECK (rating >= 1 AND rating <= 5),
+    student_id INT REFERENCES Student(student_id) ON DELETE CASCADE,
+    contract_id INT, -- Contract or Contract_Archive, so no foreign key
+    review_date DATE
+);
+CREATE INDEX idx_review_student_contract ON Review (student_id, contract_id);
+CREATE INDEX idx_review_contract ON Review (contract_id);
+
+CREATE TABLE Student_Rating_Summary (
+    student_id INT PRIMARY KEY REFERENCES Student(student_id) ON DELETE CASCADE,
+    review_count INT NOT NULL DEFAULT 0,
+    rating_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    avg_rating DECIMAL(3, 2) AS (CASE WHEN rating_count = 0 THEN 0.00
+                                      ELSE ROUND(CAST(rating_sum AS REAL) / rating_count, 2) END) STORED,
+    last_review_date DATE
+);
+
+CREATE TABLE Contract_Completion (
+    completion_token VARCHAR(64) PRIMARY KEY,
+    contract_id INT NOT NULL UNIQUE REFERENCES Contract(contract_id) ON DELETE CASCADE,
+    review_id INT,
+    payment_id INT,
+    completed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE Skill (
+    skill_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    skill_name VARCHAR(100) NOT NULL UNIQUE COLLATE NOCASE,
+    skill_description TEXT
+);
+
+CREATE TABLE Student_Skill (
+    student_id INT REFERENCES Student(student_id) ON DELETE CASCADE,
+    skill_id INT REFERENCES Skill(skill_id) ON DELETE CASCADE,
+    proficiency_level VARCHAR(12),
+    PRIMARY KEY (student_id, skill_id)
+);
+
+CREATE TABLE Project_Skill (
+    project_id INT REFERENCES Project(project_id) ON DELETE CASCADE,
+    skill_id INT REFERENCES Skill(skill_id) ON DELETE CASCADE,
+    min_proficiency VARCHAR(12) DEFAULT 'Beginner'
+        CHECK (min_proficiency IN ('Beginner', 'Intermediate', 'Advanced')),
+    PRIMARY KEY (project_id, skill_id)
+);
+
+-- Finished work moved out of the hot tables by archive_finished_work(); same
+-- columns plus archived_at and no foreign keys (see pesuconnect_schema.sql).
+CREATE TABLE Project_Archive (
+    project_id INTEGER PRIMARY KEY,
+    student_id INT,
+    title VARCHAR(100) NOT NULL,
+    description TEXT,
+    post_date DATE,
+    deadline DATE,
+    status VARCHAR(20),
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_project_archive_owner ON Project_Archive (student_id);
+
+CREATE TABLE Application_Archive (
+    application_id INTEGER PRIMARY KEY,
+    application_date DATE,
+    status VARCHAR(20),
+    student_id INT,
+    project_id INT,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_application_archive_project ON Application_Archive (project_id);
+
+CREATE TABLE Contract_Archive (
+    contract_id INTEGER PRIMARY KEY,
+    start_date DATE,
+    end_date DATE,
+    status VARCHAR(20),
+    student_id INT,
+    project_id INT,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_contract_archive_student ON Contract_Archive (student_id);
+CREATE INDEX idx_contract_archive_project ON Contract_Archive (project_id);
+
+CREATE TABLE Payment_Archive (
+    payment_id INTEGER PRIMARY KEY,
+    amount DECIMAL(10, 2) NOT NULL,
+    payment_date DATE,
+    status VARCHAR(20),
+    payment_method VARCHAR(50),
+    contract_id INT,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_payment_archive_contract ON Payment_Archive (contract_id);
+
+-- --- TRIGGERS ---
+
+CREATE TRIGGER trg_Validate_PESU_Email
+BEFORE INSERT ON Student
+WHEN NEW.email NOT LIKE '%@pesu.edu'
+BEGIN
+    SELECT RAISE(ABORT, 'Error: Registration is limited to @pesu.edu email addresses.');
+END;
+
+CREATE TRIGGER trg_Validate_Project_Deadline_INSERT
+BEFORE INSERT ON Project
+WHEN NEW.deadline <= CURDATE()
+BEGIN
+    SELECT RAISE(ABORT, 'Error: Project deadline must be in the future.');
+END;
+
+CREATE TRIGGER trg_Set_Project_Post_Date
+AFTER INSERT ON Project
+BEGIN
+    UPDATE Project SET post_date = CURDATE() WHERE project_id = NEW.project_id;
+END;
+
+-- Only a changed deadline is checked, so expired projects can still change status.
+CREATE TRIGGER trg_Validate_Project_Deadline_UPDATE
+BEFORE UPDATE ON Project
+WHEN NEW.deadline IS NOT OLD.deadline AND NEW.deadline <= CURDATE()
+BEGIN
+    SELECT RAISE(ABORT, 'Error: Project deadline must be in the future.');
+END;
+
+CREATE TRIGGER trg_Project_FTS_INSERT
+AFTER INSERT ON Project
+BEGIN
+    INSERT INTO Project_FTS (rowid, title, description) VALUES (NEW.project_id, NEW.title, NEW.description);
+END;
+
+CREATE TRIGGER trg_Project_FTS_UPDATE
+AFTER UPDATE OF title, description ON Project
+BEGIN
+    INSERT INTO Project_FTS (Project_FTS, rowid, title, description)
+    VALUES ('delete', OLD.project_id, OLD.title, OLD.description);
+    INSERT INTO Project_FTS (rowid, title, description) VALUES (NEW.project_id, NEW.title, NEW.description);
+END;
+
+CREATE TRIGGER trg_Project_FTS_DELETE
+AFTER DELETE ON Project
+BEGIN
+    INSERT INTO Project_FTS (Project_FTS, rowid, title, description)
+    VALUES ('delete', OLD.project_id, OLD.title, OLD.description);
+END;
+
+-- Own-project and closed-project checks from one Project lookup; duplicates
+-- are rejected by uq_application_student_project.
+CREATE TRIGGER trg_Validate_Application
+BEFORE INSERT ON Application
+BEGIN
+    SELECT CASE
+        WHEN student_id = NEW.student_id THEN RAISE(ABORT, 'Error: A student cannot apply to their own project.')
+        WHEN status != 'Open' THEN RAISE(ABORT, 'Error: This project is no longer open for applications.')
+    END
+    FROM Project WHERE project_id = NEW.project_id;
+END;
+
+CREATE TRIGGER trg_Validate_Skill_Proficiency_INSERT
+BEFORE INSERT ON Student_Skill
+WHEN NEW.proficiency_level NOT IN ('Beginner', 'Intermediate', 'Advanced')
+BEGIN
+    SELECT RAISE(ABORT, 'Error: Proficiency must be Beginner, Intermediate, or Advanced.');
+END;
+
+CREATE TRIGGER trg_Validate_Skill_Proficiency_UPDATE
+BEFORE UPDATE ON Student_Skill
+WHEN NEW.proficiency_level NOT IN ('Beginner', 'Intermediate', 'Advanced')
+BEGIN
+    SELECT RAISE(ABORT, 'Error: Proficiency must be Beginner, Intermediate, or Advanced.');
+END;
+
+CREATE TRIGGER trg_Validate_Payment_Amount
+BEFORE INSERT ON Payment
+WHEN NEW.amount <= 0
+BEGIN
+    SELECT RAISE(ABORT, 'Error: Payment amount must be greater than zero.');
+END;
+
+CREATE TRIGGER trg_Review_Summary_INSERT
+AFTER INSERT ON Review
+BEGIN
+    INSERT INTO Student_Rating_Summary (student_id, review_count, rating_count, rating_sum, last_review_date)
+    VALUES (NEW.student_id, 1, NEW.rating IS NOT NULL, COALESCE(NEW.rating, 0), NEW.review_date)
+    ON CONFLICT (student_id) DO UPDATE SET
+        review_count = review_count + 1,
+        rating_count = rating_count + (NEW.rating IS NOT NULL),
+        rating_sum = rating_sum + COALESCE(NEW.rating, 0),
+        last_review_date = CASE WHEN last_review_date IS NULL OR NEW.review_date > last_review_date
+                                THEN NEW.review_date ELSE last_review_date END;
+END;
+
+CREATE TRIGGER trg_Review_Summary_UPDATE
+AFTER UPDATE ON Review
+WHEN NOT (NEW.student_id IS OLD.student_id AND NEW.rating IS OLD.rating
+          AND NEW.review_date IS OLD.review_date)
+BEGIN
+    UPDATE Student_Rating_Summary
+    SET review_count = review_count - 1,
+        rating_count = rating_count - (OLD.rating IS NOT NULL),
+        rating_sum = rating_sum - COALESCE(OLD.rating, 0),
+        last_review_date = (SELECT MAX(review_date) FROM Review WHERE student_id = OLD.student_id)
+    WHERE student_id = OLD.student_id;
+
+    INSERT INTO Student_Rating_Summary (student_id, review_count, rating_count, rating_sum, last_review_date)
+    VALUES (NEW.student_id, 1, NEW.rating IS NOT NULL, COALESCE(NEW.rating, 0), NEW.review_date)
+    ON CONFLICT (student_id) DO UPDATE SET
+        review_count = review_count + 1,
+        rating_count = rating_count + (NEW.rating IS NOT NULL),
+        rating_sum = rating_sum + COALESCE(NEW.rating, 0),
+        last_review_date = (SELECT MAX(review_date) FROM Review WHERE student_id = NEW.student_id);
+END;
+
+CREATE TRIGGER trg_Review_Summary_DELETE
+AFTER DELETE ON Review
+BEGIN
+    UPDATE Student_Rating_Summary
+    SET review_count = review_count - 1,
+        rating_count = rating_count - (OLD.rating IS NOT NULL),
+        rating_sum = rating_sum - COALESCE(OLD.rating, 0),
+        last_review_date = (SELECT MAX(review_date) FROM Review WHERE student_id = OLD.student_id)
+    WHERE student_id = OLD.student_id;
+END;
+
+-- --- PAYMENT ROLLUPS ---
+-- Per-student, per-student-month and per-department payment totals, kept
+-- current by trg_Payment_Rollups_INSERT (see pesuconnect_schema.sql). Files
+-- created before this section get it on open, followed by a rebuild.
+CREATE INDEX idx_rating_summary_top ON Student_Rating_Summary (avg_rating, review_count);
+
+CREATE TABLE Student_Payment_Summary (
+    student_id INT PRIMARY KEY REFERENCES Student(student_id) ON DELETE CASCADE,
+    earned DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    earned_count INT NOT NULL DEFAULT 0,
+    spent DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    spent_count INT NOT NULL DEFAULT 0
+);
+CREATE INDEX idx_payment_summary_earned ON Student_Payment_Summary (earned);
+
+CREATE TABLE Student_Payment_Month (
+    student_id INT REFERENCES Student(student_id) ON DELETE CASCADE,
+    month DATE, -- the first day of the month of payment_date
+    earned DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    earned_count INT NOT NULL DEFAULT 0,
+    spent DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    spent_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (student_id, month)
+);
+
+CREATE TABLE Department_Payment_Summary (
+    department VARCHAR(50) PRIMARY KEY, -- '' for students without one
+    earned DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    earned_count INT NOT NULL DEFAULT 0,
+    spent DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    spent_count INT NOT NULL DEFAULT 0
+);
+
+-- Payments are only ever inserted (archiving moves them, and must not
+-- subtract from the rollups). ROUND keeps the REAL sums at cents.
+CREATE TRIGGER trg_Payment_Rollups_INSERT
+AFTER INSERT ON Payment
+BEGIN
+    INSERT INTO Student_Payment_Summary (student_id, earned, earned_count)
+    SELECT c.student_id, NEW.amount, 1
+    FROM Contract c
+    JOIN Project p ON p.project_id = c.project_id
+    JOIN Student fs ON fs.student_id = c.student_id
+    JOIN Student os ON os.student_id = p.student_id
+    WHERE c.contract_id = NEW.contract_id
+    ON CONFLICT (student_id) DO UPDATE SET
+        earned = ROUND(earned + excluded.earned, 2), earned_count = earned_count + 1;
+    INSERT INTO Student_Payment_Summary (student_id, spent, spent_count)
+    SELECT p.student_id, NEW.amount, 1
+    FROM Contract c
+    JOIN Project p ON p.project_id = c.project_id
+    JOIN Student fs ON fs.student_id = c.student_id
+    JOIN Student os ON os.student_id = p.student_id
+    WHERE c.contract_id = NEW.contract_id
+    ON CONFLICT (student_id) DO UPDATE SET
+        spent = ROUND(spent + excluded.spent, 2), spent_count = spent_count + 1;
+    INSERT INTO Department_Payment_Summary (department, earned, earned_count)
+    SELECT COALESCE(fs.department, ''), NEW.amount, 1
+    FROM Contract c
+    JOIN Project p ON p.project_id = c.project_id
+    JOIN Student fs ON fs.student_id = c.student_id
+    JOIN Student os ON os.student_id = p.student_id
+    WHERE c.contract_id = NEW.contract_id
+    ON CONFLICT (department) DO UPDATE SET
+        earned = ROUND(earned + excluded.earned, 2), earned_count = earned_count + 1;
+    INSERT INTO Department_Payment_Summary (department, spent, spent_count)
+    SELECT COALESCE(os.department, ''), NEW.amount, 1
+    FROM Contract c
+    JOIN Project p ON p.project_id = c.project_id
+    JOIN Student fs ON fs.student_id = c.student_id
+    JOIN Student os ON os.student_id = p.student_id
+    WHERE c.contract_id = NEW.contract_id
+    ON CONFLICT (department) DO UPDATE SET
+        spent = ROUND(spent + excluded.spent, 2), spent_count = spent_count + 1;
+    INSERT INTO Student_Payment_Month (student_id, month, earned, earned_count)
+    SELECT c.student_id, strftime('%Y-%m-01', NEW.payment_date), NEW.amount, 1
+    FROM Contract c
+    JOIN Project p ON p.project_id = c.project_id
+    JOIN Student fs ON fs.student_id = c.student_id
+    JOIN Student os ON os.student_id = p.student_id
+    WHERE c.contract_id = NEW.contract_id AND NEW.payment_date IS NOT NULL
+    ON CONFLICT (student_id, month) DO UPDATE SET
+        earned = ROUND(earned + excluded.earned, 2), earned_count = earned_count + 1;
+    INSERT INTO Student_Payment_Month (student_id, month, spent, spent_count)
+    SELECT p.student_id, strftime('%Y-%m-01', NEW.payment_date), NEW.amount, 1
+    FROM Contract c
+    JOIN Project p ON p.project_id = c.project_id
+    JOIN Student fs ON fs.student_id = c.student_id
+    JOIN Student os ON os.student_id = p.student_id
+    WHERE c.contract_id = NEW.contract_id AND NEW.payment_date IS NOT NULL
+    ON CONFLICT (student_id, month) DO UPDATE SET
+        spent = ROUND(spent + excluded.spent, 2), spent_count = spent_count + 1;
+END;
+
+-- --- ENTITY VERSIONS ---
+-- Change counters for the kinds of data the app caches, bumped by the
+-- trg_Version_* triggers in the same transaction as every write. A reader that
+-- remembers the counters it saw can tell from this small table whether anything
+-- it cached has changed (Repository.get_entity_versions).
+-- * scope > 0 is a student_id: writes that change what that student sees
+--   (their projects and the applications to them, their applications,
+--   contracts on either side, payments on those, reviews they received or
+--   wrote, their skills). Other students' writes leave it alone.
+-- * scope 0 to -15 are shards of the platform-wide counter, which is their
+--   sum; a write bumps the shard of its row id modulo 16, so concurrent
+--   writers rarely wait on the same row.
+-- Payments count as contract changes and Skill, Student_Skill and Project_Skill
+-- as skill changes.
+-- Existing database files get this section when they are opened.
+CREATE TABLE Entity_Version (
+    scope INT NOT NULL DEFAULT 0,
+    entity VARCHAR(32) NOT NULL,
+    version BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (scope, entity)
+);
+
+INSERT INTO Entity_Version (entity) VALUES ('projects'), ('applications'), ('contracts'), ('reviews'), ('skills');
+
+CREATE TRIGGER trg_Version_Project_INSERT AFTER INSERT ON Project
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'projects', 1 FROM (
+        SELECT -(NEW.project_id % 16) AS scope
+        UNION SELECT NEW.student_id
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Project_UPDATE AFTER UPDATE ON Project
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'projects', 1 FROM (
+        SELECT -(NEW.project_id % 16) AS scope
+        UNION SELECT NEW.student_id
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Project_DELETE AFTER DELETE ON Project
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'projects', 1 FROM (
+        SELECT -(OLD.project_id % 16) AS scope
+        UNION SELECT OLD.student_id
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Application_INSERT AFTER INSERT ON Application
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'applications', 1 FROM (
+        SELECT -(NEW.application_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = NEW.project_id)
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Application_UPDATE AFTER UPDATE ON Application
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'applications', 1 FROM (
+        SELECT -(NEW.application_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = NEW.project_id)
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Application_DELETE AFTER DELETE ON Application
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'applications', 1 FROM (
+        SELECT -(OLD.application_id % 16) AS scope
+        UNION SELECT OLD.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = OLD.project_id)
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Contract_INSERT AFTER INSERT ON Contract
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(NEW.contract_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = NEW.project_id)
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Contract_UPDATE AFTER UPDATE ON Contract
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(NEW.contract_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = NEW.project_id)
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Contract_DELETE AFTER DELETE ON Contract
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(OLD.contract_id % 16) AS scope
+        UNION SELECT OLD.student_id
+        UNION SELECT (SELECT student_id FROM Project WHERE project_id = OLD.project_id)
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Payment_INSERT AFTER INSERT ON Payment
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(NEW.payment_id % 16) AS scope
+        UNION SELECT (SELECT student_id FROM Contract WHERE contract_id = NEW.contract_id)
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = NEW.contract_id)
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Payment_UPDATE AFTER UPDATE ON Payment
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(NEW.payment_id % 16) AS scope
+        UNION SELECT (SELECT student_id FROM Contract WHERE contract_id = NEW.contract_id)
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = NEW.contract_id)
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Payment_DELETE AFTER DELETE ON Payment
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'contracts', 1 FROM (
+        SELECT -(OLD.payment_id % 16) AS scope
+        UNION SELECT (SELECT student_id FROM Contract WHERE contract_id = OLD.contract_id)
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = OLD.contract_id)
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Review_INSERT AFTER INSERT ON Review
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'reviews', 1 FROM (
+        SELECT -(NEW.review_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = NEW.contract_id)
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Review_UPDATE AFTER UPDATE ON Review
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'reviews', 1 FROM (
+        SELECT -(NEW.review_id % 16) AS scope
+        UNION SELECT NEW.student_id
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = NEW.contract_id)
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Review_DELETE AFTER DELETE ON Review
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'reviews', 1 FROM (
+        SELECT -(OLD.review_id % 16) AS scope
+        UNION SELECT OLD.student_id
+        UNION SELECT (SELECT p.student_id FROM Contract c JOIN Project p ON p.project_id = c.project_id WHERE c.contract_id = OLD.contract_id)
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Skill_INSERT AFTER INSERT ON Skill
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.skill_id % 16) AS scope
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Skill_UPDATE AFTER UPDATE ON Skill
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.skill_id % 16) AS scope
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Skill_DELETE AFTER DELETE ON Skill
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(OLD.skill_id % 16) AS scope
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Student_Skill_INSERT AFTER INSERT ON Student_Skill
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.student_id % 16) AS scope
+        UNION SELECT NEW.student_id
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Student_Skill_UPDATE AFTER UPDATE ON Student_Skill
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.student_id % 16) AS scope
+        UNION SELECT NEW.student_id
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Student_Skill_DELETE AFTER DELETE ON Student_Skill
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(OLD.student_id % 16) AS scope
+        UNION SELECT OLD.student_id
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Project_Skill_INSERT AFTER INSERT ON Project_Skill
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.project_id % 16) AS scope
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Project_Skill_UPDATE AFTER UPDATE ON Project_Skill
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(NEW.project_id % 16) AS scope
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER trg_Version_Project_Skill_DELETE AFTER DELETE ON Project_Skill
+BEGIN
+    INSERT INTO Entity_Version (scope, entity, version)
+    SELECT scope, 'skills', 1 FROM (
+        SELECT -(OLD.project_id % 16) AS scope
+    )
+    WHERE scope IS NOT NULL
+    ORDER BY scope
+    ON CONFLICT (scope, entity) DO UPDATE SET version = version + 1;
+END;
@@ -0,0 +1,50 @@
+import datetime
+import itertools
+
+import pytest
+
+from repository import SQLiteRepository
+
+
+class Campus:
+    """Builds students, projects and contracts through the public Repository API."""
+
+    def __init__(self, repo):
+        self.repo = repo
+        self._numbers = itertools.count(1)
+
+    def student(self, department="CSE"):
+        number = next(self._numbers)
+        email = f"student{number}@pesu.edu"
+        self.repo.register(f"Student {number}", email, "password", f"98000{number:05d}", department, 3)
+        return self.repo.login(email, "password")['student_id']
+
+    def project(self, owner_id, deadline=30, title=None, description="A project", skills=()):
+        """`deadline` is days from today, or None for a project without one."""
+        if deadline is not None:
+            deadline = datetime.date.today() + datetime.timedelta(days=deadline)
+        title = title or f"Project {next(self._numbers)}"
+        project_id, _ = self.repo.create_project(owner_id, title, description, deadline, skills)
+        return project_id
+
+    def contract(self, owner_id, freelancer_id, **project):
+        """Posts a project, has `freelancer_id` apply and accepts them; returns (project_id, contract_id)."""
+        project_id = self.project(owner_id, **project)
+        self.repo.apply_for_project(freelancer_id, project_id)
+        [application] = self.repo.get_pending_applications(project_id)
+        self.repo.accept_application(application['application_id'])
+        return project_id, self.repo._fetch_one(
+            "SELECT contract_id FROM Contract WHERE project_id = ?", (project_id,)
+        )['contract_id']
+
+
+@pytest.fixture
+def repo():
+    repo = SQLiteRepository(":memory:")
+    yield repo
+    repo.close()
+
+
+@pytest.fixture
+def campus(repo):
+    return Campus(repo)
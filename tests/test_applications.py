@@ -0,0 +1,60 @@
+import pytest
+
+from repository import RepositoryError
+from repository.base import DUPLICATE_APPLICATION_MESSAGE, OWN_PROJECT_MESSAGE, PROJECT_CLOSED_MESSAGE
+
+
+def test_batch_apply_decides_each_project_once(repo, campus):
+    owner, applicant, other = campus.student(), campus.student(), campus.student()
+    open_project = campus.project(owner)
+    already_applied = campus.project(owner)
+    repo.apply_for_project(applicant, already_applied)
+    own_project = campus.project(applicant)
+    taken_project, _ = campus.contract(owner, other)
+    missing_project = 10_000
+
+    outcomes = repo.apply_for_projects(
+        applicant, [open_project, own_project, open_project, missing_project, already_applied, taken_project]
+    )
+
+    assert [(o['project_id'], o['outcome'], o['message']) for o in outcomes] == [
+        (open_project, 'applied', ''),
+        (own_project, 'rejected', OWN_PROJECT_MESSAGE),
+        (missing_project, 'rejected', "Error: This project does not exist."),
+        (already_applied, 'rejected', DUPLICATE_APPLICATION_MESSAGE),
+        (taken_project, 'rejected', PROJECT_CLOSED_MESSAGE),
+    ]
+    assert repo.get_applied_project_ids(applicant) == {open_project, already_applied}
+    assert [a['applicant_id'] for a in repo.get_pending_applications(open_project)] == [applicant]
+
+
+def test_batch_apply_again_is_rejected_as_duplicate(repo, campus):
+    owner, applicant = campus.student(), campus.student()
+    projects = [campus.project(owner) for _ in range(3)]
+
+    assert {o['outcome'] for o in repo.apply_for_projects(applicant, projects)} == {'applied'}
+    again = repo.apply_for_projects(applicant, projects)
+
+    assert {(o['outcome'], o['message']) for o in again} == {('rejected', DUPLICATE_APPLICATION_MESSAGE)}
+    assert sum(len(apps) for apps in repo.get_pending_applications_by_project(projects).values()) == 3
+
+
+def test_empty_batch(repo, campus):
+    assert repo.apply_for_projects(campus.student(), []) == []
+
+
+def test_single_duplicate_application_hits_the_unique_key(repo, campus):
+    owner, applicant = campus.student(), campus.student()
+    project = campus.project(owner)
+    repo.apply_for_project(applicant, project)
+
+    with pytest.raises(RepositoryError, match="already applied"):
+        repo.apply_for_project(applicant, project)
+    assert len(repo.get_pending_applications(project)) == 1
+
+
+def test_single_application_to_own_project_is_rejected(repo, campus):
+    owner = campus.student()
+
+    with pytest.raises(RepositoryError, match="own project"):
+        repo.apply_for_project(owner, campus.project(owner))
@@ -0,0 +1,56 @@
+from decimal import Decimal
+
+import pytest
+
+from repository import RepositoryError
+
+
+def complete(repo, contract_id, owner_id, token, rating=5, amount=Decimal("1500.00")):
+    return repo.complete_contract_with_review(contract_id, owner_id, rating, "Great work", amount, "UPI", token)
+
+
+def test_replaying_the_completion_token_returns_the_first_result(repo, campus):
+    owner, freelancer = campus.student(), campus.student()
+    project_id, contract_id = campus.contract(owner, freelancer)
+
+    first = complete(repo, contract_id, owner, "token-1")
+    replay = complete(repo, contract_id, owner, "token-1", rating=1, amount=Decimal("1.00"))
+
+    assert first['already_completed'] is False
+    assert replay == dict(first, already_completed=True)
+    assert repo.get_rating_stats(freelancer)['count'] == 1
+    assert repo.get_rating_stats(freelancer)['avg'] == 5
+    assert [r['rating'] for r in repo.get_reviews_received(freelancer)] == [5]
+    assert repo.get_payment_analytics(freelancer)['totals']['earned_count'] == 1
+    assert [p['status'] for p in repo.get_my_projects(owner) if p['project_id'] == project_id] == ['Completed']
+
+
+def test_a_new_token_cannot_complete_the_contract_again(repo, campus):
+    owner, freelancer = campus.student(), campus.student()
+    _, contract_id = campus.contract(owner, freelancer)
+    complete(repo, contract_id, owner, "token-1")
+
+    with pytest.raises(RepositoryError, match="already been completed"):
+        complete(repo, contract_id, owner, "token-2")
+    assert repo.get_rating_stats(freelancer)['count'] == 1
+
+
+def test_a_token_belongs_to_one_contract(repo, campus):
+    owner, freelancer = campus.student(), campus.student()
+    _, first_contract = campus.contract(owner, freelancer)
+    _, second_contract = campus.contract(owner, freelancer)
+    complete(repo, first_contract, owner, "token-1")
+
+    with pytest.raises(RepositoryError, match="another contract"):
+        complete(repo, second_contract, owner, "token-1")
+    assert complete(repo, second_contract, owner, "token-2")['already_completed'] is False
+
+
+def test_only_the_owner_can_complete(repo, campus):
+    owner, freelancer = campus.student(), campus.student()
+    _, contract_id = campus.contract(owner, freelancer)
+
+    with pytest.raises(RepositoryError, match="Only the project owner"):
+        complete(repo, contract_id, freelancer, "token-1")
+    # The failed attempt recorded nothing, so the token is still free.
+    assert complete(repo, contract_id, owner, "token-1")['already_completed'] is False
@@ -0,0 +1,97 @@
+import sqlite3
+
+from repository import SQLiteRepository
+from repository.sqlite_repo import SCHEMA_PATH
+from tests.conftest import Campus
+
+ENTITIES = ('projects', 'applications', 'contracts', 'reviews', 'skills')
+
+
+def changes(repo, student_ids, write):
+    """{student_id or 'platform': {entities whose counter moved}} over `write`.
+
+    Only which counters moved is compared, not by how much: on SQLite the post_date trigger
+    updates every new Project row, so posting a project bumps 'projects' twice.
+    """
+    def snapshot():
+        return {student_id: repo.get_entity_versions(student_id) for student_id in student_ids}
+
+    before = snapshot()
+    write()
+    after = snapshot()
+    moved = {}
+    for student_id in student_ids:
+        for key, version in after[student_id].items():
+            scope = 'platform' if isinstance(key, str) else student_id
+            entity = key if isinstance(key, str) else key[0]
+            if version != before[student_id][key]:
+                moved.setdefault(scope, set()).add(entity)
+    return moved
+
+
+def test_every_entity_has_a_platform_and_a_student_counter(repo, campus):
+    student_id = campus.student()
+    versions = repo.get_entity_versions(student_id)
+
+    assert set(versions) == set(ENTITIES) | {(entity, student_id) for entity in ENTITIES}
+    assert set(repo.get_entity_versions()) == set(ENTITIES)
+
+
+def test_a_write_bumps_only_the_students_it_affects(repo, campus):
+    owner, applicant, bystander = campus.student(), campus.student(), campus.student()
+    project_id = campus.project(owner)
+
+    moved = changes(repo, [owner, applicant, bystander], lambda: repo.apply_for_project(applicant, project_id))
+
+    assert moved == {'platform': {'applications'}, owner: {'applications'}, applicant: {'applications'}}
+
+
+def test_completing_a_contract_reaches_both_sides(repo, campus):
+    owner, freelancer, bystander = campus.student(), campus.student(), campus.student()
+    _, contract_id = campus.contract(owner, freelancer)
+
+    moved = changes(repo, [owner, freelancer, bystander], lambda: repo.complete_contract_with_review(
+        contract_id, owner, 5, "Great", 100, "UPI", "token-1"))
+
+    assert bystander not in moved
+    assert moved[owner] == {'projects', 'contracts', 'reviews'}  # the project is now Completed
+    assert moved[freelancer] == {'contracts', 'reviews'}
+    assert moved['platform'] == {'projects', 'contracts', 'reviews'}
+
+
+def test_platform_counters_sum_their_shards(repo, campus):
+    owner = campus.student()
+    for _ in range(20):
+        campus.project(owner)
+
+    shards = repo._fetch_all("SELECT version FROM Entity_Version WHERE entity = 'projects' AND scope <= 0")
+    assert len(shards) == 16
+    assert repo.get_entity_versions()['projects'] == sum(row['version'] for row in shards) > 0
+
+
+def test_a_file_with_global_counters_is_upgraded_when_opened(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    with sqlite3.connect(path) as conn:  # the Entity_Version of migration 003: one global row per entity
+        with open(SCHEMA_PATH) as f:
+            conn.executescript(f.read())
+        triggers = [name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_Version_%'")]
+        conn.executescript("".join(f"DROP TRIGGER {name};" for name in triggers) + """
+            DROP TABLE Entity_Version;
+            CREATE TABLE Entity_Version (entity VARCHAR(32) PRIMARY KEY, version BIGINT NOT NULL DEFAULT 0);
+            INSERT INTO Entity_Version (entity) VALUES ('projects');
+            CREATE TRIGGER trg_Version_Project_INSERT AFTER INSERT ON Project
+            BEGIN
+                UPDATE Entity_Version SET version = version + 1 WHERE entity = 'projects';
+            END;
+        """)
+
+    repo = SQLiteRepository(path)
+    try:
+        columns = [row['name'] for row in repo._fetch_all("PRAGMA table_info(Entity_Version)")]
+        assert columns == ['scope', 'entity', 'version']
+        student_id = Campus(repo).student()
+        moved = changes(repo, [student_id], lambda: Campus(repo).project(student_id))
+        assert moved == {'platform': {'projects'}, student_id: {'projects'}}
+    finally:
+        repo.close()
@@ -0,0 +1,80 @@
+import csv
+import io
+from decimal import Decimal
+
+import pytest
+
+from history_export import export_history
+from repository import HISTORY_COLUMNS
+
+
+@pytest.fixture
+def history(repo, campus):
+    """Two freelancers paid by one owner, one of the contracts archived; returns the student ids."""
+    owner, freelancer, other = campus.student(), campus.student(), campus.student()
+    for number, (student, amount) in enumerate([(freelancer, "1200.00"), (freelancer, "99.99"), (other, "450.50")]):
+        project_id, contract_id = campus.contract(owner, student)
+        repo.complete_contract_with_review(contract_id, owner, 5 - number, f"Review, \"{number}\"\nline two",
+                                           Decimal(amount), "UPI", f"token-{number}")
+        if number == 0:
+            with repo.conn:
+                repo.conn.execute("UPDATE Contract SET end_date = date('now', '-400 days') WHERE project_id = ?",
+                                  (project_id,))
+            assert repo.archive_finished_work(retention_days=180)['contracts'] == 1
+    _, in_progress = campus.contract(owner, other)
+    return {'owner': owner, 'freelancer': freelancer, 'other': other}
+
+
+def streamed_rows(repo, kind, student_id=None):
+    return [row for chunk in repo.iter_history(kind, student_id) for row in chunk]
+
+
+@pytest.mark.parametrize('kind', sorted(HISTORY_COLUMNS))
+def test_csv_round_trip(repo, history, kind):
+    sink = io.BytesIO()
+
+    count = export_history(repo, kind, 'csv', sink, chunk_size=2)
+
+    header, *rows = csv.reader(io.StringIO(sink.getvalue().decode()))
+    expected = streamed_rows(repo, kind)
+    assert header == list(HISTORY_COLUMNS[kind])
+    assert count == len(rows) == len(expected) > 0
+    assert rows == [['' if value is None else str(value) for value in row] for row in expected]
+
+
+@pytest.mark.parametrize('kind', sorted(HISTORY_COLUMNS))
+def test_parquet_round_trip(repo, history, kind):
+    pq = pytest.importorskip("pyarrow.parquet")
+    sink = io.BytesIO()
+
+    count = export_history(repo, kind, 'parquet', sink, chunk_size=2)
+
+    sink.seek(0)
+    table = pq.read_table(sink)
+    expected = streamed_rows(repo, kind)
+    assert table.column_names == list(HISTORY_COLUMNS[kind])
+    assert count == table.num_rows == len(expected)
+    assert pq.ParquetFile(io.BytesIO(sink.getvalue())).num_row_groups == -(-len(expected) // 2)
+    assert [tuple(row.values()) for row in table.to_pylist()] == [tuple(row) for row in expected]
+
+
+def test_payments_export_covers_live_and_archived_rows(repo, history):
+    sink = io.BytesIO()
+
+    export_history(repo, 'payments', 'csv', sink, student_id=history['freelancer'])
+
+    rows = list(csv.DictReader(io.StringIO(sink.getvalue().decode())))
+    assert sorted((row['amount'], row['archived']) for row in rows) == [('1200.00', '1'), ('99.99', '0')]
+    assert {row['freelancer_id'] for row in rows} == {str(history['freelancer'])}
+
+
+def test_empty_history_is_just_the_header(repo, campus):
+    sink = io.BytesIO()
+
+    assert export_history(repo, 'payments', 'csv', sink, student_id=campus.student()) == 0
+    assert sink.getvalue().decode().splitlines() == [",".join(HISTORY_COLUMNS['payments'])]
+
+
+def test_unknown_format_is_refused(repo):
+    with pytest.raises(ValueError):
+        export_history(repo, 'payments', 'xml', io.BytesIO())
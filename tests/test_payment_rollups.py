@@ -0,0 +1,69 @@
+from decimal import Decimal
+
+
+def finish(repo, campus, owner, freelancer, amount, token):
+    """A contract completed and paid, returned as its project id."""
+    project_id, contract_id = campus.contract(owner, freelancer)
+    repo.complete_contract_with_review(contract_id, owner, 4, "Good", Decimal(amount), "UPI", token)
+    return project_id
+
+
+def backdate(repo, project_id, days):
+    """Moves a finished contract's end date back, past the archive's retention window."""
+    with repo.conn:
+        repo.conn.execute(
+            "UPDATE Contract SET end_date = date('now', ?) WHERE project_id = ?", (f"-{days} days", project_id)
+        )
+
+
+def test_rollups_match_the_payments_after_archiving(repo, campus):
+    owner, freelancer = campus.student("ECE"), campus.student("CSE")
+    old = finish(repo, campus, owner, freelancer, "1200.00", "token-1")
+    finish(repo, campus, owner, freelancer, "800.50", "token-2")
+    before = (repo.get_payment_analytics(freelancer)['totals'], repo.get_payment_analytics(owner)['totals'])
+    assert repo.verify_payment_rollups() == []
+
+    backdate(repo, old, 400)
+    moved = repo.archive_finished_work(retention_days=180)
+
+    assert moved == {'projects': 1, 'applications': 1, 'contracts': 1, 'payments': 1}
+    assert repo.archive_finished_work(retention_days=180)['projects'] == 0
+    assert repo.verify_payment_rollups() == []
+    after = (repo.get_payment_analytics(freelancer)['totals'], repo.get_payment_analytics(owner)['totals'])
+    assert after == before
+    assert after[0]['earned'] == Decimal("2000.50") and after[0]['earned_count'] == 2
+    assert after[1]['spent'] == Decimal("2000.50") and after[1]['spent_count'] == 2
+
+
+def test_rebuild_after_archiving_reproduces_the_rollups(repo, campus):
+    owner, freelancer = campus.student(), campus.student()
+    old = finish(repo, campus, owner, freelancer, "300.00", "token-1")
+    finish(repo, campus, owner, freelancer, "700.00", "token-2")
+    backdate(repo, old, 400)
+    repo.archive_finished_work(retention_days=180)
+    totals = repo.get_payment_analytics(freelancer)['totals']
+
+    repo.rebuild_payment_rollups()
+
+    assert repo.verify_payment_rollups() == []
+    assert repo.get_payment_analytics(freelancer)['totals'] == totals
+
+
+def test_verify_reports_drift_and_rebuild_repairs_it(repo, campus):
+    owner, freelancer = campus.student(), campus.student()
+    old = finish(repo, campus, owner, freelancer, "500.00", "token-1")
+    backdate(repo, old, 400)
+    repo.archive_finished_work(retention_days=180)
+    with repo.conn:
+        repo.conn.execute(
+            "UPDATE Student_Payment_Summary SET earned = earned - 100, earned_count = 0 WHERE student_id = ?",
+            (freelancer,),
+        )
+
+    drift = repo.verify_payment_rollups()
+
+    assert [(row['rollup'], row['rollup_key'], row['earned'], row['earned_count']) for row in drift] == [
+        ('student', freelancer, Decimal("100.00"), 1),
+    ]
+    repo.rebuild_payment_rollups()
+    assert repo.verify_payment_rollups() == []
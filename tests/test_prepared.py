@@ -0,0 +1,148 @@
+import mysql.connector
+import pytest
+from mysql.connector import errorcode
+
+from instrumentation import InstrumentedRepository, Metrics
+from repository import MySQLRepository, RepositoryError
+from repository.prepared import STATEMENTS, prepared_statement_stats
+
+
+class FakeCursor:
+    def __init__(self, conn, prepared):
+        self.conn = conn
+        self.prepared = prepared
+        self.rows = []
+
+    def execute(self, operation, params=()):
+        self.conn.executed.append((self.prepared, operation, tuple(params)))
+        if self.conn.failures:
+            raise mysql.connector.Error(errno=self.conn.failures.pop(0))
+        self.rows = self.conn.results.get(operation, [])
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Just enough of a mysql.connector connection for the prepared-statement registry."""
+
+    def __init__(self):
+        self.connection_id = 1
+        self.in_transaction = False
+        self.failures = []  # errnos the next executes raise, in order
+        self.results = {STATEMENTS['skill_catalog']: [{'skill_name': "Python"}, {'skill_name': "SQL"}]}
+        self.executed = []
+        self.cursors = []
+
+    def cursor(self, prepared=False, dictionary=False):
+        cursor = FakeCursor(self, prepared)
+        self.cursors.append(cursor)
+        return cursor
+
+    def reconnect(self):
+        self.connection_id += 1
+
+    def prepared_cursors(self):
+        return sum(cursor.prepared for cursor in self.cursors)
+
+
+def counters_since(before):
+    after = prepared_statement_stats()
+    return {name: after[name] - before[name] for name in ('prepares', 'executions', 'reprepares', 'reconnects')}
+
+
+def test_statement_is_prepared_once_per_connection():
+    conn = FakeConnection()
+    repo = MySQLRepository(conn, prepared=True)
+    before = prepared_statement_stats()
+
+    for _ in range(5):
+        assert repo.get_skill_catalog() == ["Python", "SQL"]
+
+    assert conn.prepared_cursors() == 1
+    assert all(operation is STATEMENTS['skill_catalog'] for _, operation, _ in conn.executed)
+    assert counters_since(before) == {'prepares': 1, 'executions': 5, 'reprepares': 0, 'reconnects': 0}
+
+
+@pytest.mark.parametrize('errno', [errorcode.ER_UNKNOWN_STMT_HANDLER, errorcode.ER_NEED_REPREPARE])
+def test_statement_lost_on_the_server_is_prepared_again_once(errno):
+    conn = FakeConnection()
+    repo = MySQLRepository(conn, prepared=True)
+    repo.get_skill_catalog()
+    before = prepared_statement_stats()
+
+    conn.failures = [errno]
+    assert repo.get_skill_catalog() == ["Python", "SQL"]
+    assert repo.get_skill_catalog() == ["Python", "SQL"]
+
+    assert conn.prepared_cursors() == 2
+    assert counters_since(before) == {'prepares': 1, 'executions': 2, 'reprepares': 1, 'reconnects': 0}
+
+
+def test_lost_connection_is_reported_and_prepared_again_once_after_reconnect():
+    conn = FakeConnection()
+    repo = MySQLRepository(conn, prepared=True)
+    repo.get_skill_catalog()
+    before = prepared_statement_stats()
+
+    conn.failures = [errorcode.CR_SERVER_LOST]
+    with pytest.raises(RepositoryError):
+        repo.get_skill_catalog()
+    conn.reconnect()  # what the pool's ping(reconnect=True) does before the next checkout
+    assert repo.get_skill_catalog() == ["Python", "SQL"]
+    assert repo.get_skill_catalog() == ["Python", "SQL"]
+
+    assert conn.prepared_cursors() == 2
+    assert counters_since(before) == {'prepares': 1, 'executions': 2, 'reprepares': 0, 'reconnects': 0}
+
+
+def test_reconnect_drops_every_statement_of_the_old_session():
+    conn = FakeConnection()
+    repo = MySQLRepository(conn, prepared=True)
+    repo.get_skill_catalog()
+    repo.get_applied_project_ids(7)
+    before = prepared_statement_stats()
+
+    conn.reconnect()
+    repo.get_skill_catalog()
+    repo.get_skill_catalog()
+
+    assert counters_since(before) == {'prepares': 1, 'executions': 2, 'reprepares': 0, 'reconnects': 1}
+
+
+def test_plain_text_is_the_default():
+    conn = FakeConnection()
+    repo = MySQLRepository(conn)
+    before = prepared_statement_stats()
+
+    assert repo.get_skill_catalog() == ["Python", "SQL"]
+    assert repo.get_applied_project_ids(7) == set()
+
+    assert conn.prepared_cursors() == 0
+    assert [(prepared, params) for prepared, _, params in conn.executed] == [(False, ()), (False, (7,))]
+    assert counters_since(before) == {'prepares': 0, 'executions': 0, 'reprepares': 0, 'reconnects': 0}
+
+
+def test_plain_text_reports_errors_without_retrying():
+    conn = FakeConnection()
+    repo = MySQLRepository(conn)
+    conn.failures = [errorcode.ER_UNKNOWN_STMT_HANDLER]
+
+    with pytest.raises(RepositoryError):
+        repo.get_skill_catalog()
+    assert len(conn.executed) == 1
+
+
+def test_instrumentation_counts_the_reset_and_prepare_round_trips():
+    prepared = InstrumentedRepository(MySQLRepository(FakeConnection(), prepared=True), Metrics())
+    plain = InstrumentedRepository(MySQLRepository(FakeConnection()), Metrics())
+
+    for repo in (prepared, plain):
+        repo.get_skill_catalog()
+        repo.get_skill_catalog()
+
+    assert plain.round_trips == 2
+    assert prepared.round_trips == 2 + 2 + 1  # an execute and a reset each, one prepare
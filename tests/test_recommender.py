@@ -0,0 +1,92 @@
+import pytest
+
+from recommender import ProjectSkillMatrix
+
+PYTHON, SQL, REACT, DOCKER = 1, 2, 3, 4
+
+# (project_id, owner_id, skill_id, min_proficiency)
+ROWS = [
+    (10, 100, PYTHON, 2), (10, 100, SQL, 2),  # Python met, SQL half met
+    (11, 101, PYTHON, 1),                     # fully met
+    (12, 102, REACT, 3),                      # no shared skill
+    (13, 103, PYTHON, 3), (13, 103, DOCKER, 1),
+]
+STUDENT = {PYTHON: 'Intermediate', SQL: 'Beginner'}
+
+
+def ranking(matrix, **kwargs):
+    return [(r['project_id'], pytest.approx(r['score']), r['matched_skills']) for r in matrix.top_k(STUDENT, **kwargs)]
+
+
+def rows_without(*project_ids):
+    return [row for row in ROWS if row[0] not in project_ids]
+
+
+def test_scores_partial_proficiency_and_skips_unrelated_projects():
+    matrix = ProjectSkillMatrix(ROWS)
+
+    assert ranking(matrix) == [(11, 1.0, 1), (10, 0.75, 2), (13, 1 / 3, 1)]
+    assert ranking(matrix, k=2) == [(11, 1.0, 1), (10, 0.75, 2)]
+    assert matrix.top_k({}) == [] and matrix.top_k(STUDENT, k=0) == []
+
+
+def test_excludes_own_and_applied_projects():
+    matrix = ProjectSkillMatrix(ROWS)
+
+    assert [r[0] for r in ranking(matrix, exclude_owner=101, exclude_projects={13})] == [10]
+
+
+def test_added_project_is_ranked_on_the_next_query():
+    matrix = ProjectSkillMatrix(ROWS)
+    matrix.top_k(STUDENT)
+
+    matrix.add_project(14, 104, [(PYTHON, 'Beginner'), (SQL, 'Beginner')])
+
+    assert len(matrix) == 5
+    # Equal scores: more matched skills first.
+    assert ranking(matrix)[:2] == [(14, 1.0, 2), (11, 1.0, 1)]
+
+
+def test_adding_an_existing_project_replaces_its_requirements():
+    matrix = ProjectSkillMatrix(ROWS)
+
+    matrix.add_project(10, 100, [(PYTHON, 'Advanced')])
+
+    assert len(matrix) == 4
+    assert ranking(matrix) == [(11, 1.0, 1), (10, 2 / 3, 1), (13, 1 / 3, 1)]
+
+
+def test_removed_project_is_left_out_before_compaction():
+    matrix = ProjectSkillMatrix(ROWS + [(14, 104, PYTHON, 1), (15, 105, SQL, 1)])
+
+    matrix.remove_project(11)  # one dead row in six: below the compaction threshold
+
+    ranked = [r[0] for r in ranking(matrix)]
+    assert set(ranked[:2]) == {14, 15} and ranked[2:] == [10, 13]  # 14 and 15 tie
+    assert len(matrix) == 5 and len(matrix._project_ids) == 6
+
+
+def test_compaction_keeps_the_ranking_of_a_fresh_build():
+    matrix = ProjectSkillMatrix(ROWS)
+
+    matrix.remove_project(11)
+    matrix.remove_project(12)
+    after_removal = ranking(matrix)
+
+    assert len(matrix._project_ids) == 2  # half the rows were dead: compacted away
+    assert after_removal == ranking(ProjectSkillMatrix(rows_without(11, 12))) == [(10, 0.75, 2), (13, 1 / 3, 1)]
+
+    # Rows are renumbered by the compaction; later edits must land on the right ones.
+    matrix.add_project(16, 106, [(SQL, 'Beginner')])
+    matrix.remove_project(10)
+    assert ranking(matrix) == [(16, 1.0, 1), (13, 1 / 3, 1)]
+
+
+def test_removing_a_pending_project_drops_it():
+    matrix = ProjectSkillMatrix(ROWS)
+    matrix.add_project(14, 104, [(PYTHON, 'Beginner')])
+
+    matrix.remove_project(14)
+
+    assert len(matrix) == 4
+    assert 14 not in [r[0] for r in ranking(matrix)]
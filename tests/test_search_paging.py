@@ -0,0 +1,67 @@
+import datetime
+
+from repository.base import NO_DEADLINE, next_page_cursor
+
+
+def page_through(repo, page_size, **filters):
+    """Every page of search_projects_page, following the cursors until there is none."""
+    pages, after = [], None
+    while True:
+        projects, after = repo.search_projects_page(after=after, page_size=page_size, **filters)
+        pages.append([project['project_id'] for project in projects])
+        if after is None:
+            return pages
+        assert len(pages) < 100, "the cursor stopped advancing"
+
+
+def test_pages_cover_every_open_project_once_in_deadline_order(repo, campus):
+    owner = campus.student()
+    dated = [campus.project(owner, deadline=days) for days in (40, 10, 10, 25, 5)]
+    undated = [campus.project(owner, deadline=None) for _ in range(4)]
+
+    pages = page_through(repo, page_size=2)
+
+    assert [len(page) for page in pages] == [2, 2, 2, 2, 1]
+    seen = [project_id for page in pages for project_id in page]
+    by_deadline = [dated[4], dated[1], dated[2], dated[3], dated[0]]  # ties by project_id
+    assert seen == by_deadline + undated  # undated projects last
+
+
+def test_page_ending_on_an_undated_project_continues_after_it(repo, campus):
+    owner = campus.student()
+    campus.project(owner, deadline=3)
+    first_undated, second_undated = campus.project(owner, deadline=None), campus.project(owner, deadline=None)
+
+    projects, after = repo.search_projects_page(page_size=2)
+    assert after == (NO_DEADLINE, first_undated)
+
+    projects, after = repo.search_projects_page(after=after, page_size=2)
+    assert [project['project_id'] for project in projects] == [second_undated]
+    assert after is None
+
+
+def test_only_undated_projects(repo, campus):
+    owner = campus.student()
+    undated = [campus.project(owner, deadline=None) for _ in range(5)]
+
+    assert page_through(repo, page_size=2) == [undated[:2], undated[2:4], undated[4:]]
+
+
+def test_filters_apply_on_every_page(repo, campus):
+    owner, freelancer = campus.student(), campus.student()
+    soon = campus.project(owner, deadline=5, title="Dashboard soon")
+    campus.project(owner, deadline=None, title="Dashboard someday")
+    campus.project(owner, deadline=8, title="Scraper")
+    campus.contract(owner, freelancer, deadline=6, title="Dashboard taken")  # In Progress, not Open
+
+    before = datetime.date.today() + datetime.timedelta(days=20)
+    assert page_through(repo, page_size=1, keyword="Dashboard", deadline_before=before) == [[soon]]
+    assert len([p for page in page_through(repo, page_size=1, keyword="Dashboard") for p in page]) == 2
+
+
+def test_cursor_uses_the_sort_key_of_a_missing_deadline():
+    projects = [{'project_id': 1, 'deadline': datetime.date(2030, 1, 1)}, {'project_id': 2, 'deadline': None},
+                {'project_id': 3, 'deadline': None}]
+
+    assert next_page_cursor(projects, 2) == (projects[:2], (NO_DEADLINE, 2))
+    assert next_page_cursor(projects, 3) == (projects, None)
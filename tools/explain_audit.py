@@ -0,0 +1,295 @@
+"""Runs EXPLAIN on every SQL statement the MySQL repository can issue.
+
+Statements are collected statically, so nothing is executed against your data:
+
+* SQL passed to cursor.execute()/executemany() inside the functions and
+  methods of the given Python sources (repository/mysql_repo.py by default),
+  and the named statements in a module-level STATEMENTS dict
+  (repository/prepared.py);
+* the statements inside every stored procedure those functions callproc();
+* the statements inside stored functions referenced by any of the above;
+* the statements inside triggers on the tables those statements write to.
+
+Procedure and trigger bodies are read from pesuconnect_schema.sql. Parameters
+and local variables are replaced by sample literals of the declared type.
+
+Each plan row is flagged when it shows a full table scan (type ALL), a full
+index scan (type index), a filesort or a temporary table. The exit status is 1
+if anything was flagged, so this can gate a deploy:
+
+    python -m tools.explain_audit
+    python -m tools.explain_audit --min-rows 1000 --allow Skill
+
+Run it against a database with representative data (see migrations/ for the
+index plan): on near-empty tables MySQL prefers scans even when an index exists.
+"""
+import argparse
+import ast
+import json
+import re
+import sys
+
+import mysql.connector
+
+from db_config import load_db_config
+
+SAMPLE_LITERALS = {
+    'INT': "1",
+    'DECIMAL': "1",
+    'DATE': "CURDATE()",
+}
+DEFAULT_LITERAL = "'1'"
+
+STATEMENT_START = re.compile(r"(?im)^\s*(SELECT|INSERT|UPDATE|DELETE|REPLACE|WITH)\b")
+SELECT_INTO = re.compile(r"(?i)\bINTO\s+(?:v_\w+|@\w+)(?:\s*,\s*(?:v_\w+|@\w+))*")
+WRITE_TARGET = re.compile(
+    r"(?i)\b(?:(INSERT)\s+(?:IGNORE\s+)?INTO|(REPLACE)\s+INTO|(UPDATE)|(DELETE)\s+FROM)\s+`?(\w+)`?"
+)
+FUNCTION_CALL = re.compile(r"\b(fn_\w+)\s*\(")
+ROUTINE = re.compile(
+    r"(?is)CREATE\s+(PROCEDURE|FUNCTION|TRIGGER)\s+(\w+)(.*?)\bBEGIN\b(.*?)\bEND\s*//"
+)
+
+
+# --- COLLECTING STATEMENTS ---
+
+def _string_value(node, local_strings):
+    """Returns the SQL text an AST node evaluates to, or None if it isn't static."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        # f-strings are used to expand IN (...) placeholder lists.
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.Constant):
+                parts.append(value.value)
+            else:
+                parts.append("%s")
+        return "".join(parts)
+    if isinstance(node, ast.Name):
+        return local_strings.get(node.id)
+    return None
+
+
+def collect_python_statements(paths, prefix):
+    """Finds execute() SQL and callproc() names in functions starting with `prefix`,
+    and the SQL of module-level STATEMENTS dicts."""
+    statements = []  # (source, sql)
+    procedures = []  # (source, procedure name)
+    for path in paths:
+        with open(path) as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in tree.body:
+            if (isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name)
+                    and node.targets[0].id == 'STATEMENTS' and isinstance(node.value, ast.Dict)):
+                for key, value in zip(node.value.keys, node.value.values):
+                    sql = _string_value(value, {})
+                    if sql and isinstance(key, ast.Constant):
+                        statements.append((f"STATEMENTS[{key.value!r}]", sql))
+        for func in ast.walk(tree):
+            if not isinstance(func, ast.FunctionDef) or not func.name.startswith(prefix):
+                continue
+            local_strings = {}
+            for node in ast.walk(func):
+                if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                    value = _string_value(node.value, local_strings)
+                    if value is not None:
+                        local_strings[node.targets[0].id] = value
+            for node in ast.walk(func):
+                if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.args):
+                    continue
+                if node.func.attr in ('execute', 'executemany'):
+                    sql = _string_value(node.args[0], local_strings)
+                    if sql:
+                        statements.append((func.name, sql))
+                elif node.func.attr == 'callproc':
+                    name = _string_value(node.args[0], local_strings)
+                    if name:
+                        procedures.append((func.name, name))
+    return statements, procedures
+
+
+def _strip_comments(sql):
+    return re.sub(r"--[^\n]*", "", sql)
+
+
+def parse_routines(schema_path):
+    """Returns {name: routine} for every procedure, function and trigger in the schema."""
+    with open(schema_path) as f:
+        schema = _strip_comments(f.read())
+    routines = {}
+    for kind, name, header, body in ROUTINE.findall(schema):
+        kind = kind.upper()
+        variables = {}
+        if kind in ('PROCEDURE', 'FUNCTION'):
+            for var, sql_type in re.findall(r"(?i)\b(?:IN|OUT|INOUT)?\s*\b(in_\w+)\s+(\w+)", header):
+                variables[var] = sql_type.upper()
+        for var, sql_type in re.findall(r"(?i)\bDECLARE\s+(v_\w+)\s+(\w+)", body):
+            variables[var] = sql_type.upper()
+        trigger_event = re.search(r"(?i)\b(BEFORE|AFTER)\s+(INSERT|UPDATE|DELETE)\s+ON\s+`?(\w+)`?", header)
+        routines[name] = {
+            'kind': kind,
+            'name': name,
+            'variables': variables,
+            'statements': _body_statements(body),
+            'event': trigger_event.group(2).upper() if trigger_event else None,
+            'table': trigger_event.group(3) if trigger_event else None,
+        }
+    return routines
+
+
+def _body_statements(body):
+    statements = []
+    for chunk in body.split(";"):
+        match = STATEMENT_START.search(chunk)
+        if match:
+            statements.append(SELECT_INTO.sub("", chunk[match.start():]).strip())
+    return statements
+
+
+def _bind_routine_sql(sql, routine):
+    def literal(match):
+        sql_type = routine['variables'].get(match.group(0))
+        if sql_type is None:
+            return match.group(0)
+        return SAMPLE_LITERALS.get(sql_type, DEFAULT_LITERAL)
+
+    sql = re.sub(r"\b(?:in_|v_)\w+\b", literal, sql)
+    return re.sub(r"\b(?:NEW|OLD)\.\w+", DEFAULT_LITERAL, sql)
+
+
+def _bind_python_sql(sql):
+    return sql.replace("%s", DEFAULT_LITERAL)
+
+
+def build_audit_list(sources, schema_path, prefix):
+    """Expands db_* statements through procedures, functions and triggers."""
+    statements, procedures = collect_python_statements(sources, prefix)
+    routines = parse_routines(schema_path)
+
+    audit = []  # (source, bound sql)
+    for source, sql in statements:
+        audit.append((source, _bind_python_sql(sql)))
+    for source, name in procedures:
+        routine = routines.get(name)
+        if routine is None:
+            print(f"warning: {source} calls unknown procedure {name}", file=sys.stderr)
+            continue
+        for sql in routine['statements']:
+            audit.append((f"{source} -> {name}", _bind_routine_sql(sql, routine)))
+
+    # Follow stored functions and triggers until nothing new turns up.
+    seen = set()
+    index = 0
+    while index < len(audit):
+        source, sql = audit[index]
+        index += 1
+        followed = [routines[fn] for fn in FUNCTION_CALL.findall(sql) if fn in routines]
+        for match in WRITE_TARGET.finditer(sql):
+            event = next(group for group in match.groups()[:4] if group).upper()
+            event = 'INSERT' if event == 'REPLACE' else event
+            followed.extend(
+                r for r in routines.values()
+                if r['kind'] == 'TRIGGER' and r['table'].lower() == match.group(5).lower() and r['event'] == event
+            )
+        for routine in followed:
+            if routine['name'] in seen:
+                continue
+            seen.add(routine['name'])
+            for body_sql in routine['statements']:
+                audit.append((f"{source} -> {routine['name']}", _bind_routine_sql(body_sql, routine)))
+    return audit
+
+
+# --- EXPLAIN ---
+
+def flag_plan_row(row, min_rows, allowed_tables):
+    table = row.get('table') or ""
+    if not table or table.startswith("<") or table.lower() in allowed_tables:
+        return []
+    rows = row.get('rows') or 0
+    extra = row.get('Extra') or ""
+    problems = []
+    if row.get('type') == 'ALL' and rows >= min_rows:
+        problems.append("full table scan")
+    if row.get('type') == 'index' and rows >= min_rows:
+        problems.append("full index scan")
+    if "Using filesort" in extra:
+        problems.append("filesort")
+    if "Using temporary" in extra:
+        problems.append("temporary table")
+    return problems
+
+
+def explain_all(conn, audit, min_rows, allowed_tables):
+    results = []
+    cursor = conn.cursor(dictionary=True)
+    for source, sql in audit:
+        entry = {'source': source, 'sql': " ".join(sql.split()), 'plan': [], 'problems': [], 'error': None}
+        try:
+            cursor.execute("EXPLAIN " + sql)
+            entry['plan'] = cursor.fetchall()
+        except mysql.connector.Error as err:
+            entry['error'] = str(err)
+        for row in entry['plan']:
+            for problem in flag_plan_row(row, min_rows, allowed_tables):
+                entry['problems'].append(f"{row['table']}: {problem} (type={row.get('type')}, rows={row.get('rows')})")
+        results.append(entry)
+    cursor.close()
+    return results
+
+
+def print_report(results, verbose):
+    flagged = [r for r in results if r['problems']]
+    errors = [r for r in results if r['error']]
+    for entry in results:
+        if not (entry['problems'] or entry['error'] or verbose):
+            continue
+        status = "FLAG" if entry['problems'] else "ERROR" if entry['error'] else "ok"
+        print(f"[{status}] {entry['source']}")
+        print(f"    {entry['sql'][:160]}")
+        for problem in entry['problems']:
+            print(f"    - {problem}")
+        if entry['error']:
+            print(f"    - could not EXPLAIN: {entry['error']}")
+        if verbose:
+            for row in entry['plan']:
+                print(f"      {row.get('table')}: type={row.get('type')} key={row.get('key')} "
+                      f"rows={row.get('rows')} extra={row.get('Extra')}")
+    print(f"\n{len(results)} statements explained, {len(flagged)} flagged, {len(errors)} could not be explained.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", action="append", help="Python file(s) to scan (default: repository/mysql_repo.py and repository/prepared.py)")
+    parser.add_argument("--schema", default="pesuconnect_schema.sql")
+    parser.add_argument("--prefix", default="", help="only scan functions whose name starts with this")
+    parser.add_argument("--min-rows", type=int, default=100,
+                        help="ignore full scans the optimizer estimates at fewer rows than this")
+    parser.add_argument("--allow", action="append", default=[], help="table allowed to be scanned (repeatable)")
+    parser.add_argument("--list", action="store_true", help="only list the statements, don't connect")
+    parser.add_argument("--json", help="also write the full report to this file")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every plan, not just problems")
+    args = parser.parse_args()
+
+    audit = build_audit_list(args.source or ["repository/mysql_repo.py", "repository/prepared.py"], args.schema, args.prefix)
+    if args.list:
+        for source, sql in audit:
+            print(f"{source}:\n    {' '.join(sql.split())}")
+        return 0
+
+    conn = mysql.connector.connect(**load_db_config())
+    try:
+        results = explain_all(conn, audit, args.min_rows, {table.lower() for table in args.allow})
+    finally:
+        conn.close()
+
+    print_report(results, args.verbose)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+    return 1 if any(r['problems'] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""Exports payment, contract or review history as CSV or Parquet, streaming.
+
+    python -m tools.export_history payments > payments.csv
+    python -m tools.export_history contracts --format parquet -o contracts.parquet
+    python -m tools.export_history reviews --student 42
+    python -m tools.export_history payments --backend sqlite --sqlite-path pesuconnect.sqlite3
+
+Platform-wide by default, or one student's history with --student. Rows are
+read through an unbuffered cursor --chunk-size at a time and written out as
+they arrive (one Parquet row group per chunk), so output starts at once and
+memory stays flat however many rows there are. Archived rows are included
+and marked archived=1.
+
+Reads only; point DB_REPLICA_* at a replica and pass --replica to keep a
+large export off the primary.
+"""
+import argparse
+import sys
+import time
+
+import mysql.connector
+
+from db_config import load_db_config, load_replica_config
+from history_export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_history
+from repository import HISTORY_COLUMNS, MySQLRepository, RepositoryError, SQLiteRepository
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=sorted(HISTORY_COLUMNS))
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv")
+    parser.add_argument("-o", "--output", help="file to write (default: stdout)")
+    parser.add_argument("--student", type=int, help="only this student's history")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE, help="rows fetched at a time")
+    parser.add_argument("--replica", action="store_true", help="read from the DB_REPLICA_* server")
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], default="mysql")
+    parser.add_argument("--sqlite-path", default="pesuconnect.sqlite3")
+    args = parser.parse_args()
+
+    if args.backend == "sqlite":
+        repo = SQLiteRepository(args.sqlite_path)
+    else:
+        config = load_replica_config() if args.replica else load_db_config()
+        if config is None:
+            print("--replica needs DB_REPLICA_HOST.", file=sys.stderr)
+            return 1
+        repo = MySQLRepository(mysql.connector.connect(**config))
+    sink = open(args.output, "wb") if args.output else sys.stdout.buffer
+    started = time.perf_counter()
+    try:
+        rows = export_history(repo, args.kind, args.format, sink, args.student, args.chunk_size)
+    except RepositoryError as err:
+        print(f"Export failed: {err}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        return 0  # e.g. piped into head
+    finally:
+        if args.output:
+            sink.close()
+        repo.conn.close()
+    print(f"Exported {rows} {args.kind} row(s) in {time.perf_counter() - started:.1f}s.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
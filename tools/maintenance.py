@@ -0,0 +1,85 @@
+"""Closes expired projects and archives finished work, in bounded batches.
+
+    python -m tools.maintenance
+    python -m tools.maintenance --retention-days 365 --batch-size 200
+    python -m tools.maintenance --backend sqlite --sqlite-path pesuconnect.sqlite3 --every 900
+
+Each batch is its own transaction, so the job can be stopped at any point and
+live traffic only ever waits for one batch. A run drains both backlogs:
+expired Open projects are closed and their pending applications rejected,
+then Completed/Closed projects older than --retention-days are moved with
+their applications, contracts and payments into the *_Archive tables.
+
+On MySQL the ev_Close_Expired_Projects and ev_Archive_Finished_Work events do
+the same when event_scheduler is ON; run this from cron otherwise, and always
+for SQLite (or pass --every to keep it running).
+"""
+import argparse
+import sys
+import time
+
+import mysql.connector
+
+from db_config import load_db_config
+from repository import MySQLRepository, RepositoryError, SQLiteRepository
+
+
+def drain(step, key, log, pause=0.0):
+    """Calls step() until it reports no `key` rows; returns the summed counts."""
+    totals = {}
+    while True:
+        counts = step()
+        for name, value in counts.items():
+            totals[name] = totals.get(name, 0) + value
+        if not counts[key]:
+            return totals
+        log(", ".join(f"{name} {value}" for name, value in counts.items()))
+        time.sleep(pause)
+
+
+def run_once(repo, retention_days, batch_size, pause, log=print):
+    closed = drain(lambda: repo.close_expired_projects(batch_size), 'projects_closed', log, pause)
+    archived = drain(lambda: repo.archive_finished_work(retention_days, batch_size), 'projects', log, pause)
+    return closed, archived
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--retention-days", type=int, default=180,
+                        help="archive finished projects this many days after they end")
+    parser.add_argument("--batch-size", type=int, default=500, help="projects per transaction")
+    parser.add_argument("--pause", type=float, default=0.1, help="seconds to sleep between batches")
+    parser.add_argument("--every", type=float, help="keep running, starting a pass every this many seconds")
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], default="mysql")
+    parser.add_argument("--sqlite-path", default="pesuconnect.sqlite3")
+    args = parser.parse_args()
+
+    if args.backend == "sqlite":
+        repo = SQLiteRepository(args.sqlite_path)
+    else:
+        repo = MySQLRepository(mysql.connector.connect(**load_db_config()))
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                closed, archived = run_once(repo, args.retention_days, args.batch_size, args.pause)
+            except RepositoryError as err:
+                print(f"Maintenance failed: {err}", file=sys.stderr)
+                if args.every is None:
+                    return 1
+            else:
+                print(f"Closed {closed['projects_closed']} expired project(s), "
+                      f"rejected {closed['applications_rejected']} application(s); archived "
+                      f"{archived['projects']} project(s), {archived['applications']} application(s), "
+                      f"{archived['contracts']} contract(s), {archived['payments']} payment(s).")
+            if args.every is None:
+                return 0
+            time.sleep(max(0.0, args.every - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        repo.conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Checks or rebuilds the payment rollups behind the Earnings & Spending page.
+
+Student_Payment_Summary, Student_Payment_Month and Department_Payment_Summary
+are kept current by trg_Payment_Rollups_INSERT. Use this after a bulk import,
+a restore, or whenever the totals look wrong:
+
+    python -m tools.payment_rollups            # report drift, exit 1 if any
+    python -m tools.payment_rollups --rebuild  # recompute from the payments, then verify
+    python -m tools.payment_rollups --backend sqlite --sqlite-path pesuconnect.sqlite3
+"""
+import argparse
+import sys
+
+import mysql.connector
+
+from db_config import load_db_config
+from repository import MySQLRepository, RepositoryError, SQLiteRepository
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="recompute the rollups from the payments first")
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], default="mysql")
+    parser.add_argument("--sqlite-path", default="pesuconnect.sqlite3")
+    args = parser.parse_args()
+
+    if args.backend == "sqlite":
+        repo = SQLiteRepository(args.sqlite_path)
+    else:
+        repo = MySQLRepository(mysql.connector.connect(**load_db_config()))
+    try:
+        if args.rebuild:
+            repo.rebuild_payment_rollups()
+            print("Rebuilt the payment rollups from Payment and Payment_Archive.")
+        drift = repo.verify_payment_rollups()
+    except RepositoryError as err:
+        print(f"Payment rollup check failed: {err}", file=sys.stderr)
+        return 1
+    finally:
+        repo.conn.close()
+
+    if not drift:
+        print("The payment rollups match the payments.")
+        return 0
+
+    print(f"{len(drift)} rollup row(s) disagree with the payments (actual minus rollup):")
+    for row in drift:
+        key = f"{row['rollup']} {row['rollup_key']!r}" + (f" {row['month']:%Y-%m}" if row['month'] else "")
+        print(
+            f"  {key}: earned {row['earned']:+} over {row['earned_count']:+} payment(s), "
+            f"spent {row['spent']:+} over {row['spent_count']:+} payment(s)"
+        )
+    print("Run with --rebuild to fix.")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Checks or rebuilds the Student_Rating_Summary table.
+
+Student_Rating_Summary is kept current by triggers on Review. Use this after a
+bulk import, a restore, or whenever ratings look wrong:
+
+    python -m tools.rating_summary            # report drift, exit 1 if any
+    python -m tools.rating_summary --rebuild  # recompute from Review, then verify
+"""
+import argparse
+import sys
+
+import mysql.connector
+
+from db_config import load_db_config
+
+
+def call(conn, procedure):
+    cursor = conn.cursor(dictionary=True)
+    cursor.callproc(procedure)
+    rows = []
+    for result in cursor.stored_results():
+        rows = result.fetchall()
+    cursor.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="recompute the summary from Review first")
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**load_db_config())
+    try:
+        if args.rebuild:
+            call(conn, 'sp_RebuildRatingSummary')
+            conn.commit()
+            print("Rebuilt Student_Rating_Summary from Review.")
+
+        drift = call(conn, 'sp_VerifyRatingSummary')
+    finally:
+        conn.close()
+
+    if not drift:
+        print("Student_Rating_Summary matches Review.")
+        return 0
+
+    print(f"{len(drift)} student(s) have a summary that disagrees with Review:")
+    for row in drift:
+        print(
+            f"  student {row['student_id']}: "
+            f"count {row['summary_review_count']} vs {row['actual_review_count']}, "
+            f"sum {row['summary_rating_sum']} vs {row['actual_rating_sum']}, "
+            f"last {row['summary_last_review_date']} vs {row['actual_last_review_date']}"
+        )
+    print("Run with --rebuild to fix.")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Checks the read replica the app routes reads to (DB_REPLICA_* variables).
+
+    python -m tools.replica_check
+    python -m tools.replica_check --timeout 30
+
+Connects to the primary (DB_*) and the replica (DB_REPLICA_*), and reports:
+
+  * which server each one is (host, port, server_id, read_only), so a
+    replica config that points back at the primary is caught;
+  * where a RoutingRepository sends each Repository method, and any name in
+    READ_ONLY_METHODS that is not a Repository method;
+  * replication lag: how long the replica's Entity_Version counters take to
+    reach the primary's platform-wide sums (every write bumps one, see
+    migration 008).
+
+Read-only on both servers. Exits 1 if a check fails. To try it locally, run a
+second MySQL instance replicating from the first (e.g. on port 3307) and set
+DB_REPLICA_HOST=127.0.0.1 DB_REPLICA_PORT=3307.
+"""
+import argparse
+import inspect
+import sys
+import time
+from contextlib import nullcontext
+
+import mysql.connector
+
+from db_config import load_db_config, load_replica_config
+from repository import READ_ONLY_METHODS, MySQLRepository, Repository, RoutingRepository
+
+
+def server_identity(conn):
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("SELECT @@hostname AS host, @@port AS port, @@server_id AS server_id, @@read_only AS read_only")
+    row = cursor.fetchone()
+    cursor.close()
+    return row
+
+
+def routing_table(primary, replica):
+    """{method: 'replica' | 'primary'} for every public Repository method."""
+    router = RoutingRepository(primary, lambda: nullcontext(replica))
+    table = {}
+    for name, _ in inspect.getmembers(Repository, inspect.isfunction):
+        if name.startswith("_"):
+            continue
+        if name in READ_ONLY_METHODS:
+            table[name] = 'replica' if getattr(router, name).__self__ is replica else 'primary'
+        else:
+            table[name] = 'primary'
+    return table
+
+
+def wait_for_catch_up(primary, replica, timeout, interval=0.1):
+    """Seconds until every replica counter reaches the primary's, or None after `timeout`."""
+    target = primary.get_entity_versions()
+    start = time.monotonic()
+    while True:
+        current = replica.get_entity_versions()
+        if all(current.get(entity, 0) >= version for entity, version in target.items()):
+            return time.monotonic() - start
+        if time.monotonic() - start >= timeout:
+            return None
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--timeout", type=float, default=10.0,
+                        help="seconds to wait for the replica to catch up before failing")
+    args = parser.parse_args()
+
+    replica_config = load_replica_config()
+    if replica_config is None:
+        print("DB_REPLICA_HOST is not set; the app reads from the primary.", file=sys.stderr)
+        return 1
+
+    primary_conn = mysql.connector.connect(**load_db_config())
+    replica_conn = mysql.connector.connect(**replica_config)
+    # Each poll must see the replica's latest applied changes, not one snapshot.
+    primary_conn.autocommit = replica_conn.autocommit = True
+    failed = False
+    try:
+        primary_id, replica_id = server_identity(primary_conn), server_identity(replica_conn)
+        for role, ident in (("primary", primary_id), ("replica", replica_id)):
+            print(f"{role:8} {ident['host']}:{ident['port']}  server_id={ident['server_id']}  "
+                  f"read_only={ident['read_only']}")
+        if primary_id['server_id'] == replica_id['server_id']:
+            print("The replica config points at the primary itself.", file=sys.stderr)
+            failed = True
+        elif not replica_id['read_only']:
+            print("Warning: the replica is not read_only, so a stray write would make it diverge.")
+
+        primary, replica = MySQLRepository(primary_conn), MySQLRepository(replica_conn)
+        table = routing_table(primary, replica)
+        print()
+        for target in ('replica', 'primary'):
+            names = sorted(name for name, routed in table.items() if routed == target)
+            print(f"-> {target} ({len(names)}): {', '.join(names)}")
+        unknown = sorted(READ_ONLY_METHODS - set(table))
+        if unknown:
+            print(f"READ_ONLY_METHODS names no Repository method: {', '.join(unknown)}", file=sys.stderr)
+            failed = True
+
+        print()
+        lag = wait_for_catch_up(primary, replica, args.timeout)
+        if lag is None:
+            print(f"The replica is still behind the primary after {args.timeout:g}s.", file=sys.stderr)
+            failed = True
+        else:
+            print(f"Replica caught up with the primary's Entity_Version counters in {lag:.3f}s.")
+    finally:
+        primary_conn.close()
+        replica_conn.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
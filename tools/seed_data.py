@@ -0,0 +1,314 @@
+"""Fills an empty pesuConnect database with synthetic, load-shaped data.
+
+Row counts come from a preset (--scale) and can be overridden per table.
+Activity is skewed the way a real marketplace is: project owners and
+freelancers are drawn from Zipf-like distributions, so at the larger scales
+a few owners post hundreds of projects and a few freelancers collect
+thousands of reviews, while most students have a handful of each.
+
+    python -m tools.seed_data --scale campus
+    python -m tools.seed_data --backend sqlite --sqlite-path bench.sqlite3 --scale large
+    python -m tools.seed_data --scale small --projects 5000 --reviews 3000
+
+Rows go in through the normal tables, so the triggers run as they would in
+production (passwords are hashed, Student_Rating_Summary is maintained). The
+database must be empty; every seeded student's password is "password".
+"""
+import argparse
+import datetime
+import hashlib
+import re
+import sys
+import time
+
+import mysql.connector
+import numpy as np
+
+from db_config import load_db_config
+from repository import MySQLRepository, SQLiteRepository
+
+SCALES = {
+    'small': {'students': 500, 'skills': 100, 'projects': 2_000, 'applications': 8_000,
+              'contracts': 800, 'reviews': 500, 'payments': 500},
+    'campus': {'students': 5_000, 'skills': 300, 'projects': 20_000, 'applications': 100_000,
+               'contracts': 8_000, 'reviews': 6_000, 'payments': 6_000},
+    'large': {'students': 50_000, 'skills': 1_000, 'projects': 200_000, 'applications': 1_000_000,
+              'contracts': 80_000, 'reviews': 60_000, 'payments': 60_000},
+}
+
+SEED_PASSWORD = "password"
+
+DEPARTMENTS = ["CSE", "ECE", "EEE", "ME", "BT", "CV", "AIML", "BBA", "DESIGN"]
+SKILL_NAMES = (
+    "Python Java C++ SQL JavaScript React Django Flask Figma Photoshop Illustrator "
+    "Excel PowerBI Tableau MachineLearning DataAnalysis Statistics Arduino Embedded "
+    "Linux Docker AWS Git Android iOS Flutter Unity Blender VideoEditing Writing "
+    "Proofreading Translation Kannada Hindi Marketing SEO Photography Calculus Physics LaTeX"
+).split()
+WORDS = (
+    "website app mobile data analysis python java design logo poster video editing "
+    "research survey report machine learning model dashboard database backend frontend "
+    "api scraper automation bot chatbot game android portfolio tutoring calculus physics "
+    "presentation slides excel marketing content writing blog translation photography "
+    "event branding illustration animation arduino robotics iot sensor cloud testing thesis"
+).split()
+REVIEW_TEXTS = ["Great work, delivered early.", "Solid job.", "Good communication.",
+                "Needed a few revisions.", "Would hire again!", "Late, but the result was fine."]
+PAYMENT_METHODS = ["UPI", "Bank Transfer", "Cash", "Card"]
+LEVELS = ["Beginner", "Intermediate", "Advanced"]
+
+# Insert order respects foreign keys; deletes go the other way.
+TABLES = ["Student", "Skill", "Student_Skill", "Project", "Project_Skill",
+          "Application", "Contract", "Review", "Payment"]
+COLUMNS = {
+    'Student': ("student_id", "name", "email", "password", "phone_number", "department", "year_of_study"),
+    'Skill': ("skill_id", "skill_name"),
+    'Student_Skill': ("student_id", "skill_id", "proficiency_level"),
+    'Project': ("project_id", "student_id", "title", "description", "deadline", "status"),
+    'Project_Skill': ("project_id", "skill_id", "min_proficiency"),
+    'Application': ("application_id", "application_date", "status", "student_id", "project_id"),
+    'Contract': ("contract_id", "start_date", "end_date", "status", "student_id", "project_id"),
+    'Review': ("review_id", "review_text", "rating", "student_id", "contract_id", "review_date"),
+    'Payment': ("payment_id", "amount", "payment_date", "status", "payment_method", "contract_id"),
+}
+
+
+def zipf_choice(rng, n, size, skew):
+    """Draws `size` ids in 1..n; id popularity follows 1/rank^skew over a random ranking."""
+    weights = 1.0 / np.arange(1, n + 1) ** skew
+    ranking = rng.permutation(n) + 1
+    return ranking[rng.choice(n, size=size, p=weights / weights.sum())]
+
+
+def _text(rng, low, high):
+    return " ".join(rng.choice(WORDS, size=int(rng.integers(low, high))))
+
+
+def generate(counts, seed=42, skew=1.0, today=None):
+    """Builds every table's rows in memory. Returns {table: [row tuples]} in COLUMNS order.
+
+    Counts are clamped to what the schema allows: one contract per project, and
+    reviews and payments only for completed contracts.
+    """
+    rng = np.random.default_rng(seed)
+    today = today or datetime.date.today()
+    n_students = max(counts['students'], 2)
+    n_skills = counts['skills']
+    n_projects = counts['projects']
+    n_contracts = min(counts['contracts'], n_projects)
+    n_completed = min(max(counts['reviews'], counts['payments']), n_contracts)
+    n_reviews = min(counts['reviews'], n_completed)
+    n_payments = min(counts['payments'], n_completed)
+    data = {table: [] for table in TABLES}
+
+    for student_id in range(1, n_students + 1):
+        data['Student'].append((
+            student_id, f"Student {student_id}", f"student{student_id}@pesu.edu", SEED_PASSWORD,
+            f"9{student_id:09d}", DEPARTMENTS[student_id % len(DEPARTMENTS)], int(rng.integers(1, 5)),
+        ))
+
+    for skill_id in range(1, n_skills + 1):
+        base = SKILL_NAMES[(skill_id - 1) % len(SKILL_NAMES)]
+        data['Skill'].append((skill_id, base if skill_id <= len(SKILL_NAMES) else f"{base} {skill_id}"))
+
+    if n_skills:
+        for student_id in range(1, n_students + 1):
+            picked = set(zipf_choice(rng, n_skills, int(rng.integers(0, 9)), skew).tolist())
+            data['Student_Skill'].extend((student_id, int(s), LEVELS[int(rng.integers(0, 3))]) for s in picked)
+
+    owners = zipf_choice(rng, n_students, n_projects, skew)
+    for project_id in range(1, n_projects + 1):
+        deadline = today + datetime.timedelta(days=int(rng.integers(7, 180)))
+        data['Project'].append((project_id, int(owners[project_id - 1]), _text(rng, 3, 8)[:100],
+                                _text(rng, 20, 80), deadline, 'Open'))
+        if n_skills:
+            picked = set(zipf_choice(rng, n_skills, int(rng.integers(1, 6)), skew).tolist())
+            data['Project_Skill'].extend((project_id, int(s), LEVELS[int(rng.integers(0, 3))]) for s in picked)
+
+    # Contracts: a random subset of projects, each with a (skewed) freelancer who
+    # is not the owner. The first n_completed are completed.
+    contracted = rng.permutation(n_projects)[:n_contracts] + 1
+    freelancers = zipf_choice(rng, n_students, n_contracts, skew)
+    applied = set()
+    project_status = {}
+    for contract_id, project_id in enumerate(contracted.tolist(), start=1):
+        owner = data['Project'][project_id - 1][1]
+        freelancer = int(freelancers[contract_id - 1])
+        if freelancer == owner:
+            freelancer = freelancer % n_students + 1
+        completed = contract_id <= n_completed
+        start = today - datetime.timedelta(days=int(rng.integers(1, 365)))
+        deadline = data['Project'][project_id - 1][4]
+        end = min(start + datetime.timedelta(days=int(rng.integers(1, 60))), today) if completed else deadline
+        data['Contract'].append((contract_id, start, end, 'Completed' if completed else 'In Progress',
+                                 freelancer, project_id))
+        project_status[project_id] = 'Completed' if completed else 'In Progress'
+        data['Application'].append((len(data['Application']) + 1, start, 'Accepted', freelancer, project_id))
+        applied.add((freelancer, project_id))
+        if contract_id <= n_reviews:
+            rating = int(rng.choice([5, 4, 3, 2, 1], p=[0.5, 0.3, 0.12, 0.05, 0.03]))
+            data['Review'].append((contract_id, REVIEW_TEXTS[int(rng.integers(0, len(REVIEW_TEXTS)))],
+                                   rating, freelancer, contract_id, end))
+        if contract_id <= n_payments:
+            amount = round(float(rng.lognormal(7.5, 0.8)), 2)
+            data['Payment'].append((contract_id, amount, end, 'Paid',
+                                    PAYMENT_METHODS[int(rng.integers(0, len(PAYMENT_METHODS)))], contract_id))
+
+    # The remaining applications go to popular projects first; students never
+    # apply twice to a project or to their own.
+    remaining = counts['applications'] - len(data['Application'])
+    attempts = 0
+    while remaining > 0 and attempts < 20:
+        attempts += 1
+        batch = max(remaining * 2, 1000)
+        projects = zipf_choice(rng, n_projects, batch, skew)
+        students = rng.integers(1, n_students + 1, size=batch)
+        for project_id, student_id in zip(projects.tolist(), students.tolist()):
+            if remaining == 0:
+                break
+            if student_id == data['Project'][project_id - 1][1] or (student_id, project_id) in applied:
+                continue
+            applied.add((student_id, project_id))
+            status = 'Rejected' if project_id in project_status else 'Pending'
+            applied_on = today - datetime.timedelta(days=int(rng.integers(0, 30)))
+            data['Application'].append((len(data['Application']) + 1, applied_on, status, student_id, project_id))
+            remaining -= 1
+
+    data['_project_status'] = project_status
+    return data
+
+
+def _insert_sql(table, placeholder):
+    columns = COLUMNS[table]
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join([placeholder] * len(columns))})"
+
+
+def _scalar(cursor, sql):
+    cursor.execute(sql)
+    row = cursor.fetchone()
+    return next(iter(row.values())) if isinstance(row, dict) else row[0]
+
+
+def seed(repo, counts, seed=42, skew=1.0, batch_size=1000, log=None):
+    """Generates data for `counts` and inserts it through repo.conn. Returns rows per table."""
+    is_sqlite = isinstance(repo, SQLiteRepository)
+    conn = repo.conn
+    cursor = conn.cursor()
+    if _scalar(cursor, "SELECT COUNT(*) FROM Student"):
+        raise RuntimeError("The database already has students; seed an empty one.")
+
+    data = generate(counts, seed=seed, skew=skew)
+    project_status = data.pop('_project_status')
+    if is_sqlite:
+        # The MySQL trigger hashes on insert; SQLite stores what it is given.
+        hashed = hashlib.sha1(SEED_PASSWORD.encode()).hexdigest()
+        data['Student'] = [row[:3] + (hashed,) + row[4:] for row in data['Student']]
+    placeholder = "?" if is_sqlite else "%s"
+
+    inserted = {}
+    for table in TABLES:
+        start = time.perf_counter()
+        rows = data[table]
+        sql = _insert_sql(table, placeholder)
+        if is_sqlite:
+            cursor.execute("BEGIN")
+        for offset in range(0, len(rows), batch_size):
+            cursor.executemany(sql, rows[offset:offset + batch_size])
+            if not is_sqlite:
+                conn.commit()
+        if is_sqlite:
+            conn.commit()
+        inserted[table] = len(rows)
+        if table == 'Application':
+            # Applications are only accepted while a project is Open, so the
+            # contracted projects change status after them.
+            _set_project_statuses(conn, cursor, project_status, placeholder, batch_size, is_sqlite)
+        if log:
+            log(f"{table}: {len(rows)} rows in {time.perf_counter() - start:.1f}s")
+    cursor.close()
+    return inserted
+
+
+def _set_project_statuses(conn, cursor, project_status, placeholder, batch_size, is_sqlite):
+    for status in ('In Progress', 'Completed'):
+        ids = [project_id for project_id, s in project_status.items() if s == status]
+        if is_sqlite:
+            cursor.execute("BEGIN")
+        for offset in range(0, len(ids), batch_size):
+            chunk = ids[offset:offset + batch_size]
+            cursor.execute(
+                f"UPDATE Project SET status = {placeholder} WHERE project_id IN ({', '.join([placeholder] * len(chunk))})",
+                (status, *chunk),
+            )
+            if not is_sqlite:
+                conn.commit()
+        if is_sqlite:
+            conn.commit()
+
+
+def apply_mysql_schema(conn, schema_path="pesuconnect_schema.sql"):
+    """Creates the schema in the connection's current database.
+
+    Runs pesuconnect_schema.sql statement by statement, honouring its DELIMITER
+    blocks and skipping the DROP/CREATE/USE DATABASE lines at the top so the
+    caller chooses the database.
+    """
+    with open(schema_path) as f:
+        script = f.read()
+    cursor = conn.cursor()
+    delimiter = ";"
+    buffer = []
+    for line in script.splitlines():
+        stripped = line.strip()
+        match = re.match(r"(?i)^DELIMITER\s+(\S+)", stripped)
+        if match:
+            delimiter = match.group(1)
+            continue
+        if re.match(r"(?i)^(DROP|CREATE)\s+DATABASE\b|^USE\s+\w+\s*;", stripped):
+            continue
+        buffer.append(line)
+        if stripped.endswith(delimiter):
+            statement = "\n".join(buffer).strip()[:-len(delimiter)].strip()
+            buffer = []
+            if statement and not all(l.strip().startswith("--") or not l.strip() for l in statement.splitlines()):
+                cursor.execute(statement)
+    conn.commit()
+    cursor.close()
+
+
+def scale_counts(scale, overrides):
+    counts = dict(SCALES[scale])
+    counts.update({table: n for table, n in overrides.items() if n is not None})
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    for table in SCALES['small']:
+        parser.add_argument(f"--{table}", type=int, help=f"override the number of {table}")
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent for owner/freelancer activity")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], default="mysql")
+    parser.add_argument("--sqlite-path", default="pesuconnect.sqlite3")
+    args = parser.parse_args()
+
+    counts = scale_counts(args.scale, {table: getattr(args, table) for table in SCALES['small']})
+    if args.backend == "sqlite":
+        repo = SQLiteRepository(args.sqlite_path)
+    else:
+        repo = MySQLRepository(mysql.connector.connect(**load_db_config()))
+    try:
+        inserted = seed(repo, counts, seed=args.seed, skew=args.skew, batch_size=args.batch_size, log=print)
+    except RuntimeError as err:
+        print(err, file=sys.stderr)
+        return 1
+    finally:
+        repo.conn.close()
+    print(f"Seeded {sum(inserted.values())} rows.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())